@@ -3,26 +3,66 @@
 API endpoint dla Facebook Messenger bota.
 """
 import os
+import json
 import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI, BackgroundTasks, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 
 from src import utils
-from src.facebook_bot import FacebookBot
-from src.messenger_monitor import MessengerMonitor
+from src.rate_limiter import get_rate_limiter
+from src.scheduler import create_scheduler
+from src.jobs import JobManager
+from src.driver_lease import DriverLeaseManager, PRIORITY_EXTRACTION
+from src.event_stream import EventBroadcaster
+from src import message_query
+from src import metrics
 from config import settings
+from config.config_watcher import start_config_watcher
 
 load_dotenv()
 
 # Globalna instancja bota
 bot_instance = None
 monitor_task = None
+scheduler = None
+config_watcher = None
+
+# Arbiter współdzielonej przeglądarki - monitoring, zadania API i harmonogram
+# pobierają WebDrivera wyłącznie przez dzierżawy
+lease_manager = None
+
+# Strumień zdarzeń o nowych wiadomościach (SSE / WebSocket)
+event_broadcaster = EventBroadcaster(
+    history_size=settings.config.get_stream_history_size(),
+    subscriber_buffer=settings.config.get_stream_subscriber_buffer()
+)
+
+metrics.REGISTRY.gauge(
+    "messenger_bot_rate_limiter_tokens",
+    "Dostępne tokeny globalnego limitera akcji",
+    lambda: get_rate_limiter().available_tokens()
+)
+metrics.REGISTRY.gauge(
+    "messenger_bot_event_stream_dropped",
+    "Zdarzenia odrzucone przez wolnych subskrybentów strumienia",
+    lambda: event_broadcaster.get_stats()['dropped']
+)
+
+# Cache najczęściej pobieranych stron historii (GET /conversations/{id}/messages)
+page_cache = message_query.PageCache(max_pages=settings.config.get_message_page_cache_size())
+
+# Zadania w tle (ekstrakcja) - jeden worker, bo wszystkie używają tej samej przeglądarki
+job_manager = JobManager(max_workers=1)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Zarządzanie cyklem życia aplikacji"""
-    global bot_instance, monitor_task
+    global bot_instance, monitor_task, scheduler, lease_manager, config_watcher
+    # Selenium i webdriver_manager ładowane dopiero przy tworzeniu przeglądarki
+    from src.facebook_bot import FacebookBot
+    from src.messenger_monitor import MessengerMonitor
     
     # Startup
     utils.setup_logging()
@@ -37,7 +77,17 @@ async def lifespan(app: FastAPI):
     
     if bot_instance.navigate_to_messenger():
         print("Bot uruchomiony i gotowy do pracy")
-        monitor = MessengerMonitor(bot_instance.driver, config=settings.config)
+        lease_manager = DriverLeaseManager(bot_instance.driver)
+        monitor = MessengerMonitor(
+            bot_instance.driver,
+            config=settings.config,
+            lease_manager=lease_manager,
+            event_broadcaster=event_broadcaster
+        )
+
+        # Harmonogram akcji okresowych (periodic_actions) - współdzieli dzierżawy przeglądarki
+        scheduler = create_scheduler(settings.config, lease_manager=lease_manager)
+        scheduler.start()
 
         # Pobierz i zapisz listę czatów
         print("\n📋 Pobieranie listy czatów...")
@@ -70,15 +120,24 @@ async def lifespan(app: FastAPI):
             monitor.extract_and_save_all_conversations(conversations=conversations, output_dir='data')
             print("\n✅ Ekstrakcja wiadomości zakończona!")
 
+        # Zmiany bot_config bez restartu (i bez ponownego logowania)
+        config_watcher = start_config_watcher(settings.config)
+
         # Uruchom monitoring w tle (jeśli włączony w konfiguracji)
+        # Interwał czytany z konfiguracji w każdym ticku - działa po przeładowaniu
         if config.is_monitoring_enabled():
             monitor_task = asyncio.create_task(
-                asyncio.to_thread(monitor.run_monitoring_loop, settings.POLLING_INTERVAL)
+                asyncio.to_thread(monitor.run_monitoring_loop)
             )
     
     yield
     
     # Shutdown
+    if config_watcher:
+        config_watcher.stop()
+    job_manager.shutdown()
+    if scheduler:
+        scheduler.stop()
     if monitor_task:
         monitor_task.cancel()
     if bot_instance:
@@ -95,9 +154,27 @@ async def root():
 async def health_check():
     return {
         "status": "healthy",
-        "bot_active": bot_instance is not None
+        "bot_active": bot_instance is not None,
+        "rate_limiter": get_rate_limiter().get_stats(),
+        "driver_leases": lease_manager.get_stats() if lease_manager else None,
+        "event_stream": event_broadcaster.get_stats()
     }
 
+@app.get("/schedule")
+async def schedule_status():
+    """Stan zadań okresowych i okna aktywności"""
+    if not scheduler:
+        return {"jobs": [], "active": None}
+    return {
+        "jobs": scheduler.get_status(),
+        "active": scheduler.active_window.is_active()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Metryki w formacie tekstowym Prometheusa"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/stop")
 async def stop_bot():
     """Zatrzymaj bota"""
@@ -108,34 +185,207 @@ async def stop_bot():
         return {"message": "Bot stopped"}
     return {"message": "Bot not running"}
 
+def _run_extraction_job(job, max_conversations=None):
+    """Wykonuje ekstrakcję wiadomości w wątku zadania."""
+    from src.messenger_monitor import MessengerMonitor
+
+    monitor = MessengerMonitor(bot_instance.driver, lease_manager=lease_manager)
+
+    # Jedna długa dzierżawa na pobranie listy i ekstrakcję (wywłaszczana przez monitoring)
+    with lease_manager.lease("extraction", PRIORITY_EXTRACTION, preemptible=True):
+        conversations = monitor.get_all_conversations()
+
+        return monitor.extract_and_save_all_conversations(
+            conversations=conversations,
+            output_dir='data',
+            max_conversations=max_conversations,
+            progress_callback=job.update_progress,
+            cancel_event=job.cancel_event
+        )
+
 @app.post("/extract-messages")
 async def extract_messages(max_conversations: int = None):
     """
-    Ekstraktuj wiadomości z konwersacji.
+    Zleca ekstrakcję wiadomości z konwersacji jako zadanie w tle.
 
     Args:
         max_conversations: Maksymalna liczba konwersacji do przetworzenia (None = wszystkie)
+
+    Returns:
+        ID zadania - postęp dostępny pod GET /jobs/{job_id}
     """
-    global bot_instance
     if not bot_instance:
         return {"error": "Bot not running"}
 
-    try:
-        monitor = MessengerMonitor(bot_instance.driver)
-        conversations = monitor.get_all_conversations()
+    job = job_manager.submit(
+        "extract_messages",
+        _run_extraction_job,
+        parameters={"max_conversations": max_conversations}
+    )
 
-        stats = monitor.extract_and_save_all_conversations(
-            conversations=conversations,
-            output_dir='data',
-            max_conversations=max_conversations
+    return {
+        "status": "accepted",
+        "job_id": job.id,
+        "status_url": f"/jobs/{job.id}"
+    }
+
+@app.get("/jobs")
+async def list_jobs():
+    """Lista zadań w tle"""
+    return {"jobs": [job.to_dict() for job in job_manager.list()]}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Postęp zadania: przetworzone konwersacje, wiadomości, bieżąca konwersacja, ETA"""
+    job = job_manager.get(job_id)
+    if not job:
+        return {"error": "Job not found"}
+    return job.to_dict()
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Anuluj zadanie (kooperacyjnie - po bieżącym kroku)"""
+    job = job_manager.cancel(job_id)
+    if not job:
+        return {"error": "Job not found"}
+    return job.to_dict()
+
+def _conversation_dir(conversation_id):
+    """Katalog danych konwersacji (None dla niepoprawnego lub nieistniejącego ID)."""
+    source_dir = settings.config.get_export_settings().get('source_dir') or 'data'
+    if not conversation_id or os.path.basename(conversation_id) != conversation_id or conversation_id in ('.', '..'):
+        return None
+    conv_dir = os.path.join(source_dir, conversation_id)
+    return conv_dir if os.path.isdir(conv_dir) else None
+
+def _conditional_response(payload, etag, if_none_match=None):
+    """Odpowiedź JSON z ETagiem (304 bez treści, gdy klient ma aktualną wersję)."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if payload is None or message_query.etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
+
+@app.get("/conversations")
+async def list_conversations(if_none_match: str = Header(None, alias="If-None-Match")):
+    """Zapisane konwersacje: liczba wiadomości, ostatnia wiadomość, format zapisu"""
+    source_dir = settings.config.get_export_settings().get('source_dir') or 'data'
+    conversations, etag = await asyncio.to_thread(message_query.list_conversations, source_dir)
+    return _conditional_response({"conversations": conversations}, etag, if_none_match)
+
+@app.get("/conversations/{conversation_id}/messages")
+async def conversation_messages(conversation_id: str, before: str = None, after: str = None, limit: int = None,
+                                if_none_match: str = Header(None, alias="If-None-Match")):
+    """
+    Strona wiadomości konwersacji (paginacja kursorami).
+
+    Bez kursorów zwraca najnowsze wiadomości; cursors.before w odpowiedzi
+    prowadzi do starszej strony, cursors.after do nowszej.
+
+    Args:
+        before: Kursor - wiadomości starsze niż pozycja kursora
+        after: Kursor - wiadomości od pozycji kursora
+        limit: Rozmiar strony (domyślnie message_api.page_size)
+    """
+    conv_dir = _conversation_dir(conversation_id)
+    if not conv_dir:
+        return {"error": "Conversation not found"}
+
+    try:
+        page, etag = await asyncio.to_thread(
+            message_query.query_messages, conv_dir, before=before, after=after,
+            limit=limit or settings.config.get_message_page_size(), cache=page_cache, if_none_match=if_none_match
         )
+    except message_query.QueryError as e:
+        return {"error": str(e)}
+    return _conditional_response(page, etag)
+
+@app.get("/conversations/{conversation_id}/statistics")
+async def conversation_statistics(conversation_id: str):
+    """
+    Statystyki konwersacji: aktywność nadawców, rozkład godzinowy i dzienny,
+    czasy odpowiedzi (percentyle, histogram), media i reakcje.
+    """
+    conv_dir = _conversation_dir(conversation_id)
+    if not conv_dir:
+        return {"error": "Conversation not found"}
+
+    from src.conversation_stats import compute_conversation_statistics
+    return await asyncio.to_thread(compute_conversation_statistics, conv_dir)
+
+def _parse_last_event_id(value):
+    """Zamienia nagłówek/parametr Last-Event-ID na liczbę (None jeśli brak lub niepoprawny)."""
+    try:
+        return int(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+@app.get("/events")
+async def stream_events(request: Request, last_event_id: str = None,
+                        last_event_id_header: str = Header(None, alias="Last-Event-ID")):
+    """
+    Strumień Server-Sent Events z nowymi wiadomościami wykrytymi przez monitor.
+
+    Wznawianie: nagłówek Last-Event-ID (ustawiany automatycznie przez EventSource)
+    lub parametr ?last_event_id=.
+    """
+    subscriber = event_broadcaster.subscribe(
+        last_event_id=_parse_last_event_id(last_event_id_header or last_event_id),
+        loop=asyncio.get_running_loop()
+    )
+    heartbeat = settings.config.get_stream_heartbeat()
+
+    async def event_source():
+        try:
+            if subscriber.history_gap:
+                yield "event: reset\ndata: {}\n\n"
+            while not await request.is_disconnected():
+                event = await subscriber.get(timeout=heartbeat)
+
+                dropped = subscriber.take_dropped()
+                if dropped:
+                    yield f"event: dropped\ndata: {json.dumps({'count': dropped})}\n\n"
+
+                if event is None:
+                    yield ": heartbeat\n\n"
+                    continue
+
+                payload = json.dumps(event.to_dict(), ensure_ascii=False)
+                yield f"id: {event.id}\nevent: {event.type}\ndata: {payload}\n\n"
+        finally:
+            subscriber.close()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/ws/events")
+async def websocket_events(websocket: WebSocket, last_event_id: str = None):
+    """Strumień nowych wiadomości przez WebSocket (JSON per zdarzenie)."""
+    await websocket.accept()
+    subscriber = event_broadcaster.subscribe(
+        last_event_id=_parse_last_event_id(last_event_id),
+        loop=asyncio.get_running_loop()
+    )
+    heartbeat = settings.config.get_stream_heartbeat()
+
+    try:
+        if subscriber.history_gap:
+            await websocket.send_json({"type": "reset"})
+        while True:
+            event = await subscriber.get(timeout=heartbeat)
+
+            dropped = subscriber.take_dropped()
+            if dropped:
+                await websocket.send_json({"type": "dropped", "count": dropped})
+
+            if event is None:
+                await websocket.send_json({"type": "heartbeat"})
+                continue
 
-        return {
-            "status": "success",
-            "stats": stats
-        }
-    except Exception as e:
-        return {
-            "status": "error",
-            "error": str(e)
-        }
+            await websocket.send_json(event.to_dict())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscriber.close()
@@ -0,0 +1,377 @@
+"""
+Lokalna atrapa Messengera do benchmarków ekstrakcji (bez Facebooka).
+
+Serwer HTTP odtwarza strukturę DOM, na której opiera się MessengerMonitor:
+- lista czatów: div[role='navigation'] div[role='grid'] div[role='gridcell']
+  z linkiem a[href*='/t/'], nazwą w span[dir='auto'] i znacznikiem
+  div[aria-label='Unread'] dla nieprzeczytanych,
+- wiadomości: div[role='row'] w przewijanym div[role='main'] (aria-label
+  "X said '...'", znacznik czasu span[aria-label*=':'], reakcje, obrazki),
+- leniwe doładowanie historii po przewinięciu na samą górę (z opóźnieniem),
+- wirtualizację DOM - po przekroczeniu limitu wierszy najnowsze są usuwane.
+
+Wiadomości generowane są deterministycznie na żądanie z (seed, czat, indeks),
+więc nawet N×M = miliony wiadomości nie zajmują pamięci serwera.
+"""
+import html
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIRST_NAMES = ["Anna", "Piotr", "Kasia", "Tomek", "Ola", "Marek", "Ewa", "Jan", "Zosia", "Adam"]
+LAST_NAMES = ["Nowak", "Kowalski", "Wiśniewska", "Wójcik", "Lewandowska", "Zieliński"]
+WORDS = (
+    "cześć co tam u ciebie jutro spotkanie kawa projekt wyślij plik dzięki "
+    "super ok widzimy się wieczorem zadzwoń później zdjęcie link termin"
+).split()
+REACTIONS = ["❤", "😂", "👍", "😮", "😢"]
+
+
+class SyntheticConversation:
+    """Syntetyczna konwersacja z deterministycznie generowanymi wiadomościami."""
+
+    def __init__(self, conversation_id, name, participants, message_count, seed,
+                 is_group=False, unread=False, muted=False, start=None):
+        self.id = conversation_id
+        self.name = name
+        self.participants = participants
+        self.message_count = message_count
+        self.seed = seed
+        self.is_group = is_group
+        self.unread = unread
+        self.muted = muted
+        self.start = start or datetime(2024, 1, 1, 8, 0)
+
+    def message(self, index):
+        """Zwraca wiadomość o podanym indeksie (0 = najstarsza)."""
+        rng = random.Random(f"{self.seed}:{self.id}:{index}")
+        sender = rng.choice(self.participants + ["You"])
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12))).capitalize()
+        return {
+            'index': index,
+            'sender': sender,
+            'text': text,
+            'timestamp': self.start + timedelta(minutes=index * 7 + rng.randint(0, 6)),
+            'reactions': [rng.choice(REACTIONS)] if rng.random() < 0.1 else [],
+            'image': f"/static/img/{self.id}_{index}.jpg" if rng.random() < 0.05 else None
+        }
+
+    def messages(self, start, stop):
+        """Zwraca wiadomości z zakresu [start, stop)."""
+        start = max(start, 0)
+        stop = min(stop, self.message_count)
+        return [self.message(i) for i in range(start, stop)]
+
+
+def generate_conversations(count, messages_per_conversation, seed=0, group_ratio=0.2,
+                           unread_ratio=0.1, muted_ratio=0.05):
+    """
+    Generuje syntetyczne konwersacje.
+
+    Args:
+        count: Liczba czatów (N)
+        messages_per_conversation: Liczba wiadomości w czacie (M)
+        seed: Ziarno generatora (te same parametry = te same dane)
+        group_ratio: Udział czatów grupowych
+        unread_ratio: Udział czatów z nieprzeczytanymi wiadomościami
+        muted_ratio: Udział wyciszonych czatów
+
+    Returns:
+        list: Lista SyntheticConversation (kolejność = kolejność w sidebarze)
+    """
+    rng = random.Random(seed)
+    conversations = []
+    for i in range(count):
+        is_group = rng.random() < group_ratio
+        people = [
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            for _ in range(rng.randint(3, 6) if is_group else 1)
+        ]
+        name = f"Grupa {i + 1}: {', '.join(p.split()[0] for p in people)}" if is_group else f"{people[0]} #{i + 1}"
+        conversations.append(SyntheticConversation(
+            conversation_id=str(100000 + i),
+            name=name,
+            participants=people,
+            message_count=messages_per_conversation,
+            seed=seed,
+            is_group=is_group,
+            unread=rng.random() < unread_ratio,
+            muted=rng.random() < muted_ratio
+        ))
+    return conversations
+
+
+def render_message_row(message):
+    """Renderuje wiadomość jako div[role='row'] (ten sam HTML co w JS strony)."""
+    text = html.escape(message['text'])
+    if message['sender'] == 'You':
+        label = f"You sent '{text}'"
+    else:
+        label = f"{html.escape(message['sender'])} said '{text}'"
+
+    parts = [
+        f'<div role="row" aria-label="{label}" data-index="{message["index"]}">',
+        f'<span class="time" aria-label="{message["timestamp"]:%H:%M}"></span>',
+        f'<div dir="auto">{text}</div>'
+    ]
+    if message['image']:
+        parts.append(f'<img src="{message["image"]}" alt="zdjęcie">')
+    for reaction in message['reactions']:
+        parts.append(f'<span aria-label="1 reaction: {reaction}">{reaction}</span>')
+    parts.append('</div>')
+    return ''.join(parts)
+
+
+def _message_to_json(message):
+    return dict(message, timestamp=message['timestamp'].isoformat(), html=render_message_row(message))
+
+
+PAGE_SCRIPT = """
+<script>
+(function () {
+  var main = document.querySelector("div[role='main']");
+  var threadId = main ? main.getAttribute('data-thread') : null;
+  var oldest = main ? parseInt(main.getAttribute('data-oldest'), 10) : 0;
+  var maxRows = %(max_dom_rows)d;
+  var loading = false;
+
+  function loadOlder() {
+    if (loading || oldest <= 0) return;
+    loading = true;
+    fetch('/api/t/' + threadId + '/history?before=' + oldest + '&limit=%(batch)d')
+      .then(function (r) { return r.json(); })
+      .then(function (data) {
+        var before = main.scrollHeight;
+        var html = data.messages.map(function (m) { return m.html; }).join('');
+        main.insertAdjacentHTML('afterbegin', html);
+        oldest = data.oldest;
+        // Wirtualizacja - usuń najnowsze wiersze ponad limit
+        if (maxRows > 0) {
+          var rows = main.querySelectorAll("div[role='row']");
+          for (var i = rows.length - 1; i >= maxRows; i--) rows[i].remove();
+        }
+        main.scrollTop = main.scrollHeight - before;
+        loading = false;
+      })
+      .catch(function () { loading = false; });
+  }
+
+  if (main) {
+    main.scrollTop = main.scrollHeight;
+    main.addEventListener('scroll', function () {
+      if (main.scrollTop === 0) loadOlder();
+    });
+  }
+
+  // Wskaźniki nieprzeczytanych aktualizowane "na żywo" jak w prawdziwym Messengerze
+  setInterval(function () {
+    fetch('/api/unread').then(function (r) { return r.json(); }).then(function (data) {
+      document.querySelectorAll("div[role='gridcell']").forEach(function (cell) {
+        var unread = data.unread.indexOf(cell.getAttribute('data-thread')) !== -1;
+        var marker = cell.querySelector("div[aria-label='Unread']");
+        if (unread && !marker) {
+          cell.insertAdjacentHTML('beforeend', '<div aria-label="Unread" class="dot"></div>');
+        } else if (!unread && marker) {
+          marker.remove();
+        }
+      });
+    });
+  }, %(unread_poll_ms)d);
+})();
+</script>
+"""
+
+PAGE_STYLE = """
+<style>
+  body { margin: 0; display: flex; font-family: sans-serif; }
+  div[role='navigation'] { width: 320px; height: 100vh; overflow-y: auto; }
+  div[role='main'] { flex: 1; height: 100vh; overflow-y: auto; }
+  div[role='row'] { padding: 6px 12px; min-height: 24px; }
+  .dot { display: inline-block; width: 8px; height: 8px; border-radius: 4px; background: #0866ff; }
+</style>
+"""
+
+
+class FakeMessengerApp:
+    """Stan atrapy Messengera i renderowanie stron."""
+
+    def __init__(self, conversations, batch_size=30, max_dom_rows=0, history_latency=0.0,
+                 unread_poll_ms=250):
+        """
+        Args:
+            conversations: Lista SyntheticConversation
+            batch_size: Liczba wiadomości na stronę historii (początkowa i doładowania)
+            max_dom_rows: Limit wierszy w DOM (0 = bez wirtualizacji)
+            history_latency: Sztuczne opóźnienie odpowiedzi z historią (sekundy)
+            unread_poll_ms: Co ile strona odświeża wskaźniki nieprzeczytanych
+        """
+        self.conversations = {conv.id: conv for conv in conversations}
+        self.order = [conv.id for conv in conversations]
+        self.batch_size = batch_size
+        self.max_dom_rows = max_dom_rows
+        self.history_latency = history_latency
+        self.unread_poll_ms = unread_poll_ms
+        self._lock = threading.Lock()
+        self.request_count = 0
+
+    def set_unread(self, conversation_id, unread=True):
+        """Oznacza konwersację jako (nie)przeczytaną."""
+        with self._lock:
+            conv = self.conversations.get(conversation_id)
+            if conv is None:
+                return False
+            conv.unread = unread
+            return True
+
+    def unread_ids(self):
+        with self._lock:
+            return [cid for cid in self.order if self.conversations[cid].unread]
+
+    def render_sidebar(self):
+        cells = []
+        for cid in self.order:
+            conv = self.conversations[cid]
+            marker = '<div aria-label="Unread" class="dot"></div>' if conv.unread else ''
+            label = html.escape(conv.name + (" · Muted" if conv.muted else ""), quote=True)
+            # Czat grupowy bez zdjęcia grupy - facepile z awatarów uczestników
+            facepile = '<svg><image></image><image></image></svg>' if conv.is_group else ''
+            cells.append(
+                f'<div role="gridcell" data-thread="{cid}" aria-label="{label}">{facepile}'
+                f'<a role="link" href="/messages/t/{cid}/"><span dir="auto">{html.escape(conv.name)}</span></a>'
+                f'{marker}</div>'
+            )
+        return f'<div role="navigation"><div role="grid">{"".join(cells)}</div></div>'
+
+    def render_page(self, conversation_id=None):
+        """Renderuje stronę główną lub stronę konwersacji."""
+        main = '<div role="main"></div>'
+        conv = self.conversations.get(conversation_id) if conversation_id else None
+        if conv is not None:
+            oldest = max(conv.message_count - self.batch_size, 0)
+            rows = ''.join(render_message_row(m) for m in conv.messages(oldest, conv.message_count))
+            main = f'<div role="main" data-thread="{conv.id}" data-oldest="{oldest}">{rows}</div>'
+
+        script = PAGE_SCRIPT % {
+            'max_dom_rows': self.max_dom_rows,
+            'batch': self.batch_size,
+            'unread_poll_ms': self.unread_poll_ms
+        }
+        title = html.escape(conv.name) if conv else 'Messenger'
+        return (
+            f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title>{PAGE_STYLE}</head>'
+            f'<body>{self.render_sidebar()}{main}{script}</body></html>'
+        )
+
+    def history(self, conversation_id, before, limit):
+        """Zwraca starsze wiadomości (leniwe doładowanie historii)."""
+        conv = self.conversations.get(conversation_id)
+        if conv is None:
+            return None
+        if self.history_latency:
+            time.sleep(self.history_latency)
+        start = max(before - limit, 0)
+        return {
+            'oldest': start,
+            'messages': [_message_to_json(m) for m in conv.messages(start, before)]
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    app = None
+
+    def log_message(self, format, *args):
+        # Bez logowania każdego żądania - zaburzałoby pomiary
+        pass
+
+    def _send(self, status, body, content_type):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, payload, status=200):
+        self._send(status, json.dumps(payload, ensure_ascii=False), 'application/json; charset=utf-8')
+
+    def do_GET(self):
+        self.app.request_count += 1
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+
+        if parts == ['messages']:
+            return self._send(200, self.app.render_page(), 'text/html; charset=utf-8')
+        if len(parts) == 3 and parts[:2] == ['messages', 't']:
+            if parts[2] not in self.app.conversations:
+                return self._send(404, 'not found', 'text/plain')
+            return self._send(200, self.app.render_page(parts[2]), 'text/html; charset=utf-8')
+        if len(parts) == 4 and parts[:2] == ['api', 't'] and parts[3] == 'history':
+            query = parse_qs(url.query)
+            payload = self.app.history(
+                parts[2],
+                int(query.get('before', ['0'])[0]),
+                int(query.get('limit', [str(self.app.batch_size)])[0])
+            )
+            if payload is None:
+                return self._send_json({'error': 'not found'}, 404)
+            return self._send_json(payload)
+        if parts == ['api', 'unread']:
+            return self._send_json({'unread': self.app.unread_ids()})
+        if parts[:2] == ['static', 'img']:
+            return self._send(200, '', 'image/jpeg')
+        return self._send(404, 'not found', 'text/plain')
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        # /control/unread/<id> lub /control/read/<id>
+        if len(parts) == 3 and parts[0] == 'control' and parts[1] in ('unread', 'read'):
+            ok = self.app.set_unread(parts[2], parts[1] == 'unread')
+            return self._send_json({'ok': ok}, 200 if ok else 404)
+        return self._send(404, 'not found', 'text/plain')
+
+
+class FakeMessengerServer:
+    """Serwer HTTP atrapy Messengera uruchamiany w wątku w tle."""
+
+    def __init__(self, app, host='127.0.0.1', port=0):
+        """
+        Args:
+            app: FakeMessengerApp
+            host: Adres nasłuchu
+            port: Port (0 = losowy wolny port)
+        """
+        self.app = app
+        handler = type('FakeMessengerHandler', (_Handler,), {'app': app})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def home_url(self):
+        return f"{self.base_url}/messages/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="FakeMessenger", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
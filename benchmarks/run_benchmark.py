@@ -0,0 +1,260 @@
+"""
+Benchmark ekstrakcji MessengerMonitor na lokalnej atrapie Messengera.
+
+Uruchamia FakeMessengerServer z N czatami po M wiadomości, steruje
+MessengerMonitor w headless Chrome i raportuje:
+- przepustowość (wiadomości/s, czaty/min) i czasy etapów per konwersacja,
+- opóźnienie wykrycia nowej wiadomości przez check_new_messages,
+- pamięć (szczyt tracemalloc, maxrss procesu, sterta JS przeglądarki),
+- liczbę komend WebDrivera (jeśli włączono --profile).
+
+Przykład:
+    python -m benchmarks.run_benchmark --chats 20 --messages 500 --max-dom-rows 200
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+import urllib.request
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_messenger import FakeMessengerApp, FakeMessengerServer, generate_conversations
+
+
+def _percentiles(values):
+    """Zwraca podsumowanie rozkładu (sekundy)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        'count': len(ordered),
+        'mean': round(statistics.fmean(ordered), 4),
+        'p50': round(ordered[len(ordered) // 2], 4),
+        'p95': round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 4),
+        'max': round(ordered[-1], 4)
+    }
+
+
+def create_driver(headless=True):
+    """Tworzy Chrome dla benchmarku (lokalny import - Selenium tylko tutaj)."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1280,900")
+    # performance.memory z dokładnymi wartościami
+    options.add_argument("--enable-precise-memory-info")
+    return webdriver.Chrome(options=options)
+
+
+def create_config(mode='extract'):
+    """Konfiguracja benchmarku: wszystkie czaty, bez limitera i snapshotów debug."""
+    from config.config_parser import ConfigParser
+
+    config = ConfigParser(config_file=os.devnull)
+    config.config['mode'] = mode
+    config.config['scope'] = 'all'
+    config.config['security']['respect_rate_limits'] = False
+    config.config['security']['random_delays'] = False
+    config.config['debugging'].update({
+        'save_screenshots': False,
+        'save_page_source': False,
+        'screenshot_on_error': False
+    })
+    config.config['notifications']['enabled'] = False
+    config.refresh_snapshot()
+    return config
+
+
+def _post(url):
+    request = urllib.request.Request(url, data=b'', method='POST')
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.load(response)
+
+
+def measure_extraction(monitor, conversations, open_wait, scroll_pause, max_scrolls):
+    """Przetwarza konwersacje krokami monitora i mierzy czas każdego etapu."""
+    timings = {'list': None, 'open': [], 'scroll': [], 'extract': [], 'conversation': []}
+    total_messages = 0
+    per_conversation = []
+
+    started = time.perf_counter()
+    listed = monitor.get_all_conversations()
+    timings['list'] = round(time.perf_counter() - started, 4)
+
+    for conv in listed[:len(conversations)]:
+        conv_started = time.perf_counter()
+
+        step = time.perf_counter()
+        if not monitor.open_conversation(conv['url'], wait_time=open_wait):
+            continue
+        timings['open'].append(time.perf_counter() - step)
+
+        step = time.perf_counter()
+        monitor.scroll_and_load_messages(max_scrolls=max_scrolls, scroll_pause=scroll_pause)
+        timings['scroll'].append(time.perf_counter() - step)
+
+        step = time.perf_counter()
+        messages = monitor.extract_messages_from_conversation()
+        timings['extract'].append(time.perf_counter() - step)
+
+        elapsed = time.perf_counter() - conv_started
+        timings['conversation'].append(elapsed)
+        total_messages += len(messages)
+        per_conversation.append({'name': conv['name'], 'messages': len(messages), 'seconds': round(elapsed, 3)})
+
+    total_seconds = time.perf_counter() - started
+    return {
+        'conversations_listed': len(listed),
+        'conversations_processed': len(per_conversation),
+        'messages': total_messages,
+        'seconds': round(total_seconds, 3),
+        'messages_per_second': round(total_messages / total_seconds, 2) if total_seconds else None,
+        'conversations_per_minute': round(len(per_conversation) / total_seconds * 60, 2) if total_seconds else None,
+        'list_seconds': timings['list'],
+        'open': _percentiles(timings['open']),
+        'scroll': _percentiles(timings['scroll']),
+        'extract': _percentiles(timings['extract']),
+        'conversation': _percentiles(timings['conversation']),
+        'per_conversation': per_conversation
+    }
+
+
+def measure_detection(monitor, server, conversation_ids, trials, poll_interval):
+    """
+    Mierzy opóźnienie od pojawienia się nieprzeczytanej wiadomości
+    do jej wykrycia przez check_new_messages.
+    """
+    monitor.driver.get(server.home_url)
+    time.sleep(1)
+    for cid in conversation_ids:
+        _post(f"{server.base_url}/control/read/{cid}")
+    time.sleep(server.app.unread_poll_ms / 1000 * 2)
+    monitor.check_new_messages()
+
+    latencies = []
+    for trial in range(trials):
+        cid = conversation_ids[trial % len(conversation_ids)]
+        marked_at = time.perf_counter()
+        _post(f"{server.base_url}/control/unread/{cid}")
+
+        deadline = marked_at + 30
+        while time.perf_counter() < deadline:
+            if monitor.check_new_messages():
+                latencies.append(time.perf_counter() - marked_at)
+                break
+            time.sleep(poll_interval)
+
+        _post(f"{server.base_url}/control/read/{cid}")
+        time.sleep(server.app.unread_poll_ms / 1000 * 2)
+        monitor.check_new_messages()
+
+    return {'trials': trials, 'detected': len(latencies), 'latency': _percentiles(latencies)}
+
+
+def browser_heap_bytes(driver):
+    try:
+        return driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : null")
+    except Exception:
+        return None
+
+
+def run(args):
+    conversations = generate_conversations(args.chats, args.messages, seed=args.seed, unread_ratio=0)
+    app = FakeMessengerApp(
+        conversations,
+        batch_size=args.batch,
+        max_dom_rows=args.max_dom_rows,
+        history_latency=args.history_latency
+    )
+
+    from src import metrics
+    from src.messenger_monitor import MessengerMonitor
+    from src.driver_profiler import DriverProfiler
+
+    tracemalloc.start()
+    with FakeMessengerServer(app) as server:
+        driver = create_driver(headless=not args.show_browser)
+        metrics.instrument_driver(driver)
+        profiler = None
+        if args.profile:
+            profiler = DriverProfiler(report_dir=args.output_dir)
+            profiler.install(driver)
+
+        try:
+            driver.get(server.home_url)
+            monitor = MessengerMonitor(driver, config=create_config(), home_url=server.home_url)
+
+            extraction = measure_extraction(
+                monitor, conversations, args.open_wait, args.scroll_pause, args.max_scrolls
+            )
+            heap_after_extraction = browser_heap_bytes(driver)
+            detection = measure_detection(
+                monitor, server, [c.id for c in conversations], args.detection_trials, args.poll_interval
+            )
+        finally:
+            driver.quit()
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'parameters': vars(args),
+        'extraction': extraction,
+        'detection': detection,
+        'memory': {
+            'python_peak_bytes': peak,
+            'process_maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'browser_js_heap_bytes': heap_after_extraction
+        },
+        'server_requests': app.request_count,
+        'driver_profile': profiler.build_report() if profiler else None
+    }
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n📊 Benchmark: {args.chats} czatów × {args.messages} wiadomości")
+    print(f"   Wiadomości:      {extraction['messages']} w {extraction['seconds']}s "
+          f"({extraction['messages_per_second']} msg/s)")
+    print(f"   Konwersacja p50: {(extraction['conversation'] or {}).get('p50')}s")
+    print(f"   Wykrycie p50:    {(detection['latency'] or {}).get('p50')}s")
+    print(f"   Pamięć (peak):   {peak / 1024 / 1024:.1f} MB Python")
+    print(f"   Raport:          {path}")
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ekstrakcji na atrapie Messengera")
+    parser.add_argument('--chats', type=int, default=10, help="Liczba czatów (N)")
+    parser.add_argument('--messages', type=int, default=200, help="Liczba wiadomości w czacie (M)")
+    parser.add_argument('--batch', type=int, default=30, help="Wiadomości na stronę historii")
+    parser.add_argument('--max-dom-rows', type=int, default=0, help="Limit wierszy w DOM (0 = bez wirtualizacji)")
+    parser.add_argument('--history-latency', type=float, default=0.05, help="Opóźnienie doładowania historii (s)")
+    parser.add_argument('--open-wait', type=float, default=0.5, help="wait_time dla open_conversation (s)")
+    parser.add_argument('--scroll-pause', type=float, default=0.2, help="Pauza między scrollami (s)")
+    parser.add_argument('--max-scrolls', type=int, default=50)
+    parser.add_argument('--detection-trials', type=int, default=5)
+    parser.add_argument('--poll-interval', type=float, default=0.1, help="Odstęp między check_new_messages (s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile', action='store_true', help="Dołącz profil komend WebDrivera")
+    parser.add_argument('--show-browser', action='store_true', help="Uruchom Chrome z oknem")
+    parser.add_argument('--output-dir', default='./logs/benchmarks/')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    run(parse_args())
@@ -9,6 +9,8 @@ import yaml
 import logging
 from typing import Dict, Any, Optional
 
+from config.config_snapshot import ConfigSnapshot, compile_config
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +26,9 @@ class ConfigParser:
         """
         self.config_file = config_file
         self.config = {}
+        self._snapshot = None
+        # Opis błędu, przez który użyto ustawień domyślnych (None = plik wczytany poprawnie)
+        self.load_error = None
         self._load_config()
 
     def _load_config(self):
@@ -49,9 +54,11 @@ class ConfigParser:
                         logger.info(f"Załadowano konfigurację YAML z {self.config_file}")
                     else:
                         logger.warning("Plik YAML jest pusty lub niepoprawny. Używam domyślnych ustawień.")
+                        self.load_error = "Plik YAML jest pusty lub niepoprawny"
                         self._load_defaults()
                 except yaml.YAMLError as e:
                     logger.error(f"Błąd parsowania pliku YAML: {e}")
+                    self.load_error = f"Błąd parsowania pliku YAML: {e}"
                     self._load_defaults()
             else:
                 # Ekstrahuj bloki YAML z markdown
@@ -65,6 +72,7 @@ class ConfigParser:
                             self._merge_config(self.config, parsed)
                     except yaml.YAMLError as e:
                         logger.warning(f"Błąd parsowania bloku YAML: {e}")
+                        self.load_error = f"Błąd parsowania bloku YAML: {e}"
                         continue
 
                 logger.info(f"Załadowano konfigurację z {self.config_file}")
@@ -72,10 +80,12 @@ class ConfigParser:
                 # Jeśli nie udało się załadować żadnej konfiguracji, użyj domyślnej
                 if not self.config:
                     logger.warning("Nie znaleziono poprawnych bloków YAML. Używam domyślnych ustawień.")
+                    self.load_error = "Nie znaleziono poprawnych bloków YAML"
                     self._load_defaults()
 
         except Exception as e:
             logger.error(f"Błąd wczytywania konfiguracji: {e}")
+            self.load_error = f"Błąd wczytywania konfiguracji: {e}"
             self._load_defaults()
 
     def _extract_yaml_blocks(self, content: str) -> list:
@@ -111,13 +121,20 @@ class ConfigParser:
 
     def _load_defaults(self):
         """Wczytuje domyślną konfigurację."""
-        self.config = {
+        self.config = self.default_config()
+        logger.info("Załadowano domyślną konfigurację")
+
+    @staticmethod
+    def default_config() -> Dict[str, Any]:
+        """Zwraca nową kopię domyślnej konfiguracji."""
+        return {
             'mode': 'monitor',
             'polling_interval': 10,
             'wait_timeout': 10,
             'headless_mode': False,
             'scope': 'all',
             'specific_conversations': [],
+            'conversation_matching': 'exact',
             'filters': {
                 'exclude_archived': True,
                 'exclude_muted': False,
@@ -164,6 +181,19 @@ class ConfigParser:
                 },
                 'keywords': []
             },
+            'streaming': {
+                'history_size': 1000,
+                'subscriber_buffer': 100,
+                'heartbeat_interval': 15
+            },
+            'message_api': {
+                'page_size': 50,
+                'page_cache_size': 256
+            },
+            'config_reload': {
+                'enabled': True,
+                'poll_interval': 2
+            },
             'auto_reply': {
                 'enabled': False,
                 'delay': 5,
@@ -176,6 +206,60 @@ class ConfigParser:
                     {'type': 'save_to_file', 'enabled': True, 'file_path': './data/messages.txt', 'format': 'json'}
                 ]
             },
+            'export': {
+                'enabled': True,
+                'auto_export': False,
+                'export_interval': 3600,
+                'formats': ['json'],
+                'source_dir': './data',
+                'destination': './exports/',
+                'state_file': './data/export_state.json',
+                'file_naming': {
+                    'pattern': '{date}_{conversation}_{format}'
+                },
+                'compression': {
+                    'enabled': False,
+                    'format': 'zip'
+                }
+            },
+            'export_content': {
+                'include_metadata': True,
+                'include_messages': True,
+                'include_media_links': True,
+                'include_timestamps': True,
+                'include_participants': True,
+                'include_statistics': False,
+                'anonymize': {
+                    'enabled': False,
+                    'anonymize_names': False,
+                    'anonymize_phone_numbers': False
+                }
+            },
+            'extraction_queue': {
+                'enabled': True,
+                'default_priority': 'low',
+                'aging_hours': 24,
+                'max_seconds': 0,
+                'max_actions': 0,
+                'state_file': './data/extraction_queue.json'
+            },
+            'extraction_checkpoint': {
+                'enabled': True,
+                'scroll_interval': 10,
+                'max_age_hours': 24,
+                'max_consecutive_failures': 3
+            },
+            'storage': {
+                'format': 'segments',
+                'segment_max_mb': 64
+            },
+            'compaction': {
+                'enabled': False,
+                'interval': 86400,
+                'source_dir': None,
+                'superseded': 'keep',
+                'min_snapshots': 2
+            },
             'debugging': {
                 'enabled': True,
                 'save_screenshots': True,
@@ -184,7 +268,26 @@ class ConfigParser:
                 'verbose_logging': False,
                 'log_level': 'INFO',
                 'log_file': './logs/bot.log',
-                'debug_dir': './debug_res/'
+                'debug_dir': './debug_res/',
+                'capture_scope': ['main', 'sidebar', 'dialog'],
+                'capture_strip_scripts': True,
+                'async_snapshots': True,
+                'snapshot_storage': 'store',
+                'snapshot_compression': 'gzip',
+                'snapshot_retention_days': 30,
+                'snapshot_max_total_mb': 500,
+                'snapshot_queue_size': 20,
+                'snapshot_sampling': {
+                    'enabled': True,
+                    'default': {'first': 5, 'per_minute': 1},
+                    'events': {
+                        'error': {'first': 3, 'per_minute': 1},
+                        'new_messages_detected': {'first': 10, 'per_minute': 2},
+                        'messages_count_decreased': {'first': 3, 'per_minute': 1}
+                    }
+                },
+                'profile_driver': False,
+                'profile_dir': './logs/profiles/'
             },
             'security': {
                 'respect_rate_limits': True,
@@ -192,6 +295,7 @@ class ConfigParser:
                 'min_delay': 1,
                 'max_delay': 3,
                 'max_actions_per_hour': 100,
+                'rate_limit_burst': 100,
                 'max_messages_per_conversation': 50
             },
             'schedule': {
@@ -200,10 +304,46 @@ class ConfigParser:
                     'start': '08:00',
                     'end': '22:00'
                 },
-                'active_days': [1, 2, 3, 4, 5]
-            }
+                'active_days': [1, 2, 3, 4, 5],
+                'state_file': './data/scheduler_state.json'
+            },
+            'periodic_actions': []
         }
-        logger.info("Załadowano domyślną konfigurację")
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """
+        Skompilowana migawka konfiguracji (kompilowana raz, przy pierwszym użyciu).
+
+        Po ręcznej zmianie self.config należy wywołać refresh_snapshot().
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh_snapshot()
+        return snapshot
+
+    def refresh_snapshot(self) -> ConfigSnapshot:
+        """Kompiluje migawkę z aktualnego self.config (domyślne ustawienia scalone pod spodem)."""
+        try:
+            self._snapshot = compile_config(self.config, self.default_config())
+        except ValueError as e:
+            logger.error(f"Błąd kompilacji konfiguracji: {e}. Używam domyślnych ustawień.")
+            self._snapshot = compile_config({}, self.default_config())
+        return self._snapshot
+
+    def apply(self, config: Dict[str, Any], snapshot: ConfigSnapshot):
+        """
+        Podmienia aktywną konfigurację (przeładowanie bez restartu).
+
+        Migawka podmieniana jest jednym przypisaniem, więc kod czytający
+        self.snapshot widzi w całości starą albo w całości nową konfigurację.
+
+        Args:
+            config: Nowy słownik konfiguracji
+            snapshot: Skompilowana i zwalidowana migawka tego słownika
+        """
+        self.config = config
+        self._snapshot = snapshot
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -256,6 +396,10 @@ class ConfigParser:
         """Zwraca zakres monitorowania."""
         return self.get('scope', 'all')
 
+    def get_conversation_filters(self) -> Dict[str, Any]:
+        """Zwraca filtry konwersacji (sekcja filters)."""
+        return self.snapshot.get('filters', {})
+
     def get_specific_conversations(self) -> list:
         """Zwraca listę konkretnych konwersacji do monitorowania."""
         return self.get('specific_conversations', [])
@@ -284,6 +428,34 @@ class ConfigParser:
         """Zwraca metody powiadamiania."""
         return self.get('notifications.methods', ['console', 'log_file'])
 
+    def get_stream_history_size(self) -> int:
+        """Zwraca liczbę ostatnich zdarzeń przechowywanych do wznawiania strumienia."""
+        return self.get('streaming.history_size', 1000)
+
+    def get_stream_subscriber_buffer(self) -> int:
+        """Zwraca rozmiar bufora zdarzeń jednego subskrybenta strumienia."""
+        return self.get('streaming.subscriber_buffer', 100)
+
+    def get_stream_heartbeat(self) -> int:
+        """Zwraca interwał (sekundy) wiadomości podtrzymujących połączenie strumienia."""
+        return self.get('streaming.heartbeat_interval', 15)
+
+    def get_message_page_size(self) -> int:
+        """Zwraca domyślny rozmiar strony GET /conversations/{id}/messages."""
+        return self.get('message_api.page_size', 50)
+
+    def get_message_page_cache_size(self) -> int:
+        """Zwraca liczbę stron wiadomości trzymanych w cache API."""
+        return self.get('message_api.page_cache_size', 256)
+
+    def is_config_reload_enabled(self) -> bool:
+        """Sprawdza czy przeładowywać konfigurację po zmianie pliku (bez restartu)."""
+        return self.get('config_reload.enabled', True)
+
+    def get_config_reload_interval(self) -> float:
+        """Zwraca co ile sekund sprawdzać zmiany pliku konfiguracji."""
+        return self.get('config_reload.poll_interval', 2)
+
     def is_auto_reply_enabled(self) -> bool:
         """Sprawdza czy automatyczne odpowiedzi są włączone."""
         return self.get('auto_reply.enabled', False)
@@ -296,6 +468,42 @@ class ConfigParser:
         """Zwraca reguły automatycznych odpowiedzi."""
         return self.get('auto_reply.rules', [])
 
+    def get_export_settings(self) -> Dict[str, Any]:
+        """Zwraca sekcję export (z domyślnymi wartościami dla brakujących kluczy)."""
+        return self.snapshot.get('export', {})
+
+    def get_export_content_settings(self) -> Dict[str, Any]:
+        """Zwraca sekcję export_content (z domyślnymi wartościami dla brakujących kluczy)."""
+        return self.snapshot.get('export_content', {})
+
+    def get_extraction_queue_settings(self) -> Dict[str, Any]:
+        """Zwraca sekcję extraction_queue (kolejność i budżet ekstrakcji)."""
+        return self.snapshot.get('extraction_queue', {})
+
+    def is_checkpoint_enabled(self) -> bool:
+        """Sprawdza czy zapisywać dziennik postępu ekstrakcji (wznawianie)."""
+        return self.get('extraction_checkpoint.enabled', True)
+
+    def get_checkpoint_scroll_interval(self) -> int:
+        """Zwraca co ile scrolli zapisywać postęp długiego scrollowania."""
+        return self.get('extraction_checkpoint.scroll_interval', 10)
+
+    def get_checkpoint_max_age_hours(self) -> Optional[float]:
+        """Zwraca wiek (godziny), po którym dziennik ekstrakcji nie jest wznawiany."""
+        return self.get('extraction_checkpoint.max_age_hours', 24)
+
+    def get_checkpoint_max_consecutive_failures(self) -> int:
+        """Zwraca liczbę nieudanych konwersacji pod rząd, po której ekstrakcja jest przerywana (0 = bez limitu)."""
+        return self.get('extraction_checkpoint.max_consecutive_failures', 3)
+
+    def get_storage_settings(self) -> Dict[str, Any]:
+        """Zwraca sekcję storage (format zapisu historii konwersacji)."""
+        return self.snapshot.get('storage', {})
+
+    def get_compaction_settings(self) -> Dict[str, Any]:
+        """Zwraca sekcję compaction (kompakcja snapshotów data/<konwersacja>/)."""
+        return self.snapshot.get('compaction', {})
+
     def is_debugging_enabled(self) -> bool:
         """Sprawdza czy debugging jest włączony."""
         return self.get('debugging.enabled', True)
@@ -320,6 +528,67 @@ class ConfigParser:
         """Zwraca katalog debugowania."""
         return self.get('debugging.debug_dir', './debug_res/')
 
+    def get_capture_scopes(self) -> Optional[list]:
+        """
+        Zwraca zakresy DOM zapisywane w snapshotach.
+
+        'page' (lub brak wartości) oznacza pełny page_source.
+        """
+        scopes = self.get('debugging.capture_scope', ['main', 'sidebar', 'dialog'])
+        if not scopes or scopes == 'page':
+            return None
+        return [scopes] if isinstance(scopes, str) else list(scopes)
+
+    def should_strip_captured_scripts(self) -> bool:
+        """Sprawdza czy usuwać script/style z zapisywanego HTML (w przeglądarce)."""
+        return self.get('debugging.capture_strip_scripts', True)
+
+    def are_snapshots_async(self) -> bool:
+        """Sprawdza czy zapisywać snapshoty debugowe w tle."""
+        return self.get('debugging.async_snapshots', True)
+
+    def get_snapshot_queue_size(self) -> int:
+        """Zwraca maksymalną liczbę snapshotów oczekujących na zapis."""
+        return self.get('debugging.snapshot_queue_size', 20)
+
+    def get_snapshot_storage(self) -> str:
+        """Zwraca sposób zapisu snapshotów ('store' - skompresowany magazyn, 'plain' - pliki)."""
+        return self.get('debugging.snapshot_storage', 'store')
+
+    def get_snapshot_compression(self) -> str:
+        """Zwraca kompresję HTML w magazynie snapshotów ('gzip' lub 'zstd')."""
+        return self.get('debugging.snapshot_compression', 'gzip')
+
+    def get_snapshot_retention_days(self) -> Optional[int]:
+        """Zwraca maksymalny wiek snapshotów w dniach (None = bez limitu)."""
+        return self.get('debugging.snapshot_retention_days', 30)
+
+    def get_snapshot_max_total_mb(self) -> Optional[int]:
+        """Zwraca maksymalny łączny rozmiar magazynu snapshotów w MB (None = bez limitu)."""
+        return self.get('debugging.snapshot_max_total_mb', 500)
+
+    def get_snapshot_sampling(self) -> Dict[str, Any]:
+        """
+        Zwraca reguły próbkowania snapshotów.
+
+        Returns:
+            dict: {'enabled', 'default': {'first', 'per_minute'}, 'events': {zdarzenie: reguła}}
+        """
+        sampling = self.get('debugging.snapshot_sampling', {}) or {}
+        return {
+            'enabled': sampling.get('enabled', True),
+            'default': sampling.get('default', {'first': 5, 'per_minute': 1}) or {},
+            'events': sampling.get('events', {}) or {}
+        }
+
+    def is_driver_profiling_enabled(self) -> bool:
+        """Sprawdza czy profilować komendy WebDrivera."""
+        return self.get('debugging.profile_driver', False)
+
+    def get_profile_dir(self) -> str:
+        """Zwraca katalog raportów profilera WebDrivera."""
+        return self.get('debugging.profile_dir', './logs/profiles/')
+
     def should_respect_rate_limits(self) -> bool:
         """Sprawdza czy szanować limity częstotliwości."""
         return self.get('security.respect_rate_limits', True)
@@ -336,6 +605,14 @@ class ConfigParser:
         """Zwraca maksymalne opóźnienie."""
         return self.get('security.max_delay', 3)
 
+    def get_max_actions_per_hour(self) -> int:
+        """Zwraca maksymalną liczbę akcji na godzinę."""
+        return self.get('security.max_actions_per_hour', 100)
+
+    def get_rate_limit_burst(self) -> int:
+        """Zwraca maksymalną liczbę akcji wykonywanych bez opóźnień (pojemność kubełka)."""
+        return self.get('security.rate_limit_burst', self.get_max_actions_per_hour())
+
     def is_schedule_enabled(self) -> bool:
         """Sprawdza czy harmonogram jest włączony."""
         return self.get('schedule.enabled', False)
@@ -348,6 +625,14 @@ class ConfigParser:
         """Zwraca dni aktywności."""
         return self.get('schedule.active_days', [1, 2, 3, 4, 5])
 
+    def get_scheduler_state_file(self) -> str:
+        """Zwraca ścieżkę do pliku ze stanem harmonogramu zadań okresowych."""
+        return self.get('schedule.state_file', './data/scheduler_state.json')
+
+    def get_periodic_actions(self) -> list:
+        """Zwraca listę akcji okresowych."""
+        return self.get('periodic_actions', []) or []
+
     def __repr__(self):
         """Reprezentacja tekstowa."""
         return f"<ConfigParser mode={self.get_mode()} scope={self.get_scope()}>"
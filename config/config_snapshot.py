@@ -0,0 +1,234 @@
+"""
+Skompilowana, niemutowalna migawka konfiguracji.
+
+ConfigParser.get przy każdym wywołaniu dzieli klucz kropkowy i przechodzi
+po zagnieżdżonych słownikach. Kod wykonywany w każdym ticku monitorowania
+i dla każdej konwersacji korzysta zamiast tego z ConfigSnapshot: wartości
+z domyślnymi ustawieniami scalonymi raz przy wczytaniu, listy jako krotki
+i zbiory, wyrażenia regularne i słowa kluczowe skompilowane z góry.
+"""
+import re
+from types import MappingProxyType
+from typing import Any, FrozenSet, Mapping, NamedTuple, Optional, Pattern, Tuple
+
+from config.conversation_matcher import MATCH_EXACT, MATCH_MODES, ConversationMatcher, compile_pattern, thread_id
+
+
+def freeze(value):
+    """Zamienia słowniki na MappingProxyType, a listy na krotki (rekurencyjnie)."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def merge_defaults(defaults: dict, config: dict) -> dict:
+    """Scala konfigurację z ustawieniami domyślnymi (bez modyfikowania argumentów)."""
+    merged = dict(defaults)
+    for key, value in config.items():
+        if isinstance(merged.get(key), dict) and isinstance(value, dict):
+            merged[key] = merge_defaults(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def compile_keywords(keywords) -> Optional[Pattern]:
+    """Kompiluje listę słów kluczowych w jedno wyrażenie (bez rozróżniania wielkości liter)."""
+    words = [str(word) for word in keywords or [] if word]
+    if not words:
+        return None
+    alternatives = "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+    return re.compile(f"(?:{alternatives})", re.IGNORECASE)
+
+
+class AutoReplyRule(NamedTuple):
+    """Reguła automatycznej odpowiedzi (wzorzec skompilowany)."""
+    trigger: str
+    pattern: Optional[Pattern]
+    response: str
+
+    def matches(self, text: str) -> bool:
+        if self.trigger == 'all' or self.pattern is None:
+            return True
+        return self.pattern.search(text or '') is not None
+
+
+class MessageAction(NamedTuple):
+    """Włączona akcja z on_new_message.actions."""
+    type: str
+    options: Mapping[str, Any]
+
+
+class ConversationRule(NamedTuple):
+    """Włączony wpis ze specific_conversations."""
+    name: str
+    key: str
+    priority: str
+    actions: Tuple[str, ...]
+    thread_id: Optional[str] = None
+    pattern: Optional[Pattern] = None
+
+    @property
+    def label(self) -> str:
+        """Opis wpisu w logach (nazwa, wątek lub wzorzec)."""
+        return self.name or (f"/t/{self.thread_id}" if self.thread_id else self.pattern.pattern if self.pattern else '')
+
+
+class ConfigSnapshot(NamedTuple):
+    """Typowana migawka konfiguracji (niemutowalna, bez __dict__)."""
+    raw: Mapping[str, Any]
+    mode: str
+    scope: str
+    polling_interval: float
+    wait_timeout: float
+    monitoring_enabled: bool
+    detect_new_messages: bool
+    notifications_enabled: bool
+    notification_methods: FrozenSet[str]
+    notification_keywords: Optional[Pattern]
+    save_screenshots: bool
+    screenshot_on_error: bool
+    new_message_actions: Tuple[MessageAction, ...]
+    auto_reply_enabled: bool
+    auto_reply_delay: float
+    auto_reply_rules: Tuple[AutoReplyRule, ...]
+    specific_conversations: Tuple[ConversationRule, ...]
+    conversation_matcher: ConversationMatcher
+    data_to_collect: Mapping[str, Any]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Odczyt klucza kropkowego z migawki (dla wartości bez dedykowanego pola)."""
+        value = self.raw
+        for part in key.split('.'):
+            if isinstance(value, Mapping) and part in value:
+                value = value[part]
+            else:
+                return default
+        return value
+
+    def matches_notification_keyword(self, text: str) -> bool:
+        """Sprawdza czy tekst zawiera któreś ze słów notifications.keywords."""
+        return self.notification_keywords is not None and self.notification_keywords.search(text or '') is not None
+
+
+def _compile_auto_reply_rules(rules) -> Tuple[AutoReplyRule, ...]:
+    compiled = []
+    for rule in rules or []:
+        if not isinstance(rule, Mapping) or not rule.get('enabled', True):
+            continue
+        pattern = rule.get('pattern')
+        compiled.append(AutoReplyRule(
+            trigger=rule.get('trigger', 'keyword'),
+            pattern=re.compile(pattern, re.IGNORECASE) if pattern else None,
+            response=rule.get('response', '')
+        ))
+    return tuple(compiled)
+
+
+def _compile_actions(actions) -> Tuple[MessageAction, ...]:
+    return tuple(
+        MessageAction(type=action.get('type'), options=freeze(action))
+        for action in actions or []
+        if isinstance(action, Mapping) and action.get('enabled', False)
+    )
+
+
+def _compile_conversations(conversations) -> Tuple[ConversationRule, ...]:
+    compiled = []
+    for conv in conversations or []:
+        if not isinstance(conv, Mapping) or not conv.get('enabled', True):
+            continue
+        name = str(conv.get('name') or '').strip()
+        rule = ConversationRule(
+            name=name,
+            key=name.casefold(),
+            priority=conv.get('priority', 'medium'),
+            actions=tuple(conv.get('actions') or ()),
+            thread_id=thread_id(conv.get('thread_id') or conv.get('url')),
+            pattern=compile_pattern(conv.get('pattern'), conv.get('regex'))
+        )
+        # Wpis bez nazwy, wątku i wzorca pasowałby do wszystkiego
+        if rule.key or rule.thread_id or rule.pattern is not None:
+            compiled.append(rule)
+    return tuple(compiled)
+
+
+def compile_config(config: dict, defaults: Optional[dict] = None) -> ConfigSnapshot:
+    """
+    Kompiluje słownik konfiguracji do ConfigSnapshot.
+
+    Args:
+        config: Konfiguracja wczytana z pliku
+        defaults: Ustawienia domyślne scalane pod konfiguracją
+
+    Returns:
+        ConfigSnapshot
+
+    Raises:
+        ValueError: Gdy wartość ma niepoprawny typ lub wzorzec regex jest błędny
+    """
+    merged = merge_defaults(defaults or {}, config or {})
+
+    def section(name):
+        value = merged.get(name)
+        return value if isinstance(value, dict) else {}
+
+    monitoring = section('monitoring')
+    notifications = section('notifications')
+    debugging = section('debugging')
+    auto_reply = section('auto_reply')
+
+    try:
+        conversations = _compile_conversations(merged.get('specific_conversations'))
+        return ConfigSnapshot(
+            raw=freeze(merged),
+            mode=str(merged.get('mode', 'monitor')),
+            scope=str(merged.get('scope', 'all')),
+            polling_interval=float(merged.get('polling_interval', 10)),
+            wait_timeout=float(merged.get('wait_timeout', 10)),
+            monitoring_enabled=bool(monitoring.get('enabled', True)),
+            detect_new_messages=bool(monitoring.get('detect_new_messages', True)),
+            notifications_enabled=bool(notifications.get('enabled', True)),
+            notification_methods=frozenset(notifications.get('methods') or ()),
+            notification_keywords=compile_keywords(notifications.get('keywords')),
+            save_screenshots=bool(debugging.get('save_screenshots', True)),
+            screenshot_on_error=bool(debugging.get('screenshot_on_error', True)),
+            new_message_actions=_compile_actions(section('on_new_message').get('actions')),
+            auto_reply_enabled=bool(auto_reply.get('enabled', False)),
+            auto_reply_delay=float(auto_reply.get('delay', 5)),
+            auto_reply_rules=_compile_auto_reply_rules(auto_reply.get('rules')),
+            specific_conversations=conversations,
+            conversation_matcher=ConversationMatcher(conversations, str(merged.get('conversation_matching', MATCH_EXACT))),
+            data_to_collect=freeze(section('data_to_collect'))
+        )
+    except (TypeError, re.error) as e:
+        raise ValueError(f"Niepoprawna konfiguracja: {e}") from e
+
+
+VALID_MODES = ('monitor', 'interactive', 'extract', 'auto')
+VALID_SCOPES = ('all', 'specific', 'groups', 'private')
+
+
+def validate_snapshot(snapshot: ConfigSnapshot) -> list:
+    """
+    Sprawdza poprawność wartości migawki.
+
+    Returns:
+        list: Opisy problemów (pusta lista = konfiguracja poprawna)
+    """
+    problems = []
+    if snapshot.mode not in VALID_MODES:
+        problems.append(f"mode: nieznany tryb '{snapshot.mode}'")
+    if snapshot.scope not in VALID_SCOPES:
+        problems.append(f"scope: nieznany zakres '{snapshot.scope}'")
+    if snapshot.conversation_matcher.mode not in MATCH_MODES:
+        problems.append(f"conversation_matching: nieznany tryb '{snapshot.conversation_matcher.mode}'")
+    if snapshot.polling_interval <= 0:
+        problems.append("polling_interval: wartość musi być dodatnia")
+    if snapshot.wait_timeout <= 0:
+        problems.append("wait_timeout: wartość musi być dodatnia")
+    if snapshot.auto_reply_delay < 0:
+        problems.append("auto_reply.delay: wartość nie może być ujemna")
+    return problems
@@ -0,0 +1,143 @@
+"""
+Przeładowywanie konfiguracji bez restartu.
+
+Wątek ConfigWatcher co poll_interval sekund sprawdza mtime i rozmiar pliku
+konfiguracji. Po zmianie plik jest ponownie parsowany przez ConfigParser,
+kompilowany i walidowany - dopiero poprawna konfiguracja podmienia aktywną
+(ConfigParser.apply). MessengerMonitor czyta migawkę w każdym ticku, więc
+zmiany specific_conversations, polling_interval czy reguł auto_reply działają
+od następnego ticku, bez ponownego logowania i bez dotykania przeglądarki.
+Błędna konfiguracja jest odrzucana, a bot działa dalej na poprzedniej.
+"""
+import os
+import threading
+import logging
+
+from config.config_parser import ConfigParser
+from config.config_snapshot import compile_config, validate_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigWatcher:
+    """Obserwuje plik konfiguracji i przeładowuje aktywny ConfigParser."""
+
+    def __init__(self, config, config_file=None, poll_interval=2.0, on_reload=None):
+        """
+        Args:
+            config: Aktywny ConfigParser (np. settings.config)
+            config_file: Obserwowany plik (domyślnie config.config_file)
+            poll_interval: Co ile sekund sprawdzać zmiany
+            on_reload: Opcjonalna funkcja wywoływana z nową migawką po przeładowaniu
+        """
+        self.config = config
+        self.config_file = config_file or config.config_file
+        self.poll_interval = poll_interval
+        self.on_reload = on_reload
+        self._signature = self._stat()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._stats = {'reloads': 0, 'rejected': 0, 'last_error': None}
+
+    @classmethod
+    def from_config(cls, config, on_reload=None):
+        """Tworzy obserwatora z sekcji config_reload."""
+        return cls(config, poll_interval=config.get_config_reload_interval(), on_reload=on_reload)
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.config_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self):
+        """
+        Sprawdza czy plik się zmienił i w razie potrzeby przeładowuje konfigurację.
+
+        Returns:
+            bool: True jeśli podmieniono konfigurację
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        return self.reload()
+
+    def reload(self):
+        """
+        Parsuje, kompiluje i waliduje plik; podmienia konfigurację tylko gdy jest poprawna.
+
+        Returns:
+            bool: True jeśli podmieniono konfigurację
+        """
+        candidate = ConfigParser(self.config_file)
+        problems = [candidate.load_error] if candidate.load_error else []
+
+        snapshot = None
+        if not problems:
+            try:
+                snapshot = compile_config(candidate.config, ConfigParser.default_config())
+                problems = validate_snapshot(snapshot)
+            except ValueError as e:
+                problems = [str(e)]
+
+        if problems:
+            self._stats['rejected'] += 1
+            self._stats['last_error'] = "; ".join(problems)
+            logger.error(f"❌ Odrzucono zmienioną konfigurację {self.config_file}: {self._stats['last_error']}")
+            return False
+
+        self.config.apply(candidate.config, snapshot)
+        self._stats['reloads'] += 1
+        self._stats['last_error'] = None
+        logger.info(f"🔁 Przeładowano konfigurację z {self.config_file} "
+                    f"(tryb: {snapshot.mode}, zakres: {snapshot.scope}, interwał: {snapshot.polling_interval:g}s)")
+
+        if self.on_reload:
+            try:
+                self.on_reload(snapshot)
+            except Exception as e:
+                logger.error(f"❌ Błąd obsługi przeładowania konfiguracji: {e}")
+        return True
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"❌ Błąd obserwatora konfiguracji: {e}")
+
+    def start(self):
+        """Uruchamia wątek obserwatora."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ConfigWatcher", daemon=True)
+        self._thread.start()
+        logger.info(f"👀 Obserwuję zmiany konfiguracji: {self.config_file} (co {self.poll_interval}s)")
+
+    def stop(self):
+        """Zatrzymuje wątek obserwatora."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def get_stats(self):
+        """Zwraca liczbę przeładowań i odrzuconych zmian."""
+        return dict(self._stats)
+
+
+def start_config_watcher(config, on_reload=None):
+    """
+    Uruchamia obserwatora konfiguracji, jeśli config_reload.enabled.
+
+    Returns:
+        ConfigWatcher lub None
+    """
+    if not config.is_config_reload_enabled():
+        return None
+    watcher = ConfigWatcher.from_config(config, on_reload=on_reload)
+    watcher.start()
+    return watcher
@@ -0,0 +1,138 @@
+"""
+Dopasowanie konwersacji z listy czatów do wpisów specific_conversations.
+
+Indeks budowany jest raz przy kompilacji konfiguracji (ConfigSnapshot):
+nazwy po casefold i identyfikatory wątków trafiają do słowników (wyszukanie
+O(1) niezależnie od liczby wpisów), a wzorce glob/regex łączone są w jedno
+wyrażenie sprawdzane jednym przebiegiem - pojedyncze wzorce sprawdzane są
+tylko dla nazw, które pasują do któregokolwiek z nich.
+
+Tryb "substring" zachowuje dawne dopasowanie częściowe (nazwa z konfiguracji
+zawarta w nazwie czatu lub odwrotnie) - wyłącznie po jawnym ustawieniu
+conversation_matching, bo krótka nazwa (np. "Bot") pasuje do wielu czatów.
+"""
+import fnmatch
+import re
+from typing import NamedTuple, Optional, Tuple
+
+MATCH_EXACT = 'exact'
+MATCH_SUBSTRING = 'substring'
+MATCH_MODES = (MATCH_EXACT, MATCH_SUBSTRING)
+
+_THREAD_ID = re.compile(r'/t/([^/?#]+)')
+
+
+def thread_id(value) -> Optional[str]:
+    """Identyfikator wątku z URL czatu (/t/<id>, /e2ee/t/<id>) lub samego id."""
+    value = str(value or '').strip()
+    if not value:
+        return None
+    found = _THREAD_ID.search(value)
+    if found:
+        return found.group(1)
+    return None if '/' in value else value
+
+
+def compile_pattern(glob=None, regex=None):
+    """Kompiluje wzorzec wpisu (glob lub regex, bez rozróżniania wielkości liter)."""
+    if regex:
+        return re.compile(regex, re.IGNORECASE)
+    if glob:
+        return re.compile('^' + fnmatch.translate(glob), re.IGNORECASE)
+    return None
+
+
+class MatchResult(NamedTuple):
+    """Wynik filtrowania listy konwersacji."""
+    matched: Tuple[dict, ...]
+    ambiguous: Tuple[str, ...]
+
+
+class ConversationMatcher:
+    """Indeks wpisów specific_conversations (nazwa, wątek, wzorzec)."""
+
+    def __init__(self, rules=(), mode=MATCH_EXACT):
+        """
+        Args:
+            rules: ConversationRule (kolejność = pierwszeństwo przy konflikcie)
+            mode: "exact" lub "substring" (dawne dopasowanie częściowe nazw)
+        """
+        self.rules = tuple(rules)
+        self.mode = mode
+        self._by_name = {}
+        self._by_thread = {}
+        self._patterns = []
+        for index, rule in enumerate(self.rules):
+            if rule.key:
+                self._by_name.setdefault(rule.key, []).append(index)
+            if rule.thread_id:
+                self._by_thread.setdefault(rule.thread_id, []).append(index)
+            if rule.pattern is not None:
+                self._patterns.append((index, rule.pattern))
+        # Jedno wyrażenie dla wszystkich wzorców - szybkie odrzucenie nazw bez dopasowania
+        self._any_pattern = None
+        if self._patterns:
+            try:
+                self._any_pattern = re.compile(
+                    "|".join(f"(?:{pattern.pattern})" for _, pattern in self._patterns), re.IGNORECASE
+                )
+            except re.error:
+                # Wzorce nie dają się połączyć (np. powtórzone nazwane grupy) - sprawdzane osobno
+                self._any_pattern = None
+        self._substring_keys = [(index, rule.key) for index, rule in enumerate(self.rules) if rule.key]
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _indexes(self, name, url=None):
+        key = (name or '').casefold()
+        found = list(self._by_name.get(key, ()))
+        tid = thread_id(url)
+        if tid is not None:
+            found.extend(self._by_thread.get(tid, ()))
+        if self._patterns and (self._any_pattern is None or self._any_pattern.search(name or '')):
+            found.extend(index for index, pattern in self._patterns if pattern.search(name or ''))
+        if self.mode == MATCH_SUBSTRING and key:
+            found.extend(index for index, rule_key in self._substring_keys if rule_key in key or key in rule_key)
+        return sorted(set(found))
+
+    def match(self, conv):
+        """Wszystkie wpisy pasujące do konwersacji (w kolejności konfiguracji)."""
+        return [self.rules[index] for index in self._indexes(conv.get('name'), conv.get('url'))]
+
+    def rule_for(self, conv):
+        """Pierwszy pasujący wpis (None gdy brak)."""
+        indexes = self._indexes(conv.get('name'), conv.get('url'))
+        return self.rules[indexes[0]] if indexes else None
+
+    def filter(self, conversations):
+        """
+        Konwersacje pasujące do któregokolwiek wpisu.
+
+        Niejednoznaczności: konwersacja pasująca do kilku wpisów (obowiązuje
+        pierwszy) oraz wpis bez wzorca pasujący do kilku konwersacji.
+
+        Returns:
+            MatchResult: (pasujące konwersacje z polem 'rule', opisy niejednoznaczności)
+        """
+        matched = []
+        ambiguous = []
+        hits = {}
+        for conv in conversations:
+            indexes = self._indexes(conv.get('name'), conv.get('url'))
+            if not indexes:
+                continue
+            rules = [self.rules[index] for index in indexes]
+            conv['rule'] = rules[0].label
+            matched.append(conv)
+            if len(rules) > 1:
+                ambiguous.append(f"'{conv.get('name')}' pasuje do wpisów: " + ", ".join(rule.label for rule in rules))
+            for index in indexes:
+                hits.setdefault(index, []).append(conv.get('name'))
+
+        # Wzorzec celowo obejmuje wiele czatów - raportowane są tylko nazwy
+        for index, names in hits.items():
+            if len(names) > 1 and self.rules[index].pattern is None:
+                ambiguous.append(f"wpis '{self.rules[index].label}' pasuje do {len(names)} konwersacji: "
+                                 + ", ".join(f"'{name}'" for name in names[:10]))
+        return MatchResult(tuple(matched), tuple(ambiguous))
@@ -1,54 +1,101 @@
-#config/settings.py
 """
 Ustawienia projektu.
+
+Import modułu jest tani: ścieżki i adresy URL są stałymi, a .env
+i plik konfiguracji wczytywane są dopiero przy pierwszym odczycie
+ustawienia, które ich wymaga (PEP 562 - module __getattr__), np.
+settings.config albo settings.PIN_MESSENGER. Katalogi logów i debugowania
+tworzy ensure_directories() (wywoływane przez utils.setup_logging).
 """
 import os
-from dotenv import load_dotenv
-from config.config_parser import ConfigParser
-
-load_dotenv()
+import threading
 
 # Ścieżki
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 DEBUG_DIR = os.path.join(BASE_DIR, "debug_res")
 
-# Utwórz katalogi jeśli nie istnieją
-os.makedirs(LOG_DIR, exist_ok=True)
-os.makedirs(DEBUG_DIR, exist_ok=True)
+# URL do logowania
+LOGIN_URL = "https://www.facebook.com/"
+MESSENGER_URL = "https://www.messenger.com/"
+MESSAGES_URL = "https://www.facebook.com/messages/"
 
-# Załaduj konfigurację - użyj zmiennej środowiskowej BOT_CONFIG_FILE jeśli jest ustawiona
-# Domyślnie: bot_config.yaml, fallback do bot_config.md
-CONFIG_FILE_NAME = os.getenv("BOT_CONFIG_FILE", "bot_config.yaml")
-CONFIG_FILE = os.path.join(BASE_DIR, CONFIG_FILE_NAME)
+_lock = threading.RLock()
+_env_loaded = False
+_config_parser = None
 
-# Jeśli wybrany plik nie istnieje, spróbuj bot_config.md
-if not os.path.exists(CONFIG_FILE):
-    CONFIG_FILE = os.path.join(BASE_DIR, "bot_config.md")
 
-config_parser = ConfigParser(CONFIG_FILE)
+def load_env():
+    """Wczytuje zmienne z .env (jednokrotnie)."""
+    global _env_loaded
+    with _lock:
+        if not _env_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _env_loaded = True
 
-# Ścieżka do WebDriver (nie jest już potrzebna z webdriver-manager, ale zostawiamy dla kompatybilności)
-DRIVER_PATH = os.getenv("DRIVER_PATH", "chromedriver")
 
-# PIN do Messengera (dla przywrócenia historii czatu)
-PIN_MESSENGER = os.getenv("PIN_MESSENGER")
+def ensure_directories():
+    """Tworzy katalogi logów i debugowania, jeśli nie istnieją."""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    os.makedirs(DEBUG_DIR, exist_ok=True)
 
-# URL do logowania
-LOGIN_URL = "https://www.facebook.com/"
-MESSENGER_URL = "https://www.messenger.com/"
 
-# Opóźnienie dla oczekiwania (w sekundach) - teraz z konfiguracji
-POLLING_INTERVAL = config_parser.get_polling_interval()
-WAIT_TIMEOUT = config_parser.get_wait_timeout()
+def get_config_file():
+    """
+    Zwraca ścieżkę pliku konfiguracji.
+
+    Zmienna środowiskowa BOT_CONFIG_FILE (domyślnie bot_config.yaml),
+    a gdy plik nie istnieje - bot_config.md.
+    """
+    load_env()
+    config_file = os.path.join(BASE_DIR, os.getenv("BOT_CONFIG_FILE", "bot_config.yaml"))
+    if not os.path.exists(config_file):
+        config_file = os.path.join(BASE_DIR, "bot_config.md")
+    return config_file
+
+
+def get_config():
+    """Zwraca współdzielony ConfigParser (plik parsowany przy pierwszym wywołaniu)."""
+    global _config_parser
+    with _lock:
+        if _config_parser is None:
+            from config.config_parser import ConfigParser
+            _config_parser = ConfigParser(get_config_file())
+        return _config_parser
+
+
+def _env(name, default=None):
+    load_env()
+    return os.getenv(name, default)
+
+
+# Ustawienia wyliczane przy pierwszym odczycie (potem zwykłe atrybuty modułu)
+_LAZY_SETTINGS = {
+    'config': get_config,
+    'config_parser': get_config,
+    'CONFIG_FILE': get_config_file,
+    # Ścieżka do WebDriver (nie jest już potrzebna z webdriver-manager, ale zostawiamy dla kompatybilności)
+    'DRIVER_PATH': lambda: _env("DRIVER_PATH", "chromedriver"),
+    # PIN do Messengera (dla przywrócenia historii czatu)
+    'PIN_MESSENGER': lambda: _env("PIN_MESSENGER"),
+    'POLLING_INTERVAL': lambda: get_config().get_polling_interval(),
+    'WAIT_TIMEOUT': lambda: get_config().get_wait_timeout(),
+    'HEADLESS_MODE': lambda: get_config().is_headless(),
+    'DEBUG_ENABLED': lambda: get_config().is_debugging_enabled(),
+    'SAVE_SCREENSHOTS': lambda: get_config().should_save_screenshots(),
+    'SCREENSHOT_ON_ERROR': lambda: get_config().should_screenshot_on_error(),
+}
+
 
-# Tryb headless - z konfiguracji
-HEADLESS_MODE = config_parser.is_headless()
+def __getattr__(name):
+    factory = _LAZY_SETTINGS.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = factory()
+    globals()[name] = value
+    return value
 
-# Ustawienia debugowania - z konfiguracji
-DEBUG_ENABLED = config_parser.is_debugging_enabled()
-SAVE_SCREENSHOTS = config_parser.should_save_screenshots()
-SCREENSHOT_ON_ERROR = config_parser.should_screenshot_on_error()
 
-# Export obiektu config_parser dla innych modułów
-config = config_parser
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_SETTINGS))
@@ -7,7 +7,9 @@ from dotenv import load_dotenv
 from src import utils
 from src.facebook_bot import FacebookBot
 from src.messenger_monitor import MessengerMonitor
+from src.scheduler import create_scheduler
 from config import settings
+from config.config_watcher import start_config_watcher
 
 # Załaduj zmienne środowiskowe z .env
 load_dotenv()
@@ -64,6 +66,8 @@ if __name__ == "__main__":
 
     # Inicjalizacja bota z konfiguracją
     bot = FacebookBot(email, password, config=config)
+    scheduler = None
+    config_watcher = None
 
     try:
         # Logowanie
@@ -79,6 +83,13 @@ if __name__ == "__main__":
             # Inicjalizacja monitora z konfiguracją
             monitor = MessengerMonitor(bot.driver, config=config)
 
+            # Harmonogram akcji okresowych (periodic_actions) - współdzieli dzierżawy przeglądarki
+            scheduler = create_scheduler(config, lease_manager=monitor.lease_manager)
+            scheduler.start()
+
+            # Zmiany pliku konfiguracji bez restartu
+            config_watcher = start_config_watcher(config)
+
             # Wyświetl listę wszystkich dostępnych czatów
             print("\n📋 Pobieranie listy czatów...")
             conversations = monitor.list_all_conversations()
@@ -157,6 +168,11 @@ if __name__ == "__main__":
         logger.error(f"❌ Krytyczny błąd: {e}")
         print(f"\n❌ Krytyczny błąd: {e}")
     finally:
+        if config_watcher:
+            config_watcher.stop()
+        if scheduler:
+            scheduler.stop()
+
         # Zawsze zamknij przeglądarkę na końcu
         bot.close()
         logger.info("🔒 Zamknięto przeglądarkę")
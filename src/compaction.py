@@ -0,0 +1,203 @@
+"""
+Kompakcja historii konwersacji.
+
+Starsze wersje (oraz storage.format: "json") zapisywały przy każdym
+przebiegu pełny snapshot data/<konwersacja>/messages_<timestamp>.json,
+więc kolejne pliki w dużej części powtarzają te same wiadomości. Kompakcja
+scala snapshoty z magazynem segmentów konwersacji (src.message_store) i
+przepisuje go jako nową generację: wiadomości bez duplikatów między
+źródłami (wiadomość powtórzona w jednym snapshocie, np. "ok" bez czasu,
+zostaje tyle razy, ile wystąpiła w najpełniejszym źródle), uporządkowane
+po czasie, z indeksem kluczy i czasów. Przepisywany jest
+także magazyn oznaczony jako nieuporządkowany (starsze wiadomości
+dopisane po nowszych), co przywraca wyszukiwanie binarne po czasie.
+
+Przetwarzanie jest strumieniowe: w pamięci jest naraz jeden snapshot oraz
+klucze i pozycje wiadomości (kilkadziesiąt bajtów na wiadomość), a treść
+trafia od razu do pliku roboczego, z którego po posortowaniu przepisywana
+jest do magazynu. Nowa generacja zatwierdzana jest atomowo (store.json),
+a zastąpione snapshoty usuwane lub archiwizowane dopiero potem - przerwana
+kompakcja zostawia poprzedni stan, a ponowne uruchomienie jest idempotentne.
+"""
+import glob
+import json
+import logging
+import math
+import os
+from collections import Counter
+
+from src.message_schema import message_key, parse_message_time
+from src.message_store import get_message_store, is_message_store
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = 'archive'
+SNAPSHOT_PATTERN = 'messages_*.json'
+SPOOL_FILE = 'compaction.spool'
+
+SUPERSEDED_MODES = ('keep', 'delete', 'archive')
+
+
+def snapshot_paths(conv_dir):
+    """Snapshoty konwersacji od najstarszego."""
+    return sorted(glob.glob(os.path.join(glob.escape(conv_dir), SNAPSHOT_PATTERN)))
+
+
+def _retire_snapshots(conv_dir, paths, superseded):
+    if superseded == 'delete':
+        for path in paths:
+            os.remove(path)
+    elif superseded == 'archive':
+        archive_dir = os.path.join(conv_dir, ARCHIVE_DIR)
+        os.makedirs(archive_dir, exist_ok=True)
+        for path in paths:
+            os.replace(path, os.path.join(archive_dir, os.path.basename(path)))
+
+
+def _iter_spool(spool_path, entries):
+    with open(spool_path, 'rb') as spool:
+        for _, _, offset, length in entries:
+            spool.seek(offset)
+            yield json.loads(spool.read(length))
+
+
+def compact_conversation(conv_dir, superseded='keep', min_snapshots=1):
+    """
+    Scala snapshoty i magazyn konwersacji w uporządkowaną generację magazynu.
+
+    Args:
+        conv_dir: Katalog konwersacji (data/<konwersacja>/)
+        superseded: Co zrobić ze scalonymi snapshotami: keep, delete, archive
+        min_snapshots: Minimalna liczba snapshotów, od której kompakcja ma sens
+                       (magazyn nieuporządkowany kompaktowany jest zawsze)
+
+    Returns:
+        dict: snapshots, messages, duplicates, superseded (None gdy pominięto)
+    """
+    if superseded not in SUPERSEDED_MODES:
+        raise ValueError(f"Nieznany tryb superseded: {superseded} (dozwolone: {', '.join(SUPERSEDED_MODES)})")
+
+    paths = snapshot_paths(conv_dir)
+    unordered = is_message_store(conv_dir) and not get_message_store(conv_dir).ordered
+    if not unordered and (not paths or len(paths) < min_snapshots):
+        return None
+
+    store = get_message_store(conv_dir)
+    spool_path = os.path.join(conv_dir, SPOOL_FILE)
+    conversation = store.conversation_name or os.path.basename(conv_dir)
+
+    # Liczba wystąpień klucza: scalona (maksimum po źródłach) i w bieżącym źródle.
+    # Powtórzenia w jednym źródle (np. kilka "ok" bez czasu) to osobne wiadomości.
+    kept = Counter()
+    entries = []
+    merged = []
+    duplicates = 0
+    last_time = -math.inf
+
+    def add(message, spool, occurrences):
+        nonlocal duplicates, last_time
+        key = message_key(message)
+        occurrences[key] += 1
+        if occurrences[key] <= kept[key]:
+            duplicates += 1
+            return
+        kept[key] = occurrences[key]
+        # Wiadomość bez czasu zostaje przy poprzedniej (kolejność z pliku)
+        moment = parse_message_time(message)
+        if math.isnan(moment):
+            moment = last_time
+        last_time = moment
+        data = json.dumps(message, ensure_ascii=False).encode('utf-8')
+        entries.append((moment, len(entries), spool.tell(), len(data)))
+        spool.write(data)
+
+    # Blokada magazynu - ekstrakcja nie dopisze nic między odczytem a przepisaniem
+    with store.lock:
+        try:
+            with open(spool_path, 'wb') as spool:
+                occurrences = Counter()
+                for message in store.iter_messages():
+                    add(message, spool, occurrences)
+                for path in paths:
+                    try:
+                        with open(path, 'r', encoding='utf-8') as f:
+                            data = json.load(f)
+                    except (OSError, ValueError) as e:
+                        # Uszkodzony snapshot zostaje na miejscu (nie jest zastępowany)
+                        logger.warning(f"⚠️ Pomijam uszkodzony plik {path}: {e}")
+                        continue
+                    conversation = data.get('conversation_name') or conversation
+                    occurrences = Counter()
+                    for message in data.get('messages') or ():
+                        add(message, spool, occurrences)
+                    merged.append(path)
+
+            entries.sort()
+            count = store.rewrite(_iter_spool(spool_path, entries), conversation_name=conversation)
+        finally:
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+
+    _retire_snapshots(conv_dir, merged, superseded)
+
+    return {
+        'snapshots': len(merged),
+        'messages': count,
+        'duplicates': duplicates,
+        'superseded': superseded
+    }
+
+
+def compact_all(source_dir='data', superseded='keep', min_snapshots=2):
+    """
+    Kompaktuje wszystkie konwersacje w katalogu danych.
+
+    Returns:
+        dict: conversations, snapshots, messages, duplicates, errors
+    """
+    stats = {'conversations': 0, 'snapshots': 0, 'messages': 0, 'duplicates': 0, 'errors': 0}
+    if not os.path.isdir(source_dir):
+        return stats
+
+    for entry in sorted(os.scandir(source_dir), key=lambda e: e.name):
+        if not entry.is_dir():
+            continue
+        try:
+            result = compact_conversation(entry.path, superseded=superseded, min_snapshots=min_snapshots)
+        except OSError as e:
+            stats['errors'] += 1
+            logger.error(f"❌ Błąd kompakcji {entry.path}: {e}")
+            continue
+        if result is None:
+            continue
+        stats['conversations'] += 1
+        for key in ('snapshots', 'messages', 'duplicates'):
+            stats[key] += result[key]
+
+    logger.info(
+        f"🗜️ Kompakcja: {stats['conversations']} konwersacji, {stats['snapshots']} snapshotów -> "
+        f"{stats['messages']} wiadomości (usunięte duplikaty: {stats['duplicates']})"
+    )
+    return stats
+
+
+def compact_messages(config=None, **overrides):
+    """
+    Kompakcja wg sekcji compaction konfiguracji (akcja "compact" harmonogramu).
+
+    Args:
+        config: ConfigParser (domyślnie settings.config)
+        **overrides: Nadpisania source_dir, superseded, min_snapshots
+    """
+    if config is None:
+        from config import settings
+        config = settings.config
+
+    options = dict(config.get_compaction_settings())
+    options.update({key: value for key, value in overrides.items() if value is not None})
+    source_dir = options.get('source_dir') or config.get_export_settings().get('source_dir') or 'data'
+    return compact_all(
+        source_dir,
+        superseded=options.get('superseded', 'keep'),
+        min_snapshots=options.get('min_snapshots', 2)
+    )
@@ -0,0 +1,197 @@
+"""
+Statystyki konwersacji liczone wektorowo (NumPy).
+
+Wiadomości ładowane są do tablic kolumnowych (czas, nadawca jako kod,
+liczba mediów, reakcji, długość tekstu), a wszystkie statystyki liczone są
+operacjami na całych tablicach - bez pętli po wiadomościach - więc nawet
+miliony wiadomości przetwarzane są w sekundach. Wynik jest słownikiem
+gotowym do JSON (eksport z export_content.include_statistics i endpoint
+API /conversations/{id}/statistics). Czasy wiadomości magazynu segmentów
+czytane są z indeksu (numpy.frombuffer), więc nie są parsowane ponownie.
+"""
+import os
+from array import array
+
+import numpy as np
+
+from src.message_schema import parse_message_time
+
+# Progi (sekundy) histogramu czasu odpowiedzi
+RESPONSE_TIME_BUCKETS = (0, 60, 300, 900, 3600, 6 * 3600, 86400)
+RESPONSE_TIME_LABELS = ('<1m', '1-5m', '5-15m', '15-60m', '1-6h', '6-24h', '>24h')
+
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+# Wpis indeksu magazynu segmentów (src.message_store.INDEX_ENTRY, '<8sIQId')
+INDEX_DTYPE = np.dtype([('key', 'S8'), ('segment', '<u4'), ('offset', '<u8'), ('length', '<u4'), ('time', '<f8')])
+
+
+def store_times(store):
+    """
+    Kolumna czasu wiadomości magazynu odczytana wprost z indeksu.
+
+    Czas parsowany jest raz, przy dopisaniu wiadomości, ale wiadomość bez
+    czasu dostaje w indeksie czas poprzedniej (lub 0 na początku magazynu),
+    żeby zachować uporządkowanie. Takie wpisy mają czas równy poprzedniemu,
+    więc tylko dla nich czas wyznaczany jest ponownie z treści wiadomości -
+    wynik jest taki sam jak przy parsowaniu każdej wiadomości.
+    """
+    with store.lock:
+        times = np.frombuffer(store.index_bytes(), dtype=INDEX_DTYPE)['time'].copy()
+        if times.size:
+            candidates = np.flatnonzero(times[1:] == times[:-1]) + 1
+            if times[0] == 0.0:
+                candidates = np.concatenate(([0], candidates))
+            for position in candidates.tolist():
+                times[position] = parse_message_time(store.read(position))
+    return times
+
+
+class ConversationColumns:
+    """
+    Bufor kolumnowy wiadomości jednej konwersacji (dopisywanie rekord po rekordzie).
+
+    Kolumny to zwarte array.array (kilkadziesiąt bajtów na wiadomość),
+    kopiowane do tablic NumPy przez protokół bufora (bez obiektów Pythona).
+    """
+
+    def __init__(self):
+        self.times = array('d')
+        self.sender_codes = array('i')
+        self.media_counts = array('i')
+        self.reaction_counts = array('i')
+        self.text_lengths = array('q')
+        self.media_types = {}
+        self.senders = {}
+
+    def add(self, message, moment=None):
+        """
+        Dodaje wiadomość (schemat extract_messages_from_conversation).
+
+        Args:
+            message: Wiadomość
+            moment: Czas wiadomości, jeśli już znany (np. z indeksu magazynu) - pomija parsowanie
+        """
+        sender = message.get('sender') or 'Unknown'
+        code = self.senders.setdefault(sender, len(self.senders))
+        media = message.get('media') or ()
+
+        self.times.append(parse_message_time(message) if moment is None else moment)
+        self.sender_codes.append(code)
+        self.media_counts.append(len(media))
+        self.reaction_counts.append(len(message.get('reactions') or ()))
+        self.text_lengths.append(len(message.get('text') or ''))
+        for item in media:
+            media_type = item.get('type', 'unknown')
+            self.media_types[media_type] = self.media_types.get(media_type, 0) + 1
+
+    def __len__(self):
+        return len(self.times)
+
+    def to_arrays(self):
+        """Zwraca słownik tablic NumPy."""
+        return {
+            'times': np.array(self.times, dtype=np.float64),
+            'senders': np.array(self.sender_codes, dtype=np.intc),
+            'media': np.array(self.media_counts, dtype=np.intc),
+            'reactions': np.array(self.reaction_counts, dtype=np.intc),
+            'text_lengths': np.array(self.text_lengths, dtype=np.int64),
+        }
+
+
+def _response_times(times, senders):
+    """Czasy odpowiedzi: odstęp między kolejnymi wiadomościami różnych nadawców."""
+    valid = ~np.isnan(times)
+    times, senders = times[valid], senders[valid]
+    if times.size < 2:
+        return np.empty(0)
+    order = np.argsort(times, kind='stable')
+    times, senders = times[order], senders[order]
+    switched = senders[1:] != senders[:-1]
+    return (times[1:] - times[:-1])[switched]
+
+
+def _distribution(values):
+    if values.size == 0:
+        return {'count': 0}
+    p50, p90, p99 = np.percentile(values, (50, 90, 99))
+    counts, _ = np.histogram(values, bins=np.append(RESPONSE_TIME_BUCKETS, np.inf))
+    return {
+        'count': int(values.size),
+        'mean_seconds': float(values.mean()),
+        'median_seconds': float(p50),
+        'p90_seconds': float(p90),
+        'p99_seconds': float(p99),
+        'histogram': dict(zip(RESPONSE_TIME_LABELS, counts.tolist())),
+    }
+
+
+def compute_statistics(columns):
+    """
+    Liczy statystyki konwersacji.
+
+    Args:
+        columns: ConversationColumns
+
+    Returns:
+        dict: message_count, per_sender, by_hour, by_weekday, daily_volume,
+              response_times, media, reactions, text
+    """
+    arrays = columns.to_arrays()
+    times, senders = arrays['times'], arrays['senders']
+    names = sorted(columns.senders, key=columns.senders.get)
+
+    per_sender = np.bincount(senders, minlength=len(names))
+    media_per_sender = np.bincount(senders, weights=arrays['media'], minlength=len(names))
+
+    dated = times[~np.isnan(times)].astype('datetime64[s]')
+    days = dated.astype('datetime64[D]')
+    hours = ((dated - days).astype(np.int64) // 3600).astype(np.int64)
+    # 1970-01-01 to czwartek -> przesunięcie do poniedziałku = 0
+    weekdays = (days.astype(np.int64) + 3) % 7
+    unique_days, day_counts = np.unique(days, return_counts=True)
+
+    return {
+        'message_count': int(times.size),
+        'dated_messages': int(dated.size),
+        'first_message': str(dated.min()) if dated.size else None,
+        'last_message': str(dated.max()) if dated.size else None,
+        'per_sender': {name: int(count) for name, count in zip(names, per_sender)},
+        'by_hour': np.bincount(hours, minlength=24).tolist(),
+        'by_weekday': dict(zip(WEEKDAYS, np.bincount(weekdays, minlength=7).tolist())),
+        'daily_volume': {str(day): int(count) for day, count in zip(unique_days, day_counts)},
+        'response_times': _distribution(_response_times(times, senders)),
+        'media': {
+            'total': int(arrays['media'].sum()),
+            'messages_with_media': int(np.count_nonzero(arrays['media'])),
+            'by_type': dict(columns.media_types),
+            'per_sender': {name: int(count) for name, count in zip(names, media_per_sender)},
+        },
+        'reactions': {
+            'total': int(arrays['reactions'].sum()),
+            'messages_with_reactions': int(np.count_nonzero(arrays['reactions'])),
+        },
+        'text': {
+            'total_characters': int(arrays['text_lengths'].sum()),
+            'mean_length': float(arrays['text_lengths'].mean()) if times.size else 0.0,
+        },
+    }
+
+
+def compute_conversation_statistics(conv_dir):
+    """
+    Liczy statystyki konwersacji z katalogu data/<konwersacja>/.
+
+    Returns:
+        dict: Statystyki (compute_statistics) z polem 'conversation'
+    """
+    from src.exporter import iter_export_messages
+
+    columns = ConversationColumns()
+    conversation = os.path.basename(conv_dir)
+    for conversation, _, message, _, moment in iter_export_messages(conv_dir, full=True):
+        columns.add(message, moment)
+
+    stats = compute_statistics(columns)
+    stats['conversation'] = conversation
+    return stats
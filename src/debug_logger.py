@@ -4,77 +4,95 @@ Moduł do zapisywania informacji debugowych.
 """
 import os
 from datetime import datetime
-from selenium.webdriver.remote.webdriver import WebDriver
+from typing import TYPE_CHECKING
 from config import settings
+from src import metrics
+from src.driver_profiler import phase
+from src.snapshot_writer import capture_snapshot, write_snapshot, get_snapshot_writer
+from src.snapshot_store import get_snapshot_store
+from src.snapshot_sampler import get_snapshot_sampler, format_suppressed_summary
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
 
 
 class DebugLogger:
     """Klasa do zapisywania screenshotów, logów i HTML."""
     
-    def __init__(self, debug_dir: str = None):
+    def __init__(self, debug_dir: str = None, async_writes: bool = None):
         self.debug_dir = debug_dir or settings.DEBUG_DIR
         os.makedirs(self.debug_dir, exist_ok=True)
+
+        # Zapis w tle - na wątku wywołującym tylko pobranie danych z przeglądarki
+        if async_writes is None:
+            async_writes = settings.config.are_snapshots_async()
+        self.writer = get_snapshot_writer(settings.config.get_snapshot_queue_size()) if async_writes else None
+
+        # Zapisywane fragmenty DOM zamiast pełnego page_source
+        self.capture_scopes = settings.config.get_capture_scopes()
+        self.strip_scripts = settings.config.should_strip_captured_scripts()
+
+        # Skompresowany magazyn z deduplikacją ("plain" = dotychczasowe pliki w katalogu zdarzenia)
+        self.store = None
+        if settings.config.get_snapshot_storage() == 'store':
+            self.store = get_snapshot_store(self.debug_dir, settings.config)
+
+        # Limit snapshotów per typ zdarzenia (wspólny dla wszystkich instancji)
+        self.sampler = get_snapshot_sampler(settings.config)
     
-    def save_debug_snapshot(self, driver: WebDriver, event_name: str, additional_info: str = ""):
+    @phase("debug_snapshot")
+    def save_debug_snapshot(self, driver: 'WebDriver', event_name: str, additional_info: str = ""):
         """
         Zapisuje pełny snapshot stanu przeglądarki.
+
+        Przy zapisie asynchronicznym pliki pojawiają się w katalogu zdarzenia
+        chwilę później (wątek SnapshotWriter). Snapshoty ponad limit
+        zdarzenia (debugging.snapshot_sampling) są pomijane i zliczane;
+        podsumowanie pominiętych trafia do następnego zapisanego snapshotu.
         
         Args:
             driver: Instancja WebDriver
             event_name: Nazwa zdarzenia (np. "new_message", "conversation_change")
             additional_info: Dodatkowe informacje do zapisania w logu
+
+        Returns:
+            str: Katalog zdarzenia (None jeśli snapshot pominięto)
         """
+        capture, suppressed = self.sampler.should_capture(event_name)
+        if not capture:
+            return None
+        additional_info += format_suppressed_summary(suppressed)
+
+        metrics.DEBUG_SNAPSHOTS.labels(event_name).inc()
+
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        event_dir = os.path.join(self.debug_dir, f"{timestamp}_{event_name}")
-        os.makedirs(event_dir, exist_ok=True)
-        
-        # 1. Screenshot
-        screenshot_path = os.path.join(event_dir, "screenshot.png")
-        try:
-            driver.save_screenshot(screenshot_path)
-            print(f"✓ Screenshot zapisany: {screenshot_path}")
-        except Exception as e:
-            print(f"✗ Błąd zapisu screenshota: {e}")
-        
-        # 2. HTML strony
-        html_path = os.path.join(event_dir, "page_source.html")
-        try:
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(driver.page_source)
-            print(f"✓ HTML zapisany: {html_path}")
-        except Exception as e:
-            print(f"✗ Błąd zapisu HTML: {e}")
-        
-        # 3. Log tekstowy z informacjami
-        log_path = os.path.join(event_dir, "debug.log")
-        try:
-            with open(log_path, 'w', encoding='utf-8') as f:
-                f.write(f"=== DEBUG LOG ===\n")
-                f.write(f"Timestamp: {datetime.now().isoformat()}\n")
-                f.write(f"Event: {event_name}\n")
-                f.write(f"Current URL: {driver.current_url}\n")
-                f.write(f"Page Title: {driver.title}\n")
-                f.write(f"\n=== Additional Info ===\n")
-                f.write(additional_info)
-                f.write(f"\n\n=== Browser Logs ===\n")
-                
-                # Logi przeglądarki (jeśli dostępne)
-                try:
-                    browser_logs = driver.get_log('browser')
-                    for log_entry in browser_logs:
-                        f.write(f"{log_entry}\n")
-                except Exception as log_error:
-                    f.write(f"Browser logs not available: {log_error}\n")
-                
-            print(f"✓ Log zapisany: {log_path}")
-        except Exception as e:
-            print(f"✗ Błąd zapisu logu: {e}")
+        if self.store is not None:
+            event_dir = self.store.event_dir_for(timestamp, event_name)
+            write_func = self.store.add
+        else:
+            event_dir = os.path.join(self.debug_dir, f"{timestamp}_{event_name}")
+            write_func = write_snapshot
+
+        snapshot = capture_snapshot(
+            driver, event_name, event_dir, additional_info,
+            scopes=self.capture_scopes, strip_scripts=self.strip_scripts
+        )
+        if self.writer is not None:
+            self.writer.submit(snapshot, write_func)
+        else:
+            write_func(snapshot)
         
         return event_dir
+
+    def flush(self, timeout: float = 10):
+        """Czeka na zapis oczekujących snapshotów (np. przed zamknięciem przeglądarki)."""
+        if self.writer is not None:
+            return self.writer.flush(timeout)
+        return True
     
-    def save_error_snapshot(self, driver: WebDriver, error: Exception):
+    def save_error_snapshot(self, driver: 'WebDriver', error: Exception):
         """
-        Zapisuje snapshot w przypadku błędu.
+        Zapisuje snapshot w przypadku błędu (z limitem zdarzenia "error").
         
         Args:
             driver: Instancja WebDriver
@@ -0,0 +1,95 @@
+"""
+Pobieranie wybranych fragmentów DOM zamiast pełnego page_source.
+
+driver.page_source serializuje cały dokument Messengera (megabajty) przez
+połączenie WebDrivera. Tutaj jedno wywołanie execute_script zwraca tylko
+outerHTML wskazanych poddrzew (np. div[role='main'], lista czatów, okno
+dialogowe), opcjonalnie bez węzłów script/style - usuwanych z klonu
+w przeglądarce, przed transferem, bez zmiany strony.
+"""
+import html
+
+# Nazwane zakresy przechwytywania -> selektor CSS
+CAPTURE_SCOPES = {
+    'main': "div[role='main']",
+    'sidebar': "div[role='navigation']",
+    'dialog': "div[role='dialog']",
+}
+
+PAGE_SCOPE = 'page'
+
+_CAPTURE_SCRIPT = """
+const selectors = arguments[0];
+const strip = arguments[1];
+const STRIP = 'script, style, noscript, link[rel="stylesheet"], template';
+
+function serialize(node) {
+    if (!strip) return node.outerHTML;
+    const clone = node.cloneNode(true);
+    clone.querySelectorAll(STRIP).forEach(function (el) { el.remove(); });
+    return clone.outerHTML;
+}
+
+if (selectors === null) {
+    return [{selector: 'page', html: serialize(document.documentElement)}];
+}
+
+const parts = [];
+for (const selector of selectors) {
+    document.querySelectorAll(selector).forEach(function (node) {
+        parts.push({selector: selector, html: serialize(node)});
+    });
+}
+return parts;
+"""
+
+
+def resolve_scopes(scopes):
+    """
+    Zamienia nazwy zakresów na selektory CSS.
+
+    Args:
+        scopes: Nazwa lub lista nazw z CAPTURE_SCOPES, 'page' albo własne selektory CSS
+
+    Returns:
+        list lub None: Lista selektorów (None = cała strona)
+    """
+    if not scopes:
+        return None
+    if isinstance(scopes, str):
+        scopes = [scopes]
+    if PAGE_SCOPE in scopes:
+        return None
+    return [CAPTURE_SCOPES.get(scope, scope) for scope in scopes]
+
+
+def capture_dom(driver, scopes=None, strip_scripts=True):
+    """
+    Pobiera HTML wybranych poddrzew jako jeden dokument.
+
+    Gdy żaden selektor nic nie znajdzie (np. strona logowania), pobierana
+    jest cała strona, więc snapshot nigdy nie jest pusty.
+
+    Args:
+        driver: Instancja WebDriver
+        scopes: Zakresy (patrz resolve_scopes); None/'page' = cała strona
+        strip_scripts: Czy usuwać script/style przed transferem
+
+    Returns:
+        tuple: (html, lista użytych selektorów)
+    """
+    selectors = resolve_scopes(scopes)
+    parts = driver.execute_script(_CAPTURE_SCRIPT, selectors, strip_scripts) or []
+
+    if not parts and selectors is not None:
+        parts = driver.execute_script(_CAPTURE_SCRIPT, None, strip_scripts) or []
+
+    if len(parts) == 1 and parts[0]['selector'] == PAGE_SCOPE:
+        return parts[0]['html'], [PAGE_SCOPE]
+
+    # Fragmenty składane w minimalny dokument - parser offline i selektory działają bez zmian
+    body = "\n".join(
+        f"<!-- scope: {html.escape(part['selector'])} -->\n{part['html']}" for part in parts
+    )
+    used = list(dict.fromkeys(part['selector'] for part in parts))
+    return f"<!DOCTYPE html>\n<html><body>\n{body}\n</body></html>", used
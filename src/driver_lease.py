@@ -0,0 +1,217 @@
+"""
+Menedżer dzierżaw (lease) współdzielonej instancji WebDrivera.
+
+Jedna sesja Chrome jest używana przez pętlę monitorowania, zadania API
+(ekstrakcja) i harmonogram. Każdy komponent pobiera przeglądarkę wyłącznie
+przez dzierżawę, a menedżer przydziela ją według priorytetu:
+
+- monitorowanie dostaje krótkie dzierżawy na pojedynczy tick,
+- ekstrakcja dostaje długą dzierżawę z możliwością wywłaszczenia - między
+  konwersacjami oddaje przeglądarkę, jeśli czeka ktoś ważniejszy.
+"""
+import heapq
+import itertools
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Niższa wartość = wyższy priorytet
+PRIORITY_MONITOR = 0
+PRIORITY_SCHEDULED = 5
+PRIORITY_EXTRACTION = 10
+
+
+class DriverLease:
+    """Dzierżawa przeglądarki przyznana jednemu właścicielowi."""
+
+    def __init__(self, manager, owner, priority, preemptible):
+        self.manager = manager
+        self.owner = owner
+        self.priority = priority
+        self.preemptible = preemptible
+        self.thread_id = threading.get_ident()
+        self.depth = 1
+        self.acquired_at = None
+        self.wait_seconds = 0.0
+        self.previous_owner = None
+        self.yield_count = 0
+
+    @property
+    def driver(self):
+        """Instancja WebDrivera dostępna w ramach dzierżawy."""
+        return self.manager.driver
+
+    def should_yield(self):
+        """Sprawdza czy na przeglądarkę czeka ktoś z wyższym priorytetem."""
+        return self.preemptible and self.manager.has_waiter_above(self.priority)
+
+    def yield_if_requested(self):
+        """
+        Oddaje przeglądarkę oczekującemu z wyższym priorytetem i odzyskuje ją ponownie.
+
+        Wywoływane w bezpiecznych punktach (np. między konwersacjami).
+
+        Returns:
+            bool: True jeśli przeglądarka została oddana (stan strony mógł się zmienić)
+        """
+        if not self.should_yield():
+            return False
+        self.manager._yield(self)
+        return True
+
+
+class DriverLeaseManager:
+    """Arbiter przydzielający współdzieloną przeglądarkę według priorytetów."""
+
+    def __init__(self, driver):
+        """
+        Args:
+            driver: Współdzielona instancja WebDrivera
+        """
+        self.driver = driver
+        self._cond = threading.Condition()
+        self._holder = None
+        self._waiters = []
+        self._seq = itertools.count()
+        self._last_owner = None
+        self._stats = {}
+
+    def has_waiter_above(self, priority):
+        """Sprawdza czy czeka ktoś z priorytetem wyższym niż podany."""
+        with self._cond:
+            return bool(self._waiters) and self._waiters[0][0] < priority
+
+    def acquire(self, owner, priority=PRIORITY_EXTRACTION, preemptible=False, timeout=None):
+        """
+        Pobiera dzierżawę przeglądarki (blokująco).
+
+        Wątek, który już trzyma dzierżawę, otrzymuje ją ponownie (reentrant).
+
+        Args:
+            owner: Nazwa komponentu (np. "monitor", "extraction")
+            priority: Priorytet (PRIORITY_*)
+            preemptible: Czy dzierżawa może być wywłaszczona
+            timeout: Maksymalny czas oczekiwania (None = bez limitu)
+
+        Returns:
+            DriverLease: Przyznana dzierżawa
+
+        Raises:
+            TimeoutError: Gdy dzierżawa nie została przyznana w czasie timeout
+        """
+        with self._cond:
+            holder = self._holder
+            if holder is not None and holder.thread_id == threading.get_ident():
+                holder.depth += 1
+                return holder
+
+            lease = DriverLease(self, owner, priority, preemptible)
+            self._wait_for_turn(lease, timeout)
+            return lease
+
+    def _wait_for_turn(self, lease, timeout=None):
+        """Czeka w kolejce priorytetowej na przydział przeglądarki (wymaga blokady)."""
+        ticket = (lease.priority, next(self._seq))
+        heapq.heappush(self._waiters, ticket)
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+
+        try:
+            while self._holder is not None or self._waiters[0] != ticket:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"Nie przyznano przeglądarki dla '{lease.owner}' w ciągu {timeout}s")
+                self._cond.wait(remaining)
+        except BaseException:
+            self._waiters.remove(ticket)
+            heapq.heapify(self._waiters)
+            self._cond.notify_all()
+            raise
+
+        heapq.heappop(self._waiters)
+        waited = time.monotonic() - start
+
+        lease.wait_seconds = waited
+        lease.acquired_at = time.monotonic()
+        lease.previous_owner = self._last_owner
+        self._holder = lease
+        self._record_wait(lease.owner, waited)
+
+        if waited > 1.0:
+            logger.debug(f"🔑 Dzierżawa przeglądarki dla '{lease.owner}' po {waited:.2f}s oczekiwania")
+
+    def release(self, lease):
+        """Zwalnia dzierżawę (przy zagnieżdżeniu dopiero ostatnie zwolnienie oddaje przeglądarkę)."""
+        with self._cond:
+            if self._holder is not lease:
+                return
+            lease.depth -= 1
+            if lease.depth > 0:
+                return
+            self._hand_off(lease)
+
+    def _hand_off(self, lease):
+        """Oddaje przeglądarkę kolejnemu oczekującemu (wymaga blokady)."""
+        held = time.monotonic() - lease.acquired_at if lease.acquired_at else 0.0
+        self._stats[lease.owner]['held_seconds'] += held
+        self._last_owner = lease.owner
+        self._holder = None
+        self._cond.notify_all()
+
+    def _yield(self, lease):
+        """Oddaje przeglądarkę na chwilę i ustawia się ponownie w kolejce."""
+        with self._cond:
+            if self._holder is not lease:
+                return
+            depth = lease.depth
+            lease.yield_count += 1
+            self._stats[lease.owner]['yields'] += 1
+            logger.info(f"🔑 '{lease.owner}' oddaje przeglądarkę zadaniu o wyższym priorytecie")
+            self._hand_off(lease)
+            self._wait_for_turn(lease)
+            lease.depth = depth
+
+    @contextmanager
+    def lease(self, owner, priority=PRIORITY_EXTRACTION, preemptible=False, timeout=None):
+        """
+        Context manager dla dzierżawy przeglądarki.
+
+        Przykład:
+            with manager.lease("monitor", PRIORITY_MONITOR) as lease:
+                lease.driver.find_elements(...)
+        """
+        lease = self.acquire(owner, priority, preemptible, timeout)
+        try:
+            yield lease
+        finally:
+            self.release(lease)
+
+    def _record_wait(self, owner, waited):
+        """Aktualizuje statystyki oczekiwania na dzierżawę (wymaga blokady)."""
+        stats = self._stats.setdefault(owner, {
+            'leases': 0,
+            'total_wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+            'held_seconds': 0.0,
+            'yields': 0
+        })
+        stats['leases'] += 1
+        stats['total_wait_seconds'] += waited
+        stats['max_wait_seconds'] = max(stats['max_wait_seconds'], waited)
+
+    def get_stats(self):
+        """
+        Zwraca statystyki dzierżaw.
+
+        Returns:
+            dict: Aktualny właściciel, liczba oczekujących i statystyki per właściciel
+        """
+        with self._cond:
+            return {
+                'holder': self._holder.owner if self._holder else None,
+                'waiting': len(self._waiters),
+                'owners': {owner: dict(stats) for owner, stats in self._stats.items()}
+            }
@@ -0,0 +1,239 @@
+"""
+Profiler komend WebDrivera (opcjonalny, debugging.profile_driver).
+
+Każda zdalna komenda (find_elements, get_attribute, execute_script, text,
+zrzuty ekranu - także komendy WebElementów, które przechodzą przez
+driver.execute) jest zapisywana wraz z czasem trwania, aktywną fazą
+i miejscem wywołania w kodzie bota. Na koniec przebiegu powstaje raport
+JSON: najczęstsze miejsca wywołań, liczba komend na wiadomość i czas per faza.
+
+Fazy oznaczane są dekoratorem lub context managerem `phase(...)` - gdy
+profiler nie jest zainstalowany, koszt oznaczenia to dopisanie etykiety
+do listy w wątku.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_active_profiler = None
+
+# Ramki z tych ścieżek nie są miejscem wywołania (biblioteka i sam profiler)
+_SKIPPED_PATHS = (
+    os.sep + 'selenium' + os.sep,
+    os.path.abspath(__file__),
+    os.path.join('src', 'metrics.py'),
+)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+NO_PHASE = '-'
+
+
+@contextmanager
+def phase(label):
+    """
+    Oznacza fazę działania bota (działa też jako dekorator).
+
+    Przykład:
+        with phase("scroll"):
+            ...
+    """
+    stack = getattr(_local, 'phases', None)
+    if stack is None:
+        stack = _local.phases = []
+    stack.append(label)
+    try:
+        yield
+    finally:
+        stack.pop()
+
+
+def current_phase():
+    """Zwraca najbardziej wewnętrzną aktywną fazę w bieżącym wątku."""
+    stack = getattr(_local, 'phases', None)
+    return stack[-1] if stack else NO_PHASE
+
+
+def count_messages(count):
+    """Zlicza wyekstraktowane wiadomości w aktywnej fazie (jeśli profiler działa)."""
+    if _active_profiler is not None:
+        _active_profiler.add_messages(count)
+
+
+def _call_site():
+    """Zwraca pierwsze miejsce wywołania poza Selenium i profilerem."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not any(path in filename for path in _SKIPPED_PATHS):
+            return f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return '?'
+
+
+class DriverProfiler:
+    """Zbiera statystyki komend WebDrivera i zapisuje raport przebiegu."""
+
+    def __init__(self, report_dir='./logs/profiles/', top_sites=25):
+        """
+        Args:
+            report_dir: Katalog raportów JSON
+            top_sites: Ile najczęstszych miejsc wywołań umieścić w raporcie
+        """
+        self.report_dir = report_dir
+        self.top_sites = top_sites
+        self.started_at = datetime.now()
+        self._lock = threading.Lock()
+        self._commands = {}
+        self._phases = {}
+        self._sites = {}
+
+    def install(self, driver):
+        """
+        Podmienia driver.execute na wersję profilującą.
+
+        Returns:
+            Ten sam driver
+        """
+        global _active_profiler
+        original_execute = driver.execute
+
+        def profiled_execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return original_execute(driver_command, params)
+            finally:
+                self.record(driver_command, time.perf_counter() - start, current_phase(), _call_site())
+
+        driver.execute = profiled_execute
+        _active_profiler = self
+        logger.info(f"⏱️ Profiler WebDrivera włączony (raporty: {self.report_dir})")
+        return driver
+
+    @staticmethod
+    def _new_entry():
+        return {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0}
+
+    @staticmethod
+    def _add(entry, duration):
+        entry['calls'] += 1
+        entry['seconds'] += duration
+        if duration > entry['max_seconds']:
+            entry['max_seconds'] = duration
+
+    def record(self, command, duration, phase_label=NO_PHASE, site='?'):
+        """Zapisuje pojedynczą komendę."""
+        with self._lock:
+            self._add(self._commands.setdefault(command, self._new_entry()), duration)
+
+            phase_stats = self._phases.get(phase_label)
+            if phase_stats is None:
+                phase_stats = self._phases[phase_label] = dict(self._new_entry(), messages=0, commands={})
+            self._add(phase_stats, duration)
+            phase_stats['commands'][command] = phase_stats['commands'].get(command, 0) + 1
+
+            site_stats = self._sites.get(site)
+            if site_stats is None:
+                site_stats = self._sites[site] = dict(self._new_entry(), commands={})
+            self._add(site_stats, duration)
+            site_stats['commands'][command] = site_stats['commands'].get(command, 0) + 1
+
+    def add_messages(self, count):
+        """Zlicza wiadomości wyekstraktowane w aktywnej fazie."""
+        label = current_phase()
+        with self._lock:
+            phase_stats = self._phases.get(label)
+            if phase_stats is None:
+                phase_stats = self._phases[label] = dict(self._new_entry(), messages=0, commands={})
+            phase_stats['messages'] += count
+
+    def build_report(self):
+        """Buduje raport przebiegu (słownik)."""
+        with self._lock:
+            total_calls = sum(entry['calls'] for entry in self._commands.values())
+            total_seconds = sum(entry['seconds'] for entry in self._commands.values())
+            total_messages = sum(entry['messages'] for entry in self._phases.values())
+
+            phases = [
+                {
+                    'phase': label,
+                    'calls': stats['calls'],
+                    'seconds': round(stats['seconds'], 4),
+                    'max_seconds': round(stats['max_seconds'], 4),
+                    'messages': stats['messages'],
+                    'calls_per_message': round(stats['calls'] / stats['messages'], 2) if stats['messages'] else None,
+                    'commands': dict(stats['commands'])
+                }
+                for label, stats in sorted(self._phases.items(), key=lambda item: -item[1]['seconds'])
+            ]
+            sites = [
+                {
+                    'site': site,
+                    'calls': stats['calls'],
+                    'seconds': round(stats['seconds'], 4),
+                    'commands': dict(stats['commands'])
+                }
+                for site, stats in sorted(self._sites.items(), key=lambda item: -item[1]['calls'])[:self.top_sites]
+            ]
+            commands = {
+                command: {
+                    'calls': stats['calls'],
+                    'seconds': round(stats['seconds'], 4),
+                    'max_seconds': round(stats['max_seconds'], 4)
+                }
+                for command, stats in sorted(self._commands.items(), key=lambda item: -item[1]['calls'])
+            }
+
+        return {
+            'started_at': self.started_at.isoformat(),
+            'finished_at': datetime.now().isoformat(),
+            'total_calls': total_calls,
+            'total_seconds': round(total_seconds, 4),
+            'messages': total_messages,
+            'calls_per_message': round(total_calls / total_messages, 2) if total_messages else None,
+            'phases': phases,
+            'top_call_sites': sites,
+            'commands': commands
+        }
+
+    def write_report(self):
+        """
+        Zapisuje raport JSON do report_dir.
+
+        Returns:
+            str: Ścieżka raportu lub None przy błędzie
+        """
+        report = self.build_report()
+        try:
+            os.makedirs(self.report_dir, exist_ok=True)
+            filename = f"driver_profile_{self.started_at:%Y%m%d_%H%M%S}.json"
+            path = os.path.join(self.report_dir, filename)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.warning(f"⚠️ Nie udało się zapisać raportu profilera: {e}")
+            return None
+
+        logger.info(f"⏱️ Raport profilera: {path} ({report['total_calls']} komend, {report['total_seconds']:.1f}s)")
+        for entry in report['phases'][:5]:
+            logger.info(f"   {entry['phase']}: {entry['calls']} komend, {entry['seconds']:.2f}s")
+        return path
+
+
+def install_profiler(driver, report_dir='./logs/profiles/'):
+    """
+    Instaluje profiler na driverze i ustawia go jako aktywny.
+
+    Returns:
+        DriverProfiler: Zainstalowany profiler
+    """
+    profiler = DriverProfiler(report_dir)
+    profiler.install(driver)
+    return profiler
@@ -0,0 +1,196 @@
+"""
+Rozgłaszanie zdarzeń o nowych wiadomościach do subskrybentów API (SSE/WebSocket).
+
+Monitor publikuje zdarzenia z własnego wątku, a subskrybenci konsumują je
+w pętli asyncio. Każdy subskrybent ma ograniczony bufor - gdy klient nie
+nadąża, najstarsze zdarzenia są odrzucane i zliczane. Ostatnie zdarzenia
+trzymane są w krótkim buforze cyklicznym, dzięki czemu klient może wznowić
+strumień od podanego Last-Event-ID.
+"""
+import asyncio
+import threading
+import logging
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class StreamEvent:
+    """Pojedyncze zdarzenie strumienia."""
+
+    __slots__ = ('id', 'type', 'data', 'created_at')
+
+    def __init__(self, event_id, event_type, data):
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+        self.created_at = datetime.now().isoformat()
+
+    def to_dict(self):
+        """Zwraca zdarzenie jako słownik (do serializacji JSON)."""
+        return {
+            'id': self.id,
+            'type': self.type,
+            'created_at': self.created_at,
+            'data': self.data
+        }
+
+
+class Subscriber:
+    """Subskrybent strumienia z ograniczonym buforem (polityka drop-oldest)."""
+
+    def __init__(self, broadcaster, max_buffer, loop=None):
+        self._broadcaster = broadcaster
+        self._buffer = deque()
+        self._max_buffer = max_buffer
+        self._lock = threading.Lock()
+        self._loop = loop
+        self._wakeup = asyncio.Event() if loop else None
+        self.dropped = 0
+        self._unreported_drops = 0
+        self.history_gap = False
+
+    def _push(self, event):
+        """Dodaje zdarzenie do bufora (wywoływane z dowolnego wątku)."""
+        with self._lock:
+            if len(self._buffer) >= self._max_buffer:
+                self._buffer.popleft()
+                self.dropped += 1
+                self._unreported_drops += 1
+                self._broadcaster._count_drop()
+            self._buffer.append(event)
+
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                # Pętla asyncio już zamknięta - subskrybent zostanie usunięty przy rozłączeniu
+                pass
+
+    def take_dropped(self):
+        """Zwraca liczbę odrzuconych zdarzeń od ostatniego wywołania."""
+        with self._lock:
+            count = self._unreported_drops
+            self._unreported_drops = 0
+            return count
+
+    def get_nowait(self):
+        """Zwraca kolejne zdarzenie z bufora lub None."""
+        with self._lock:
+            return self._buffer.popleft() if self._buffer else None
+
+    async def get(self, timeout=None):
+        """
+        Czeka na kolejne zdarzenie.
+
+        Args:
+            timeout: Maksymalny czas oczekiwania (None = bez limitu)
+
+        Returns:
+            StreamEvent lub None po przekroczeniu czasu
+        """
+        while True:
+            with self._lock:
+                if self._buffer:
+                    return self._buffer.popleft()
+                self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+    def close(self):
+        """Wypisuje subskrybenta z rozgłaszacza."""
+        self._broadcaster.unsubscribe(self)
+
+
+class EventBroadcaster:
+    """Thread-safe rozgłaszacz zdarzeń z buforem historii do wznawiania strumienia."""
+
+    def __init__(self, history_size=1000, subscriber_buffer=100):
+        """
+        Args:
+            history_size: Liczba ostatnich zdarzeń trzymanych do wznawiania (Last-Event-ID)
+            subscriber_buffer: Maksymalna liczba zdarzeń w buforze jednego subskrybenta
+        """
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        # RLock - odtwarzanie historii w subscribe() może zliczać odrzucone zdarzenia
+        self._lock = threading.RLock()
+        self._next_id = 1
+        self.subscriber_buffer = subscriber_buffer
+        self._stats = {
+            'published': 0,
+            'dropped': 0,
+            'subscribers_total': 0
+        }
+
+    def publish(self, event_type, data):
+        """
+        Publikuje zdarzenie do wszystkich subskrybentów.
+
+        Args:
+            event_type: Typ zdarzenia (np. "new_message")
+            data: Dane zdarzenia (serializowalne do JSON)
+
+        Returns:
+            StreamEvent: Opublikowane zdarzenie
+        """
+        with self._lock:
+            event = StreamEvent(self._next_id, event_type, data)
+            self._next_id += 1
+            self._history.append(event)
+            self._stats['published'] += 1
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            subscriber._push(event)
+
+        return event
+
+    def subscribe(self, last_event_id=None, loop=None, max_buffer=None):
+        """
+        Tworzy nowego subskrybenta, opcjonalnie odtwarzając zdarzenia po last_event_id.
+
+        Args:
+            last_event_id: ID ostatniego zdarzenia otrzymanego przez klienta
+            loop: Pętla asyncio konsumenta (wymagana dla Subscriber.get)
+            max_buffer: Rozmiar bufora subskrybenta (domyślnie subscriber_buffer)
+
+        Returns:
+            Subscriber: Subskrybent; history_gap=True oznacza, że część zdarzeń
+            po last_event_id wypadła już z bufora historii
+        """
+        subscriber = Subscriber(self, max_buffer or self.subscriber_buffer, loop=loop)
+
+        with self._lock:
+            if last_event_id is not None:
+                oldest = self._history[0].id if self._history else self._next_id
+                subscriber.history_gap = last_event_id + 1 < oldest
+                for event in self._history:
+                    if event.id > last_event_id:
+                        subscriber._push(event)
+            self._subscribers.add(subscriber)
+            self._stats['subscribers_total'] += 1
+
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Usuwa subskrybenta."""
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _count_drop(self):
+        """Zlicza zdarzenie odrzucone przez wolnego konsumenta."""
+        with self._lock:
+            self._stats['dropped'] += 1
+
+    def get_stats(self):
+        """Zwraca statystyki rozgłaszacza."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['subscribers'] = len(self._subscribers)
+            stats['last_event_id'] = self._next_id - 1
+            stats['slow_consumers'] = sum(1 for s in self._subscribers if s.dropped)
+            return stats
@@ -0,0 +1,600 @@
+"""
+Strumieniowy eksport zapisanych wiadomości (sekcje export i export_content).
+
+Wiadomości czytane są raz, konwersacja po konwersacji, a każdy rekord
+trafia od razu do writerów wszystkich formatów z export.formats (json, csv,
+html, txt) - jedno przejście niezależnie od liczby formatów. Przy
+compression.enabled writery piszą bezpośrednio do wpisów archiwum ZIP
+(ZipFile.open(..., 'w')), bez plików tymczasowych. W pamięci trzymany jest
+tylko bieżący rekord i klucze wiadomości jednej konwersacji.
+
+Eksport przyrostowy (auto_export / akcja "export" harmonogramu) zapamiętuje
+w pliku stanu znacznik (generacja, pozycja) magazynu segmentów każdej
+konwersacji i eksportuje tylko wiadomości za nim - plik stanu nie rośnie
+z historią. Klucze wyeksportowanych wiadomości zapisywane są już tylko dla
+dawnych folderów ze snapshotami messages_*.json.
+Przy export_content.include_statistics w tym samym przejściu wypełniany jest
+bufor kolumnowy src.conversation_stats, a statystyki konwersacji zapisywane
+są obok jej plików ({format} = "statistics").
+"""
+import csv
+import html
+import io
+import json
+import os
+import re
+import hashlib
+import threading
+import zipfile
+import logging
+from datetime import datetime
+from itertools import islice
+
+from src.compaction import snapshot_paths
+from src.message_schema import message_key
+from src.message_store import get_message_store, is_message_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATTERN = "{date}_{conversation}_{format}"
+
+CSV_COLUMNS = ['conversation', 'key', 'timestamp', 'sender', 'text', 'media', 'reactions', 'extracted_at']
+
+_PHONE_RE = re.compile(r"(?<!\w)\+?\d[\d \-]{7,}\d(?!\w)")
+
+
+class ExportWriter:
+    """Writer jednego formatu dla jednej konwersacji (strumień binarny na wejściu)."""
+
+    extension = None
+
+    def __init__(self, stream, conversation):
+        self.conversation = conversation
+        self.out = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+        self.count = 0
+        self.begin()
+
+    def begin(self):
+        pass
+
+    def write(self, record):
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+    def close(self):
+        self.end()
+        self.out.close()
+
+
+class JsonExportWriter(ExportWriter):
+    extension = 'json'
+
+    def begin(self):
+        self.out.write('{"conversation": %s, "messages": [\n' % json.dumps(self.conversation, ensure_ascii=False))
+
+    def write(self, record):
+        if self.count:
+            self.out.write(',\n')
+        self.out.write(json.dumps(record, ensure_ascii=False))
+        self.count += 1
+
+    def end(self):
+        self.out.write('\n], "message_count": %d}\n' % self.count)
+
+
+class CsvExportWriter(ExportWriter):
+    extension = 'csv'
+
+    def begin(self):
+        self.writer = csv.writer(self.out)
+        self.writer.writerow(CSV_COLUMNS)
+
+    def write(self, record):
+        self.writer.writerow([
+            record.get('conversation', ''),
+            record.get('key', ''),
+            record.get('timestamp') or '',
+            record.get('sender') or '',
+            record.get('text') or '',
+            ' '.join(item.get('url', '') for item in record.get('media') or ()),
+            '; '.join(record.get('reactions') or ()),
+            record.get('extracted_at') or '',
+        ])
+        self.count += 1
+
+
+class HtmlExportWriter(ExportWriter):
+    extension = 'html'
+
+    def begin(self):
+        title = html.escape(self.conversation)
+        self.out.write(
+            f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{title}</title></head>\n"
+            f"<body>\n<h1>{title}</h1>\n<table>\n"
+            "<tr><th>Czas</th><th>Nadawca</th><th>Wiadomość</th><th>Media</th></tr>\n"
+        )
+
+    def write(self, record):
+        media = ' '.join(
+            f'<a href="{html.escape(item.get("url", ""))}">{html.escape(item.get("type", "link"))}</a>'
+            for item in record.get('media') or ()
+        )
+        self.out.write(
+            f"<tr><td>{html.escape(record.get('timestamp') or '')}</td>"
+            f"<td>{html.escape(record.get('sender') or '')}</td>"
+            f"<td>{html.escape(record.get('text') or '')}</td><td>{media}</td></tr>\n"
+        )
+        self.count += 1
+
+    def end(self):
+        self.out.write("</table>\n</body></html>\n")
+
+
+class TxtExportWriter(ExportWriter):
+    extension = 'txt'
+
+    def write(self, record):
+        prefix = f"[{record['timestamp']}] " if record.get('timestamp') else ""
+        self.out.write(f"{prefix}{record.get('sender') or 'Unknown'}: {record.get('text') or ''}\n")
+        self.count += 1
+
+
+EXPORT_WRITERS = {
+    'json': JsonExportWriter,
+    'csv': CsvExportWriter,
+    'html': HtmlExportWriter,
+    'txt': TxtExportWriter,
+}
+
+
+def _unique_path(path):
+    """Dodaje sufiks _2, _3... gdy plik już istnieje (kolejne eksporty tego samego dnia)."""
+    base, ext = os.path.splitext(path)
+    if base.endswith('.tar'):
+        base, ext = base[:-4], '.tar' + ext
+    candidate, counter = path, 1
+    while os.path.exists(candidate):
+        counter += 1
+        candidate = f"{base}_{counter}{ext}"
+    return candidate
+
+
+class DirectorySink:
+    """Pliki eksportu w katalogu docelowym (zapis atomowy: .tmp + os.replace)."""
+
+    def __init__(self, destination):
+        self.destination = destination
+        os.makedirs(destination, exist_ok=True)
+        self.paths = []
+
+    def open(self, name):
+        path = _unique_path(os.path.join(self.destination, name))
+        return io.BufferedWriter(_AtomicFile(path, self.paths))
+
+    def close(self):
+        return list(self.paths)
+
+
+class _AtomicFile(io.FileIO):
+    def __init__(self, path, written):
+        self._final_path = path
+        self._written = written
+        super().__init__(path + '.tmp', 'w')
+
+    def close(self):
+        if not self.closed:
+            super().close()
+            os.replace(self._final_path + '.tmp', self._final_path)
+            self._written.append(self._final_path)
+
+
+class ZipSink:
+    """Archiwum ZIP - wpisy pisane strumieniowo przez ZipFile.open(name, 'w')."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._zip = zipfile.ZipFile(path + '.tmp', 'w', compression=zipfile.ZIP_DEFLATED)
+        self.entries = 0
+
+    def open(self, name):
+        self.entries += 1
+        # force_zip64 - rozmiar wpisu nie jest znany z góry
+        return self._zip.open(name, 'w', force_zip64=True)
+
+    def close(self):
+        self._zip.close()
+        if not self.entries:
+            os.remove(self.path + '.tmp')
+            return []
+        self.path = _unique_path(self.path)
+        os.replace(self.path + '.tmp', self.path)
+        return [self.path]
+
+
+def find_conversation_dirs(source_dir):
+    """Zwraca posortowane katalogi konwersacji z magazynem segmentów lub snapshotami messages_*.json."""
+    if not os.path.isdir(source_dir):
+        return []
+    return sorted(
+        entry.path for entry in os.scandir(source_dir)
+        if entry.is_dir() and (is_message_store(entry.path) or snapshot_paths(entry.path))
+    )
+
+
+def iter_conversation_messages(conv_dir, skip_keys=None):
+    """
+    Iteruje po wiadomościach konwersacji: najpierw magazyn segmentów
+    (src.message_store), potem snapshoty od najstarszego.
+
+    Snapshoty z kolejnych przebiegów zachodzą na siebie - każda wiadomość
+    zwracana jest raz (po kluczu message_key). W pamięci jest naraz tylko
+    jeden plik snapshotu.
+
+    Args:
+        conv_dir: Katalog konwersacji (data/<konwersacja>/)
+        skip_keys: Zbiór kluczy do pominięcia; uzupełniany o zwrócone klucze
+
+    Yields:
+        tuple: (nazwa konwersacji, klucz, wiadomość)
+    """
+    seen = skip_keys if skip_keys is not None else set()
+    conversation = os.path.basename(conv_dir)
+    if is_message_store(conv_dir):
+        store = get_message_store(conv_dir)
+        conversation = store.conversation_name or conversation
+        try:
+            for message in store.iter_messages():
+                key = message_key(message)
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield conversation, key, message
+        finally:
+            # Mapowania plików zwalniane po każdej konwersacji (limit deskryptorów)
+            store.close()
+
+    for name, key, message in _iter_snapshot_messages(snapshot_paths(conv_dir), seen):
+        yield name or conversation, key, message
+
+
+def _iter_snapshot_messages(paths, seen):
+    """
+    Wiadomości snapshotów (od najstarszego) z pominięciem kluczy z seen.
+
+    Yields:
+        tuple: (nazwa konwersacji z pliku lub None, klucz, wiadomość)
+    """
+    conversation = None
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Pomijam uszkodzony plik {path}: {e}")
+            continue
+
+        conversation = data.get('conversation_name') or conversation
+        for message in data.get('messages') or ():
+            key = message_key(message)
+            if key in seen:
+                continue
+            seen.add(key)
+            yield conversation, key, message
+
+
+def _store_pending_ranges(store, marker):
+    """
+    Zakresy pozycji magazynu niewyeksportowane według znacznika {generation, position}.
+
+    Po przepisaniu magazynu z zachowaną kolejnością (starsza historia dopisana
+    przed zapisaną) nowa jest część przed przesuniętym znacznikiem i za nim;
+    po kompakcji pozycje nie przenoszą się i eksportowany jest cały magazyn.
+    """
+    offset = store.carried_offset(marker['generation'])
+    if offset is None:
+        logger.warning(f"⚠️ Magazyn {store.conv_dir} przepisany od poprzedniego eksportu "
+                       f"- eksportuję całą konwersację")
+        return [(0, len(store))]
+    return [(0, offset), (offset + marker['position'], len(store))]
+
+
+def iter_export_messages(conv_dir, previous=None, current=None, full=False):
+    """
+    Iteruje po wiadomościach konwersacji z informacją, czy są nowe od poprzedniego eksportu.
+
+    Magazyn segmentów: nowe są pozycje za znacznikiem z poprzedniego stanu
+    (stan sprzed znaczników - klucze). Snapshoty: klucze spoza zapisanych
+    w stanie, z pominięciem wiadomości obecnych w magazynie.
+
+    Przy full wiadomości magazynu mają czas z kolumny indeksu
+    (src.conversation_stats.store_times) - bez ponownego parsowania.
+
+    Args:
+        conv_dir: Katalog konwersacji
+        previous: Stan konwersacji z poprzedniego eksportu (None = eksport pełny)
+        current: Słownik uzupełniany o nowy stan konwersacji
+        full: Zwracaj także wcześniej wyeksportowane wiadomości (statystyki)
+
+    Yields:
+        tuple: (nazwa konwersacji, klucz, wiadomość, czy nowa, czas z indeksu lub None)
+    """
+    previous = previous or {}
+    current = current if current is not None else {}
+    conversation = os.path.basename(conv_dir)
+    legacy_keys = set(previous.get('keys', ()))
+    paths = snapshot_paths(conv_dir)
+    store_keys = set()
+
+    if is_message_store(conv_dir):
+        store = get_message_store(conv_dir)
+        try:
+            with store.lock:
+                generation, count = store.generation, len(store)
+                ranges = _store_pending_ranges(store, previous['store']) if previous.get('store') else None
+                if paths:
+                    store_keys = {store.entry(position).key for position in range(count)}
+                times = None
+                if full:
+                    from src.conversation_stats import store_times
+                    times = store_times(store)
+            conversation = store.conversation_name or conversation
+
+            start = 0
+            if ranges is not None and not full:
+                start = min((lo for lo, hi in ranges if lo < hi), default=count)
+            for position, message in enumerate(islice(store.iter_messages(start), count - start), start):
+                key = message_key(message)
+                if ranges is None:
+                    new = key not in legacy_keys
+                else:
+                    new = any(lo <= position < hi for lo, hi in ranges)
+                if new or full:
+                    yield conversation, key, message, new, None if times is None else float(times[position])
+
+            # Magazyn przepisany w trakcie eksportu - pozycje nieważne, kolejny eksport będzie pełny
+            position = count if store.generation == generation else 0
+            current['store'] = {'generation': generation, 'position': position}
+        finally:
+            # Mapowania plików zwalniane po każdej konwersacji (limit deskryptorów)
+            store.close()
+
+    if paths:
+        keys = []
+        for name, key, message in _iter_snapshot_messages(paths, store_keys):
+            keys.append(key)
+            new = key not in legacy_keys
+            if new or full:
+                yield name or conversation, key, message, new, None
+        current['keys'] = sorted(keys)
+
+
+def _pseudonym(name):
+    return "Uczestnik_" + hashlib.sha1(name.encode('utf-8')).hexdigest()[:6]
+
+
+def prepare_record(conversation, key, message, content=None):
+    """
+    Buduje rekord eksportu zgodnie z export_content.
+
+    Args:
+        conversation: Nazwa konwersacji
+        key: Klucz wiadomości
+        message: Wiadomość w schemacie extract_messages_from_conversation
+        content: Sekcja export_content konfiguracji
+
+    Returns:
+        dict: Rekord przekazywany do writerów
+    """
+    content = content or {}
+    anonymize = content.get('anonymize') or {}
+    anonymize_names = anonymize.get('enabled', False) and anonymize.get('anonymize_names', False)
+    anonymize_phones = anonymize.get('enabled', False) and anonymize.get('anonymize_phone_numbers', False)
+
+    sender = message.get('sender')
+    text = message.get('text', '') if content.get('include_messages', True) else ''
+    if anonymize_names:
+        if sender and sender != 'You':
+            sender = _pseudonym(sender)
+        conversation = _pseudonym(conversation)
+    if anonymize_phones and text:
+        text = _PHONE_RE.sub('[telefon]', text)
+
+    record = {'conversation': conversation, 'key': key, 'sender': sender, 'text': text}
+    if content.get('include_timestamps', True):
+        record['timestamp'] = message.get('timestamp')
+    if content.get('include_media_links', True) and message.get('media'):
+        record['media'] = message['media']
+    if message.get('reactions'):
+        record['reactions'] = message['reactions']
+    if content.get('include_metadata', True):
+        record['extracted_at'] = message.get('extracted_at')
+    return record
+
+
+def _compression_enabled(compression):
+    if not compression.get('enabled', False):
+        return False
+    if compression.get('format', 'zip') != 'zip':
+        logger.warning(f"⚠️ Kompresja '{compression.get('format')}' nie jest obsługiwana - używam zip")
+    return True
+
+
+def _safe_name(value):
+    return re.sub(r'[<>:"/\\|?*\s]+', '_', str(value)).strip('_') or 'unknown'
+
+
+class Exporter:
+    """Jednoprzebiegowy eksport do wielu formatów."""
+
+    def __init__(self, source_dir='./data', destination='./exports/', formats=('json',),
+                 pattern=DEFAULT_PATTERN, compress=False, content=None, state_file=None):
+        """
+        Args:
+            source_dir: Katalog z danymi konwersacji (data/)
+            destination: Katalog docelowy eksportu
+            formats: Formaty z EXPORT_WRITERS (nieznane są pomijane z ostrzeżeniem)
+            pattern: Wzorzec nazwy pliku ({date}, {time}, {timestamp}, {conversation}, {format})
+            compress: Czy pisać do archiwów ZIP (jedno archiwum na format)
+            content: Sekcja export_content
+            state_file: Plik stanu eksportu przyrostowego (None = eksport pełny)
+        """
+        self.source_dir = source_dir
+        self.destination = destination
+        self.formats = [fmt for fmt in dict.fromkeys(formats) if fmt in EXPORT_WRITERS]
+        for fmt in set(formats) - set(self.formats):
+            logger.warning(f"⚠️ Nieobsługiwany format eksportu '{fmt}' - pomijam")
+        self.pattern = pattern or DEFAULT_PATTERN
+        self.compress = compress
+        self.content = content or {}
+        self.state_file = state_file
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, **overrides):
+        """Tworzy exporter z sekcji export i export_content."""
+        export = config.get_export_settings()
+        options = {
+            'source_dir': export.get('source_dir', './data'),
+            'destination': export.get('destination', './exports/'),
+            'formats': export.get('formats') or ['json'],
+            'pattern': (export.get('file_naming') or {}).get('pattern', DEFAULT_PATTERN),
+            'compress': _compression_enabled(export.get('compression') or {}),
+            'content': config.get_export_content_settings(),
+            'state_file': export.get('state_file'),
+        }
+        options.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**options)
+
+    def _file_name(self, now, conversation, fmt, extension=None):
+        name = self.pattern.format(
+            date=now.strftime("%Y%m%d"), time=now.strftime("%H%M%S"),
+            timestamp=now.strftime("%Y%m%d_%H%M%S"), conversation=_safe_name(conversation), format=fmt
+        )
+        return f"{name}.{extension or EXPORT_WRITERS[fmt].extension}"
+
+    def _new_statistics_columns(self):
+        """Bufor kolumnowy statystyk (None gdy include_statistics wyłączone)."""
+        if not self.content.get('include_statistics', False):
+            return None
+        from src.conversation_stats import ConversationColumns
+        return ConversationColumns()
+
+    def _write_statistics(self, sink, now, conversation, columns):
+        from src.conversation_stats import compute_statistics
+
+        statistics = compute_statistics(columns)
+        statistics['conversation'] = conversation
+        with sink.open(self._file_name(now, conversation, 'statistics', 'json')) as stream:
+            stream.write(json.dumps(statistics, ensure_ascii=False, indent=2).encode('utf-8'))
+
+    def _load_state(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {'conversations': {}}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Nie udało się wczytać stanu eksportu ({e}) - eksport pełny")
+            return {'conversations': {}}
+
+    def _save_state(self, state):
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_file)), exist_ok=True)
+        tmp_path = self.state_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_file)
+
+    def run(self, incremental=True):
+        """
+        Eksportuje wiadomości (przyrostowo, jeśli podano state_file).
+
+        Returns:
+            dict: Statystyki eksportu (conversations, messages, files)
+        """
+        with self._lock:
+            return self._run(incremental and bool(self.state_file))
+
+    def _run(self, incremental):
+        now = datetime.now()
+        state = self._load_state() if incremental else {'conversations': {}}
+        stats = {'conversations': 0, 'messages': 0, 'files': [], 'formats': list(self.formats)}
+
+        if self.compress:
+            sinks = {
+                fmt: ZipSink(os.path.join(self.destination, f"{self._file_name(now, 'all', fmt)}.zip"))
+                for fmt in self.formats
+            }
+        else:
+            shared = DirectorySink(self.destination)
+            sinks = {fmt: shared for fmt in self.formats}
+
+        try:
+            for conv_dir in find_conversation_dirs(self.source_dir):
+                folder = os.path.basename(conv_dir)
+                previous = state['conversations'].get(folder, {})
+                current = {}
+                # Statystyki obejmują całą historię, także wcześniej wyeksportowane wiadomości
+                columns = self._new_statistics_columns()
+                writers = []
+
+                try:
+                    messages = iter_export_messages(conv_dir, previous, current, full=columns is not None)
+                    for conversation, key, message, new, moment in messages:
+                        if columns is not None:
+                            columns.add(message, moment)
+                        if not new:
+                            continue
+
+                        record = prepare_record(conversation, key, message, self.content)
+                        if not writers:
+                            # Pliki tworzone dopiero przy pierwszej nowej wiadomości
+                            name = record['conversation']
+                            writers = [
+                                EXPORT_WRITERS[fmt](sinks[fmt].open(self._file_name(now, name, fmt)), name)
+                                for fmt in self.formats
+                            ]
+                        for writer in writers:
+                            writer.write(record)
+                        stats['messages'] += 1
+                finally:
+                    for writer in writers:
+                        writer.close()
+
+                if writers:
+                    stats['conversations'] += 1
+                    if columns is not None:
+                        self._write_statistics(sinks[self.formats[0]], now, writers[0].conversation, columns)
+
+                state['conversations'][folder] = current
+        finally:
+            for sink in {id(sink): sink for sink in sinks.values()}.values():
+                stats['files'].extend(sink.close())
+
+        if incremental:
+            state['last_export'] = datetime.now().isoformat()
+            self._save_state(state)
+
+        logger.info(f"📦 Eksport: {stats['messages']} wiadomości z {stats['conversations']} konwersacji "
+                    f"-> {len(stats['files'])} plików ({', '.join(self.formats)})")
+        return stats
+
+
+def export_messages(config=None, incremental=True, **overrides):
+    """
+    Uruchamia eksport zgodnie z konfiguracją.
+
+    Args:
+        config: ConfigParser (domyślnie settings.config)
+        incremental: Eksportuj tylko wiadomości nowe od poprzedniego eksportu
+        **overrides: Nadpisania opcji Exporter (np. formats, destination)
+
+    Returns:
+        dict: Statystyki eksportu
+    """
+    if config is None:
+        from config import settings
+        config = settings.config
+    return Exporter.from_config(config, **overrides).run(incremental=incremental)
@@ -0,0 +1,154 @@
+"""
+Dziennik postępu ekstrakcji wszystkich konwersacji (wznawianie po awarii).
+
+extract_and_save_all_conversations zapisuje w data/extraction_checkpoint.json
+stan każdej konwersacji: "done" po zapisaniu jej wiadomości, "partial"
+okresowo w trakcie długiego scrollowania (liczba wykonanych scrolli),
+"failed" po błędzie. Plik zapisywany jest atomowo (plik tymczasowy + os.replace), więc przerwanie w dowolnym momencie
+(awaria przeglądarki, wylogowanie, Ctrl+C) zostawia ostatni spójny stan.
+
+Kolejne uruchomienie z tym samym trybem pomija konwersacje "done",
+a "partial" kontynuuje od zapisanej liczby scrolli (już przewinięta część
+historii przewijana jest szybciej, bez ponownego zapisu). Przebieg
+dokończony do końca listy usuwa dziennik (nieudane konwersacje ponawiane
+są w kolejnym przebiegu); zostaje on tylko po przerwaniu - anulowaniu,
+wyczerpaniu budżetu lub serii nieudanych konwersacji pod rząd (awaria
+przeglądarki, wylogowanie). Wiek dziennika (max_age_hours) liczony jest od
+początku przerwanego przebiegu.
+"""
+import json
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = 'extraction_checkpoint.json'
+
+STATUS_DONE = 'done'
+STATUS_PARTIAL = 'partial'
+STATUS_FAILED = 'failed'
+
+
+def conversation_id(conv):
+    """Identyfikator konwersacji w dzienniku (URL, a gdy go brak - nazwa)."""
+    return conv.get('url') or conv.get('name') or 'Unknown'
+
+
+class ExtractionCheckpoint:
+    """Dziennik postępu jednego przebiegu ekstrakcji."""
+
+    def __init__(self, path, mode=None, max_age_hours=24, clock=time.time):
+        """
+        Args:
+            path: Plik dziennika
+            mode: Tryb ekstrakcji (dziennik z innego trybu nie jest wznawiany)
+            max_age_hours: Starszy dziennik jest ignorowany (None = bez limitu)
+            clock: Funkcja zwracająca aktualny czas (epoch)
+        """
+        self.path = path
+        self.mode = mode
+        self.max_age_hours = max_age_hours
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.resumed = False
+        self._state = self._load()
+
+    @classmethod
+    def from_config(cls, output_dir, config, mode=None):
+        """Tworzy dziennik w katalogu wyjściowym ekstrakcji (sekcja extraction_checkpoint)."""
+        return cls(
+            os.path.join(output_dir, CHECKPOINT_FILE),
+            mode=mode,
+            max_age_hours=config.get_checkpoint_max_age_hours()
+        )
+
+    def _new_state(self):
+        now = self._clock()
+        return {'version': 1, 'mode': self.mode, 'started_at': now, 'updated_at': now, 'conversations': {}}
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return self._new_state()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Uszkodzony dziennik ekstrakcji {self.path} - zaczynam od nowa: {e}")
+            return self._new_state()
+
+        # Wiek liczony od początku przebiegu - zapisy w kolejnych przebiegach go nie odświeżają
+        age_hours = (self._clock() - state.get('started_at', 0)) / 3600
+        if state.get('mode') != self.mode:
+            logger.info(f"📒 Dziennik ekstrakcji z innego trybu ({state.get('mode')}) - zaczynam od nowa")
+            return self._new_state()
+        if self.max_age_hours is not None and age_hours > self.max_age_hours:
+            logger.info(f"📒 Dziennik ekstrakcji sprzed {age_hours:.0f} h - zaczynam od nowa")
+            return self._new_state()
+
+        self.resumed = bool(state.get('conversations'))
+        if self.resumed:
+            done = sum(1 for entry in state['conversations'].values() if entry.get('status') == STATUS_DONE)
+            logger.info(f"📒 Wznawiam ekstrakcję: {done}/{len(state['conversations'])} konwersacji ukończonych")
+        return state
+
+    def _save(self):
+        self._state['updated_at'] = self._clock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self._state, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.path + '.tmp', self.path)
+
+    def get(self, conv_id):
+        """Wpis konwersacji (None gdy brak)."""
+        with self._lock:
+            entry = self._state['conversations'].get(conv_id)
+            return dict(entry) if entry else None
+
+    def is_done(self, conv_id):
+        entry = self.get(conv_id)
+        return entry is not None and entry.get('status') == STATUS_DONE
+
+    def resume_scrolls(self, conv_id):
+        """Liczba scrolli wykonanych przed przerwaniem (0 dla nowej konwersacji)."""
+        entry = self.get(conv_id)
+        return entry.get('scrolls', 0) if entry and entry.get('status') == STATUS_PARTIAL else 0
+
+    def _update(self, conv_id, status, **fields):
+        with self._lock:
+            entry = self._state['conversations'].setdefault(conv_id, {})
+            entry.update(fields, status=status, updated_at=self._clock())
+            self._save()
+
+    def mark_partial(self, conv_id, name, scrolls, last_key=None, messages=0):
+        """Zapisuje postęp scrollowania konwersacji."""
+        self._update(conv_id, STATUS_PARTIAL, name=name, scrolls=scrolls, last_key=last_key, messages=messages)
+
+    def mark_done(self, conv_id, name, messages=0, last_key=None):
+        """Oznacza konwersację jako ukończoną."""
+        self._update(conv_id, STATUS_DONE, name=name, messages=messages, last_key=last_key)
+
+    def mark_failed(self, conv_id, name, error=None):
+        """Oznacza konwersację jako nieudaną (ponawiana przy wznowieniu)."""
+        self._update(conv_id, STATUS_FAILED, name=name, error=error)
+
+    def complete(self):
+        """Kończy przebieg - usuwa dziennik."""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._state = self._new_state()
+            self.resumed = False
+
+    def get_stats(self):
+        """Liczba konwersacji w dzienniku wg statusu."""
+        with self._lock:
+            stats = {STATUS_DONE: 0, STATUS_PARTIAL: 0, STATUS_FAILED: 0}
+            for entry in self._state['conversations'].values():
+                stats[entry.get('status')] = stats.get(entry.get('status'), 0) + 1
+            return stats
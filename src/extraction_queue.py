@@ -0,0 +1,169 @@
+"""
+Kolejka priorytetowa ekstrakcji konwersacji.
+
+Konwersacje ustawiane są według priorytetu z specific_conversations
+(high > medium > low; pozostałe dostają extraction_queue.default_priority),
+a przy równym priorytecie według pozycji na liście czatów (Messenger
+sortuje ją od ostatniej aktywności). Starzenie zapobiega zagłodzeniu:
+konwersacja czekająca na ekstrakcję dłużej niż aging_hours awansuje
+o jeden poziom (za każde kolejne aging_hours - o następny), a czas
+oczekiwania liczony jest od ostatniej ekstrakcji, więc stan przechowywany
+jest między przebiegami w extraction_queue.state_file.
+
+ExtractionBudget ogranicza przebieg czasem i liczbą akcji przeglądarki
+(limiter akcji) - przy ograniczonym budżecie najważniejsze konwersacje
+są pobierane jako pierwsze.
+"""
+import json
+import os
+import threading
+import time
+import logging
+
+from config.conversation_matcher import ConversationMatcher
+from src.extraction_checkpoint import conversation_id
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_LEVELS = {'low': 1, 'medium': 2, 'high': 3}
+MAX_LEVEL = max(PRIORITY_LEVELS.values())
+
+
+def priority_level(priority, default='medium'):
+    """Poziom liczbowy priorytetu (nieznana wartość = default)."""
+    return PRIORITY_LEVELS.get(str(priority).lower(), PRIORITY_LEVELS[default])
+
+
+class ExtractionQueue:
+    """Porządkuje konwersacje do ekstrakcji (priorytet, aktywność, starzenie)."""
+
+    def __init__(self, matcher=None, default_priority='low', aging_hours=24, state_file=None, clock=time.time):
+        """
+        Args:
+            matcher: ConversationMatcher z migawki konfiguracji (specific_conversations)
+            default_priority: Priorytet konwersacji spoza specific_conversations
+            aging_hours: Co ile godzin oczekiwania konwersacja awansuje o poziom (0 = bez starzenia)
+            state_file: Plik z czasami ostatniej ekstrakcji (None = tylko w pamięci)
+            clock: Funkcja zwracająca aktualny czas (epoch)
+        """
+        self.matcher = matcher if matcher is not None else ConversationMatcher()
+        self.default_priority = default_priority if default_priority in PRIORITY_LEVELS else 'low'
+        self.aging_hours = aging_hours
+        self.state_file = state_file
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self._load_state()
+
+    @classmethod
+    def from_config(cls, config):
+        """Tworzy kolejkę z sekcji extraction_queue i specific_conversations."""
+        settings = config.get_extraction_queue_settings()
+        return cls(
+            matcher=config.snapshot.conversation_matcher,
+            default_priority=settings.get('default_priority', 'low'),
+            aging_hours=settings.get('aging_hours', 24),
+            state_file=settings.get('state_file')
+        )
+
+    def _load_state(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('conversations', {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Nie udało się wczytać stanu kolejki ekstrakcji: {e}")
+            return {}
+
+    def _save_state(self):
+        if not self.state_file:
+            return
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.state_file + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'conversations': self._state}, f, ensure_ascii=False, indent=2)
+        os.replace(self.state_file + '.tmp', self.state_file)
+
+    def priority_of(self, conv):
+        """Skonfigurowany priorytet konwersacji."""
+        rule = self.matcher.rule_for(conv)
+        return rule.priority if rule is not None else self.default_priority
+
+    def effective_level(self, conv, now=None):
+        """Poziom priorytetu po uwzględnieniu czasu oczekiwania."""
+        now = self._clock() if now is None else now
+        level = priority_level(self.priority_of(conv))
+        if not self.aging_hours:
+            return level
+        entry = self._state.get(conversation_id(conv), {})
+        waiting_since = entry.get('last_extracted') or entry.get('first_seen') or now
+        waited_hours = max(0.0, now - waiting_since) / 3600
+        return min(MAX_LEVEL, level + int(waited_hours // self.aging_hours))
+
+    def order(self, conversations):
+        """
+        Zwraca konwersacje w kolejności ekstrakcji.
+
+        Każda konwersacja dostaje pola 'priority' (z konfiguracji)
+        i 'queue_level' (po starzeniu).
+        """
+        now = self._clock()
+        with self._lock:
+            for conv in conversations:
+                self._state.setdefault(conversation_id(conv), {'first_seen': now})
+
+            ranked = []
+            for rank, conv in enumerate(conversations):
+                conv['priority'] = self.priority_of(conv)
+                conv['queue_level'] = self.effective_level(conv, now)
+                ranked.append((-conv['queue_level'], rank, conv))
+            ranked.sort(key=lambda item: item[:2])
+            self._save_state()
+
+        ordered = [conv for _, _, conv in ranked]
+        if ordered:
+            logger.info("📋 Kolejka ekstrakcji: " + ", ".join(
+                f"{conv.get('name')} ({conv['priority']}, poziom {conv['queue_level']})" for conv in ordered[:10]
+            ) + (" ..." if len(ordered) > 10 else ""))
+        return ordered
+
+    def mark_extracted(self, conv):
+        """Zapisuje czas ekstrakcji (zeruje starzenie konwersacji)."""
+        with self._lock:
+            entry = self._state.setdefault(conversation_id(conv), {'first_seen': self._clock()})
+            entry['last_extracted'] = self._clock()
+            self._save_state()
+
+
+class ExtractionBudget:
+    """Limit czasu i akcji przeglądarki jednego przebiegu ekstrakcji."""
+
+    def __init__(self, max_seconds=None, max_actions=None, action_counter=None, clock=time.monotonic):
+        """
+        Args:
+            max_seconds: Maksymalny czas przebiegu (None/0 = bez limitu)
+            max_actions: Maksymalna liczba akcji przeglądarki (None/0 = bez limitu)
+            action_counter: Funkcja zwracająca liczbę akcji wykonanych przez ten przebieg
+            clock: Funkcja zwracająca czas monotoniczny
+        """
+        self.max_seconds = max_seconds or None
+        self.max_actions = max_actions or None
+        self._action_counter = action_counter
+        self._clock = clock
+        self._started = clock()
+        self._actions_at_start = action_counter() if action_counter else 0
+
+    def used(self):
+        """Wykorzystany budżet: sekundy i akcje."""
+        actions = self._action_counter() - self._actions_at_start if self._action_counter else 0
+        return {'seconds': round(self._clock() - self._started, 1), 'actions': actions}
+
+    def exhausted(self):
+        """Powód wyczerpania budżetu (None gdy budżet jest dostępny)."""
+        used = self.used()
+        if self.max_seconds is not None and used['seconds'] >= self.max_seconds:
+            return f"czas ({used['seconds']:.0f}/{self.max_seconds}s)"
+        if self.max_actions is not None and used['actions'] >= self.max_actions:
+            return f"akcje ({used['actions']}/{self.max_actions})"
+        return None
@@ -4,14 +4,13 @@ Klasa do logowania i interakcji z Facebookiem.
 """
 import time
 import random
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from config import settings
 from src import utils
 from src.debug_logger import DebugLogger
+from src.rate_limiter import throttle
+from src import metrics
+from src.driver_profiler import install_profiler, phase
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,12 +21,19 @@ class FacebookBot:
         self.email = email
         self.password = password
         self.driver = None
+        self.profiler = None
         self.config = config if config else settings.config
         self.debug_logger = DebugLogger()
         self.setup_driver()
 
     def setup_driver(self):
         """Inicjalizuje WebDriver z ustawieniami z konfiguracji."""
+        # Ciężkie importy (sterownik Chrome, webdriver_manager) dopiero przy tworzeniu przeglądarki
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+        from webdriver_manager.chrome import ChromeDriverManager
+
         chrome_options = Options()
 
         # Tryb headless z konfiguracji
@@ -61,13 +67,23 @@ class FacebookBot:
         service = Service(ChromeDriverManager().install())
 
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
+
+        # Histogram czasu komend WebDrivera (/metrics)
+        metrics.instrument_driver(self.driver)
+
+        # Opcjonalny profiler każdej komendy (raport w close())
+        if self.config.is_driver_profiling_enabled():
+            self.profiler = install_profiler(self.driver, self.config.get_profile_dir())
+
         self.driver.implicitly_wait(self.config.get_wait_timeout())
 
         logger.info(f"WebDriver zainicjalizowany (headless: {self.config.is_headless()}, timeout: {self.config.get_wait_timeout()}s)")
 
+    @phase("login")
     def login(self):
         """Loguje się do Facebooka z obsługą opóźnień z konfiguracji."""
         try:
+            throttle("navigation")
             self.driver.get(settings.LOGIN_URL)
 
             # Zapisz stan przed logowaniem (jeśli debugging włączony)
@@ -145,6 +161,7 @@ class FacebookBot:
 
             # Wprowadź PIN
             logger.info(f"📝 Wprowadzam PIN do Messengera...")
+            throttle("send")
             pin_input.clear()
             pin_input.send_keys(pin)
 
@@ -168,6 +185,7 @@ class FacebookBot:
                 self.debug_logger.save_error_snapshot(self.driver, e)
             return False
 
+    @phase("navigate_to_messenger")
     def navigate_to_messenger(self):
         """Przechodzi do Messenger poprzez bezpośrednią nawigację do URL."""
         try:
@@ -181,7 +199,8 @@ class FacebookBot:
 
             # Bezpośrednia nawigacja do Messenger URL
             logger.info("🔄 Przechodzę do Messenger przez bezpośredni link...")
-            self.driver.get("https://www.facebook.com/messages/")
+            throttle("navigation")
+            self.driver.get(settings.MESSAGES_URL)
             time.sleep(5)  # Czekaj na załadowanie
 
             # Obsłuż okno dialogowe z PINem (jeśli się pojawi)
@@ -231,5 +250,11 @@ class FacebookBot:
             except Exception as e:
                 logger.warning(f"Nie udało się zapisać final snapshot: {e}")
 
+            # Dokończ zapis snapshotów z kolejki przed zamknięciem
+            self.debug_logger.flush()
+
+            if self.profiler:
+                self.profiler.write_report()
+
             self.driver.quit()
             logger.info("🔒 Zamknięto przeglądarkę")
\ No newline at end of file
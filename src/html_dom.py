@@ -0,0 +1,263 @@
+"""
+Minimalny DOM i silnik selektorów CSS dla zapisanych snapshotów HTML.
+
+Oparty wyłącznie na html.parser ze standardowej biblioteki. Obsługuje
+podzbiór CSS używany przez bota: znacznik, #id, .klasa, [atrybut],
+[atrybut='v'], [atrybut*='v'], [atrybut^='v'], [atrybut$='v'],
+[atrybut~='v'], kombinatory potomka (spacja) i dziecka (>) oraz listy
+selektorów rozdzielone przecinkami.
+"""
+import re
+from html.parser import HTMLParser
+
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr'
+}
+
+# Znaczniki, które w innerText zaczynają nową linię
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt',
+    'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li',
+    'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tr', 'ul'
+}
+
+# Treść tych znaczników nie jest tekstem widocznym dla użytkownika
+HIDDEN_TAGS = {'script', 'style', 'noscript', 'template', 'head', 'title'}
+
+
+class Node:
+    """Element DOM."""
+
+    __slots__ = ('tag', 'attrs', 'children', 'parent')
+
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children = []
+        self.parent = parent
+
+    @property
+    def tag_name(self):
+        """Nazwa znacznika (jak WebElement.tag_name)."""
+        return self.tag
+
+    def get_attribute(self, name):
+        """Zwraca wartość atrybutu lub None (jak WebElement.get_attribute)."""
+        return self.attrs.get(name)
+
+    def iter_descendants(self):
+        """Iteruje po potomkach (elementach) w kolejności dokumentu."""
+        stack = [child for child in reversed(self.children) if isinstance(child, Node)]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(child for child in reversed(node.children) if isinstance(child, Node))
+
+    def find_elements(self, selector):
+        """Zwraca potomków pasujących do selektora CSS (jak WebElement.find_elements)."""
+        return select(self, selector)
+
+    def find_element(self, selector):
+        """Zwraca pierwszego pasującego potomka lub None."""
+        found = select(self, selector, limit=1)
+        return found[0] if found else None
+
+    @property
+    def text(self):
+        """Przybliżenie innerText: tekst bez skryptów, bloki w osobnych liniach."""
+        parts = []
+        self._collect_text(parts)
+        lines = (' '.join(line.split()) for line in ''.join(parts).split('\n'))
+        return '\n'.join(line for line in lines if line)
+
+    def _collect_text(self, parts):
+        for child in self.children:
+            if isinstance(child, Node):
+                if child.tag in HIDDEN_TAGS:
+                    continue
+                if child.tag in BLOCK_TAGS:
+                    parts.append('\n')
+                child._collect_text(parts)
+                if child.tag in BLOCK_TAGS:
+                    parts.append('\n')
+            else:
+                parts.append(child)
+
+    def __repr__(self):
+        return f"<Node {self.tag} {self.attrs}>"
+
+
+class _TreeBuilder(HTMLParser):
+    """Buduje drzewo Node z HTML (tolerancyjny dla niedomkniętych znaczników)."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node('#document')
+        self._current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {name: (value if value is not None else '') for name, value in attrs}, self._current)
+        self._current.children.append(node)
+        if tag not in VOID_TAGS:
+            self._current = node
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, {name: (value if value is not None else '') for name, value in attrs}, self._current)
+        self._current.children.append(node)
+
+    def handle_endtag(self, tag):
+        # Zamknij najbliższy otwarty znacznik o tej nazwie (pomijając niedomknięte)
+        node = self._current
+        while node is not None and node is not self.root:
+            if node.tag == tag:
+                self._current = node.parent
+                return
+            node = node.parent
+
+    def handle_data(self, data):
+        self._current.children.append(data)
+
+
+def parse_html(html):
+    """
+    Parsuje HTML do drzewa Node.
+
+    Returns:
+        Node: Korzeń dokumentu ('#document')
+    """
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+# ===== Silnik selektorów =====
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s*>\s*|\s+)
+    | (?P<tag>\*|[a-zA-Z][\w-]*)
+    | \#(?P<id>[\w-]+)
+    | \.(?P<cls>[\w-]+)
+    | \[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[*^$~|]?=)\s*(?:'(?P<sq>[^']*)'|"(?P<dq>[^"]*)"|(?P<bare>[^\]\s]+)))?\s*\]
+""", re.VERBOSE)
+
+_ATTR_OPS = {
+    None: lambda actual, expected: True,
+    '=': lambda actual, expected: actual == expected,
+    '*=': lambda actual, expected: expected in actual,
+    '^=': lambda actual, expected: actual.startswith(expected),
+    '$=': lambda actual, expected: actual.endswith(expected),
+    '~=': lambda actual, expected: expected in actual.split(),
+    '|=': lambda actual, expected: actual == expected or actual.startswith(expected + '-'),
+}
+
+# Przecinek rozdzielający selektory (poza cudzysłowami w wartościach atrybutów)
+_GROUP_SPLIT_RE = re.compile(r",(?=(?:[^'\"]|'[^']*'|\"[^\"]*\")*$)")
+
+_compiled_cache = {}
+
+
+class _Compound:
+    """Prosty selektor złożony (np. div[role='row'].msg)."""
+
+    __slots__ = ('tag', 'checks')
+
+    def __init__(self):
+        self.tag = None
+        self.checks = []
+
+    def matches(self, node):
+        if self.tag is not None and node.tag != self.tag:
+            return False
+        for name, op, expected in self.checks:
+            actual = node.attrs.get(name)
+            if actual is None or not _ATTR_OPS[op](actual, expected):
+                return False
+        return True
+
+
+def _compile(selector):
+    """Kompiluje selektor do listy alternatyw [(kompozyt, kombinator), ...]."""
+    compiled = _compiled_cache.get(selector)
+    if compiled is not None:
+        return compiled
+
+    alternatives = []
+    for part in _GROUP_SPLIT_RE.split(selector):
+        part = part.strip()
+        if not part:
+            continue
+        steps = []
+        current = _Compound()
+        combinator = None
+        pos = 0
+        while pos < len(part):
+            match = _TOKEN_RE.match(part, pos)
+            if not match or match.end() == pos:
+                raise ValueError(f"Nieobsługiwany selektor CSS: {selector!r}")
+            pos = match.end()
+            if match.group('ws') is not None:
+                steps.append((current, combinator))
+                current = _Compound()
+                combinator = '>' if '>' in match.group('ws') else ' '
+            elif match.group('tag'):
+                tag = match.group('tag').lower()
+                current.tag = None if tag == '*' else tag
+            elif match.group('id'):
+                current.checks.append(('id', '=', match.group('id')))
+            elif match.group('cls'):
+                current.checks.append(('class', '~=', match.group('cls')))
+            else:
+                value = match.group('sq')
+                if value is None:
+                    value = match.group('dq')
+                if value is None:
+                    value = match.group('bare')
+                current.checks.append((match.group('attr').lower(), match.group('op'), value))
+        steps.append((current, combinator))
+        alternatives.append(steps)
+
+    _compiled_cache[selector] = alternatives
+    return alternatives
+
+
+def _matches_steps(node, steps, index):
+    """Sprawdza dopasowanie node do steps[:index+1] (od prawej do lewej)."""
+    compound, combinator = steps[index]
+    if node.tag == '#document' or not compound.matches(node):
+        return False
+    if index == 0:
+        return True
+
+    parent = node.parent
+    if combinator == '>':
+        return parent is not None and _matches_steps(parent, steps, index - 1)
+
+    while parent is not None:
+        if _matches_steps(parent, steps, index - 1):
+            return True
+        parent = parent.parent
+    return False
+
+
+def select(root, selector, limit=None):
+    """
+    Zwraca potomków root pasujących do selektora CSS w kolejności dokumentu.
+
+    Jak querySelectorAll (i find_elements w Selenium): wynik musi leżeć
+    wewnątrz root, ale przodkowie z lewej strony selektora mogą być poza nim.
+
+    Args:
+        root: Node, w którym szukamy
+        selector: Selektor CSS
+        limit: Maksymalna liczba wyników (None = wszystkie)
+    """
+    alternatives = _compile(selector)
+    results = []
+    for node in root.iter_descendants():
+        if any(_matches_steps(node, steps, len(steps) - 1) for steps in alternatives):
+            results.append(node)
+            if limit is not None and len(results) >= limit:
+                break
+    return results
@@ -0,0 +1,192 @@
+"""
+System zadań w tle dla długotrwałych operacji (np. ekstrakcji wiadomości).
+
+Zadania wykonywane są w puli wątków, a klient od razu otrzymuje ID zadania,
+przez które może odpytywać postęp lub kooperacyjnie anulować pracę.
+"""
+import threading
+import time
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Zgłaszany przez zadanie, które zauważyło prośbę o anulowanie."""
+
+
+class Job:
+    """Pojedyncze zadanie w tle wraz z postępem."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    CANCELLING = 'cancelling'
+    CANCELLED = 'cancelled'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    FINISHED_STATES = (CANCELLED, COMPLETED, FAILED)
+
+    def __init__(self, kind, parameters=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.parameters = parameters or {}
+        self.status = Job.QUEUED
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._started_monotonic = None
+        self.progress = {
+            'conversations_total': 0,
+            'conversations_done': 0,
+            'messages': 0,
+            'current_conversation': None
+        }
+
+    def update_progress(self, **fields):
+        """Aktualizuje pola postępu (wywoływane z wątku zadania)."""
+        with self._lock:
+            self.progress.update(fields)
+
+    def is_cancelled(self):
+        """Sprawdza czy poproszono o anulowanie zadania."""
+        return self.cancel_event.is_set()
+
+    def _eta_seconds(self):
+        """Szacuje pozostały czas na podstawie średniego czasu na konwersację."""
+        done = self.progress['conversations_done']
+        total = self.progress['conversations_total']
+        if self.status != Job.RUNNING or not done or not total or self._started_monotonic is None:
+            return None
+        elapsed = time.monotonic() - self._started_monotonic
+        return round(elapsed / done * max(total - done, 0), 1)
+
+    def to_dict(self):
+        """Zwraca stan zadania w formie słownika (do API)."""
+        with self._lock:
+            return {
+                'id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'parameters': self.parameters,
+                'created_at': self.created_at.isoformat(),
+                'started_at': self.started_at.isoformat() if self.started_at else None,
+                'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+                'progress': dict(self.progress),
+                'eta_seconds': self._eta_seconds(),
+                'result': self.result,
+                'error': self.error
+            }
+
+
+class JobManager:
+    """Menedżer zadań w tle oparty na ThreadPoolExecutor."""
+
+    def __init__(self, max_workers=1, max_history=100):
+        """
+        Args:
+            max_workers: Liczba równoległych zadań
+            max_history: Ile zakończonych zadań przechowywać w pamięci
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.max_history = max_history
+
+    def submit(self, kind, func, parameters=None):
+        """
+        Zleca wykonanie zadania w tle.
+
+        Args:
+            kind: Typ zadania (np. "extract_messages")
+            func: Funkcja wywoływana jako func(job, **parameters)
+            parameters: Parametry zadania
+
+        Returns:
+            Job: Utworzone zadanie
+        """
+        job = Job(kind, parameters)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim_history()
+        self._executor.submit(self._run, job, func)
+        logger.info(f"📋 Zlecono zadanie {kind} (id: {job.id})")
+        return job
+
+    def _run(self, job, func):
+        """Wykonuje zadanie i zapisuje jego wynik."""
+        with job._lock:
+            if job.cancel_event.is_set():
+                job.status = Job.CANCELLED
+                job.finished_at = datetime.now()
+                return
+            job.status = Job.RUNNING
+            job.started_at = datetime.now()
+            job._started_monotonic = time.monotonic()
+
+        try:
+            result = func(job, **job.parameters)
+            status = Job.CANCELLED if job.is_cancelled() else Job.COMPLETED
+            error = None
+        except JobCancelled:
+            result, status, error = None, Job.CANCELLED, None
+        except Exception as e:
+            logger.error(f"❌ Zadanie {job.id} zakończone błędem: {e}")
+            result, status, error = None, Job.FAILED, str(e)
+
+        with job._lock:
+            job.result = result
+            job.status = status
+            job.error = error
+            job.finished_at = datetime.now()
+            job.progress['current_conversation'] = None
+
+        logger.info(f"📋 Zadanie {job.id} zakończone ze statusem: {status}")
+
+    def _trim_history(self):
+        """Usuwa najstarsze zakończone zadania ponad limit (wymaga blokady)."""
+        finished = [j for j in self._jobs.values() if j.status in Job.FINISHED_STATES]
+        for job in finished[:max(len(self._jobs) - self.max_history, 0)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id):
+        """Zwraca zadanie o podanym ID lub None."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        """Zwraca listę wszystkich zadań."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        """
+        Prosi zadanie o anulowanie (kooperacyjnie).
+
+        Returns:
+            Job lub None jeśli zadanie nie istnieje
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        with job._lock:
+            if job.status not in Job.FINISHED_STATES:
+                job.cancel_event.set()
+                if job.status == Job.RUNNING:
+                    job.status = Job.CANCELLING
+        logger.info(f"📋 Poproszono o anulowanie zadania {job_id}")
+        return job
+
+    def shutdown(self):
+        """Anuluje wszystkie aktywne zadania i zamyka pulę."""
+        for job in self.list():
+            if job.status not in Job.FINISHED_STATES:
+                job.cancel_event.set()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,203 @@
+"""
+Zapytania API o zapisaną historię konwersacji (GET /conversations...).
+
+Strony wiadomości wyznaczane są pozycjami w magazynie segmentów
+(src.message_store): kursor to generacja magazynu i pozycja, a odczyt
+strony to odczyt limit rekordów przez mmap - koszt zapytania nie zależy od
+długości historii. Magazyn jest tylko do dopisywania, więc zawartość
+strony (generacja, start, stop) nigdy się nie zmienia - z tych wartości
+liczony jest ETag (odpowiedź 304 bez czytania rekordów), a gotowe strony
+trzymane są w małym cache LRU.
+"""
+import base64
+import binascii
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from src.message_store import get_message_store, is_message_store
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class QueryError(ValueError):
+    """Niepoprawne zapytanie (np. nieważny kursor)."""
+
+
+def encode_cursor(generation, position):
+    """Kursor strony: nieprzezroczysty token z generacją magazynu i pozycją."""
+    return base64.urlsafe_b64encode(f"{generation}:{position}".encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(value):
+    """
+    Odczytuje kursor.
+
+    Returns:
+        tuple: (generacja, pozycja)
+
+    Raises:
+        QueryError: Gdy kursor jest niepoprawny
+    """
+    try:
+        text = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode('ascii')
+        generation, position = (int(part) for part in text.split(':'))
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise QueryError(f"Niepoprawny kursor: {value}")
+    if position < 0:
+        raise QueryError(f"Niepoprawny kursor: {value}")
+    return generation, position
+
+
+def _etag(*parts):
+    return '"' + hashlib.sha1("|".join(str(part) for part in parts).encode('utf-8')).hexdigest()[:20] + '"'
+
+
+def etag_matches(etag, if_none_match):
+    """Sprawdza nagłówek If-None-Match (lista ETagów lub *)."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _iso(moment):
+    return datetime.fromtimestamp(moment, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+class PageCache:
+    """Cache LRU stron wiadomości (klucz: katalog, generacja, start, stop)."""
+
+    def __init__(self, max_pages=256):
+        self.max_pages = max_pages
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def get(self, key):
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                self._stats['misses'] += 1
+                return None
+            self._pages.move_to_end(key)
+            self._stats['hits'] += 1
+            return page
+
+    def put(self, key, page):
+        if self.max_pages <= 0:
+            return
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats, pages=len(self._pages), max_pages=self.max_pages)
+
+
+def list_conversations(source_dir):
+    """
+    Lista zapisanych konwersacji.
+
+    Returns:
+        tuple: (lista słowników id/name/storage/message_count/last_message, ETag)
+    """
+    from src.exporter import find_conversation_dirs
+
+    conversations = []
+    for conv_dir in find_conversation_dirs(source_dir):
+        folder = os.path.basename(conv_dir)
+        item = {'id': folder, 'name': folder, 'storage': 'json', 'message_count': None, 'last_message': None}
+        if is_message_store(conv_dir):
+            store = get_message_store(conv_dir)
+            with store.lock:
+                count = len(store)
+                item.update({
+                    'name': store.conversation_name or folder,
+                    'storage': 'segments',
+                    'message_count': count,
+                    'last_message': _iso(store.entry(count - 1).time) if count else None,
+                    'generation': store.generation
+                })
+                store.close()
+        conversations.append(item)
+
+    return conversations, _etag(json.dumps(conversations, sort_keys=True))
+
+
+def _page_bounds(store, before, after, limit):
+    """Zakres pozycji strony [start, stop) dla kursorów before/after."""
+    count = len(store)
+
+    def position(cursor):
+        generation, value = decode_cursor(cursor)
+        if generation != store.generation:
+            raise QueryError("Kursor wygasł (magazyn został przepisany przez kompakcję) - pobierz stronę od nowa")
+        return min(value, count)
+
+    upper = position(before) if before else count
+    if after:
+        start = position(after)
+        return start, max(start, min(upper, start + limit))
+    return max(0, upper - limit), upper
+
+
+def query_messages(conv_dir, before=None, after=None, limit=DEFAULT_PAGE_SIZE, cache=None, if_none_match=None):
+    """
+    Strona wiadomości konwersacji (w kolejności magazynu).
+
+    Bez kursorów zwraca ostatnie limit wiadomości. cursors.before prowadzi
+    do starszej strony, cursors.after do nowszej (None = brak dalszych).
+
+    Args:
+        conv_dir: Katalog konwersacji
+        before: Kursor - wiadomości przed tą pozycją
+        after: Kursor - wiadomości od tej pozycji
+        limit: Rozmiar strony (1..MAX_PAGE_SIZE)
+        cache: PageCache (opcjonalnie)
+        if_none_match: Nagłówek If-None-Match
+
+    Returns:
+        tuple: (strona lub None gdy ETag pasuje - odpowiedź 304, ETag)
+
+    Raises:
+        QueryError: Niepoprawny kursor/limit lub konwersacja bez magazynu segmentów
+    """
+    if not is_message_store(conv_dir):
+        raise QueryError("Konwersacja zapisana w starym formacie - uruchom kompakcję (akcja 'compact')")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise QueryError(f"limit musi być w zakresie 1..{MAX_PAGE_SIZE}")
+
+    store = get_message_store(conv_dir)
+    with store.lock:
+        generation, count = store.generation, len(store)
+        start, stop = _page_bounds(store, before, after, limit)
+        cursors = {
+            'before': encode_cursor(generation, start) if start > 0 else None,
+            'after': encode_cursor(generation, stop) if stop < count else None
+        }
+        etag = _etag(os.path.abspath(conv_dir), generation, start, stop, stop < count)
+        if etag_matches(etag, if_none_match):
+            return None, etag
+
+        key = (os.path.abspath(conv_dir), generation, start, stop)
+        messages = cache.get(key) if cache is not None else None
+        if messages is None:
+            messages = store.read_range(start, stop)
+            if cache is not None:
+                cache.put(key, messages)
+
+        return {
+            'conversation': os.path.basename(conv_dir),
+            'name': store.conversation_name,
+            'total': count,
+            'messages': messages,
+            'cursors': cursors
+        }, etag
@@ -0,0 +1,237 @@
+"""
+Wspólne selektory i reguły ekstrakcji wiadomości.
+
+Moduł bez zależności od Selenium - używany zarówno przez MessengerMonitor
+(ekstrakcja na żywo), jak i przez offline_extractor (zapisane snapshoty HTML),
+dzięki czemu obie ścieżki zwracają dane w tym samym schemacie.
+"""
+import calendar
+import hashlib
+import re
+from datetime import datetime
+from functools import lru_cache
+
+# Elementy listy czatów (Facebook często zmienia interfejs - kolejne to zapasowe)
+CHAT_SELECTORS = [
+    # Selektor dla kontenera z czatami
+    "div[role='navigation'] div[role='grid'] div[role='gridcell']",
+    "div[role='navigation'] a[role='link']",
+    "div[aria-label*='Czat']",
+    "div[aria-label*='Conversation']",
+    # Fallback - ogólny selektor dla linków czatów
+    "a[href*='/t/']",
+]
+
+CHAT_NAME_SELECTOR = "span[dir='auto']"
+
+MESSAGE_CONTAINER_SELECTORS = [
+    "div[role='main']",
+    "div[aria-label='Messages']",
+    "div[aria-label='Wiadomości']",
+]
+
+MESSAGE_SELECTORS = [
+    "div[role='row']",
+    "div[data-scope='messages_table']",
+    "div[aria-label*='You sent']",
+    "div[aria-label*='said']",
+]
+
+TIMESTAMP_SELECTOR = "span[aria-label*=':']"
+
+REACTION_SELECTORS = [
+    "div[aria-label*='reaction']",
+    "span[aria-label*='reaction']",
+    "img[alt*='reaction']",
+    "[data-reaction]"
+]
+
+UNREAD_SELECTORS = [
+    "div[role='gridcell'] div[aria-label='Unread']",
+    "span[aria-label='Unread']",
+]
+
+# Element-wskaźnik nieprzeczytanej konwersacji wewnątrz wiersza listy czatów
+UNREAD_INDICATOR_SELECTOR = "div[aria-label='Unread'], span[aria-label='Unread']"
+
+# Znaczniki stanu w aria-label samego wiersza listy czatów - porównywane z całym
+# fragmentem etykiety (rozdzielonym przecinkiem, kropką środkową itp.), nie jako
+# podciąg, więc podgląd ostatniej wiadomości ("idziemy grupą") ich nie udaje
+GROUP_LABEL_RE = re.compile(r'group|group chat|grupa|czat grupowy|konwersacja grupowa')
+MUTED_LABEL_RE = re.compile(r'muted|notifications muted|wyciszon[aoy]|powiadomienia wyciszone')
+UNREAD_LABEL_RE = re.compile(r'unread|unread messages?|\d+ unread messages?|nieprzeczytan[aey]|'
+                             r'nieprzeczytane wiadomości|\d+ nieprzeczytan\w*( wiadomości?)?')
+ARCHIVED_LABEL_RE = re.compile(r'archived|zarchiwizowan[aey]')
+_LABEL_SEPARATORS = re.compile(r'\s*[,;|·•]\s*')
+
+DOCUMENT_EXTENSIONS = ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.zip', '.rar']
+
+DEFAULT_MEDIA_TYPES = ['images', 'videos', 'audio', 'documents']
+
+_DATETIME_FORMATS = ('%d/%m/%Y, %H:%M', '%d.%m.%Y, %H:%M', '%d.%m.%Y %H:%M', '%Y-%m-%d %H:%M', '%B %d, %Y, %I:%M %p')
+_TIME_RE = re.compile(r'(\d{1,2}):(\d{2})(?:\s*([AaPp][Mm]))?')
+_TIME_ONLY_RE = re.compile(r'(\d{1,2}):(\d{2})(?:\s*([AaPp][Mm]))?\s*')
+
+
+def is_chat_url(url):
+    """Sprawdza czy URL prowadzi do konwersacji."""
+    return bool(url) and ('/t/' in url or '/e2ee/' in url)
+
+
+def classify_sidebar_row(name, features):
+    """
+    Klasyfikuje wiersz listy czatów na podstawie cech zebranych z DOM.
+
+    Brane są pod uwagę tylko: aria-label samego wiersza (znaczniki porównywane
+    z całymi fragmentami etykiety), wskaźnik nieprzeczytania
+    (UNREAD_INDICATOR_SELECTOR), liczba awatarów (facepile czatu grupowego)
+    i ścieżka strony (widok archiwum). Cecha, której nie da się ustalić,
+    ma wartość None - filtry nie odrzucają wtedy konwersacji. Czat grupowy
+    ze zdjęciem grupy nie różni się od prywatnego, więc is_group jest
+    ustalane tylko pozytywnie.
+
+    Args:
+        name: Nazwa czatu
+        features: Słownik z kluczami label (aria-label wiersza), unread_indicator,
+            avatars (liczba awatarów), path (ścieżka strony)
+
+    Returns:
+        dict: is_group, muted, unread, archived (True/False/None)
+    """
+    label = (features.get('label') or '').strip()
+    segments = [segment for segment in _LABEL_SEPARATORS.split(label.casefold()) if segment]
+    # Wiersz bez etykiety nie mówi nic o wyciszeniu ani przeczytaniu
+    known = bool(segments)
+
+    def marked(pattern):
+        return any(pattern.fullmatch(segment) for segment in segments)
+
+    def state(is_set, determined):
+        return True if is_set else (False if determined else None)
+
+    path = features.get('path')
+    return {
+        'is_group': state((features.get('avatars') or 0) >= 2 or marked(GROUP_LABEL_RE), False),
+        'muted': state(marked(MUTED_LABEL_RE), known),
+        'unread': state(features.get('unread_indicator') or marked(UNREAD_LABEL_RE), known),
+        # Zarchiwizowane czaty widoczne są tylko w widoku archiwum
+        'archived': state('/archived' in (path or '') or marked(ARCHIVED_LABEL_RE), path is not None),
+    }
+
+
+def normalize_name(name):
+    """Usuwa zbędne białe znaki z nazwy czatu."""
+    return ' '.join(name.split())
+
+
+def parse_sender(aria_label):
+    """
+    Wyznacza nadawcę z aria-label wiersza wiadomości.
+
+    Format: "You sent 'text'" lub "Name said 'text'".
+    """
+    if 'You sent' in aria_label or 'You said' in aria_label:
+        return 'You'
+    if ' said ' in aria_label:
+        return aria_label.split(' said ')[0].strip()
+    if ' sent ' in aria_label:
+        return aria_label.split(' sent ')[0].strip()
+    return 'Unknown'
+
+
+def is_document_url(href):
+    """Sprawdza czy link prowadzi do dokumentu (po rozszerzeniu pliku)."""
+    return bool(href) and any(ext in href.lower() for ext in DOCUMENT_EXTENSIONS)
+
+
+def get_collection_flags(data_config):
+    """
+    Zwraca flagi ekstrakcji z sekcji data_to_collect.
+
+    Returns:
+        dict: include_reactions, include_timestamps, include_sender_info,
+              include_media, media_config
+    """
+    data_config = data_config or {}
+    messages_config = data_config.get('messages', {})
+    media_config = data_config.get('media', {})
+    return {
+        'include_reactions': messages_config.get('include_reactions', True),
+        'include_timestamps': messages_config.get('include_timestamps', True),
+        'include_sender_info': messages_config.get('include_sender_info', True),
+        'include_media': media_config.get('enabled', True),
+        'media_config': media_config
+    }
+
+
+def message_key(message):
+    """
+    Stabilny klucz wiadomości (niezależny od pozycji w oknie i czasu ekstrakcji).
+
+    Ta sama wiadomość pobrana w kolejnych przebiegach ma inny 'index'
+    i 'extracted_at', ale ten sam klucz - używany do deduplikacji.
+    """
+    media = message.get('media') or ()
+    parts = (
+        message.get('timestamp') or '',
+        message.get('sender') or '',
+        message.get('text') or '',
+        media[0].get('url', '') if media else '',
+    )
+    return hashlib.sha1("\x1f".join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def _epoch(value):
+    return calendar.timegm(value.timetuple())
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(value):
+    """datetime z ISO 8601 (None gdy niepoprawny) - extracted_at powtarza się w całej partii."""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _time_of_day(match, extracted):
+    hour, minute = int(match.group(1)) % 24, int(match.group(2))
+    if match.group(3):
+        hour = hour % 12 + (12 if match.group(3).lower() == 'pm' else 0)
+    return float(_epoch(extracted.replace(hour=hour, minute=minute, second=0, microsecond=0)))
+
+
+def parse_message_time(message):
+    """
+    Wyznacza czas wiadomości jako sekundy epoki (czas lokalny traktowany jak UTC).
+
+    Kolejno: pełna data w polu timestamp, sama godzina z timestamp
+    (z datą z extracted_at), w ostateczności extracted_at. Najczęstsze
+    formaty ("HH:MM" i ISO 8601) rozpoznawane są przed próbami strptime.
+
+    Returns:
+        float: Sekundy epoki lub NaN, gdy czasu nie da się ustalić
+    """
+    timestamp = (message.get('timestamp') or '').strip()
+    extracted_at = message.get('extracted_at')
+    extracted = _parse_iso(extracted_at) if extracted_at else None
+
+    if timestamp:
+        match = _TIME_ONLY_RE.fullmatch(timestamp)
+        if match:
+            if extracted is not None:
+                return _time_of_day(match, extracted)
+        else:
+            parsed = _parse_iso(timestamp)
+            if parsed is not None:
+                return float(_epoch(parsed))
+            for fmt in _DATETIME_FORMATS:
+                try:
+                    return float(_epoch(datetime.strptime(timestamp, fmt)))
+                except ValueError:
+                    continue
+            match = _TIME_RE.search(timestamp)
+            if match and extracted is not None:
+                return _time_of_day(match, extracted)
+
+    return float(_epoch(extracted)) if extracted is not None else float('nan')
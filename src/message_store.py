@@ -0,0 +1,573 @@
+"""
+Magazyn historii konwersacji: segmenty tylko do dopisywania z indeksem.
+
+Układ katalogu data/<konwersacja>/:
+    store.json                      - metadane (generacja, nazwa konwersacji, uporządkowanie)
+    segment_<gen>_<nr>.log          - rekordy [długość: 4 B big-endian][JSON wiadomości]
+    index_<gen>.idx                 - wpisy stałej długości (32 B) w kolejności rekordów:
+                                      klucz (8 B), segment, offset, długość, czas (epoch)
+
+Dopisanie wiadomości to zapis rekordu na końcu bieżącego segmentu i wpisu
+na końcu indeksu - bez przepisywania historii. Odczyty korzystają z mmap:
+wpis nr i leży pod offsetem i * 32 w indeksie, a treść wiadomości pod
+offsetem z wpisu w segmencie, więc "ostatnie 100 wiadomości" albo
+"wiadomości od daty X" (wyszukiwanie binarne po czasie we wpisach
+indeksu) nie wymaga parsowania reszty pliku.
+
+Kolejne przebiegi ekstrakcji zwracają w dużej części te same wiadomości,
+a wiadomość bez czasu (np. powtórzone "ok" tej samej osoby) ma ten sam
+message_key co jej wcześniejsze wystąpienie. Dopisywana partia jest więc
+wyrównywana do końca magazynu: część pokrywająca się z zapisanym ogonem
+jest pomijana, a powtórzenia wewnątrz partii zostają. Partia obejmująca
+cały magazyn i starszą historię (głębsze scrollowanie) zastępuje go nową
+generacją w kolejności partii. Gdy partia nie pokrywa się z ogonem,
+pomijane są tylko wystąpienia klucza ponad liczbę już zapisanych.
+
+Wiadomości dopisywane są w kolejności ekstrakcji. Jeśli nowa wiadomość
+jest starsza od już zapisanych (partia bez wyrównania),
+magazyn oznaczany jest jako nieuporządkowany - zapytania po czasie
+przeglądają wtedy wpisy indeksu liniowo, a kompakcja (src.compaction)
+przepisuje magazyn w kolejności czasu jako nową generację.
+
+Zatwierdzeniem zapisu jest wpis w indeksie - rekordy segmentu bez wpisu
+(przerwany zapis) są obcinane przy otwarciu magazynu.
+"""
+import bisect
+import glob
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import logging
+from collections import Counter
+from typing import NamedTuple
+
+from src.message_schema import message_key, parse_message_time
+
+logger = logging.getLogger(__name__)
+
+META_FILE = 'store.json'
+RECORD_HEADER = struct.Struct('>I')
+INDEX_ENTRY = struct.Struct('<8sIQId')
+
+DEFAULT_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class IndexEntry(NamedTuple):
+    """Wpis indeksu magazynu."""
+    key: str
+    segment: int
+    offset: int
+    length: int
+    time: float
+
+
+class _MappedFile:
+    """Plik tylko do odczytu przez mmap, mapowany ponownie gdy urósł."""
+
+    def __init__(self, path):
+        self.path = path
+        self._map = None
+        self._size = 0
+
+    def read(self, offset, length):
+        end = offset + length
+        if end > self._size:
+            self._remap()
+            if end > self._size:
+                raise ValueError(f"Odczyt poza końcem pliku {self.path} ({end} > {self._size})")
+        return self._map[offset:end]
+
+    def _remap(self):
+        self.close()
+        with open(self.path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._size = size
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+        self._size = 0
+
+
+def is_message_store(conv_dir):
+    """Sprawdza czy katalog konwersacji zawiera magazyn segmentów."""
+    return os.path.exists(os.path.join(conv_dir, META_FILE))
+
+
+def stored_count(conv_dir):
+    """
+    Liczba zatwierdzonych wiadomości magazynu z rozmiaru indeksu - bez otwierania
+    magazynu i bez wpisu we współdzielonym rejestrze get_message_store.
+
+    Returns:
+        int: Liczba wiadomości lub None, gdy katalog nie zawiera magazynu
+    """
+    try:
+        with open(os.path.join(conv_dir, META_FILE), 'r', encoding='utf-8') as f:
+            generation = json.load(f).get('generation', 0)
+    except (OSError, ValueError):
+        return None
+    try:
+        return os.path.getsize(os.path.join(conv_dir, f"index_{generation}.idx")) // INDEX_ENTRY.size
+    except OSError:
+        return 0
+
+
+class MessageStore:
+    """Historia jednej konwersacji w segmentach tylko do dopisywania."""
+
+    def __init__(self, conv_dir, segment_max_bytes=DEFAULT_SEGMENT_MAX_BYTES):
+        """
+        Args:
+            conv_dir: Katalog konwersacji (data/<konwersacja>/)
+            segment_max_bytes: Rozmiar, po którym zaczynany jest nowy segment
+        """
+        self.conv_dir = conv_dir
+        self.segment_max_bytes = segment_max_bytes
+        self._lock = threading.RLock()
+        self._meta_path = os.path.join(conv_dir, META_FILE)
+        self._meta = {'version': 1, 'generation': 0, 'conversation_name': None, 'ordered': True}
+        self._segments = {}
+        self._index = None
+        self._keys = None
+        self._key_counts = None
+        self._count = 0
+        self._last_time = -math.inf
+
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, 'r', encoding='utf-8') as f:
+                self._meta.update(json.load(f))
+        self._open_generation()
+
+    # ===== Pliki =====
+
+    @property
+    def lock(self):
+        """Blokada magazynu - dla operacji z wielu wywołań (np. kompakcja)."""
+        return self._lock
+
+    @property
+    def generation(self):
+        return self._meta['generation']
+
+    @property
+    def conversation_name(self):
+        return self._meta.get('conversation_name')
+
+    @property
+    def ordered(self):
+        """Czy wpisy są uporządkowane po czasie (wyszukiwanie binarne)."""
+        return self._meta.get('ordered', True)
+
+    def _index_path(self, generation=None):
+        return os.path.join(self.conv_dir, f"index_{self.generation if generation is None else generation}.idx")
+
+    def _segment_path(self, segment, generation=None):
+        generation = self.generation if generation is None else generation
+        return os.path.join(self.conv_dir, f"segment_{generation}_{segment:06d}.log")
+
+    def _save_meta(self):
+        os.makedirs(self.conv_dir, exist_ok=True)
+        with open(self._meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self._meta, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self._meta_path + '.tmp', self._meta_path)
+
+    def _open_generation(self):
+        """Otwiera indeks bieżącej generacji i obcina niezatwierdzone zapisy."""
+        self._close_maps()
+        self._keys = self._key_counts = None
+        index_path = self._index_path()
+        size = os.path.getsize(index_path) if os.path.exists(index_path) else 0
+        self._count = size // INDEX_ENTRY.size
+        if size % INDEX_ENTRY.size:
+            # Urwany ostatni wpis po awarii
+            with open(index_path, 'r+b') as f:
+                f.truncate(self._count * INDEX_ENTRY.size)
+        self._index = _MappedFile(index_path)
+
+        if self._count:
+            last = self.entry(self._count - 1)
+            self._segment, self._segment_size = last.segment, last.offset + RECORD_HEADER.size + last.length
+            self._last_time = last.time
+        else:
+            self._segment, self._segment_size = 0, 0
+
+        for path in glob.glob(os.path.join(glob.escape(self.conv_dir), f"segment_{self.generation}_*.log")):
+            segment = int(os.path.basename(path)[:-4].rsplit('_', 1)[1])
+            if segment > self._segment:
+                os.remove(path)
+            elif segment == self._segment and os.path.getsize(path) > self._segment_size:
+                logger.warning(f"⚠️ Obcinam niezatwierdzone rekordy w {path}")
+                with open(path, 'r+b') as f:
+                    f.truncate(self._segment_size)
+
+    def _close_maps(self):
+        for mapped in self._segments.values():
+            mapped.close()
+        self._segments = {}
+        if self._index is not None:
+            self._index.close()
+
+    def close(self):
+        """Zamyka mapowania plików."""
+        with self._lock:
+            self._close_maps()
+
+    # ===== Odczyt =====
+
+    def __len__(self):
+        return self._count
+
+    def entry(self, position):
+        """Wpis indeksu nr position (IndexEntry)."""
+        with self._lock:
+            if not 0 <= position < self._count:
+                raise IndexError(position)
+            key, segment, offset, length, moment = INDEX_ENTRY.unpack(
+                self._index.read(position * INDEX_ENTRY.size, INDEX_ENTRY.size))
+            return IndexEntry(key.hex(), segment, offset, length, moment)
+
+    def _read_record(self, entry):
+        mapped = self._segments.get(entry.segment)
+        if mapped is None:
+            mapped = self._segments[entry.segment] = _MappedFile(self._segment_path(entry.segment))
+        return json.loads(mapped.read(entry.offset + RECORD_HEADER.size, entry.length))
+
+    def read(self, position):
+        """Wiadomość nr position."""
+        with self._lock:
+            return self._read_record(self.entry(position))
+
+    def read_range(self, start, stop):
+        """Wiadomości z pozycji [start, stop) - odczytywane są tylko te rekordy."""
+        with self._lock:
+            start, stop = max(0, start), min(stop, self._count)
+            return [self._read_record(self.entry(position)) for position in range(start, stop)]
+
+    def tail(self, count):
+        """Ostatnie count wiadomości."""
+        with self._lock:
+            return self.read_range(self._count - count, self._count)
+
+    def iter_messages(self, start=0):
+        """Iteruje po wiadomościach od pozycji start (w kolejności zapisu)."""
+        position = start
+        while position < self._count:
+            with self._lock:
+                batch = self.read_range(position, position + 256)
+            yield from batch
+            position += len(batch)
+
+    def carried_offset(self, generation):
+        """
+        Pozycja, od której bieżąca generacja zawiera wiadomości generacji generation.
+
+        Returns:
+            int: Przesunięcie (0 dla bieżącej) lub None, gdy generacja została
+                przepisana bez zachowania kolejności (kompakcja)
+        """
+        if generation == self.generation:
+            return 0
+        return self._meta.get('carried', {}).get(str(generation))
+
+    def index_bytes(self):
+        """Zatwierdzone wpisy indeksu (INDEX_ENTRY) jako bajty - do odczytu kolumnowego."""
+        with self._lock:
+            return self._index.read(0, self._count * INDEX_ENTRY.size) if self._count else b''
+
+    def bisect_time(self, moment):
+        """
+        Pierwsza pozycja z czasem >= moment (magazyn uporządkowany).
+
+        Raises:
+            ValueError: Gdy magazyn jest nieuporządkowany
+        """
+        with self._lock:
+            if not self.ordered:
+                raise ValueError("Magazyn nieuporządkowany - wymagana kompakcja")
+            times = _TimeView(self)
+            return bisect.bisect_left(times, moment)
+
+    def positions_between(self, after=None, before=None):
+        """
+        Pozycje wiadomości z czasem w [after, before).
+
+        Returns:
+            range lub list: Zakres pozycji (lista, gdy magazyn nieuporządkowany)
+        """
+        with self._lock:
+            if self.ordered:
+                start = self.bisect_time(after) if after is not None else 0
+                stop = self.bisect_time(before) if before is not None else self._count
+                return range(start, max(start, stop))
+            low = -math.inf if after is None else after
+            high = math.inf if before is None else before
+            data = self._index.read(0, self._count * INDEX_ENTRY.size) if self._count else b''
+            return [
+                position for position, (_, _, _, _, moment) in enumerate(INDEX_ENTRY.iter_unpack(data))
+                if low <= moment < high
+            ]
+
+    def since(self, moment, limit=None):
+        """Wiadomości z czasem >= moment (najwyżej limit najstarszych)."""
+        positions = self.positions_between(after=moment)
+        if limit is not None:
+            positions = positions[:limit]
+        with self._lock:
+            return [self.read(position) for position in positions]
+
+    def _load_keys(self):
+        if self._keys is None:
+            data = self._index.read(0, self._count * INDEX_ENTRY.size) if self._count else b''
+            self._keys, self._key_counts = {}, Counter()
+            for position, entry in enumerate(INDEX_ENTRY.iter_unpack(data)):
+                self._keys.setdefault(entry[0], position)
+                self._key_counts[entry[0]] += 1
+        return self._keys
+
+    def _tail_keys(self, count):
+        """Klucze (bajty) ostatnich count wpisów indeksu."""
+        start = max(0, self._count - count)
+        if start == self._count:
+            return []
+        data = self._index.read(start * INDEX_ENTRY.size, (self._count - start) * INDEX_ENTRY.size)
+        return [entry[0] for entry in INDEX_ENTRY.iter_unpack(data)]
+
+    def __contains__(self, key):
+        with self._lock:
+            return bytes.fromhex(key) in self._load_keys()
+
+    def get(self, key):
+        """Wiadomość o kluczu message_key (None gdy brak)."""
+        with self._lock:
+            position = self._load_keys().get(bytes.fromhex(key))
+            return None if position is None else self.read(position)
+
+    # ===== Zapis =====
+
+    def append(self, messages, conversation_name=None):
+        """
+        Dopisuje nowe wiadomości (część pokrywająca się z zapisaną historią jest pomijana).
+
+        Args:
+            messages: Wiadomości w kolejności ekstrakcji
+            conversation_name: Nazwa konwersacji (zapisywana w metadanych)
+
+        Returns:
+            int: Liczba dopisanych wiadomości
+        """
+        with self._lock:
+            meta_changed = not os.path.exists(self._meta_path)
+            if conversation_name and conversation_name != self.conversation_name:
+                self._meta['conversation_name'] = conversation_name
+                meta_changed = True
+
+            older, newer = self._new_messages(messages)
+            if older:
+                # Partia obejmuje cały magazyn i starszą historię - nowa generacja w kolejności partii
+                current = list(self.iter_messages())
+                self.rewrite([message for _, message in older] + current + [message for _, message in newer],
+                             carried=len(older))
+                return len(older) + len(newer)
+
+            was_ordered = self.ordered
+            added = self._append(newer)
+            if meta_changed or self.ordered != was_ordered:
+                self._save_meta()
+            return added
+
+    def _new_messages(self, messages):
+        """
+        Wiadomości partii, których nie ma jeszcze w magazynie.
+
+        Partia wyrównywana jest do ogona magazynu: szukany jest najdłuższy
+        fragment partii równy ostatnim zapisanym wiadomościom, który zaczyna
+        partię albo obejmuje cały magazyn (przy remisie - najwcześniejszy).
+        Nowe są wiadomości za tym fragmentem oraz - gdy partia obejmuje cały
+        magazyn - wiadomości przed nim (starsza historia). Bez wyrównania
+        wystąpienie klucza jest nowe tylko ponad liczbę jego wystąpień
+        w magazynie.
+
+        Returns:
+            tuple: (starsze, nowsze) - listy (klucz, wiadomość)
+        """
+        batch = [(bytes.fromhex(message_key(message)), message) for message in messages]
+        if not self._count or not batch:
+            return [], batch
+
+        tail = self._tail_keys(len(batch))
+        best_length, best_end = 0, None
+        for end in range(1, len(batch) + 1):
+            if batch[end - 1][0] != tail[-1]:
+                continue
+            length = 0
+            while length < end and length < len(tail) and batch[end - 1 - length][0] == tail[-1 - length]:
+                length += 1
+            if (end == length or length == self._count) and length > best_length:
+                best_length, best_end = length, end
+
+        if best_end is not None:
+            return batch[:best_end - best_length], batch[best_end:]
+
+        self._load_keys()
+        seen = Counter()
+        fresh = []
+        for key, message in batch:
+            seen[key] += 1
+            if seen[key] > self._key_counts[key]:
+                fresh.append((key, message))
+        return [], fresh
+
+    def _append(self, items):
+        keys = self._load_keys()
+        entries = []
+        segment_file = None
+        try:
+            for key, message in items:
+                payload = json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                record_size = RECORD_HEADER.size + len(payload)
+
+                if self._segment_size and self._segment_size + record_size > self.segment_max_bytes:
+                    segment_file = self._finish_segment(segment_file)
+                    self._segment, self._segment_size = self._segment + 1, 0
+                if segment_file is None:
+                    os.makedirs(self.conv_dir, exist_ok=True)
+                    segment_file = open(self._segment_path(self._segment), 'ab')
+
+                segment_file.write(RECORD_HEADER.pack(len(payload)))
+                segment_file.write(payload)
+
+                # Wiadomość bez czasu dostaje czas poprzedniej (zachowuje kolejność)
+                moment = parse_message_time(message)
+                if math.isnan(moment):
+                    moment = self._last_time if self._last_time > -math.inf else 0.0
+                if moment < self._last_time:
+                    self._meta['ordered'] = False
+                self._last_time = max(self._last_time, moment)
+
+                entries.append(INDEX_ENTRY.pack(key, self._segment, self._segment_size, len(payload), moment))
+                keys.setdefault(key, self._count + len(entries) - 1)
+                self._key_counts[key] += 1
+                self._segment_size += record_size
+        finally:
+            self._finish_segment(segment_file)
+
+        if entries:
+            # Wpisy indeksu zatwierdzają rekordy zapisane w segmencie
+            with open(self._index_path(), 'ab') as f:
+                f.write(b''.join(entries))
+                f.flush()
+                os.fsync(f.fileno())
+            self._count += len(entries)
+        return len(entries)
+
+    @staticmethod
+    def _finish_segment(segment_file):
+        if segment_file is not None:
+            segment_file.flush()
+            os.fsync(segment_file.fileno())
+            segment_file.close()
+        return None
+
+    def rewrite(self, messages, conversation_name=None, carried=None):
+        """
+        Zastępuje zawartość magazynu wiadomościami w podanej kolejności.
+
+        Nowa generacja zapisywana jest obok bieżącej i zatwierdzana podmianą
+        store.json; pliki poprzedniej generacji usuwane są dopiero potem.
+
+        Args:
+            messages: Wiadomości (np. posortowane po czasie przez kompakcję)
+            conversation_name: Nazwa konwersacji
+            carried: Pozycja, od której nowa generacja zawiera całą bieżącą
+                w niezmienionej kolejności (None = kolejność niezachowana)
+
+        Returns:
+            int: Liczba wiadomości w nowej generacji
+        """
+        with self._lock:
+            previous_meta = self._meta
+            new_generation = previous_meta['generation'] + 1
+            for path in self._generation_files(new_generation):
+                os.remove(path)  # pozostałości przerwanej kompakcji
+
+            self._close_maps()
+            # Przesunięcia wcześniejszych generacji - pozycje zapamiętane przez czytelników
+            # (np. znacznik eksportu przyrostowego) pozostają ważne po przepisaniu
+            lineage = {}
+            if carried is not None:
+                lineage = {generation: offset + carried
+                           for generation, offset in previous_meta.get('carried', {}).items()}
+                lineage[str(previous_meta['generation'])] = carried
+            self._meta = dict(previous_meta, generation=new_generation, ordered=True, carried=lineage,
+                              conversation_name=conversation_name or previous_meta.get('conversation_name'))
+            self._index = _MappedFile(self._index_path())
+            self._keys, self._key_counts, self._count = {}, Counter(), 0
+            self._segment, self._segment_size, self._last_time = 0, 0, -math.inf
+            try:
+                added = self._append((bytes.fromhex(message_key(message)), message) for message in messages)
+            except BaseException:
+                self._close_maps()
+                for path in self._generation_files(new_generation):
+                    os.remove(path)
+                self._meta = previous_meta
+                self._open_generation()
+                raise
+
+            self._save_meta()
+            for path in self._generation_files(previous_meta['generation']):
+                os.remove(path)
+            self._open_generation()
+            return added
+
+    def _generation_files(self, generation):
+        pattern = os.path.join(glob.escape(self.conv_dir), f"segment_{generation}_*.log")
+        files = glob.glob(pattern)
+        if os.path.exists(self._index_path(generation)):
+            files.append(self._index_path(generation))
+        return files
+
+    def get_stats(self):
+        """Zwraca statystyki magazynu."""
+        with self._lock:
+            return {
+                'messages': self._count,
+                'segments': self._segment + 1 if self._count else 0,
+                'generation': self.generation,
+                'ordered': self.ordered
+            }
+
+
+class _TimeView:
+    """Sekwencja czasów wpisów indeksu (dla bisect, bez kopiowania indeksu)."""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __len__(self):
+        return len(self._store)
+
+    def __getitem__(self, position):
+        return self._store.entry(position).time
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_message_store(conv_dir, segment_max_bytes=None):
+    """Zwraca współdzielony magazyn konwersacji (jeden na katalog w procesie)."""
+    key = os.path.abspath(conv_dir)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = MessageStore(conv_dir, segment_max_bytes or DEFAULT_SEGMENT_MAX_BYTES)
+        return store
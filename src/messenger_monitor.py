@@ -12,6 +12,20 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from src import utils
 from src.debug_logger import DebugLogger
+from src import metrics
+from src.message_schema import (
+    CHAT_SELECTORS, CHAT_NAME_SELECTOR, MESSAGE_CONTAINER_SELECTORS, MESSAGE_SELECTORS,
+    TIMESTAMP_SELECTOR, REACTION_SELECTORS, UNREAD_SELECTORS, UNREAD_INDICATOR_SELECTOR, DEFAULT_MEDIA_TYPES,
+    is_chat_url, normalize_name, parse_sender, is_document_url, get_collection_flags, message_key,
+    classify_sidebar_row
+)
+from src.extraction_checkpoint import ExtractionCheckpoint, conversation_id
+from src.extraction_queue import ExtractionBudget, ExtractionQueue
+from src.sidebar_filter import SidebarFilter, stored_message_count
+from src.driver_profiler import phase, count_messages
+from src.rate_limiter import get_rate_limiter, throttle
+from src.scheduler import ActiveWindow
+from src.driver_lease import DriverLeaseManager, PRIORITY_MONITOR, PRIORITY_EXTRACTION
 from config import settings
 import logging
 import re
@@ -56,39 +70,52 @@ def sanitize_folder_name(name):
 
 
 class MessengerMonitor:
-    def __init__(self, driver, config=None):
+    def __init__(self, driver, config=None, lease_manager=None, home_url=None, event_broadcaster=None):
         self.driver = driver
         self.config = config if config else settings.config
         self.last_message_count = 0
         self.debug_logger = DebugLogger()
+        self.rate_limiter = get_rate_limiter(self.config)
+
+        # Dostęp do przeglądarki wyłącznie przez dzierżawy - menedżer współdzielony
+        # z innymi komponentami (API, harmonogram) używającymi tej samej sesji
+        self.lease_manager = lease_manager or DriverLeaseManager(driver)
+        self.home_url = home_url or settings.MESSAGES_URL
+
+        # Opcjonalny rozgłaszacz zdarzeń (strumień SSE/WebSocket w API)
+        self.event_broadcaster = event_broadcaster
+        self._unread_urls = set()
+        self._last_poll_at = None
+        self.active_window = ActiveWindow.from_config(self.config)
+        self._config_snapshot = None
+        self.sidebar_stats = {}
+        self._sidebar_urls = frozenset()
 
         # Loguj konfigurację monitorowania
         logger.info(f"Monitor zainicjalizowany - tryb: {self.config.get_mode()}, zakres: {self.config.get_scope()}")
 
+    @phase("conversation_list")
     def get_all_conversations(self):
         """
         Pobiera listę widocznych konwersacji z Messengera (bez scrollowania).
         Filtruje konwersacje zgodnie z konfiguracją (scope i specific_conversations).
         """
+        with self.lease_manager.lease("sidebar", PRIORITY_EXTRACTION):
+            return self._get_all_conversations()
+
+    def _get_all_conversations(self):
+        """Pobiera i filtruje listę konwersacji (wymaga dzierżawy przeglądarki)."""
         try:
             conversations = []
             seen_urls = set()
 
             # Różne selektory dla elementów czatów (Facebook często zmienia interfejs)
-            chat_selectors = [
-                # Selektor dla kontenera z czatami
-                "div[role='navigation'] div[role='grid'] div[role='gridcell']",
-                "div[role='navigation'] a[role='link']",
-                "div[aria-label*='Czat']",
-                "div[aria-label*='Conversation']",
-                # Fallback - ogólny selektor dla linków czatów
-                "a[href*='/t/']",
-            ]
+            chat_selectors = CHAT_SELECTORS
 
             logger.info(f"📋 Pobieranie widocznych czatów...")
 
             # Zbierz aktualnie widoczne czaty
-            for selector in chat_selectors:
+            for selector_index, selector in enumerate(chat_selectors):
                 try:
                     chat_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
 
@@ -120,7 +147,7 @@ class MessengerMonitor:
                                             chat_url = link_elements[0].get_attribute("href")
 
                                     # Sprawdź czy to prawdziwy URL czatu
-                                    if chat_url and ('/t/' in chat_url or '/e2ee/' in chat_url):
+                                    if is_chat_url(chat_url):
                                         url_display = chat_url if len(chat_url) <= 60 else chat_url[:57] + "..."
                                         logger.debug(f"      ✅ URL: {url_display}")
                                     else:
@@ -139,7 +166,7 @@ class MessengerMonitor:
                                 # Użyj find_elements zamiast find_element (bez timeoutu!)
                                 try:
                                     logger.debug(f"      🔍 Szukam nazwy czatu (span[dir='auto'])...")
-                                    name_elements = element.find_elements(By.CSS_SELECTOR, "span[dir='auto']")
+                                    name_elements = element.find_elements(By.CSS_SELECTOR, CHAT_NAME_SELECTOR)
                                     if name_elements:
                                         chat_name = name_elements[0].text.strip()
                                         logger.debug(f"      ✅ Znaleziono nazwę: '{chat_name}'")
@@ -172,7 +199,7 @@ class MessengerMonitor:
                                 # Dodaj do listy jeśli mamy nazwę i URL
                                 if chat_name and len(chat_name) > 0 and chat_url:
                                     # Usuń zbędne białe znaki
-                                    chat_name = ' '.join(chat_name.split())
+                                    chat_name = normalize_name(chat_name)
 
                                     # Użyj URL jako klucza unikalności
                                     if chat_url not in seen_urls:
@@ -197,12 +224,17 @@ class MessengerMonitor:
                         # Jeśli znaleźliśmy czaty, przerwij pętlę selektorów
                         if conversations:
                             logger.info(f"   ✅ Zebrano {len(conversations)} unikalnych czatów")
+                            if selector_index > 0:
+                                metrics.SELECTOR_FALLBACKS.labels("conversation_list").inc()
                             break
 
                 except Exception as e:
                     logger.warning(f"   ⚠️ Błąd dla selektora '{selector}': {e}")
                     continue
 
+            # Klasyfikacja wierszy (grupa, wyciszony, nieprzeczytany, archiwum) - dla filtrów
+            self._classify_sidebar_rows(conversations)
+
             # Filtruj według konfiguracji
             filtered_conversations = self._filter_conversations_by_config(conversations)
 
@@ -211,13 +243,57 @@ class MessengerMonitor:
 
         except Exception as e:
             logger.error(f"Błąd podczas pobierania listy konwersacji: {e}")
-            if self.config.should_screenshot_on_error():
+            metrics.ERRORS.labels("conversation_list").inc()
+            if self.config.snapshot.screenshot_on_error:
                 self.debug_logger.save_error_snapshot(self.driver, e)
             return []
 
+    def _classify_sidebar_rows(self, conversations):
+        """
+        Uzupełnia konwersacje o pola is_group, muted, unread i archived.
+
+        Jedno wywołanie execute_script zbiera cechy wszystkich wierszy listy
+        czatów. Gdy się nie powiedzie, pola pozostają puste - filtry nie
+        odrzucają wtedy żadnej konwersacji.
+
+        Args:
+            conversations: Konwersacje z listy czatów (z polem 'element')
+        """
+        rows = [conv for conv in conversations if conv.get('element') is not None]
+        if not rows:
+            return
+
+        script = """
+            var unreadSelector = arguments[0];
+            return Array.from(arguments).slice(1).map(function (el) {
+                var row = el.closest("[role='gridcell'], [role='row'], li") || el;
+                return {
+                    label: row.getAttribute('aria-label') || '',
+                    unread_indicator: !!row.querySelector(unreadSelector),
+                    avatars: row.querySelectorAll('svg image').length,
+                    path: window.location.pathname
+                };
+            });
+        """
+        try:
+            features = self.driver.execute_script(
+                script, UNREAD_INDICATOR_SELECTOR, *[conv['element'] for conv in rows]
+            ) or []
+        except Exception as e:
+            logger.debug(f"Nie udało się sklasyfikować listy czatów: {e}")
+            return
+
+        for conv, row_features in zip(rows, features):
+            if row_features:
+                conv.update(classify_sidebar_row(conv.get('name'), row_features))
+
     def _filter_conversations_by_config(self, conversations):
         """
-        Filtruje konwersacje zgodnie z konfiguracją (scope i specific_conversations).
+        Filtruje konwersacje zgodnie z konfiguracją (scope, specific_conversations i filters).
+
+        Odrzucone konwersacje nie są otwierane - liczba pominiętych otwarć
+        trafia do self.sidebar_stats, a URL-e pozostałych do self._sidebar_urls
+        (rozpoznanie listy przekazanej później do ekstrakcji).
 
         Args:
             conversations: Lista wszystkich znalezionych konwersacji
@@ -225,52 +301,63 @@ class MessengerMonitor:
         Returns:
             Lista przefiltrowanych konwersacji
         """
+        rows = len(conversations)
+        conversations = self._filter_conversations_by_scope(conversations)
+
+        sidebar_filter = SidebarFilter.from_config(self.config, message_count=self._stored_message_count)
+        filtered, stats = sidebar_filter.apply(conversations)
+        stats['rows'] = rows
+        stats['opens_avoided'] = rows - len(filtered)
+        stats['excluded']['scope'] += rows - len(conversations)
+        self.sidebar_stats = stats
+        self._sidebar_urls = frozenset(conv.get('url') for conv in filtered)
+
+        for reason, count in stats['excluded'].items():
+            if count:
+                metrics.CONVERSATIONS_FILTERED.labels(reason).inc(count)
+        if stats['opens_avoided']:
+            excluded = ", ".join(f"{reason}: {count}" for reason, count in stats['excluded'].items() if count)
+            logger.info(f"   🚫 Pominięto {stats['opens_avoided']}/{rows} konwersacji przed otwarciem ({excluded})")
+        return filtered
+
+    def _stored_message_count(self, conv):
+        """Liczba zapisanych wiadomości konwersacji (filtr min_message_count)."""
+        source_dir = self.config.get_export_settings().get('source_dir') or 'data'
+        return stored_message_count(os.path.join(source_dir, sanitize_folder_name(conv.get('name'))))
+
+    def _filter_conversations_by_scope(self, conversations):
+        """
+        Filtruje konwersacje według scope: specific (specific_conversations).
+
+        Zakresy groups i private stosuje SidebarFilter na podstawie klasyfikacji wierszy.
+        """
         scope = self.config.get_scope()
 
-        # Jeśli scope = "all", zwróć wszystkie
-        if scope == 'all':
-            logger.info(f"   Scope: all - zwracam wszystkie {len(conversations)} konwersacji")
+        if scope != 'specific':
+            logger.info(f"   Scope: {scope} - {len(conversations)} konwersacji przed filtrami")
             return conversations
 
-        # Jeśli scope = "specific", filtruj według specific_conversations
-        if scope == 'specific':
-            specific_convs = self.config.get_specific_conversations()
-
-            if not specific_convs:
-                logger.warning("   Scope: specific, ale brak specific_conversations w konfiguracji")
-                return conversations
+        # Filtruj według specific_conversations
+        matcher = self.config.snapshot.conversation_matcher
 
-            # Pobierz nazwy włączonych konwersacji z konfiguracji
-            enabled_names = []
-            for conv_config in specific_convs:
-                if conv_config.get('enabled', True):  # domyślnie enabled=True
-                    enabled_names.append(conv_config.get('name', '').strip())
+        if not len(matcher):
+            logger.warning("   Scope: specific, ale brak specific_conversations w konfiguracji")
+            return conversations
 
-            logger.info(f"   Scope: specific - filtruję według {len(enabled_names)} nazw z konfiguracji")
-            logger.info(f"   Szukane konwersacje: {enabled_names}")
+        logger.info(f"   Scope: specific - filtruję według {len(matcher)} wpisów z konfiguracji "
+                    f"(dopasowanie: {matcher.mode})")
 
-            # Filtruj konwersacje które pasują do nazw z konfiguracji
-            filtered = []
-            for conv in conversations:
-                conv_name = conv.get('name', '').strip()
-                # Dopasowanie: sprawdź czy nazwa z konfiguracji zawiera się w nazwie czatu
-                # lub odwrotnie (dla elastyczności)
-                for enabled_name in enabled_names:
-                    if enabled_name.lower() in conv_name.lower() or conv_name.lower() in enabled_name.lower():
-                        filtered.append(conv)
-                        logger.info(f"   ✅ Dopasowano: '{conv_name}' do config: '{enabled_name}'")
-                        break
+        result = matcher.filter(conversations)
+        for conv in result.matched:
+            logger.info(f"   ✅ Dopasowano: '{conv.get('name')}' do config: '{conv['rule']}'")
+        for problem in result.ambiguous:
+            logger.warning(f"   ⚠️ Niejednoznaczne dopasowanie: {problem}")
 
-            if not filtered:
-                logger.warning(f"   ⚠️ Nie znaleziono żadnych konwersacji pasujących do konfiguracji")
-                logger.info(f"   Dostępne konwersacje: {[c['name'] for c in conversations[:10]]}")
+        if not result.matched:
+            logger.warning(f"   ⚠️ Nie znaleziono żadnych konwersacji pasujących do konfiguracji")
+            logger.info(f"   Dostępne konwersacje: {[c['name'] for c in conversations[:10]]}")
 
-            return filtered
-
-        # Jeśli scope = "groups" lub inne, na razie zwróć wszystkie
-        # (można później dodać rozróżnienie groups vs individual)
-        logger.info(f"   Scope: {scope} - zwracam wszystkie {len(conversations)} konwersacji")
-        return conversations
+        return list(result.matched)
 
     def list_all_conversations(self):
         """Wyświetla w logach listę wszystkich dostępnych czatów."""
@@ -303,7 +390,7 @@ class MessengerMonitor:
         logger.info(f"{'='*70}\n")
 
         # Zapisz snapshot z listą czatów (jeśli debugging włączony)
-        if self.config.should_save_screenshots():
+        if self.config.snapshot.save_screenshots:
             additional_info = f"Znaleziono {len(conversations)} czatów:\n"
             for i, conv in enumerate(conversations[:10], 1):  # Pokaż pierwsze 10
                 additional_info += f"{i}. {conv.get('name', 'Nieznana nazwa')}\n"
@@ -434,6 +521,7 @@ class MessengerMonitor:
             print(f"❌ Błąd podczas zapisywania czatów do plików: {e}")
             return None
 
+    @phase("open_conversation")
     def open_conversation(self, conversation_url, wait_time=3):
         """
         Otwiera konkretną konwersację używając URL.
@@ -451,7 +539,10 @@ class MessengerMonitor:
                 return False
 
             logger.info(f"🔗 Otwieranie konwersacji: {conversation_url}")
+            throttle("navigation")
+            open_started = time.perf_counter()
             self.driver.get(conversation_url)
+            metrics.CONVERSATION_OPEN_SECONDS.observe(time.perf_counter() - open_started)
             time.sleep(wait_time)
 
             # Sprawdź czy udało się otworzyć konwersację
@@ -465,17 +556,25 @@ class MessengerMonitor:
 
         except Exception as e:
             logger.error(f"❌ Błąd podczas otwierania konwersacji: {e}")
-            if self.config.should_screenshot_on_error():
+            metrics.ERRORS.labels("open_conversation").inc()
+            if self.config.snapshot.screenshot_on_error:
                 self.debug_logger.save_error_snapshot(self.driver, e)
             return False
 
-    def scroll_and_load_messages(self, max_scrolls=50, scroll_pause=2.0):
+    @phase("scroll")
+    def scroll_and_load_messages(self, max_scrolls=50, scroll_pause=2.0, cancel_event=None,
+                                 start_scroll=0, on_progress=None, progress_every=10):
         """
         Scrolluje konwersację w górę aby załadować starsze wiadomości.
 
         Args:
             max_scrolls: Maksymalna liczba przewinięć
             scroll_pause: Pauza między przewinięciami (w sekundach)
+            cancel_event: threading.Event - ustawienie przerywa scrollowanie
+            start_scroll: Liczba scrolli wykonanych przed przerwaniem (wznowienie) -
+                tę część historii przewijamy z krótszą pauzą i bez wykrywania końca
+            on_progress: Funkcja wywoływana z liczbą wykonanych scrolli co progress_every scrolli
+            progress_every: Co ile scrolli wywoływać on_progress
 
         Returns:
             bool: True jeśli scrollowanie zakończyło się pomyślnie
@@ -484,19 +583,17 @@ class MessengerMonitor:
             logger.info(f"📜 Rozpoczynam scrollowanie wiadomości (max {max_scrolls} scrolli)...")
 
             # Znajdź kontener z wiadomościami
-            message_container_selectors = [
-                "div[role='main']",
-                "div[aria-label='Messages']",
-                "div[aria-label='Wiadomości']",
-            ]
+            message_container_selectors = MESSAGE_CONTAINER_SELECTORS
 
             message_container = None
-            for selector in message_container_selectors:
+            for selector_index, selector in enumerate(message_container_selectors):
                 try:
                     containers = self.driver.find_elements(By.CSS_SELECTOR, selector)
                     if containers:
                         message_container = containers[0]
                         logger.debug(f"Znaleziono kontener wiadomości: {selector}")
+                        if selector_index > 0:
+                            metrics.SELECTOR_FALLBACKS.labels("message_container").inc()
                         break
                 except:
                     continue
@@ -504,7 +601,20 @@ class MessengerMonitor:
             previous_height = 0
             no_change_count = 0
 
+            if start_scroll:
+                logger.info(f"   ⏩ Wznowienie - szybkie przewinięcie {start_scroll} scrolli pobranych wcześniej")
+
             for scroll_num in range(max_scrolls):
+                catching_up = scroll_num < start_scroll
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info("⏹️ Scrollowanie przerwane (anulowano zadanie)")
+                    if on_progress and scroll_num > start_scroll:
+                        on_progress(scroll_num)
+                    break
+
+                if on_progress and not catching_up and scroll_num > start_scroll and scroll_num % progress_every == 0:
+                    on_progress(scroll_num)
+
                 try:
                     # Scrolluj do góry kontenera
                     if message_container:
@@ -516,21 +626,26 @@ class MessengerMonitor:
                         logger.info(f"   📜 Scroll {scroll_num + 1}/{max_scrolls}: pozycja przed={current_scroll}")
 
                         # Scrolluj do samej góry
+                        throttle("scroll")
+                        step_started = time.perf_counter()
                         self.driver.execute_script(
                             "arguments[0].scrollTop = 0",
                             message_container
                         )
 
-                        time.sleep(scroll_pause)
+                        time.sleep(scroll_pause / 2 if catching_up else scroll_pause)
 
                         new_scroll = self.driver.execute_script(
                             "return arguments[0].scrollTop",
                             message_container
                         )
+                        metrics.SCROLL_STEP_SECONDS.observe(time.perf_counter() - step_started)
 
                         logger.info(f"      ➜ pozycja po={new_scroll}")
 
                         # Sprawdź czy pozycja się zmieniła
+                        if catching_up:
+                            continue
                         if current_scroll == new_scroll or new_scroll == 0:
                             no_change_count += 1
                             logger.info(f"      ⚠️ Brak zmiany pozycji (próba {no_change_count}/3)")
@@ -550,10 +665,12 @@ class MessengerMonitor:
 
         except Exception as e:
             logger.error(f"❌ Błąd podczas scrollowania wiadomości: {e}")
-            if self.config.should_screenshot_on_error():
+            metrics.ERRORS.labels("scroll").inc()
+            if self.config.snapshot.screenshot_on_error:
                 self.debug_logger.save_error_snapshot(self.driver, e)
             return False
 
+    @phase("extract_messages")
     def extract_messages_from_conversation(self):
         """
         Ekstraktuje wiadomości z aktualnie otwartej konwersacji.
@@ -566,35 +683,31 @@ class MessengerMonitor:
             logger.info("📥 Ekstraktuję wiadomości z konwersacji...")
 
             # Sprawdź co powinno być pobierane z konfiguracji
-            data_config = self.config.get('data_to_collect', {})
-            messages_config = data_config.get('messages', {})
-            media_config = data_config.get('media', {})
-            metadata_config = data_config.get('metadata', {})
+            flags = get_collection_flags(self.config.snapshot.data_to_collect)
+            media_config = flags['media_config']
 
-            include_reactions = messages_config.get('include_reactions', True)
-            include_timestamps = messages_config.get('include_timestamps', True)
-            include_sender_info = messages_config.get('include_sender_info', True)
-            include_media = media_config.get('enabled', True)
+            include_reactions = flags['include_reactions']
+            include_timestamps = flags['include_timestamps']
+            include_sender_info = flags['include_sender_info']
+            include_media = flags['include_media']
 
             logger.info(f"   Konfiguracja: reactions={include_reactions}, timestamps={include_timestamps}, sender={include_sender_info}, media={include_media}")
 
             messages = []
 
             # Różne selektory dla wiadomości
-            message_selectors = [
-                "div[role='row']",
-                "div[data-scope='messages_table']",
-                "div[aria-label*='You sent']",
-                "div[aria-label*='said']",
-            ]
+            message_selectors = MESSAGE_SELECTORS
 
+            harvest_started = time.perf_counter()
             message_elements = []
-            for selector in message_selectors:
+            for selector_index, selector in enumerate(message_selectors):
                 try:
                     elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                     if elements:
                         message_elements = elements
                         logger.debug(f"Znaleziono {len(elements)} elementów wiadomości dla selektora: {selector}")
+                        if selector_index > 0:
+                            metrics.SELECTOR_FALLBACKS.labels("message_rows").inc()
                         break
                 except:
                     continue
@@ -635,7 +748,7 @@ class MessengerMonitor:
                         logger.info(f"      🕐 Szukam timestamp...")
                         timestamp_element = None
                         try:
-                            timestamp_element = element.find_element(By.CSS_SELECTOR, "span[aria-label*=':']")
+                            timestamp_element = element.find_element(By.CSS_SELECTOR, TIMESTAMP_SELECTOR)
                         except:
                             pass
 
@@ -652,14 +765,7 @@ class MessengerMonitor:
                         message_data['aria_label'] = aria_label
                         # Spróbuj wyekstraktować nadawcę z aria-label
                         # Format: "You sent 'text'" lub "Name said 'text'"
-                        if 'You sent' in aria_label or 'You said' in aria_label:
-                            message_data['sender'] = 'You'
-                        elif ' said ' in aria_label or ' sent ' in aria_label:
-                            # Spróbuj wyodrębnić nazwę
-                            sender_match = aria_label.split(' said ')[0] if ' said ' in aria_label else aria_label.split(' sent ')[0]
-                            message_data['sender'] = sender_match.strip()
-                        else:
-                            message_data['sender'] = 'Unknown'
+                        message_data['sender'] = parse_sender(aria_label)
                         logger.info(f"      ✅ Sender: {message_data.get('sender')}")
 
                     # Pobierz media jeśli włączone
@@ -693,12 +799,18 @@ class MessengerMonitor:
                     logger.debug(f"Błąd podczas przetwarzania wiadomości {idx}: {e}")
                     continue
 
+            harvest_seconds = time.perf_counter() - harvest_started
+            if harvest_seconds > 0:
+                metrics.ROWS_HARVESTED_PER_SECOND.observe(len(message_elements) / harvest_seconds)
+
+            count_messages(len(messages))
             logger.info(f"✅ Wyekstraktowano {len(messages)} wiadomości")
             return messages
 
         except Exception as e:
             logger.error(f"❌ Błąd podczas ekstraktowania wiadomości: {e}")
-            if self.config.should_screenshot_on_error():
+            metrics.ERRORS.labels("extract_messages").inc()
+            if self.config.snapshot.screenshot_on_error:
                 self.debug_logger.save_error_snapshot(self.driver, e)
             return []
 
@@ -715,7 +827,7 @@ class MessengerMonitor:
         """
         try:
             media_items = []
-            media_types = media_config.get('types', ['images', 'videos', 'audio', 'documents'])
+            media_types = media_config.get('types', DEFAULT_MEDIA_TYPES)
 
             # Szukaj obrazków
             if 'images' in media_types:
@@ -768,7 +880,7 @@ class MessengerMonitor:
                         href = link.get_attribute("href")
                         text = link.text.strip()
                         # Sprawdź czy to link do dokumentu (zawiera rozszerzenie pliku)
-                        if href and any(ext in href.lower() for ext in ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.zip', '.rar']):
+                        if is_document_url(href):
                             media_items.append({
                                 'type': 'document',
                                 'url': href,
@@ -797,12 +909,7 @@ class MessengerMonitor:
             reactions = []
 
             # Szukaj reakcji - różne selektory dla różnych wersji Messengera
-            reaction_selectors = [
-                "div[aria-label*='reaction']",
-                "span[aria-label*='reaction']",
-                "img[alt*='reaction']",
-                "[data-reaction]"
-            ]
+            reaction_selectors = REACTION_SELECTORS
 
             for selector in reaction_selectors:
                 try:
@@ -829,13 +936,18 @@ class MessengerMonitor:
         """
         Zapisuje wiadomości do folderu konwersacji.
 
+        Przy storage.format "segments" (domyślnie) nowe wiadomości dopisywane
+        są do magazynu segmentów (src.message_store) - bez duplikatów
+        z poprzednich przebiegów; "json" zapisuje pełny snapshot
+        messages_<timestamp>.json jak dotychczas.
+
         Args:
             messages: Lista wiadomości do zapisania
             conversation_name: Nazwa konwersacji
             output_dir: Katalog bazowy (domyślnie 'data')
 
         Returns:
-            str: Ścieżka do zapisanego pliku lub None
+            str: Ścieżka do zapisanego pliku lub magazynu (None przy błędzie)
         """
         try:
             if not messages:
@@ -849,6 +961,16 @@ class MessengerMonitor:
             conv_dir = os.path.join(output_dir, folder_name)
             os.makedirs(conv_dir, exist_ok=True)
 
+            storage = self.config.get_storage_settings()
+            if storage.get('format', 'segments') == 'segments':
+                from src.message_store import get_message_store
+
+                store = get_message_store(conv_dir, int(storage.get('segment_max_mb', 64) * 1024 * 1024))
+                added = store.append(messages, conversation_name=conversation_name)
+                logger.info(f"✅ Dopisano {added} nowych z {len(messages)} wiadomości do magazynu: {conv_dir}")
+                print(f"✅ Dopisano {added} nowych z {len(messages)} wiadomości do: {conv_dir}")
+                return conv_dir
+
             # Wygeneruj nazwę pliku z timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"messages_{timestamp}.json"
@@ -877,7 +999,8 @@ class MessengerMonitor:
             print(f"❌ Błąd podczas zapisywania wiadomości: {e}")
             return None
 
-    def extract_and_save_all_conversations(self, conversations=None, output_dir='data', max_conversations=None):
+    def extract_and_save_all_conversations(self, conversations=None, output_dir='data', max_conversations=None,
+                                           progress_callback=None, cancel_event=None):
         """
         Ekstraktuje i zapisuje wiadomości ze wszystkich konwersacji.
         Zachowanie zależy od trybu w konfiguracji:
@@ -888,25 +1011,57 @@ class MessengerMonitor:
             conversations: Lista konwersacji (jeśli None, pobierze automatycznie)
             output_dir: Katalog wyjściowy
             max_conversations: Maksymalna liczba konwersacji do przetworzenia (None = wszystkie)
+            progress_callback: Funkcja wywoływana z polami postępu (conversations_done,
+                conversations_total, messages, current_conversation)
+            cancel_event: threading.Event - ustawienie przerywa ekstrakcję po bieżącym kroku
 
         Returns:
             dict: Statystyki ekstrakcji
         """
+        # Długa dzierżawa z wywłaszczaniem - między konwersacjami oddajemy przeglądarkę
+        # monitorowaniu, jeśli czeka na swój tick
+        with self.lease_manager.lease("extraction", PRIORITY_EXTRACTION, preemptible=True) as lease:
+            return self._extract_and_save_all_conversations(
+                lease, conversations, output_dir, max_conversations, progress_callback, cancel_event
+            )
+
+    def _extract_and_save_all_conversations(self, lease, conversations, output_dir, max_conversations,
+                                            progress_callback, cancel_event):
+        """Właściwa pętla ekstrakcji wykonywana w ramach dzierżawy przeglądarki."""
+        def report(**fields):
+            if progress_callback:
+                progress_callback(**fields)
+
         try:
             # Pobierz konwersacje jeśli nie zostały podane
             if conversations is None:
                 conversations = self.get_all_conversations()
+            # Lista z get_all_conversations/list_all_conversations tego monitora - filtry
+            # listy czatów już pominęły otwarcia odrzuconych konwersacji
+            harvested = bool(conversations) and all(conv.get('url') in self._sidebar_urls for conv in conversations)
 
             if not conversations:
                 logger.warning("⚠️ Brak konwersacji do przetworzenia")
                 return None
 
+            # Kolejność wg priorytetu z specific_conversations, aktywności i starzenia
+            queue_settings = self.config.get_extraction_queue_settings()
+            queue = ExtractionQueue.from_config(self.config) if queue_settings.get('enabled', True) else None
+            if queue:
+                conversations = queue.order(conversations)
+            # Limiter jest wspólny dla procesu - liczone są tylko akcje wątku ekstrakcji
+            budget = ExtractionBudget(
+                max_seconds=queue_settings.get('max_seconds'),
+                max_actions=queue_settings.get('max_actions'),
+                action_counter=self.rate_limiter.thread_acquired
+            )
+
             # Ogranicz liczbę konwersacji jeśli podano
             if max_conversations:
                 conversations = conversations[:max_conversations]
 
             # Sprawdź tryb działania
-            mode = self.config.get_mode()
+            mode = self.config.snapshot.mode
             should_scroll = mode == 'extract'  # Scrolluj tylko w trybie extract
 
             logger.info(f"🚀 Rozpoczynam ekstrakcję wiadomości z {len(conversations)} konwersacji...")
@@ -918,13 +1073,67 @@ class MessengerMonitor:
                 'total': len(conversations),
                 'success': 0,
                 'failed': 0,
-                'total_messages': 0
+                'skipped': 0,
+                'empty': 0,
+                'total_messages': 0,
+                'cancelled': False,
+                'opens_avoided': self.sidebar_stats.get('opens_avoided', 0) if harvested else 0
             }
 
+            # Dziennik postępu - wznowienie po przerwanym przebiegu
+            checkpoint = None
+            if self.config.is_checkpoint_enabled():
+                checkpoint = ExtractionCheckpoint.from_config(output_dir, self.config, mode=mode)
+            stats['resumed'] = bool(checkpoint and checkpoint.resumed)
+
+            report(conversations_total=len(conversations), conversations_done=0, messages=0)
+
+            # Seria nieudanych konwersacji pod rząd oznacza zwykle awarię przeglądarki
+            # lub wylogowanie - przebieg jest przerywany, a dziennik zostaje do wznowienia.
+            # Błędy samej konwersacji (brak URL) nie wliczają się do serii
+            max_failures = self.config.get_checkpoint_max_consecutive_failures()
+            consecutive_failures = 0
+
+            def record_failure(conv_id, conv_name, reason, streak=True):
+                nonlocal consecutive_failures
+                stats['failed'] += 1
+                if streak:
+                    consecutive_failures += 1
+                if checkpoint:
+                    checkpoint.mark_failed(conv_id, conv_name, reason)
+
             for idx, conv in enumerate(conversations, 1):
+                if max_failures and consecutive_failures >= max_failures:
+                    logger.error(f"⛔ {consecutive_failures} nieudanych konwersacji pod rząd - przerywam ekstrakcję "
+                                 f"(pozostało {len(conversations) - idx + 1}, dziennik zachowany do wznowienia)")
+                    stats['aborted'] = f"{consecutive_failures} nieudanych konwersacji pod rząd"
+                    break
+
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info(f"⏹️ Ekstrakcja anulowana po {idx - 1}/{len(conversations)} konwersacjach")
+                    stats['cancelled'] = True
+                    break
+
+                exhausted = budget.exhausted()
+                if exhausted:
+                    logger.info(f"⏹️ Wyczerpano budżet ekstrakcji: {exhausted} - "
+                                f"pozostało {len(conversations) - idx + 1} konwersacji")
+                    stats['budget_exhausted'] = exhausted
+                    break
+
+                # Bezpieczny punkt wywłaszczenia - kolejna konwersacja i tak otwierana jest od nowa
+                lease.yield_if_requested()
+
+                conv_name = conv.get('name', 'Unknown')
+                conv_id = conversation_id(conv)
+                if checkpoint and checkpoint.is_done(conv_id):
+                    logger.info(f"[{idx}/{len(conversations)}] ⏭️ Pomijam (ukończona w przerwanym przebiegu): {conv_name}")
+                    stats['skipped'] += 1
+                    continue
+
                 try:
-                    conv_name = conv.get('name', 'Unknown')
                     conv_url = conv.get('url')
+                    report(conversations_done=idx - 1, current_conversation=conv_name)
 
                     logger.info(f"\n{'='*70}")
                     logger.info(f"[{idx}/{len(conversations)}] 💬 PRZETWARZAM KONWERSACJĘ: {conv_name}")
@@ -933,21 +1142,29 @@ class MessengerMonitor:
 
                     if not conv_url:
                         logger.warning(f"⚠️ Brak URL dla konwersacji: {conv_name}")
-                        stats['failed'] += 1
+                        record_failure(conv_id, conv_name, "Brak URL", streak=False)
                         continue
 
                     # Otwórz konwersację
                     logger.info(f"   🔗 Otwieram konwersację...")
                     if not self.open_conversation(conv_url):
                         logger.warning(f"   ❌ Nie udało się otworzyć konwersacji: {conv_name}")
-                        stats['failed'] += 1
+                        record_failure(conv_id, conv_name, "Nie udało się otworzyć konwersacji")
                         continue
                     logger.info(f"   ✅ Konwersacja otwarta")
 
                     # Scrolluj aby załadować wiadomości TYLKO w trybie extract
                     if should_scroll:
                         logger.info(f"   📜 Scrolluję aby pobrać całą historię (tryb: extract)")
-                        self.scroll_and_load_messages()
+                        on_progress = None
+                        if checkpoint:
+                            on_progress = self._scroll_checkpointer(checkpoint, conv_id, conv_name)
+                        self.scroll_and_load_messages(
+                            cancel_event=cancel_event,
+                            start_scroll=checkpoint.resume_scrolls(conv_id) if checkpoint else 0,
+                            on_progress=on_progress,
+                            progress_every=max(1, self.config.get_checkpoint_scroll_interval())
+                        )
                     else:
                         logger.info(f"   ⏭️  Pomijam scrollowanie (tryb: {mode})")
 
@@ -957,22 +1174,54 @@ class MessengerMonitor:
 
                     if messages:
                         # Zapisz wiadomości
-                        self.save_messages_to_folder(messages, conv_name, output_dir)
+                        if not self.save_messages_to_folder(messages, conv_name, output_dir):
+                            raise IOError("Nie udało się zapisać wiadomości")
+                        # Przerwane scrollowanie zostawia wpis "partial" - wznowienie dokończy historię
+                        scroll_cancelled = should_scroll and cancel_event is not None and cancel_event.is_set()
+                        if checkpoint and not scroll_cancelled:
+                            checkpoint.mark_done(conv_id, conv_name, len(messages), message_key(messages[-1]))
+                        if queue and not scroll_cancelled:
+                            queue.mark_extracted(conv)
                         stats['success'] += 1
+                        consecutive_failures = 0
                         stats['total_messages'] += len(messages)
+                        report(messages=stats['total_messages'])
                         logger.info(f"✅ Pomyślnie przetworzono: {conv_name} ({len(messages)} wiadomości)")
                     else:
+                        # Pusta (np. nowa) konwersacja to nie błąd - nie wlicza się do serii niepowodzeń
                         logger.warning(f"⚠️ Brak wiadomości w konwersacji: {conv_name}")
-                        stats['failed'] += 1
+                        stats['empty'] += 1
+                        if checkpoint:
+                            checkpoint.mark_done(conv_id, conv_name, 0)
 
-                    # Krótka pauza między konwersacjami
-                    time.sleep(2)
+                    # Krótka pauza między konwersacjami - tylko gdy tempo nie jest
+                    # kontrolowane przez limiter akcji (ten sam czeka, gdy budżet się kończy)
+                    if not self.rate_limiter.enabled:
+                        time.sleep(2)
 
                 except Exception as e:
                     logger.error(f"❌ Błąd podczas przetwarzania konwersacji '{conv_name}': {e}")
-                    stats['failed'] += 1
+                    metrics.ERRORS.labels("extraction").inc()
+                    record_failure(conv_id, conv_name, str(e))
                     continue
 
+            stats['budget'] = budget.used()
+
+            # Dziennik zostaje do wznowienia tylko po przerwanym przebiegu (anulowanie, wyczerpanie
+            # budżetu, seria błędów). Przebieg dokończony do końca listy go usuwa - nieudane
+            # konwersacje ponawiane są w kolejnym przebiegu, a ukończone pobierane od nowa
+            if checkpoint:
+                if not (stats['cancelled'] or stats.get('budget_exhausted') or stats.get('aborted')):
+                    checkpoint.complete()
+                else:
+                    logger.info(f"📒 Dziennik ekstrakcji zachowany do wznowienia: {checkpoint.get_stats()}")
+
+            report(
+                conversations_done=stats['success'] + stats['failed'] + stats['skipped'] + stats['empty'],
+                messages=stats['total_messages'],
+                current_conversation=None
+            )
+
             # Podsumowanie
             logger.info(f"\n{'='*70}")
             logger.info(f"📊 PODSUMOWANIE EKSTRAKCJI")
@@ -981,6 +1230,9 @@ class MessengerMonitor:
             logger.info(f"Całkowita liczba konwersacji: {stats['total']}")
             logger.info(f"Pomyślnie przetworzonych:     {stats['success']}")
             logger.info(f"Nieudanych:                   {stats['failed']}")
+            logger.info(f"Pustych:                      {stats['empty']}")
+            logger.info(f"Pominiętych (wznowienie):     {stats['skipped']}")
+            logger.info(f"Pominiętych przed otwarciem:  {stats['opens_avoided']}")
             logger.info(f"Łączna liczba wiadomości:     {stats['total_messages']}")
             logger.info(f"{'='*70}\n")
 
@@ -991,31 +1243,56 @@ class MessengerMonitor:
             print(f"Całkowita liczba konwersacji: {stats['total']}")
             print(f"Pomyślnie przetworzonych:     {stats['success']}")
             print(f"Nieudanych:                   {stats['failed']}")
+            print(f"Pustych:                      {stats['empty']}")
+            print(f"Pominiętych (wznowienie):     {stats['skipped']}")
+            print(f"Pominiętych przed otwarciem:  {stats['opens_avoided']}")
             print(f"Łączna liczba wiadomości:     {stats['total_messages']}")
             print(f"{'='*70}\n")
 
+            limiter_stats = self.rate_limiter.get_stats()
+            stats['rate_limiter'] = limiter_stats
+            logger.info(
+                f"⏳ Limiter akcji: {limiter_stats['acquired']} akcji, "
+                f"oczekiwano {limiter_stats['waited']} razy "
+                f"(łącznie {limiter_stats['total_wait_seconds']:.1f}s), "
+                f"pozostało tokenów: {limiter_stats['tokens']:.0f}/{limiter_stats['capacity']:.0f}"
+            )
+
             return stats
 
         except Exception as e:
             logger.error(f"❌ Błąd podczas ekstrakcji konwersacji: {e}")
-            if self.config.should_screenshot_on_error():
+            if self.config.snapshot.screenshot_on_error:
                 self.debug_logger.save_error_snapshot(self.driver, e)
             return None
 
+    def _scroll_checkpointer(self, checkpoint, conv_id, conv_name):
+        """
+        Zwraca funkcję on_progress dla scroll_and_load_messages zapisującą postęp.
+
+        Zapisywana jest tylko liczba scrolli - bez ponownej ekstrakcji
+        załadowanego DOM (koszt rósłby kwadratowo z długością historii,
+        a starsze partie dopisywane po nowszych rozporządkowałyby magazyn).
+        Wznowienie przewija już załadowaną część szybko i pobiera całość na końcu.
+        """
+        def on_progress(scrolls):
+            checkpoint.mark_partial(conv_id, conv_name, scrolls)
+            logger.info(f"   📒 Checkpoint: {scrolls} scrolli")
+
+        return on_progress
+
     def get_unread_conversations(self):
         """Znajduje nieprzeczytane rozmowy (uproszczony przykład)."""
         try:
             # Selektor może się zmieniać w zależności od interfejsu Facebooka
-            unread_selectors = [
-                "div[role='gridcell'] div[aria-label='Unread']",
-                "span[aria-label='Unread']",
-                # Dodaj więcej selektorów w razie potrzeby
-            ]
+            unread_selectors = UNREAD_SELECTORS
             
-            for selector in unread_selectors:
+            for selector_index, selector in enumerate(unread_selectors):
                 try:
                     unread_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                     if unread_elements:
+                        if selector_index > 0:
+                            metrics.SELECTOR_FALLBACKS.labels("unread").inc()
                         return unread_elements
                 except Exception:
                     continue
@@ -1024,29 +1301,43 @@ class MessengerMonitor:
             
         except Exception as e:
             logger.error(f"Błąd podczas pobierania nieprzeczytanych konwersacji: {e}")
+            metrics.ERRORS.labels("unread").inc()
             self.debug_logger.save_error_snapshot(self.driver, e)  # NOWE
             return []
     
+    @phase("check_new_messages")
     def check_new_messages(self):
         """Sprawdza, czy są nowe wiadomości zgodnie z konfiguracją."""
+        cfg = self.config.snapshot
+
         # Sprawdź czy monitoring jest włączony
-        if not self.config.is_monitoring_enabled():
+        if not cfg.monitoring_enabled:
             logger.debug("Monitoring jest wyłączony w konfiguracji")
             return False
 
         # Sprawdź czy wykrywanie nowych wiadomości jest włączone
-        if not self.config.should_detect_new_messages():
+        if not cfg.detect_new_messages:
             logger.debug("Wykrywanie nowych wiadomości jest wyłączone w konfiguracji")
             return False
 
         unread_conversations = self.get_unread_conversations()
         current_count = len(unread_conversations)
 
+        # Odstęp między sprawdzeniami - górna granica opóźnienia wykrycia nowej wiadomości
+        polled_at = time.monotonic()
+        previous_poll_at, self._last_poll_at = self._last_poll_at, polled_at
+        if previous_poll_at is not None:
+            metrics.UNREAD_POLL_INTERVAL_SECONDS.observe(polled_at - previous_poll_at)
+
+        # Zdarzenia per konwersacja dla subskrybentów strumienia
+        if self.event_broadcaster is not None:
+            self._publish_unread_changes(unread_conversations)
+
         if current_count > self.last_message_count:
             logger.info(f"🔔 Znaleziono nowe wiadomości! Liczba nieprzeczytanych rozmów: {current_count}")
 
             # Zapisz debug snapshot przy nowych wiadomościach (jeśli włączone)
-            if self.config.should_save_screenshots():
+            if cfg.save_screenshots:
                 additional_info = f"Poprzednia liczba nieprzeczytanych: {self.last_message_count}\n"
                 additional_info += f"Aktualna liczba nieprzeczytanych: {current_count}\n"
                 additional_info += f"Nowych wiadomości: {current_count - self.last_message_count}\n"
@@ -1061,7 +1352,7 @@ class MessengerMonitor:
             self._handle_new_messages(current_count - self.last_message_count)
 
             # Opcjonalnie: powiadomienia
-            if self.config.are_notifications_enabled():
+            if cfg.notifications_enabled:
                 self._send_notification(f"Nowe wiadomości: {current_count - self.last_message_count}")
 
             self.last_message_count = current_count
@@ -1069,7 +1360,7 @@ class MessengerMonitor:
 
         elif current_count < self.last_message_count:
             # Zapisz gdy liczba nieprzeczytanych się zmniejszyła (jeśli włączone)
-            if self.config.should_save_screenshots():
+            if cfg.save_screenshots:
                 additional_info = f"Liczba nieprzeczytanych zmniejszyła się\n"
                 additional_info += f"Poprzednia: {self.last_message_count}\n"
                 additional_info += f"Aktualna: {current_count}\n"
@@ -1084,22 +1375,75 @@ class MessengerMonitor:
 
         return False
 
-    def _handle_new_messages(self, count):
-        """Obsługuje akcje na nowe wiadomości zgodnie z konfiguracją."""
-        actions = self.config.get('on_new_message.actions', [])
+    def _describe_unread_conversations(self, unread_elements):
+        """
+        Ustala nazwy i URL konwersacji dla wskaźników nieprzeczytanych wiadomości.
+
+        Jedno wywołanie execute_script dla wszystkich elementów zamiast
+        osobnych zapytań o rodzica każdego z nich.
+
+        Args:
+            unread_elements: Elementy wskaźników "Unread" z listy czatów
+
+        Returns:
+            list: Lista słowników {'name', 'url'}
+        """
+        if not unread_elements:
+            return []
+
+        script = """
+            return Array.from(arguments).map(function (el) {
+                var link = el.closest("a[href*='/t/'], a[href*='/e2ee/']");
+                if (!link) { return null; }
+                var name = link.querySelector("span[dir='auto']");
+                return {
+                    url: link.href,
+                    name: name ? name.textContent.trim() : (link.getAttribute('aria-label') || '')
+                };
+            });
+        """
+        described = self.driver.execute_script(script, *unread_elements) or []
+        return [item for item in described if item and item.get('url')]
 
-        for action in actions:
-            if not action.get('enabled', False):
+    def _publish_unread_changes(self, unread_elements):
+        """
+        Publikuje zdarzenie "new_message" dla każdej konwersacji, która stała się nieprzeczytana.
+
+        Args:
+            unread_elements: Elementy wskaźników "Unread" z listy czatów
+        """
+        try:
+            conversations = self._describe_unread_conversations(unread_elements)
+        except Exception as e:
+            logger.debug(f"Nie udało się ustalić nieprzeczytanych konwersacji: {e}")
+            return
+
+        current_urls = {conv['url'] for conv in conversations}
+        detected_at = datetime.now().isoformat()
+
+        for conv in conversations:
+            if conv['url'] in self._unread_urls:
                 continue
+            self.event_broadcaster.publish('new_message', {
+                'conversation': conv['name'],
+                'url': conv['url'],
+                'unread_conversations': len(current_urls),
+                'detected_at': detected_at
+            })
 
-            action_type = action.get('type')
+        self._unread_urls = current_urls
+
+    def _handle_new_messages(self, count):
+        """Obsługuje akcje na nowe wiadomości zgodnie z konfiguracją."""
+        for action in self.config.snapshot.new_message_actions:
+            action_type = action.type
 
             if action_type == 'log':
                 logger.info(f"📝 Akcja: Logowanie {count} nowych wiadomości")
 
             elif action_type == 'save_to_file':
-                file_path = action.get('file_path', './data/messages.txt')
-                file_format = action.get('format', 'txt')
+                file_path = action.options.get('file_path', './data/messages.txt')
+                file_format = action.options.get('format', 'txt')
                 logger.info(f"💾 Akcja: Zapisywanie do pliku {file_path} (format: {file_format})")
                 # TODO: Implementacja zapisywania do pliku
 
@@ -1109,7 +1453,7 @@ class MessengerMonitor:
 
     def _send_notification(self, message):
         """Wysyła powiadomienie zgodnie z konfiguracją."""
-        methods = self.config.get_notification_methods()
+        methods = self.config.snapshot.notification_methods
 
         if 'console' in methods:
             logger.info(f"🔔 Powiadomienie: {message}")
@@ -1117,49 +1461,113 @@ class MessengerMonitor:
         if 'log_file' in methods:
             logger.info(f"📄 Powiadomienie zapisane do logu: {message}")
     
+    def _restore_page_state(self, previous_owner):
+        """
+        Przywraca znany stan strony (lista czatów) po tym, jak przeglądarki
+        używał inny komponent (np. ekstrakcja otworzyła inną konwersację).
+
+        Args:
+            previous_owner: Nazwa poprzedniego właściciela dzierżawy
+        """
+        current_url = self.driver.current_url
+        if current_url and current_url.rstrip('/') == self.home_url.rstrip('/'):
+            return
+
+        logger.info(f"🔄 Przeglądarka używana przez '{previous_owner}' - wracam do {self.home_url}")
+        throttle("navigation")
+        self.driver.get(self.home_url)
+        utils.wait_for_page_load(self.driver)
+
+        # Liczba nieprzeczytanych z innej strony nie jest porównywalna - zacznij od nowa
+        self.last_message_count = len(self.get_unread_conversations())
+
+    def _refresh_config(self, fixed_interval=None):
+        """
+        Uwzględnia przeładowaną konfigurację (ConfigWatcher) na początku ticku.
+
+        Returns:
+            float: Interwał monitorowania (podany jawnie albo z aktualnej konfiguracji)
+        """
+        snapshot = self.config.snapshot
+        if snapshot is not self._config_snapshot:
+            if self._config_snapshot is not None:
+                logger.info("🔁 Monitor używa przeładowanej konfiguracji")
+                self.active_window = ActiveWindow.from_config(self.config)
+            self._config_snapshot = snapshot
+        return fixed_interval if fixed_interval is not None else snapshot.polling_interval
+
     def run_monitoring_loop(self, interval=None):
-        """Pętla monitorująca z wykorzystaniem konfiguracji."""
-        # Użyj interwału z konfiguracji jeśli nie podano
-        if interval is None:
-            interval = self.config.get_polling_interval()
+        """
+        Pętla monitorująca z wykorzystaniem konfiguracji.
+
+        Bez jawnego interwału używany jest polling_interval z aktualnej
+        konfiguracji - również po jej przeładowaniu w trakcie działania.
+        """
+        fixed_interval = interval
+        interval = self._refresh_config(fixed_interval)
 
         logger.info(f"🔄 Rozpoczynam pętlę monitorowania (interwał: {interval}s)...")
 
         # Zapisz initial state (jeśli włączone)
-        if self.config.should_save_screenshots():
-            self.debug_logger.save_debug_snapshot(
-                self.driver,
-                "monitoring_start",
-                f"Rozpoczęcie monitorowania z interwałem: {interval}s\nTryb: {self.config.get_mode()}\nZakres: {self.config.get_scope()}"
-            )
+        if self.config.snapshot.save_screenshots:
+            with self.lease_manager.lease("monitor", PRIORITY_MONITOR):
+                self.debug_logger.save_debug_snapshot(
+                    self.driver,
+                    "monitoring_start",
+                    f"Rozpoczęcie monitorowania z interwałem: {interval}s\nTryb: {self.config.get_mode()}\nZakres: {self.config.get_scope()}"
+                )
 
         try:
+            suspended = False
             while True:
                 try:
-                    if self.check_new_messages():
-                        # Opcjonalnie: Oznacz jako przeczytane lub podejmij inną akcję
-                        pass
+                    interval = self._refresh_config(fixed_interval)
+
+                    # Poza oknem aktywności (schedule) nie używaj przeglądarki
+                    if not self.active_window.is_active():
+                        if not suspended:
+                            logger.info("💤 Poza godzinami aktywności - wstrzymuję monitorowanie")
+                            suspended = True
+                        time.sleep(min(interval, self.active_window.seconds_until_active()))
+                        continue
+                    if suspended:
+                        logger.info("⏰ Początek godzin aktywności - wznawiam monitorowanie")
+                        suspended = False
+
+                    # Krótka dzierżawa na jeden tick monitorowania
+                    with self.lease_manager.lease("monitor", PRIORITY_MONITOR) as lease:
+                        if lease.previous_owner not in (None, "monitor"):
+                            self._restore_page_state(lease.previous_owner)
+
+                        with metrics.MONITOR_TICK_SECONDS.time():
+                            if self.check_new_messages():
+                                # Opcjonalnie: Oznacz jako przeczytane lub podejmij inną akcję
+                                pass
 
                     time.sleep(interval)
 
                 except Exception as e:
                     logger.error(f"Błąd w pętli monitorowania: {e}")
+                    metrics.ERRORS.labels("monitoring_loop").inc()
                     # Zapisz błąd ale kontynuuj działanie (jeśli włączone)
-                    if self.config.should_screenshot_on_error():
-                        self.debug_logger.save_error_snapshot(self.driver, e)
+                    if self.config.snapshot.screenshot_on_error:
+                        with self.lease_manager.lease("monitor", PRIORITY_MONITOR):
+                            self.debug_logger.save_error_snapshot(self.driver, e)
                     time.sleep(interval)
 
         except KeyboardInterrupt:
             logger.info("⏹️ Zatrzymano monitorowanie przez użytkownika")
             # Zapisz final state (jeśli włączone)
-            if self.config.should_save_screenshots():
-                self.debug_logger.save_debug_snapshot(
-                    self.driver,
-                    "monitoring_stop",
-                    "Zakończenie monitorowania przez użytkownika (Ctrl+C)"
-                )
+            if self.config.snapshot.save_screenshots:
+                with self.lease_manager.lease("monitor", PRIORITY_MONITOR):
+                    self.debug_logger.save_debug_snapshot(
+                        self.driver,
+                        "monitoring_stop",
+                        "Zakończenie monitorowania przez użytkownika (Ctrl+C)"
+                    )
         except Exception as e:
             logger.error(f"Krytyczny błąd w monitorowaniu: {e}")
-            if self.config.should_screenshot_on_error():
-                self.debug_logger.save_error_snapshot(self.driver, e)
+            if self.config.snapshot.screenshot_on_error:
+                with self.lease_manager.lease("monitor", PRIORITY_MONITOR):
+                    self.debug_logger.save_error_snapshot(self.driver, e)
             raise
\ No newline at end of file
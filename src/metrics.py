@@ -0,0 +1,306 @@
+"""
+Lekkie metryki w formacie tekstowym Prometheusa (bez zewnętrznych zależności).
+
+Pomiar to jedno wyszukiwanie binarne kubełka i inkrementacja pod blokadą,
+więc metryki mogą być włączone na produkcji również w gorących pętlach.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Domyślne kubełki (sekundy) - od pojedynczych komend WebDrivera do długich operacji
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names, values, extra=None):
+    """Formatuje etykiety w notacji Prometheusa: {a="1",b="2"}."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value):
+    """Escapuje wartość etykiety."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    """Formatuje liczbę (inf -> +Inf)."""
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Wspólna baza metryk z obsługą etykiet."""
+
+    metric_type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **kwargs):
+        """Zwraca metrykę potomną dla podanych wartości etykiet."""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default_child(self):
+        """Metryka bez etykiet."""
+        return self.labels()
+
+    def render(self):
+        """Zwraca linie w formacie tekstowym Prometheusa."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+        for key, child in sorted(self._children.items()):
+            lines.extend(child._render(self.name, self.labelnames, key))
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+    def _render(self, name, labelnames, key):
+        return [f"{name}{_format_labels(labelnames, key)} {_format_value(self._value)}"]
+
+
+class Counter(_Metric):
+    """Licznik monotoniczny."""
+
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default_child().inc(amount)
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self):
+        """Mierzy czas wykonania bloku."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    @property
+    def count(self):
+        return sum(self._counts)
+
+    @property
+    def sum(self):
+        return self._sum
+
+    def _render(self, name, labelnames, key):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self._buckets + (float('inf'),), counts):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, key)} {cumulative}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Histogram z ustalonymi kubełkami."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default_child().observe(value)
+
+    def time(self):
+        return self._default_child().time()
+
+
+class _GaugeChild:
+    def __init__(self, func):
+        self._func = func
+
+    def _render(self, name, labelnames, key):
+        try:
+            value = self._func()
+        except Exception:
+            return []
+        return [f"{name}{_format_labels(labelnames, key)} {_format_value(value)}"]
+
+
+class Gauge(_Metric):
+    """Wskaźnik odczytywany funkcją w chwili eksportu metryk."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name, documentation, func):
+        super().__init__(name, documentation)
+        self._children[()] = _GaugeChild(func)
+
+
+class MetricsRegistry:
+    """Rejestr metryk renderowany pod /metrics."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, func):
+        return self._register(Gauge(name, documentation, func))
+
+    def render(self):
+        """Zwraca wszystkie metryki w formacie tekstowym Prometheusa."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# ===== Metryki gorących ścieżek =====
+
+WEBDRIVER_COMMAND_SECONDS = REGISTRY.histogram(
+    "messenger_bot_webdriver_command_seconds",
+    "Czas wykonania komendy WebDrivera wg typu komendy",
+    ("command",)
+)
+CONVERSATION_OPEN_SECONDS = REGISTRY.histogram(
+    "messenger_bot_conversation_open_seconds",
+    "Czas otwarcia konwersacji (nawigacja, bez stałej pauzy po otwarciu)"
+)
+SCROLL_STEP_SECONDS = REGISTRY.histogram(
+    "messenger_bot_scroll_step_seconds",
+    "Czas jednego kroku scrollowania historii"
+)
+ROWS_HARVESTED_PER_SECOND = REGISTRY.histogram(
+    "messenger_bot_rows_harvested_per_second",
+    "Liczba przetworzonych wierszy wiadomości na sekundę (per konwersacja)",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+MONITOR_TICK_SECONDS = REGISTRY.histogram(
+    "messenger_bot_monitor_tick_seconds",
+    "Czas jednego ticku pętli monitorowania"
+)
+UNREAD_POLL_INTERVAL_SECONDS = REGISTRY.histogram(
+    "messenger_bot_unread_poll_interval_seconds",
+    "Odstęp między kolejnymi sprawdzeniami nieprzeczytanych konwersacji"
+)
+SELECTOR_FALLBACKS = REGISTRY.counter(
+    "messenger_bot_selector_fallbacks_total",
+    "Liczba użyć zapasowego selektora CSS (pierwszy selektor nic nie znalazł)",
+    ("component",)
+)
+ERRORS = REGISTRY.counter(
+    "messenger_bot_errors_total",
+    "Liczba błędów wg komponentu",
+    ("component",)
+)
+CONVERSATIONS_FILTERED = REGISTRY.counter(
+    "messenger_bot_conversations_filtered_total",
+    "Konwersacje z listy czatów pominięte przed otwarciem wg powodu (filters, scope)",
+    ("reason",)
+)
+DEBUG_SNAPSHOTS = REGISTRY.counter(
+    "messenger_bot_debug_snapshots_total",
+    "Liczba zapisanych snapshotów debugowych wg zdarzenia",
+    ("event",)
+)
+DEBUG_SNAPSHOTS_SUPPRESSED = REGISTRY.counter(
+    "messenger_bot_debug_snapshots_suppressed_total",
+    "Snapshoty debugowe pominięte przez próbkowanie (limit per zdarzenie)",
+    ("event",)
+)
+DEBUG_SNAPSHOTS_DROPPED = REGISTRY.counter(
+    "messenger_bot_debug_snapshots_dropped_total",
+    "Snapshoty debugowe odrzucone przy pełnej kolejce zapisu",
+    ("event",)
+)
+
+
+def instrument_driver(driver):
+    """
+    Mierzy czas każdej komendy WebDrivera (również komend WebElementów,
+    które przechodzą przez driver.execute).
+
+    Args:
+        driver: Instancja WebDrivera
+
+    Returns:
+        Ten sam driver (z podmienioną metodą execute)
+    """
+    original_execute = driver.execute
+
+    def timed_execute(driver_command, params=None):
+        start = time.perf_counter()
+        try:
+            return original_execute(driver_command, params)
+        finally:
+            WEBDRIVER_COMMAND_SECONDS.labels(driver_command).observe(time.perf_counter() - start)
+
+    driver.execute = timed_execute
+    return driver
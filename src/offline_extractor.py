@@ -0,0 +1,282 @@
+"""
+Ekstrakcja konwersacji i wiadomości z zapisanych snapshotów HTML (bez przeglądarki).
+
+Korzysta z tych samych selektorów i reguł co MessengerMonitor (src.message_schema),
+więc wynik ma ten sam schemat co get_all_conversations (bez pola 'element')
+i extract_messages_from_conversation. Katalog snapshotów (np. debug_res/)
+przetwarzany jest równolegle w puli procesów.
+
+Przykład:
+    python -m src.offline_extractor debug_res/ --output data/offline.jsonl
+"""
+import argparse
+import json
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from urllib.parse import urljoin
+
+from src.html_dom import parse_html
+from src.snapshot_store import read_blob
+from src.message_schema import (
+    CHAT_SELECTORS, CHAT_NAME_SELECTOR, MESSAGE_SELECTORS, TIMESTAMP_SELECTOR,
+    REACTION_SELECTORS, DEFAULT_MEDIA_TYPES, is_chat_url, normalize_name,
+    parse_sender, is_document_url, get_collection_flags
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://www.facebook.com/"
+
+SNAPSHOT_SUFFIXES = ('.html', '.html.gz', '.html.zst')
+
+
+def _absolute(url, base_url):
+    """Rozwiązuje względny URL (Selenium zwraca właściwość href - zawsze absolutną)."""
+    return urljoin(base_url, url) if url else url
+
+
+def extract_conversations(document, base_url=DEFAULT_BASE_URL):
+    """
+    Wyciąga listę konwersacji z sidebara.
+
+    Args:
+        document: Node (parse_html) lub tekst HTML
+        base_url: Adres strony, z której pochodzi snapshot
+
+    Returns:
+        list: [{'name', 'url'}] w kolejności z sidebara (bez duplikatów URL)
+    """
+    if isinstance(document, str):
+        document = parse_html(document)
+
+    for selector in CHAT_SELECTORS:
+        conversations = []
+        seen_urls = set()
+
+        for element in document.find_elements(selector):
+            if element.tag_name == 'a':
+                chat_url = element.get_attribute("href")
+            else:
+                link = element.find_element("a")
+                chat_url = link.get_attribute("href") if link is not None else None
+            chat_url = _absolute(chat_url, base_url)
+            if not is_chat_url(chat_url):
+                continue
+
+            name_element = element.find_element(CHAT_NAME_SELECTOR)
+            chat_name = name_element.text.strip() if name_element is not None else None
+            if not chat_name:
+                chat_name = element.get_attribute("aria-label")
+            if not chat_name:
+                chat_name = element.text.strip()
+
+            if chat_name and chat_url not in seen_urls:
+                seen_urls.add(chat_url)
+                conversations.append({'name': normalize_name(chat_name), 'url': chat_url})
+
+        if conversations:
+            return conversations
+
+    return []
+
+
+def _extract_media(element, media_config, base_url):
+    media_items = []
+    media_types = media_config.get('types', DEFAULT_MEDIA_TYPES)
+
+    if 'images' in media_types:
+        for img in element.find_elements("img"):
+            src = img.get_attribute("src")
+            if src and not src.startswith('data:'):
+                media_items.append({'type': 'image', 'url': _absolute(src, base_url), 'alt': img.get_attribute("alt") or ''})
+
+    for media_type, tag in (('videos', 'video'), ('audio', 'audio')):
+        if media_type in media_types:
+            for node in element.find_elements(tag):
+                src = node.get_attribute("src")
+                if src:
+                    media_items.append({'type': tag, 'url': _absolute(src, base_url)})
+
+    if 'documents' in media_types:
+        for link in element.find_elements("a[href]"):
+            href = _absolute(link.get_attribute("href"), base_url)
+            if is_document_url(href):
+                media_items.append({
+                    'type': 'document',
+                    'url': href,
+                    'filename': link.text.strip() or href.split('/')[-1]
+                })
+
+    return media_items or None
+
+
+def _extract_reactions(element):
+    reactions = []
+    for selector in REACTION_SELECTORS:
+        for node in element.find_elements(selector):
+            reaction_text = (
+                node.get_attribute("aria-label") or node.get_attribute("alt")
+                or node.get_attribute("data-reaction") or node.text.strip()
+            )
+            if reaction_text:
+                reactions.append(reaction_text)
+    return reactions or None
+
+
+def extract_messages(document, data_config=None, base_url=DEFAULT_BASE_URL, extracted_at=None):
+    """
+    Wyciąga wiadomości z otwartej konwersacji (schemat extract_messages_from_conversation).
+
+    Args:
+        document: Node (parse_html) lub tekst HTML
+        data_config: Sekcja data_to_collect konfiguracji
+        base_url: Adres strony, z której pochodzi snapshot
+        extracted_at: Znacznik czasu ekstrakcji (domyślnie teraz)
+
+    Returns:
+        list: Lista wiadomości
+    """
+    if isinstance(document, str):
+        document = parse_html(document)
+
+    flags = get_collection_flags(data_config)
+    extracted_at = extracted_at or datetime.now().isoformat()
+
+    message_elements = []
+    for selector in MESSAGE_SELECTORS:
+        message_elements = document.find_elements(selector)
+        if message_elements:
+            break
+
+    messages = []
+    for idx, element in enumerate(message_elements):
+        message_text = element.text.strip()
+        aria_label = element.get_attribute("aria-label")
+
+        message_data = {
+            'index': idx,
+            'text': message_text,
+            'extracted_at': extracted_at
+        }
+
+        if flags['include_timestamps']:
+            timestamp_element = element.find_element(TIMESTAMP_SELECTOR)
+            message_data['timestamp'] = timestamp_element.get_attribute("aria-label") if timestamp_element is not None else None
+
+        if flags['include_sender_info'] and aria_label:
+            message_data['aria_label'] = aria_label
+            message_data['sender'] = parse_sender(aria_label)
+
+        if flags['include_media']:
+            media_links = _extract_media(element, flags['media_config'], base_url)
+            if media_links:
+                message_data['media'] = media_links
+
+        if flags['include_reactions']:
+            reactions = _extract_reactions(element)
+            if reactions:
+                message_data['reactions'] = reactions
+
+        if message_text or (flags['include_media'] and message_data.get('media')):
+            messages.append(message_data)
+
+    return messages
+
+
+def read_snapshot(path):
+    """Wczytuje snapshot HTML (również skompresowany .gz/.zst z magazynu snapshotów)."""
+    if path.endswith(('.gz', '.zst')):
+        return read_blob(os.path.dirname(path), os.path.basename(path)).decode('utf-8')
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def process_snapshot(path, data_config=None, base_url=DEFAULT_BASE_URL):
+    """
+    Przetwarza jeden plik snapshotu.
+
+    Returns:
+        dict: {'path', 'conversations', 'messages', 'error'}
+    """
+    try:
+        document = parse_html(read_snapshot(path))
+        extracted_at = datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+        return {
+            'path': path,
+            'conversations': extract_conversations(document, base_url),
+            'messages': extract_messages(document, data_config, base_url, extracted_at),
+            'error': None
+        }
+    except Exception as e:
+        return {'path': path, 'conversations': [], 'messages': [], 'error': str(e)}
+
+
+def find_snapshots(directory):
+    """Zwraca posortowane ścieżki plików HTML w katalogu (rekurencyjnie)."""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(SNAPSHOT_SUFFIXES):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def _process_snapshot_args(args):
+    return process_snapshot(*args)
+
+
+def process_directory(directory, data_config=None, base_url=DEFAULT_BASE_URL, workers=None):
+    """
+    Przetwarza wszystkie snapshoty z katalogu w puli procesów.
+
+    Args:
+        directory: Katalog ze snapshotami (np. debug_res/)
+        data_config: Sekcja data_to_collect konfiguracji
+        base_url: Adres bazowy dla względnych linków
+        workers: Liczba procesów (None = liczba CPU, 1 = bez puli)
+
+    Yields:
+        dict: Wynik process_snapshot dla każdego pliku (w kolejności ścieżek)
+    """
+    tasks = [(path, data_config, base_url) for path in find_snapshots(directory)]
+    logger.info(f"🗂️ Snapshotów do przetworzenia: {len(tasks)}")
+
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _process_snapshot_args(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_process_snapshot_args, tasks, chunksize=4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ekstrakcja wiadomości z zapisanych snapshotów HTML")
+    parser.add_argument('directory', help="Katalog ze snapshotami (np. debug_res/)")
+    parser.add_argument('--output', default='data/offline_extraction.jsonl', help="Plik wynikowy JSON Lines")
+    parser.add_argument('--workers', type=int, default=None, help="Liczba procesów (domyślnie liczba CPU)")
+    parser.add_argument('--config', default='bot_config.yaml', help="Plik konfiguracji (sekcja data_to_collect)")
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    args = parser.parse_args(argv)
+
+    from config.config_parser import ConfigParser
+    data_config = ConfigParser(args.config).get('data_to_collect', {})
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    totals = {'snapshots': 0, 'messages': 0, 'errors': 0}
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for result in process_directory(args.directory, data_config, args.base_url, args.workers):
+            totals['snapshots'] += 1
+            totals['messages'] += len(result['messages'])
+            totals['errors'] += 1 if result['error'] else 0
+            f.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+    print(f"✅ Przetworzono {totals['snapshots']} snapshotów: {totals['messages']} wiadomości, "
+          f"{totals['errors']} błędów -> {args.output}")
+    return totals
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""
+Globalny limiter akcji (token bucket) egzekwujący security.max_actions_per_hour.
+
+Każda akcja zmieniająca stan przeglądarki (nawigacja, krok scrollowania,
+kliknięcie, wpisanie tekstu) pobiera token z jednego, współdzielonego w
+procesie kubełka. Dopóki budżet jest dostępny akcje wykonują się bez
+opóźnień, a dopiero przy jego wyczerpaniu limiter czeka dokładnie tyle,
+ile potrzeba na odnowienie tokenów.
+"""
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket z blokującym i nieblokującym pobieraniem tokenów."""
+
+    def __init__(self, rate_per_hour, capacity=None, enabled=True, clock=time.monotonic):
+        """
+        Inicjalizuje kubełek.
+
+        Args:
+            rate_per_hour: Liczba tokenów odnawianych w ciągu godziny
+            capacity: Maksymalna liczba tokenów (domyślnie rate_per_hour)
+            enabled: Jeśli False, acquire() zawsze przepuszcza (tylko zlicza akcje)
+            clock: Funkcja zwracająca czas monotoniczny (do testów)
+        """
+        self._clock = clock
+        self._cond = threading.Condition(threading.Lock())
+        self._rate = 0.0
+        self._capacity = 0.0
+        self._tokens = 0.0
+        self._last_refill = clock()
+        self.enabled = enabled
+        # Akcje pobrane przez bieżący wątek (budżet jednego przebiegu ekstrakcji)
+        self._thread_local = threading.local()
+
+        self._stats = {
+            'acquired': 0,
+            'rejected': 0,
+            'waited': 0,
+            'total_wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+            'by_action': {}
+        }
+
+        self.reconfigure(rate_per_hour, capacity)
+        self._tokens = self._capacity
+
+    def reconfigure(self, rate_per_hour, capacity=None):
+        """
+        Zmienia parametry kubełka bez utraty bieżącego stanu.
+
+        Args:
+            rate_per_hour: Nowa liczba tokenów na godzinę
+            capacity: Nowa pojemność (domyślnie rate_per_hour)
+
+        Raises:
+            ValueError: Gdy limit aktywnego limitera nie jest dodatni
+        """
+        rate_per_hour = max(float(rate_per_hour or 0), 0.0)
+        if rate_per_hour <= 0 and self.enabled:
+            # Bez odnawiania tokenów acquire() czekałby w nieskończoność po wyczerpaniu kubełka
+            raise ValueError(
+                "security.max_actions_per_hour musi być dodatnie "
+                "(aby wyłączyć limit akcji, ustaw security.respect_rate_limits: false)"
+            )
+        capacity = float(capacity) if capacity else rate_per_hour
+
+        with self._cond:
+            self._refill()
+            self._rate = rate_per_hour / 3600.0
+            self._capacity = max(capacity, 1.0)
+            self._tokens = min(self._tokens, self._capacity)
+            self._cond.notify_all()
+
+    def _refill(self):
+        """Dolicza tokeny za czas od ostatniego odświeżenia (wymaga blokady)."""
+        now = self._clock()
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+        self._last_refill = now
+
+    def _wait_time(self, tokens):
+        """Zwraca czas potrzebny na uzbieranie `tokens` tokenów (wymaga blokady)."""
+        missing = tokens - self._tokens
+        if missing <= 0:
+            return 0.0
+        if self._rate <= 0:
+            return float('inf')
+        return missing / self._rate
+
+    def _record(self, action, waited):
+        """Aktualizuje statystyki po udanym pobraniu tokenu (wymaga blokady)."""
+        self._stats['acquired'] += 1
+        self._thread_local.acquired = getattr(self._thread_local, 'acquired', 0) + 1
+        if action:
+            self._stats['by_action'][action] = self._stats['by_action'].get(action, 0) + 1
+        if waited > 0:
+            self._stats['waited'] += 1
+            self._stats['total_wait_seconds'] += waited
+            self._stats['max_wait_seconds'] = max(self._stats['max_wait_seconds'], waited)
+
+    def acquire(self, tokens=1, blocking=True, timeout=None, action=None):
+        """
+        Pobiera tokeny z kubełka.
+
+        Args:
+            tokens: Liczba tokenów do pobrania
+            blocking: Czy czekać na dostępność tokenów
+            timeout: Maksymalny czas oczekiwania w sekundach (None = bez limitu)
+            action: Typ akcji (np. "navigation", "scroll") do statystyk
+
+        Returns:
+            bool: True jeśli tokeny zostały pobrane, False w przeciwnym razie
+        """
+        start = self._clock()
+        deadline = None if timeout is None else start + timeout
+
+        with self._cond:
+            if not self.enabled:
+                self._record(action, 0.0)
+                return True
+
+            while True:
+                self._refill()
+                wait = self._wait_time(tokens)
+
+                if wait <= 0:
+                    self._tokens -= tokens
+                    self._record(action, self._clock() - start)
+                    return True
+
+                if not blocking:
+                    self._stats['rejected'] += 1
+                    return False
+
+                if deadline is not None:
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        self._stats['rejected'] += 1
+                        return False
+                    wait = min(wait, remaining)
+
+                if wait == float('inf'):
+                    wait = None
+
+                logger.debug(f"⏳ Limiter akcji: czekam {wait if wait is not None else '∞'}s na token ({action})")
+                self._cond.wait(wait)
+
+    def try_acquire(self, tokens=1, action=None):
+        """Nieblokująca wersja acquire()."""
+        return self.acquire(tokens, blocking=False, action=action)
+
+    def thread_acquired(self):
+        """Zwraca liczbę akcji pobranych przez bieżący wątek."""
+        return getattr(self._thread_local, 'acquired', 0)
+
+    def available_tokens(self):
+        """Zwraca aktualną liczbę dostępnych tokenów."""
+        with self._cond:
+            self._refill()
+            return self._tokens
+
+    def time_until_available(self, tokens=1):
+        """Zwraca czas (w sekundach) do chwili, gdy `tokens` tokenów będzie dostępnych."""
+        with self._cond:
+            if not self.enabled:
+                return 0.0
+            self._refill()
+            return self._wait_time(tokens)
+
+    def get_stats(self):
+        """
+        Zwraca bieżące metryki limitera.
+
+        Returns:
+            dict: Stan kubełka i statystyki oczekiwania
+        """
+        with self._cond:
+            self._refill()
+            stats = dict(self._stats)
+            stats['by_action'] = dict(self._stats['by_action'])
+            stats.update({
+                'enabled': self.enabled,
+                'tokens': round(self._tokens, 3),
+                'capacity': self._capacity,
+                'rate_per_hour': self._rate * 3600.0,
+                'avg_wait_seconds': (
+                    self._stats['total_wait_seconds'] / self._stats['waited']
+                    if self._stats['waited'] else 0.0
+                )
+            })
+            return stats
+
+
+# Globalna instancja limitera współdzielona przez wszystkie komponenty
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter(config=None):
+    """
+    Zwraca globalny limiter akcji, tworząc go przy pierwszym wywołaniu.
+
+    Args:
+        config: Obiekt ConfigParser (domyślnie settings.config)
+
+    Returns:
+        TokenBucket: Współdzielony limiter
+    """
+    global _rate_limiter
+
+    if _rate_limiter is not None:
+        return _rate_limiter
+
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            if config is None:
+                from config import settings
+                config = settings.config
+
+            _rate_limiter = TokenBucket(
+                rate_per_hour=config.get_max_actions_per_hour(),
+                capacity=config.get_rate_limit_burst(),
+                enabled=config.should_respect_rate_limits()
+            )
+            logger.info(
+                f"Limiter akcji zainicjalizowany "
+                f"(limit: {config.get_max_actions_per_hour()}/h, "
+                f"aktywny: {config.should_respect_rate_limits()})"
+            )
+
+    return _rate_limiter
+
+
+def throttle(action, tokens=1):
+    """
+    Pobiera token z globalnego limitera przed wykonaniem akcji na przeglądarce.
+
+    Args:
+        action: Typ akcji ("navigation", "scroll", "click", "send")
+        tokens: Koszt akcji w tokenach
+    """
+    get_rate_limiter().acquire(tokens, action=action)
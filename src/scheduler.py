@@ -0,0 +1,421 @@
+"""
+Harmonogram zadań okresowych (periodic_actions) i okien aktywności (schedule).
+
+Zadania trzymane są w kopcu posortowanym po czasie następnego uruchomienia
+i wykonywane na jednym wątku roboczym. Zadania korzystające z przeglądarki
+pobierają dzierżawę od tego samego DriverLeaseManager co pętla
+monitorowania, więc nigdy nie używają WebDrivera równocześnie z nią.
+Czasy następnych uruchomień są zapisywane na dysk, dzięki czemu restart
+nie wywołuje serii zaległych zadań.
+"""
+import heapq
+import json
+import os
+import shutil
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from src.driver_lease import PRIORITY_SCHEDULED
+from src.snapshot_store import RESERVED_NAMES
+
+logger = logging.getLogger(__name__)
+
+# Rejestr obsługiwanych akcji: nazwa -> (funkcja, czy używa przeglądarki)
+ACTION_HANDLERS = {}
+
+
+def register_action(name, uses_driver=False):
+    """
+    Dekorator rejestrujący obsługę akcji z periodic_actions.
+
+    Args:
+        name: Nazwa akcji (pole `action` w konfiguracji)
+        uses_driver: Czy akcja korzysta z WebDrivera
+    """
+    def decorator(func):
+        ACTION_HANDLERS[name] = (func, uses_driver)
+        return func
+    return decorator
+
+
+def _parse_hhmm(value):
+    """Zamienia 'HH:MM' na liczbę minut od północy."""
+    hours, minutes = str(value).split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+class ActiveWindow:
+    """Okno aktywności bota (godziny i dni tygodnia) z sekcji schedule."""
+
+    def __init__(self, enabled=False, start='00:00', end='23:59', days=None):
+        """
+        Args:
+            enabled: Czy harmonogram jest włączony (False = zawsze aktywny)
+            start: Początek okna 'HH:MM'
+            end: Koniec okna 'HH:MM' (może być przed startem - okno przez północ)
+            days: Dni aktywności (1=poniedziałek, 7=niedziela)
+        """
+        self.enabled = enabled
+        self.start = _parse_hhmm(start)
+        self.end = _parse_hhmm(end)
+        self.days = set(days or range(1, 8))
+
+    @classmethod
+    def from_config(cls, config):
+        """Tworzy okno aktywności z konfiguracji."""
+        hours = config.get_active_hours() or {}
+        return cls(
+            enabled=config.is_schedule_enabled(),
+            start=hours.get('start', '00:00'),
+            end=hours.get('end', '23:59'),
+            days=config.get_active_days()
+        )
+
+    def is_active(self, now=None):
+        """Sprawdza czy podany moment (domyślnie teraz) mieści się w oknie."""
+        if not self.enabled:
+            return True
+
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+
+        if self.start <= self.end:
+            return now.isoweekday() in self.days and self.start <= minute < self.end
+
+        # Okno przez północ - część po północy należy do dnia poprzedniego
+        if minute >= self.start:
+            return now.isoweekday() in self.days
+        if minute < self.end:
+            return (now - timedelta(days=1)).isoweekday() in self.days
+        return False
+
+    def seconds_until_active(self, now=None):
+        """Zwraca liczbę sekund do najbliższego otwarcia okna (0 jeśli aktywne)."""
+        now = now or datetime.now()
+        if self.is_active(now):
+            return 0.0
+
+        # Sprawdzaj kolejne minuty w ramach tygodnia - wystarczająco tanie
+        candidate = now.replace(second=0, microsecond=0)
+        for _ in range(8 * 24 * 60):
+            candidate += timedelta(minutes=1)
+            if self.is_active(candidate):
+                return (candidate - now).total_seconds()
+        return float('inf')
+
+    def __repr__(self):
+        return f"<ActiveWindow enabled={self.enabled} days={sorted(self.days)}>"
+
+
+class ScheduledJob:
+    """Pojedyncze zadanie okresowe."""
+
+    def __init__(self, name, interval, func, uses_driver=False, parameters=None):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.uses_driver = uses_driver
+        self.parameters = parameters or {}
+        self.next_run = None
+        self.last_run = None
+        self.last_error = None
+        self.run_count = 0
+
+
+class PeriodicScheduler:
+    """Harmonogram zadań okresowych oparty na kopcu i jednym wątku roboczym."""
+
+    def __init__(self, lease_manager=None, active_window=None, state_file=None, clock=time.time):
+        """
+        Args:
+            lease_manager: DriverLeaseManager współdzielony z pętlą monitorowania
+            active_window: Okno aktywności dla zadań używających przeglądarki
+            state_file: Plik JSON z czasami następnych uruchomień
+            clock: Funkcja zwracająca aktualny czas (epoch)
+        """
+        self.lease_manager = lease_manager
+        self.active_window = active_window or ActiveWindow()
+        self.state_file = state_file
+        self._clock = clock
+        self._jobs = {}
+        self._heap = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._saved_state = self._load_state()
+
+    def _load_state(self):
+        """Wczytuje zapisane czasy następnych uruchomień."""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('next_run', {})
+        except Exception as e:
+            logger.warning(f"⚠️ Nie udało się wczytać stanu harmonogramu: {e}")
+            return {}
+
+    def _save_state(self):
+        """Zapisuje atomowo czasy następnych uruchomień (wymaga blokady)."""
+        if not self.state_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.state_file)), exist_ok=True)
+            data = {
+                'updated_at': datetime.now().isoformat(),
+                'next_run': {name: job.next_run for name, job in self._jobs.items()}
+            }
+            tmp_path = f"{self.state_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.state_file)
+        except Exception as e:
+            logger.warning(f"⚠️ Nie udało się zapisać stanu harmonogramu: {e}")
+
+    def add_job(self, name, interval, func, uses_driver=False, parameters=None):
+        """
+        Dodaje zadanie okresowe.
+
+        Zaległe zadanie (zapisany termin w przeszłości) uruchamiane jest tylko raz,
+        a kolejne terminy liczone są od chwili jego wykonania.
+
+        Args:
+            name: Unikalna nazwa zadania
+            interval: Interwał w sekundach
+            func: Funkcja wywoływana z parametrami zadania (**parameters)
+            uses_driver: Czy zadanie korzysta z WebDrivera
+            parameters: Parametry przekazywane do funkcji
+        """
+        job = ScheduledJob(name, interval, func, uses_driver, parameters)
+        now = self._clock()
+        saved = self._saved_state.get(name)
+        job.next_run = max(saved, now) if saved else now
+
+        with self._cond:
+            self._jobs[name] = job
+            heapq.heappush(self._heap, (job.next_run, name))
+            self._save_state()
+            self._cond.notify()
+
+        logger.info(f"🗓️ Zaplanowano zadanie '{name}' co {interval}s (następne: {datetime.fromtimestamp(job.next_run):%Y-%m-%d %H:%M:%S})")
+        return job
+
+    def start(self):
+        """Uruchamia wątek roboczy harmonogramu."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="PeriodicScheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"🗓️ Harmonogram uruchomiony ({len(self._jobs)} zadań)")
+
+    def stop(self, timeout=5):
+        """Zatrzymuje wątek roboczy (bieżące zadanie zostanie dokończone)."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+        logger.info("🗓️ Harmonogram zatrzymany")
+
+    def _run(self):
+        """Pętla wątku roboczego - czeka na najbliższe zadanie z kopca."""
+        while True:
+            with self._cond:
+                while self._running:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    next_run, name = self._heap[0]
+                    job = self._jobs.get(name)
+                    # Pomiń nieaktualne wpisy (zadanie przeplanowane lub usunięte)
+                    if job is None or job.next_run != next_run:
+                        heapq.heappop(self._heap)
+                        continue
+                    delay = next_run - self._clock()
+                    if delay <= 0:
+                        heapq.heappop(self._heap)
+                        break
+                    self._cond.wait(delay)
+
+                if not self._running:
+                    return
+
+            self._execute(job)
+
+            with self._cond:
+                job.next_run = self._clock() + job.interval
+                heapq.heappush(self._heap, (job.next_run, job.name))
+                self._save_state()
+
+    def _execute(self, job):
+        """Wykonuje zadanie z uwzględnieniem okna aktywności i dzierżawy przeglądarki."""
+        if job.uses_driver and not self.active_window.is_active():
+            logger.info(f"🗓️ Zadanie '{job.name}' pominięte - poza oknem aktywności")
+            return
+
+        logger.info(f"🗓️ Uruchamiam zadanie okresowe: {job.name}")
+        start = time.monotonic()
+        try:
+            if job.uses_driver and self.lease_manager is not None:
+                with self.lease_manager.lease(job.name, PRIORITY_SCHEDULED):
+                    job.func(**job.parameters)
+            else:
+                job.func(**job.parameters)
+            job.last_error = None
+            logger.info(f"✅ Zadanie '{job.name}' zakończone ({time.monotonic() - start:.1f}s)")
+        except Exception as e:
+            job.last_error = str(e)
+            logger.error(f"❌ Błąd zadania okresowego '{job.name}': {e}")
+        finally:
+            job.last_run = self._clock()
+            job.run_count += 1
+
+    def get_status(self):
+        """Zwraca stan wszystkich zadań."""
+        with self._cond:
+            return [
+                {
+                    'name': job.name,
+                    'interval': job.interval,
+                    'uses_driver': job.uses_driver,
+                    'next_run': datetime.fromtimestamp(job.next_run).isoformat() if job.next_run else None,
+                    'last_run': datetime.fromtimestamp(job.last_run).isoformat() if job.last_run else None,
+                    'last_error': job.last_error,
+                    'run_count': job.run_count
+                }
+                for job in self._jobs.values()
+            ]
+
+
+@register_action("cleanup")
+def cleanup_old_files(keep_days=30, directories=None):
+    """
+    Usuwa pliki logów i katalogi debug starsze niż keep_days.
+
+    Magazyn snapshotów w debug_res/ sprzątany jest przez własny indeks
+    (SnapshotStore.enforce_retention), a przeglądanie katalogu dotyczy
+    tylko plików spoza magazynu (np. snapshotów w starym formacie).
+
+    Args:
+        keep_days: Ile dni zachować
+        directories: Lista katalogów (domyślnie logs/ i debug_res/)
+    """
+    if directories is None:
+        from config import settings
+        directories = [settings.LOG_DIR, settings.DEBUG_DIR]
+        if settings.config.get_snapshot_storage() == 'store':
+            from src.snapshot_store import get_snapshot_store
+            get_snapshot_store(settings.DEBUG_DIR).enforce_retention(max_age_days=keep_days)
+
+    cutoff = time.time() - keep_days * 86400
+    removed = 0
+
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            if entry.name in RESERVED_NAMES:
+                continue
+            try:
+                if entry.stat().st_mtime >= cutoff:
+                    continue
+                if entry.is_dir():
+                    shutil.rmtree(entry.path)
+                else:
+                    os.remove(entry.path)
+                removed += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Nie udało się usunąć {entry.path}: {e}")
+
+    logger.info(f"🧹 Usunięto {removed} starych plików/katalogów (starszych niż {keep_days} dni)")
+    return removed
+
+
+@register_action("export")
+def export_data(format=None, formats=None, destination=None, incremental=True):
+    """
+    Eksportuje zapisane wiadomości (sekcje export / export_content).
+
+    Args:
+        format: Pojedynczy format (jak w przykładowym periodic_actions)
+        formats: Lista formatów (domyślnie export.formats)
+        destination: Katalog docelowy (domyślnie export.destination)
+        incremental: Eksportuj tylko wiadomości nowe od poprzedniego eksportu
+    """
+    from src.exporter import export_messages
+
+    if format and not formats:
+        formats = [format]
+    stats = export_messages(incremental=incremental, formats=formats, destination=destination)
+    return {key: stats[key] for key in ('conversations', 'messages')}
+
+
+@register_action("compact")
+def compact_data(superseded=None, min_snapshots=None, source_dir=None):
+    """
+    Scala snapshoty konwersacji w kanoniczne segmenty (sekcja compaction).
+
+    Args:
+        superseded: keep, delete lub archive (domyślnie compaction.superseded)
+        min_snapshots: Minimalna liczba snapshotów konwersacji do kompakcji
+        source_dir: Katalog danych (domyślnie export.source_dir)
+    """
+    from src.compaction import compact_messages
+
+    stats = compact_messages(superseded=superseded, min_snapshots=min_snapshots, source_dir=source_dir)
+    return {key: stats[key] for key in ('conversations', 'snapshots', 'messages')}
+
+
+def create_scheduler(config, lease_manager=None):
+    """
+    Tworzy harmonogram z sekcji periodic_actions konfiguracji.
+
+    Args:
+        config: Obiekt ConfigParser
+        lease_manager: DriverLeaseManager współdzielony z pętlą monitorowania
+
+    Returns:
+        PeriodicScheduler: Harmonogram (jeszcze nieuruchomiony)
+    """
+    scheduler = PeriodicScheduler(
+        lease_manager=lease_manager,
+        active_window=ActiveWindow.from_config(config),
+        state_file=config.get_scheduler_state_file()
+    )
+
+    for action_config in config.get_periodic_actions():
+        if not action_config.get('enabled', False):
+            continue
+
+        name = action_config.get('name') or action_config.get('action')
+        action = action_config.get('action')
+        handler = ACTION_HANDLERS.get(action)
+
+        if handler is None:
+            logger.warning(f"⚠️ Brak obsługi akcji okresowej '{action}' (zadanie '{name}') - pomijam")
+            continue
+
+        func, uses_driver = handler
+        scheduler.add_job(
+            name,
+            action_config.get('interval', 86400),
+            func,
+            uses_driver=uses_driver,
+            parameters=action_config.get('parameters') or {}
+        )
+
+    # export.auto_export - przyrostowy eksport co export_interval sekund
+    export = config.get_export_settings()
+    if export.get('enabled', True) and export.get('auto_export', False):
+        func, uses_driver = ACTION_HANDLERS['export']
+        scheduler.add_job('auto_export', export.get('export_interval', 3600), func, uses_driver=uses_driver)
+
+    # compaction.enabled - kompakcja snapshotów w tle co compaction.interval sekund
+    compaction = config.get_compaction_settings()
+    if compaction.get('enabled', False):
+        func, uses_driver = ACTION_HANDLERS['compact']
+        scheduler.add_job('auto_compaction', compaction.get('interval', 86400), func, uses_driver=uses_driver)
+
+    return scheduler
@@ -0,0 +1,99 @@
+"""
+Filtrowanie listy czatów przed otwarciem konwersacji.
+
+Każde otwarcie czatu to przeładowanie strony, oczekiwania i scrollowanie,
+więc filtry (sekcja filters) i scope: groups/private stosowane są do
+wierszy listy czatów sklasyfikowanych podczas jej pobierania
+(message_schema.classify_sidebar_row) - odrzucone konwersacje nie są
+w ogóle otwierane. Liczba wiadomości dla min_message_count pochodzi
+z magazynu segmentów zapisanej historii; konwersacja bez zapisanej historii
+lub o nieustalonej klasyfikacji nie jest odrzucana.
+"""
+import logging
+
+from src.message_store import stored_count
+
+logger = logging.getLogger(__name__)
+
+EXCLUSION_REASONS = ('scope', 'archived', 'muted', 'read', 'message_count')
+
+
+def stored_message_count(conv_dir):
+    """Liczba wiadomości w magazynie segmentów z rozmiaru indeksu (None gdy brak magazynu)."""
+    return stored_count(conv_dir)
+
+
+class SidebarFilter:
+    """Filtry konwersacji stosowane do sklasyfikowanych wierszy listy czatów."""
+
+    def __init__(self, scope='all', exclude_archived=True, exclude_muted=False, only_unread=False,
+                 min_message_count=0, message_count=None):
+        """
+        Args:
+            scope: Zakres ("groups" i "private" filtrowane tutaj)
+            exclude_archived: Pomijaj zarchiwizowane
+            exclude_muted: Pomijaj wyciszone
+            only_unread: Tylko nieprzeczytane
+            min_message_count: Minimalna liczba zapisanych wiadomości (0 = bez limitu)
+            message_count: Funkcja conv -> liczba zapisanych wiadomości lub None
+        """
+        self.scope = scope
+        self.exclude_archived = exclude_archived
+        self.exclude_muted = exclude_muted
+        self.only_unread = only_unread
+        self.min_message_count = min_message_count or 0
+        self.message_count = message_count
+
+    @classmethod
+    def from_config(cls, config, message_count=None):
+        """Tworzy filtr z sekcji filters i scope."""
+        filters = config.get_conversation_filters()
+        return cls(
+            scope=config.get_scope(),
+            exclude_archived=filters.get('exclude_archived', True),
+            exclude_muted=filters.get('exclude_muted', False),
+            only_unread=filters.get('only_unread', False),
+            min_message_count=filters.get('min_message_count', 0),
+            message_count=message_count
+        )
+
+    def reason(self, conv):
+        """Powód odrzucenia konwersacji (None = konwersacja zostaje)."""
+        is_group = conv.get('is_group')
+        if is_group is not None:
+            if (self.scope == 'groups' and not is_group) or (self.scope == 'private' and is_group):
+                return 'scope'
+        if self.exclude_archived and conv.get('archived'):
+            return 'archived'
+        if self.exclude_muted and conv.get('muted'):
+            return 'muted'
+        if self.only_unread and conv.get('unread') is False:
+            return 'read'
+        if self.min_message_count and self.message_count is not None:
+            count = self.message_count(conv)
+            if count is not None and count < self.min_message_count:
+                return 'message_count'
+        return None
+
+    def apply(self, conversations):
+        """
+        Returns:
+            tuple: (pozostałe konwersacje, statystyki: rows, kept, opens_avoided, excluded wg powodu)
+        """
+        kept = []
+        excluded = dict.fromkeys(EXCLUSION_REASONS, 0)
+        for conv in conversations:
+            reason = self.reason(conv)
+            if reason is None:
+                kept.append(conv)
+            else:
+                excluded[reason] += 1
+                logger.debug(f"   ⏭️ Pomijam '{conv.get('name')}' przed otwarciem ({reason})")
+
+        stats = {
+            'rows': len(conversations),
+            'kept': len(kept),
+            'opens_avoided': len(conversations) - len(kept),
+            'excluded': excluded
+        }
+        return kept, stats
@@ -0,0 +1,119 @@
+"""
+Próbkowanie i limitowanie snapshotów debugowych per typ zdarzenia.
+
+Powtarzający się błąd w pętli monitorowania albo "migający" licznik
+nieprzeczytanych tworzyłby snapshot w każdym ticku. Reguła zdarzenia
+przepuszcza pierwsze `first` wystąpień, a potem najwyżej `per_minute`
+na minutę. Pominięte zdarzenia są zliczane, a ich podsumowanie trafia
+do najbliższego zapisanego snapshotu.
+"""
+import threading
+import time
+
+from src import metrics
+
+DEFAULT_RULE = {'first': 5, 'per_minute': 1}
+
+
+class SnapshotSampler:
+    """Decyduje, które snapshoty zapisać, i zlicza pominięte."""
+
+    def __init__(self, default_rule=None, event_rules=None, enabled=True, clock=time.monotonic):
+        """
+        Args:
+            default_rule: Reguła dla zdarzeń bez własnej reguły {'first', 'per_minute'}
+            event_rules: Reguły per typ zdarzenia {nazwa: {'first', 'per_minute'}}
+            enabled: False = zapisuj wszystkie snapshoty
+            clock: Funkcja zwracająca czas monotoniczny
+        """
+        self.default_rule = dict(DEFAULT_RULE, **(default_rule or {}))
+        self.event_rules = {name: dict(self.default_rule, **rule) for name, rule in (event_rules or {}).items()}
+        self.enabled = enabled
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._seen = {}
+        self._last_allowed = {}
+        self._suppressed_total = {}
+        self._pending_summary = {}
+
+    @classmethod
+    def from_config(cls, config):
+        """Tworzy sampler z sekcji debugging.snapshot_sampling."""
+        sampling = config.get_snapshot_sampling()
+        return cls(
+            default_rule=sampling.get('default'),
+            event_rules=sampling.get('events'),
+            enabled=sampling.get('enabled', True)
+        )
+
+    def rule_for(self, event_name):
+        return self.event_rules.get(event_name, self.default_rule)
+
+    def should_capture(self, event_name):
+        """
+        Sprawdza czy zapisać snapshot zdarzenia.
+
+        Returns:
+            tuple: (czy zapisać, podsumowanie pominiętych {zdarzenie: liczba} -
+                    niepuste tylko dla zapisywanego snapshotu)
+        """
+        if not self.enabled:
+            return True, {}
+
+        now = self._clock()
+        rule = self.rule_for(event_name)
+
+        with self._lock:
+            seen = self._seen.get(event_name, 0) + 1
+            self._seen[event_name] = seen
+
+            allowed = seen <= rule['first']
+            if not allowed and rule['per_minute']:
+                last = self._last_allowed.get(event_name)
+                allowed = last is None or now - last >= 60.0 / rule['per_minute']
+
+            if not allowed:
+                self._suppressed_total[event_name] = self._suppressed_total.get(event_name, 0) + 1
+                self._pending_summary[event_name] = self._pending_summary.get(event_name, 0) + 1
+                summary = None
+            else:
+                self._last_allowed[event_name] = now
+                summary, self._pending_summary = self._pending_summary, {}
+
+        if not allowed:
+            metrics.DEBUG_SNAPSHOTS_SUPPRESSED.labels(event_name).inc()
+            return False, {}
+        return True, summary
+
+    def get_stats(self):
+        """Zwraca liczbę wystąpień i pominięć per zdarzenie."""
+        with self._lock:
+            return {
+                event: {'seen': seen, 'suppressed': self._suppressed_total.get(event, 0)}
+                for event, seen in self._seen.items()
+            }
+
+
+def format_suppressed_summary(summary):
+    """Tekst podsumowania pominiętych snapshotów (dopisywany do additional_info)."""
+    if not summary:
+        return ""
+    lines = ["", "", "=== Pominięte snapshoty (sampling) od poprzedniego zapisu ==="]
+    lines.extend(f"{event}: {count}" for event, count in sorted(summary.items()))
+    return "\n".join(lines)
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_snapshot_sampler(config=None):
+    """Zwraca współdzielony sampler (jeden dla wszystkich instancji DebugLogger)."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            if config is None:
+                from config import settings
+                config = settings.config
+            _sampler = SnapshotSampler.from_config(config)
+        return _sampler
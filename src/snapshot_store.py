@@ -0,0 +1,390 @@
+"""
+Skompresowany, deduplikowany magazyn snapshotów debugowych (debug_res/).
+
+Układ katalogu:
+    events/<czas>_<zdarzenie>/manifest.json  - opis zdarzenia i odwołania do blobów
+    events/<czas>_<zdarzenie>/debug.log      - log tekstowy (jak dotychczas)
+    blobs/<ab>/<sha256>.html.gz|.png         - treść adresowana hashem surowych danych
+    snapshot_index.jsonl                     - dziennik zdarzeń (dodanie/usunięcie)
+
+Identyczne zrzuty (np. powtarzające się before_login) zapisywane są raz.
+HTML kompresowany jest gzipem (lub zstd, jeśli zainstalowano zstandard).
+Retencja (wiek i łączny rozmiar) egzekwowana jest przy każdym zapisie na
+podstawie indeksu w pamięci - usuwane są najstarsze zdarzenia i bloby bez
+odwołań, bez przeglądania całego katalogu.
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import logging
+from collections import OrderedDict
+
+try:
+    import zstandard
+except ImportError:  # zstd jest opcjonalny
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+EVENTS_DIR = "events"
+BLOBS_DIR = "blobs"
+INDEX_FILE = "snapshot_index.jsonl"
+
+# Wpisy w debug_res/ należące do magazynu (pomijane przez sprzątanie katalogów)
+RESERVED_NAMES = {EVENTS_DIR, BLOBS_DIR, INDEX_FILE, INDEX_FILE + ".tmp"}
+
+
+class SnapshotStore:
+    """Magazyn snapshotów z deduplikacją blobów i retencją."""
+
+    def __init__(self, root, compression='gzip', max_age_days=None, max_total_mb=None, clock=time.time):
+        """
+        Args:
+            root: Katalog magazynu (debug_res/)
+            compression: 'gzip' lub 'zstd' (wymaga pakietu zstandard)
+            max_age_days: Maksymalny wiek zdarzeń (None = bez limitu)
+            max_total_mb: Maksymalny łączny rozmiar (None = bez limitu)
+            clock: Funkcja zwracająca aktualny czas (epoch)
+        """
+        self.root = root
+        if compression == 'zstd' and zstandard is None:
+            logger.warning("⚠️ Pakiet zstandard niedostępny - snapshoty HTML kompresowane gzipem")
+            compression = 'gzip'
+        self.compression = compression
+        self.max_age_days = max_age_days
+        self.max_total_bytes = int(max_total_mb * 1024 * 1024) if max_total_mb else None
+        self._clock = clock
+        self._lock = threading.RLock()
+
+        self._events = OrderedDict()  # event_dir -> rekord indeksu (od najstarszego)
+        self._blob_refs = {}          # sha256 -> liczba odwołań
+        self._blob_info = {}          # sha256 -> {'path', 'size'}
+        self._total_bytes = 0
+        self._removed_records = 0
+        self._stats = {'events_added': 0, 'events_removed': 0, 'blobs_deduplicated': 0, 'bytes_saved': 0}
+
+        os.makedirs(os.path.join(root, EVENTS_DIR), exist_ok=True)
+        os.makedirs(os.path.join(root, BLOBS_DIR), exist_ok=True)
+        self._index_path = os.path.join(root, INDEX_FILE)
+        self._load_index()
+
+    @classmethod
+    def from_config(cls, root, config):
+        """Tworzy magazyn z ustawień sekcji debugging."""
+        return cls(
+            root,
+            compression=config.get_snapshot_compression(),
+            max_age_days=config.get_snapshot_retention_days(),
+            max_total_mb=config.get_snapshot_max_total_mb()
+        )
+
+    # ===== Indeks =====
+
+    def _load_index(self):
+        """Odtwarza indeks w pamięci z dziennika (lub z manifestów, gdy go brak)."""
+        if not os.path.exists(self._index_path):
+            self._rebuild_index()
+            return
+
+        with open(self._index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # urwany ostatni wpis po awarii
+                if record.get('op') == 'remove':
+                    self._forget(record['event_dir'])
+                    self._removed_records += 1
+                else:
+                    self._remember(record)
+
+    def _rebuild_index(self):
+        """Buduje indeks z manifestów zdarzeń (jednorazowo, np. po usunięciu indeksu)."""
+        events_root = os.path.join(self.root, EVENTS_DIR)
+        records = []
+        for entry in os.scandir(events_root):
+            manifest_path = os.path.join(entry.path, "manifest.json")
+            if not os.path.exists(manifest_path):
+                continue
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                records.append(self._record_from_manifest(entry.name, manifest))
+            except Exception as e:
+                logger.warning(f"⚠️ Pominięto uszkodzony manifest {manifest_path}: {e}")
+
+        for record in sorted(records, key=lambda r: r['created_at']):
+            self._remember(record)
+        self._rewrite_index()
+
+    def _record_from_manifest(self, event_name, manifest):
+        blobs = {
+            info['sha256']: {'path': info['blob'], 'size': info['stored_size'], 'encoding': info.get('encoding')}
+            for info in manifest.get('files', {}).values()
+        }
+        return {
+            'op': 'add',
+            'event_dir': os.path.join(EVENTS_DIR, event_name),
+            'created_at': manifest.get('created_at_epoch', 0),
+            'bytes': manifest.get('event_bytes', 0),
+            'blobs': blobs
+        }
+
+    def _remember(self, record):
+        """Dodaje rekord do indeksu w pamięci (wymaga blokady)."""
+        self._events[record['event_dir']] = record
+        self._total_bytes += record.get('bytes', 0)
+        for sha, info in record['blobs'].items():
+            if sha not in self._blob_refs:
+                self._blob_refs[sha] = 0
+                self._blob_info[sha] = info
+                self._total_bytes += info['size']
+            self._blob_refs[sha] += 1
+
+    def _forget(self, event_dir):
+        """
+        Usuwa rekord z indeksu w pamięci (wymaga blokady).
+
+        Returns:
+            tuple: (rekord lub None, lista blobów bez odwołań)
+        """
+        record = self._events.pop(event_dir, None)
+        if record is None:
+            return None, []
+        self._total_bytes -= record.get('bytes', 0)
+        orphaned = []
+        for sha in record['blobs']:
+            self._blob_refs[sha] -= 1
+            if self._blob_refs[sha] <= 0:
+                del self._blob_refs[sha]
+                info = self._blob_info.pop(sha)
+                self._total_bytes -= info['size']
+                orphaned.append(info)
+        return record, orphaned
+
+    def _append_index(self, record):
+        with open(self._index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def _rewrite_index(self):
+        """Zapisuje atomowo zwarty indeks (tylko aktualne zdarzenia)."""
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in self._events.values():
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self._index_path)
+        self._removed_records = 0
+
+    # ===== Zapis =====
+
+    def event_dir_for(self, timestamp, event_name):
+        """Zwraca ścieżkę katalogu zdarzenia."""
+        return os.path.join(self.root, EVENTS_DIR, f"{timestamp}_{event_name}")
+
+    def _compress_html(self, data):
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor(level=10).compress(data), '.html.zst', 'zstd'
+        return gzip.compress(data, compresslevel=6), '.html.gz', 'gzip'
+
+    def _put_blob(self, data, kind):
+        """
+        Zapisuje blob (jeśli jeszcze go nie ma) i zwraca jego opis.
+
+        Args:
+            data: Surowe bajty
+            kind: 'html' lub 'png'
+        """
+        sha = hashlib.sha256(data).hexdigest()
+        existing = self._blob_info.get(sha)
+        if existing is not None and os.path.exists(os.path.join(self.root, existing['path'])):
+            self._stats['blobs_deduplicated'] += 1
+            self._stats['bytes_saved'] += existing['size']
+            return {'sha256': sha, 'blob': existing['path'], 'size': len(data),
+                    'stored_size': existing['size'], 'encoding': existing.get('encoding')}
+
+        if kind == 'html':
+            stored, ext, encoding = self._compress_html(data)
+        else:
+            # PNG jest już skompresowany
+            stored, ext, encoding = data, '.png', None
+
+        rel_path = os.path.join(BLOBS_DIR, sha[:2], sha + ext)
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(stored)
+        os.replace(tmp_path, path)
+
+        return {'sha256': sha, 'blob': rel_path, 'size': len(data), 'stored_size': len(stored), 'encoding': encoding}
+
+    def add(self, snapshot):
+        """
+        Zapisuje snapshot (DebugSnapshot) do magazynu.
+
+        Returns:
+            str: Katalog zdarzenia
+        """
+        # Blokada na cały zapis - retencja nie może usunąć bloba, do którego
+        # właśnie dodajemy odwołanie
+        with self._lock:
+            self._add(snapshot)
+        print(f"✓ Snapshot zapisany: {snapshot.event_dir}")
+        return snapshot.event_dir
+
+    def _add(self, snapshot):
+        os.makedirs(snapshot.event_dir, exist_ok=True)
+        files = {}
+        if snapshot.screenshot_png is not None:
+            files['screenshot'] = self._put_blob(snapshot.screenshot_png, 'png')
+        if snapshot.page_source is not None:
+            files['page_source'] = self._put_blob(snapshot.page_source.encode('utf-8'), 'html')
+
+        log_path = os.path.join(snapshot.event_dir, "debug.log")
+        with open(log_path, 'w', encoding='utf-8') as f:
+            f.write(format_debug_log(snapshot))
+
+        manifest = {
+            'event': snapshot.event_name,
+            'created_at': snapshot.created_at.isoformat(),
+            'created_at_epoch': snapshot.created_at.timestamp(),
+            'url': snapshot.current_url,
+            'title': snapshot.title,
+            'capture_scope': snapshot.capture_scope,
+            'capture_errors': snapshot.capture_errors,
+            'files': files
+        }
+        # Rozmiar własnych plików zdarzenia (log + manifest) - do limitu łącznego rozmiaru
+        manifest_size = len(json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+        manifest['event_bytes'] = os.path.getsize(log_path) + manifest_size
+        with open(os.path.join(snapshot.event_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        record = self._record_from_manifest(os.path.basename(snapshot.event_dir), manifest)
+        self._remember(record)
+        self._append_index(record)
+        self._stats['events_added'] += 1
+        self.enforce_retention()
+
+    # ===== Retencja =====
+
+    def _remove_event(self, event_dir):
+        """Usuwa zdarzenie i osierocone bloby (wymaga blokady)."""
+        record, orphaned = self._forget(event_dir)
+        if record is None:
+            return False
+        self._append_index({'op': 'remove', 'event_dir': event_dir})
+        self._removed_records += 1
+        self._stats['events_removed'] += 1
+
+        shutil.rmtree(os.path.join(self.root, event_dir), ignore_errors=True)
+        for info in orphaned:
+            try:
+                os.remove(os.path.join(self.root, info['path']))
+            except FileNotFoundError:
+                pass
+        return True
+
+    def enforce_retention(self, max_age_days=None):
+        """
+        Usuwa najstarsze zdarzenia ponad limit wieku lub rozmiaru.
+
+        Koszt zależy od liczby usuwanych zdarzeń, nie od rozmiaru katalogu.
+
+        Args:
+            max_age_days: Nadpisuje limit wieku (np. keep_days z periodic_actions)
+
+        Returns:
+            int: Liczba usuniętych zdarzeń
+        """
+        max_age_days = self.max_age_days if max_age_days is None else max_age_days
+        cutoff = self._clock() - max_age_days * 86400 if max_age_days else None
+        removed = 0
+
+        with self._lock:
+            while self._events:
+                event_dir, record = next(iter(self._events.items()))
+                too_old = cutoff is not None and record['created_at'] < cutoff
+                too_big = self.max_total_bytes is not None and self._total_bytes > self.max_total_bytes
+                if not (too_old or too_big):
+                    break
+                self._remove_event(event_dir)
+                removed += 1
+
+            # Zwijaj dziennik, gdy wpisów o usunięciach jest więcej niż zdarzeń
+            if self._removed_records > max(len(self._events), 100):
+                self._rewrite_index()
+
+        if removed:
+            logger.info(f"🧹 Retencja snapshotów: usunięto {removed} zdarzeń "
+                        f"(pozostało {len(self._events)}, {self._total_bytes / 1024 / 1024:.1f} MB)")
+        return removed
+
+    def get_stats(self):
+        """Zwraca statystyki magazynu."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'events': len(self._events),
+                'blobs': len(self._blob_refs),
+                'total_bytes': self._total_bytes,
+                'compression': self.compression
+            })
+            return stats
+
+
+def format_debug_log(snapshot):
+    """Tekst pliku debug.log dla snapshotu."""
+    lines = [
+        "=== DEBUG LOG ===",
+        f"Timestamp: {snapshot.created_at.isoformat()}",
+        f"Event: {snapshot.event_name}",
+        f"Current URL: {snapshot.current_url}",
+        f"Page Title: {snapshot.title}",
+        f"Capture Scope: {snapshot.capture_scope}",
+        "",
+        "=== Additional Info ===",
+        snapshot.additional_info,
+        "",
+        "=== Browser Logs ==="
+    ]
+    if snapshot.browser_logs is not None:
+        lines.extend(str(entry) for entry in snapshot.browser_logs)
+    else:
+        lines.append(f"Browser logs not available: {snapshot.capture_errors.get('browser_logs')}")
+    return "\n".join(lines) + "\n"
+
+
+def read_blob(root, blob_path):
+    """Odczytuje blob z magazynu (rozpakowując HTML)."""
+    path = os.path.join(root, blob_path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    if path.endswith('.gz'):
+        return gzip.decompress(data)
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("Do odczytu blobów .zst wymagany jest pakiet zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_snapshot_store(root, config=None):
+    """Zwraca współdzielony magazyn dla katalogu (jeden indeks na proces)."""
+    key = os.path.abspath(root)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            if config is None:
+                from config import settings
+                config = settings.config
+            store = _stores[key] = SnapshotStore.from_config(root, config)
+        return store
@@ -0,0 +1,252 @@
+"""
+Asynchroniczny zapis snapshotów debugowych.
+
+Na wątku wywołującym wykonywane jest tylko szybkie pobranie danych
+z przeglądarki (zrzut PNG, page_source, URL, logi konsoli). Kodowanie
+i zapis plików odbywa się na osobnym wątku. Kolejka ma ograniczony rozmiar:
+gdy zapis nie nadąża, najstarszy oczekujący snapshot jest odrzucany
+i zliczany, więc debugowanie nigdy nie wstrzymuje monitorowania.
+"""
+import os
+import threading
+import time
+import logging
+from collections import deque
+from datetime import datetime
+
+from src import metrics
+from src.dom_capture import capture_dom
+
+logger = logging.getLogger(__name__)
+
+
+class DebugSnapshot:
+    """Dane snapshotu pobrane z przeglądarki (gotowe do zapisu w tle)."""
+
+    __slots__ = (
+        'event_name', 'event_dir', 'created_at', 'additional_info', 'screenshot_png',
+        'page_source', 'capture_scope', 'current_url', 'title', 'browser_logs', 'capture_errors'
+    )
+
+    def __init__(self, event_name, event_dir, additional_info=""):
+        self.event_name = event_name
+        self.event_dir = event_dir
+        self.created_at = datetime.now()
+        self.additional_info = additional_info
+        self.screenshot_png = None
+        self.page_source = None
+        self.capture_scope = None
+        self.current_url = None
+        self.title = None
+        self.browser_logs = None
+        self.capture_errors = {}
+
+
+def capture_snapshot(driver, event_name, event_dir, additional_info="", scopes=None, strip_scripts=False):
+    """
+    Pobiera dane snapshotu z przeglądarki (na wątku wywołującym).
+
+    Błędy pojedynczych elementów nie przerywają pobierania pozostałych.
+
+    Args:
+        scopes: Zakresy DOM do zapisania (src.dom_capture); None = pełny page_source
+        strip_scripts: Czy usuwać script/style przed transferem
+
+    Returns:
+        DebugSnapshot
+    """
+    snapshot = DebugSnapshot(event_name, event_dir, additional_info)
+
+    try:
+        snapshot.screenshot_png = driver.get_screenshot_as_png()
+    except Exception as e:
+        snapshot.capture_errors['screenshot'] = str(e)
+    try:
+        if scopes is None and not strip_scripts:
+            snapshot.page_source = driver.page_source
+            snapshot.capture_scope = ['page']
+        else:
+            snapshot.page_source, snapshot.capture_scope = capture_dom(driver, scopes, strip_scripts)
+    except Exception as e:
+        snapshot.capture_errors['page_source'] = str(e)
+    try:
+        snapshot.current_url = driver.current_url
+        snapshot.title = driver.title
+    except Exception as e:
+        snapshot.capture_errors['page_info'] = str(e)
+    try:
+        snapshot.browser_logs = driver.get_log('browser')
+    except Exception as e:
+        snapshot.capture_errors['browser_logs'] = str(e)
+
+    return snapshot
+
+
+def write_snapshot(snapshot):
+    """Zapisuje snapshot do katalogu zdarzenia (screenshot, HTML, debug.log)."""
+    os.makedirs(snapshot.event_dir, exist_ok=True)
+
+    # 1. Screenshot
+    screenshot_path = os.path.join(snapshot.event_dir, "screenshot.png")
+    if snapshot.screenshot_png is not None:
+        try:
+            with open(screenshot_path, 'wb') as f:
+                f.write(snapshot.screenshot_png)
+            print(f"✓ Screenshot zapisany: {screenshot_path}")
+        except Exception as e:
+            print(f"✗ Błąd zapisu screenshota: {e}")
+    else:
+        print(f"✗ Błąd zapisu screenshota: {snapshot.capture_errors.get('screenshot')}")
+
+    # 2. HTML strony
+    html_path = os.path.join(snapshot.event_dir, "page_source.html")
+    if snapshot.page_source is not None:
+        try:
+            with open(html_path, 'w', encoding='utf-8') as f:
+                f.write(snapshot.page_source)
+            print(f"✓ HTML zapisany: {html_path}")
+        except Exception as e:
+            print(f"✗ Błąd zapisu HTML: {e}")
+    else:
+        print(f"✗ Błąd zapisu HTML: {snapshot.capture_errors.get('page_source')}")
+
+    # 3. Log tekstowy z informacjami
+    log_path = os.path.join(snapshot.event_dir, "debug.log")
+    try:
+        with open(log_path, 'w', encoding='utf-8') as f:
+            f.write(f"=== DEBUG LOG ===\n")
+            f.write(f"Timestamp: {snapshot.created_at.isoformat()}\n")
+            f.write(f"Event: {snapshot.event_name}\n")
+            f.write(f"Current URL: {snapshot.current_url}\n")
+            f.write(f"Page Title: {snapshot.title}\n")
+            f.write(f"Capture Scope: {snapshot.capture_scope}\n")
+            f.write(f"\n=== Additional Info ===\n")
+            f.write(snapshot.additional_info)
+            f.write(f"\n\n=== Browser Logs ===\n")
+
+            if snapshot.browser_logs is not None:
+                for log_entry in snapshot.browser_logs:
+                    f.write(f"{log_entry}\n")
+            else:
+                f.write(f"Browser logs not available: {snapshot.capture_errors.get('browser_logs')}\n")
+
+        print(f"✓ Log zapisany: {log_path}")
+    except Exception as e:
+        print(f"✗ Błąd zapisu logu: {e}")
+
+    return snapshot.event_dir
+
+
+class AsyncSnapshotWriter:
+    """Wątek zapisujący snapshoty z ograniczonej kolejki (polityka drop-oldest)."""
+
+    def __init__(self, max_queue=20, write_func=write_snapshot):
+        """
+        Args:
+            max_queue: Maksymalna liczba snapshotów oczekujących na zapis
+            write_func: Funkcja zapisująca pojedynczy snapshot
+        """
+        self.max_queue = max_queue
+        self._write = write_func
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._in_progress = 0
+        self._running = True
+        self._stats = {'submitted': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'write_seconds': 0.0}
+        self._thread = threading.Thread(target=self._run, name="SnapshotWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, snapshot, write_func=None):
+        """
+        Dodaje snapshot do kolejki zapisu (nie blokuje).
+
+        Args:
+            snapshot: DebugSnapshot
+            write_func: Funkcja zapisu dla tego snapshotu (domyślnie write_func writera)
+
+        Returns:
+            bool: False jeśli w zamian odrzucono najstarszy oczekujący snapshot
+        """
+        with self._cond:
+            self._stats['submitted'] += 1
+            dropped = None
+            if len(self._queue) >= self.max_queue:
+                dropped, _ = self._queue.popleft()
+                self._stats['dropped'] += 1
+            self._queue.append((snapshot, write_func or self._write))
+            self._cond.notify()
+
+        if dropped is not None:
+            metrics.DEBUG_SNAPSHOTS_DROPPED.labels(dropped.event_name).inc()
+            logger.warning(f"⚠️ Kolejka snapshotów pełna - odrzucono '{dropped.event_name}'")
+            return False
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                snapshot, write_func = self._queue.popleft()
+                self._in_progress += 1
+
+            start = time.perf_counter()
+            try:
+                write_func(snapshot)
+                outcome = 'written'
+            except Exception as e:
+                logger.error(f"❌ Błąd zapisu snapshotu '{snapshot.event_name}': {e}")
+                outcome = 'failed'
+
+            with self._cond:
+                self._in_progress -= 1
+                self._stats[outcome] += 1
+                self._stats['write_seconds'] += time.perf_counter() - start
+                self._cond.notify_all()
+
+    def flush(self, timeout=10):
+        """
+        Czeka na zapis wszystkich oczekujących snapshotów.
+
+        Returns:
+            bool: True jeśli kolejka została opróżniona w czasie timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._in_progress:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=10):
+        """Zapisuje pozostałe snapshoty i zatrzymuje wątek."""
+        self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def get_stats(self):
+        """Zwraca statystyki zapisu."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['queued'] = len(self._queue)
+            stats['max_queue'] = self.max_queue
+            return stats
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_snapshot_writer(max_queue=20):
+    """Zwraca współdzielony wątek zapisu snapshotów (tworzony przy pierwszym użyciu)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AsyncSnapshotWriter(max_queue=max_queue)
+        return _writer
@@ -1,20 +1,21 @@
 #src/utils.py
 """
 Pomocnicze funkcje.
+
+Selenium importowane jest wewnątrz funkcji operujących na przeglądarce,
+więc import modułu (np. dla setup_logging) nie ładuje WebDrivera.
 """
 import time
 import logging
 import os
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.action_chains import ActionChains
 from config import settings
+from src.rate_limiter import throttle
+from src.driver_profiler import phase
 
 
 def setup_logging():
     """Ustawia podstawowe logowanie do pliku i konsoli."""
+    settings.ensure_directories()
     log_file = os.path.join(settings.LOG_DIR, "bot.log")
     
     logging.basicConfig(
@@ -40,6 +41,10 @@ def wait_for_element_and_click(driver, locator, timeout=10, retry_count=3):
     Returns:
         element lub None
     """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
+
     for attempt in range(retry_count):
         try:
             element = WebDriverWait(driver, timeout).until(
@@ -50,7 +55,8 @@ def wait_for_element_and_click(driver, locator, timeout=10, retry_count=3):
             driver.execute_script("arguments[0].scrollIntoView(true);", element)
             time.sleep(0.5)
             
-            # Spróbuj kliknąć normalnie
+            # Spróbuj kliknąć normalnie (w ramach limitu akcji)
+            throttle("click")
             element.click()
             return element
             
@@ -99,10 +105,15 @@ def wait_for_element_and_send_keys(driver, locator, text, timeout=10):
     Returns:
         element lub None
     """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
     try:
         element = WebDriverWait(driver, timeout).until(
             EC.presence_of_element_located(locator)
         )
+        throttle("send")
         element.clear()
         element.send_keys(text)
         return element
@@ -126,6 +137,10 @@ def wait_for_element_presence(driver, locator, timeout=10):
     Returns:
         element lub None
     """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
     try:
         element = WebDriverWait(driver, timeout).until(
             EC.presence_of_element_located(locator)
@@ -139,6 +154,7 @@ def wait_for_element_presence(driver, locator, timeout=10):
         return None
 
 
+@phase("cookie_popup")
 def handle_cookie_popup(driver, timeout=10):
     """
     Obsługuje popup z cookies na Facebooku - ODMAWIA opcjonalnych cookies.
@@ -150,6 +166,11 @@ def handle_cookie_popup(driver, timeout=10):
     Returns:
         bool: True jeśli popup został obsłużony, False w przeciwnym razie
     """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
+    from selenium.webdriver.common.by import By
+
     try:
         print("🍪 Sprawdzam popup cookies...")
         
@@ -201,6 +222,9 @@ def handle_cookie_popup(driver, timeout=10):
                 # Sprawdź czy element jest interaktywny
                 print(f"   📍 Element tag: {button.tag_name}, Text: {button.text[:50]}")
                 
+                # Wszystkie próby kliknięcia tego elementu liczymy jako jedną akcję
+                throttle("click")
+                
                 # Próba 1: Normalny click
                 try:
                     WebDriverWait(driver, 5).until(EC.element_to_be_clickable(selector))
@@ -269,6 +293,7 @@ def handle_cookie_popup(driver, timeout=10):
                     
                     if "decline" in btn_text.lower() or "odrzuć" in btn_text.lower():
                         print(f"   🎯 Znaleziono właściwy button: '{btn_text}'")
+                        throttle("click")
                         
                         # Przewiń i kliknij
                         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
@@ -326,6 +351,11 @@ def handle_decline_cookies(driver, timeout=5):
     Returns:
         bool: True jeśli popup został obsłużony, False w przeciwnym razie
     """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
+    from selenium.webdriver.common.by import By
+
     try:
         decline_selectors = [
             # Angielski
@@ -345,6 +375,7 @@ def handle_decline_cookies(driver, timeout=5):
                 driver.execute_script("arguments[0].scrollIntoView(true);", button)
                 time.sleep(0.3)
                 
+                throttle("click")
                 try:
                     button.click()
                 except ElementClickInterceptedException:
@@ -379,6 +410,9 @@ def wait_for_page_load(driver, timeout=10):
     Returns:
         bool: True jeśli strona się załadowała
     """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+
     try:
         WebDriverWait(driver, timeout).until(
             lambda d: d.execute_script("return document.readyState") == "complete"
@@ -0,0 +1,97 @@
+"""
+Testy jednostkowe dla kompakcji snapshotów konwersacji.
+"""
+import json
+import os
+import tempfile
+import unittest
+
+from src.compaction import compact_all, compact_conversation
+from src.exporter import iter_conversation_messages
+from src.message_store import MessageStore, get_message_store, is_message_store
+
+
+def _write_snapshot(conv_dir, name, messages):
+    os.makedirs(conv_dir, exist_ok=True)
+    with open(os.path.join(conv_dir, name), 'w', encoding='utf-8') as f:
+        json.dump({'conversation_name': 'Jan Kowalski', 'messages': messages}, f)
+
+
+def _message(minute, sender="Jan"):
+    return {'text': f"wiadomość {minute}", 'sender': sender, 'timestamp': f"2026-01-01T10:{minute:02d}:00"}
+
+
+class TestCompaction(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = os.path.join(self.tmp.name, 'data')
+        self.conv_dir = os.path.join(self.data, 'Jan_Kowalski')
+        # Drugi snapshot sięga dalej w historię i zawiera nowsze wiadomości
+        _write_snapshot(self.conv_dir, 'messages_20260101_100000.json', [_message(i) for i in (3, 4, 5)])
+        _write_snapshot(self.conv_dir, 'messages_20260102_100000.json', [_message(i) for i in (1, 2, 3, 4, 5, 6)])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_merges_snapshots_into_ordered_store(self):
+        result = compact_conversation(self.conv_dir)
+
+        self.assertEqual(result, {'snapshots': 2, 'messages': 6, 'duplicates': 3, 'superseded': 'keep'})
+        store = MessageStore(self.conv_dir)
+        self.assertEqual(store.conversation_name, 'Jan Kowalski')
+        self.assertTrue(store.ordered)
+        self.assertEqual([m['text'] for m in store.iter_messages()], [f"wiadomość {i}" for i in range(1, 7)])
+
+    def test_archive_and_incremental_recompaction(self):
+        compact_conversation(self.conv_dir, superseded='archive')
+        self.assertEqual(sorted(os.listdir(os.path.join(self.conv_dir, 'archive'))),
+                         ['messages_20260101_100000.json', 'messages_20260102_100000.json'])
+
+        _write_snapshot(self.conv_dir, 'messages_20260103_100000.json', [_message(6), _message(7, "Anna")])
+        result = compact_conversation(self.conv_dir, superseded='delete')
+
+        self.assertEqual(result['messages'], 7)
+        self.assertEqual(result['duplicates'], 1)
+        self.assertEqual(sorted(os.listdir(self.conv_dir)), ['archive', 'index_2.idx', 'segment_2_000000.log', 'store.json'])
+        # Eksport widzi tę samą historię po kompakcji
+        self.assertEqual(len(list(iter_conversation_messages(self.conv_dir))), 7)
+
+    def test_keeps_repeated_messages_within_snapshot(self):
+        conv_dir = os.path.join(self.data, 'Anna')
+        ok = {'sender': "Anna", 'text': "ok"}
+        _write_snapshot(conv_dir, 'messages_20260101_100000.json', [ok, {'sender': "Ja", 'text': "jedziesz?"}, ok])
+        _write_snapshot(conv_dir, 'messages_20260102_100000.json', [ok, {'sender': "Ja", 'text': "jedziesz?"}, ok, ok])
+
+        result = compact_conversation(conv_dir, superseded='delete')
+
+        self.assertEqual(result['messages'], 4)
+        self.assertEqual(result['duplicates'], 3)
+        self.assertEqual([m['text'] for m in get_message_store(conv_dir).iter_messages()].count("ok"), 3)
+
+    def test_reorders_unordered_store(self):
+        store = get_message_store(os.path.join(self.data, 'Anna'))
+        store.append([_message(5, "Anna")], conversation_name="Anna")
+        store.append([_message(1, "Anna")])  # starsza wiadomość po nowszej
+        self.assertFalse(store.ordered)
+
+        result = compact_conversation(store.conv_dir, min_snapshots=2)
+
+        self.assertEqual(result['snapshots'], 0)
+        self.assertTrue(store.ordered)
+        self.assertEqual([m['text'] for m in store.iter_messages()], ["wiadomość 1", "wiadomość 5"])
+
+    def test_compact_all_respects_min_snapshots(self):
+        _write_snapshot(os.path.join(self.data, 'Anna'), 'messages_20260101_100000.json', [_message(1, "Anna")])
+
+        stats = compact_all(self.data, min_snapshots=2)
+
+        self.assertEqual(stats['conversations'], 1)
+        self.assertFalse(is_message_store(os.path.join(self.data, 'Anna')))
+
+    def test_rejects_unknown_superseded_mode(self):
+        with self.assertRaises(ValueError):
+            compact_conversation(self.conv_dir, superseded='move')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Testy jednostkowe dla skompilowanej migawki konfiguracji.
+"""
+import os
+import unittest
+
+from config.config_parser import ConfigParser
+from config.config_snapshot import compile_config
+
+
+class TestConfigSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.defaults = ConfigParser.default_config()
+
+    def test_defaults_are_merged_under_partial_config(self):
+        snapshot = compile_config({'polling_interval': 3, 'debugging': {'save_screenshots': False}}, self.defaults)
+        self.assertEqual(snapshot.polling_interval, 3.0)
+        self.assertFalse(snapshot.save_screenshots)
+        self.assertTrue(snapshot.screenshot_on_error)
+        self.assertEqual(snapshot.notification_methods, frozenset({'console', 'log_file'}))
+        self.assertEqual(snapshot.get('security.max_actions_per_hour'), 100)
+        self.assertEqual(snapshot.get('missing.key', 'x'), 'x')
+
+    def test_snapshot_is_immutable(self):
+        snapshot = compile_config({}, self.defaults)
+        with self.assertRaises(AttributeError):
+            snapshot.mode = 'extract'
+        with self.assertRaises(TypeError):
+            snapshot.raw['mode'] = 'extract'
+        self.assertFalse(hasattr(snapshot, '__dict__'))
+
+    def test_rules_and_keywords_are_precompiled(self):
+        snapshot = compile_config({
+            'notifications': {'keywords': ['pilne', 'help']},
+            'auto_reply': {'rules': [
+                {'trigger': 'keyword', 'pattern': 'hello|cześć', 'response': 'Hej', 'enabled': True},
+                {'trigger': 'all', 'pattern': None, 'response': 'Nieaktywna', 'enabled': False}
+            ]},
+            'on_new_message': {'actions': [
+                {'type': 'log', 'enabled': True},
+                {'type': 'mark_as_read', 'enabled': False}
+            ]},
+            'specific_conversations': [{'name': ' Jan Kowalski ', 'enabled': True}, {'name': 'Off', 'enabled': False}]
+        }, self.defaults)
+
+        self.assertTrue(snapshot.matches_notification_keyword("To jest PILNE"))
+        self.assertFalse(snapshot.matches_notification_keyword("zwykła wiadomość"))
+        self.assertEqual(len(snapshot.auto_reply_rules), 1)
+        self.assertTrue(snapshot.auto_reply_rules[0].matches("Cześć, co tam?"))
+        self.assertEqual([action.type for action in snapshot.new_message_actions], ['log'])
+        self.assertEqual([conv.key for conv in snapshot.specific_conversations], ['jan kowalski'])
+
+    def test_invalid_pattern_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            compile_config({'auto_reply': {'rules': [{'pattern': '(', 'enabled': True}]}}, self.defaults)
+
+    def test_parser_snapshot_is_cached_until_refresh(self):
+        parser = ConfigParser(os.devnull)
+        snapshot = parser.snapshot
+        self.assertIs(parser.snapshot, snapshot)
+        parser.config['mode'] = 'extract'
+        self.assertEqual(parser.snapshot.mode, 'monitor')
+        self.assertEqual(parser.refresh_snapshot().mode, 'extract')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Testy jednostkowe dla przeładowywania konfiguracji bez restartu.
+"""
+import os
+import tempfile
+import unittest
+
+from config.config_parser import ConfigParser
+from config.config_watcher import ConfigWatcher
+
+
+class TestConfigWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "bot_config.yaml")
+        self._write("polling_interval: 10\nscope: all\n")
+        self.config = ConfigParser(self.path)
+        self.reloaded = []
+        self.watcher = ConfigWatcher(self.config, poll_interval=0.05, on_reload=self.reloaded.append)
+
+    def tearDown(self):
+        self.watcher.stop()
+        self.tmp.cleanup()
+
+    def _write(self, content):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        # Wymuś inną sygnaturę nawet przy zgrubnej rozdzielczości mtime
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_unchanged_file_is_not_reloaded(self):
+        self.assertFalse(self.watcher.check())
+        self.assertEqual(self.reloaded, [])
+
+    def test_valid_change_swaps_snapshot(self):
+        old_snapshot = self.config.snapshot
+        self._write("polling_interval: 3\nscope: specific\nspecific_conversations:\n  - name: Jan\n")
+
+        self.assertTrue(self.watcher.check())
+        self.assertIsNot(self.config.snapshot, old_snapshot)
+        self.assertEqual(self.config.snapshot.polling_interval, 3.0)
+        self.assertEqual(self.config.get_scope(), 'specific')
+        self.assertEqual(self.reloaded, [self.config.snapshot])
+
+    def test_invalid_change_is_rejected(self):
+        old_snapshot = self.config.snapshot
+        for content in ("polling_interval: [unclosed\n", "polling_interval: -1\n",
+                        "auto_reply:\n  rules:\n    - pattern: '('\n"):
+            self._write(content)
+            self.assertFalse(self.watcher.check())
+
+        self.assertIs(self.config.snapshot, old_snapshot)
+        self.assertEqual(self.watcher.get_stats()['rejected'], 3)
+        self.assertIsNotNone(self.watcher.get_stats()['last_error'])
+
+    def test_background_thread_picks_up_change(self):
+        self.watcher.start()
+        self._write("polling_interval: 7\n")
+        self.watcher._stop_event.wait(0.5)
+        self.assertEqual(self.config.snapshot.polling_interval, 7.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
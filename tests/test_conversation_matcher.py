@@ -0,0 +1,62 @@
+"""
+Testy jednostkowe dla indeksu dopasowania konwersacji.
+"""
+import unittest
+
+from config.config_snapshot import compile_config, validate_snapshot
+from config.conversation_matcher import thread_id
+
+
+def _matcher(conversations, mode='exact'):
+    return compile_config({'specific_conversations': conversations, 'conversation_matching': mode}).conversation_matcher
+
+
+def _chats(*names):
+    return [{'name': name, 'url': f"https://www.messenger.com/t/{i}/"} for i, name in enumerate(names)]
+
+
+class TestConversationMatcher(unittest.TestCase):
+    def test_thread_id(self):
+        self.assertEqual(thread_id("https://www.messenger.com/e2ee/t/123?x=1"), '123')
+        self.assertEqual(thread_id("456"), '456')
+        self.assertIsNone(thread_id("https://www.messenger.com/marketplace/"))
+
+    def test_exact_name_thread_and_pattern(self):
+        matcher = _matcher([
+            {'name': "Bot"},
+            {'thread_id': "https://www.messenger.com/t/1"},
+            {'pattern': "projekt *"},
+            {'regex': r"^rodzina\b"},
+        ])
+        chats = _chats("bot", "Jan", "Projekt Alfa", "Rodzina Kowalskich", "Chatbot pomocy", "Stary projekt x")
+        result = matcher.filter(chats)
+
+        self.assertEqual([conv['name'] for conv in result.matched], ["bot", "Jan", "Projekt Alfa", "Rodzina Kowalskich"])
+        self.assertEqual(result.matched[1]['rule'], "/t/1")
+        self.assertEqual(result.ambiguous, ())
+
+    def test_ambiguous_matches_are_reported(self):
+        matcher = _matcher([{'name': "Anna", 'priority': 'high'}, {'pattern': "An*", 'priority': 'low'}])
+        result = matcher.filter(_chats("Anna", "ANNA", "Antek"))
+
+        self.assertEqual(len(result.matched), 3)
+        self.assertEqual(matcher.rule_for({'name': "anna"}).priority, 'high')
+        # Dwie konwersacje o tej samej nazwie i konwersacje pasujące do dwóch wpisów
+        self.assertEqual(len(result.ambiguous), 3)
+        self.assertTrue(any("pasuje do 2 konwersacji" in problem for problem in result.ambiguous))
+
+    def test_substring_only_in_explicit_mode(self):
+        config = [{'name': "Bot"}]
+        chats = _chats("Chatbot pomocy", "Botanika", "Jan")
+        self.assertEqual(_matcher(config).filter(chats).matched, ())
+        self.assertEqual(len(_matcher(config, 'substring').filter(chats).matched), 2)
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            compile_config({'specific_conversations': [{'regex': "("}]})
+        problems = validate_snapshot(compile_config({'conversation_matching': 'fuzzy'}))
+        self.assertTrue(any("conversation_matching" in problem for problem in problems))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Testy jednostkowe dla wektorowych statystyk konwersacji.
+"""
+import json
+import math
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    from src.conversation_stats import (
+        INDEX_DTYPE, ConversationColumns, compute_conversation_statistics, compute_statistics,
+        parse_message_time, store_times
+    )
+    from src.exporter import Exporter
+    from src.message_store import INDEX_ENTRY, get_message_store
+
+
+def _message(sender, timestamp, text="hej", media=(), reactions=()):
+    return {'sender': sender, 'timestamp': timestamp, 'text': text, 'media': list(media),
+            'reactions': list(reactions), 'extracted_at': '2026-01-05T12:00:00'}
+
+
+@unittest.skipIf(numpy is None, "numpy nie jest zainstalowany")
+class TestConversationStats(unittest.TestCase):
+    def test_parse_message_time(self):
+        full = parse_message_time({'timestamp': '2026-01-05T08:30:00'})
+        hour_only = parse_message_time({'timestamp': '8:30 AM', 'extracted_at': '2026-01-05T12:00:00'})
+        self.assertEqual(full, hour_only)
+        self.assertTrue(math.isnan(parse_message_time({'timestamp': 'wczoraj'})))
+
+    def test_compute_statistics(self):
+        columns = ConversationColumns()
+        for message in [
+            _message("Jan", "2026-01-05T08:00:00", media=[{'type': 'image'}]),
+            _message("Jan", "2026-01-05T08:01:00"),
+            _message("Anna", "2026-01-05T08:03:00", text="cześć", reactions=["❤"]),
+            _message("Jan", "2026-01-05T10:03:00"),
+            _message("Anna", "bez daty"),
+        ]:
+            columns.add(message)
+
+        stats = compute_statistics(columns)
+
+        self.assertEqual(stats['message_count'], 5)
+        self.assertEqual(stats['dated_messages'], 5)  # "bez daty" -> extracted_at
+        self.assertEqual(stats['per_sender'], {'Jan': 3, 'Anna': 2})
+        self.assertEqual(stats['by_hour'][8], 3)
+        self.assertEqual(stats['by_weekday']['Mon'], 5)
+        self.assertEqual(stats['daily_volume'], {'2026-01-05': 5})
+        # Zmiany nadawcy: 08:01->08:03 (120 s), 08:03->10:03 (7200 s), 10:03->12:00 (7020 s)
+        self.assertEqual(stats['response_times']['count'], 3)
+        self.assertEqual(stats['response_times']['median_seconds'], 7020.0)
+        self.assertEqual(stats['response_times']['histogram']['1-5m'], 1)
+        self.assertEqual(stats['media']['by_type'], {'image': 1})
+        self.assertEqual(stats['media']['per_sender'], {'Jan': 1, 'Anna': 0})
+        self.assertEqual(stats['reactions']['total'], 1)
+
+    def test_empty_conversation(self):
+        stats = compute_statistics(ConversationColumns())
+        self.assertEqual(stats['message_count'], 0)
+        self.assertEqual(stats['response_times'], {'count': 0})
+        self.assertIsNone(stats['first_message'])
+
+    def test_exporter_writes_statistics_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conv_dir = os.path.join(tmp, 'data', 'Jan_Kowalski')
+            os.makedirs(conv_dir)
+            with open(os.path.join(conv_dir, 'messages_20260105_120000.json'), 'w', encoding='utf-8') as f:
+                json.dump({'conversation_name': 'Jan Kowalski', 'messages': [
+                    _message("Jan", "2026-01-05T08:00:00"), _message("Anna", "2026-01-05T08:02:00")
+                ]}, f)
+
+            out = os.path.join(tmp, 'exports')
+            Exporter(source_dir=os.path.join(tmp, 'data'), destination=out, formats=['json'],
+                     pattern="{conversation}_{format}", content={'include_statistics': True}).run(incremental=False)
+
+            with open(os.path.join(out, 'Jan_Kowalski_statistics.json'), encoding='utf-8') as f:
+                stats = json.load(f)
+            self.assertEqual(stats['conversation'], 'Jan Kowalski')
+            self.assertEqual(stats['per_sender'], {'Jan': 1, 'Anna': 1})
+
+    def test_store_times_read_from_index(self):
+        self.assertEqual(INDEX_DTYPE.itemsize, INDEX_ENTRY.size)
+        messages = [_message("Jan", "8:00"), _message("Anna", "2026-01-05T08:02:00"), _message("Jan", "10:03 AM")]
+        with tempfile.TemporaryDirectory() as tmp:
+            conv_dir = os.path.join(tmp, 'Jan_Kowalski')
+            get_message_store(conv_dir).append(messages, conversation_name="Jan Kowalski")
+
+            self.assertEqual(list(store_times(get_message_store(conv_dir))),
+                             [parse_message_time(message) for message in messages])
+            stats = compute_conversation_statistics(conv_dir)
+            self.assertEqual(stats['conversation'], "Jan Kowalski")
+            self.assertEqual(stats['by_hour'][8], 2)
+
+    def test_store_and_snapshot_statistics_match(self):
+        # Wiadomości bez czasu nie dostają w statystykach czasu poprzedniej wiadomości z indeksu
+        messages = [
+            {'sender': "Jan", 'text': "a"}, _message("Anna", "2026-01-05T08:00:00"),
+            {'sender': "Jan", 'text': "b"}, _message("Anna", "2026-01-05T13:00:00"),
+            _message("Jan", "2026-01-05T13:00:00"),
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            store_dir = os.path.join(tmp, 'store')
+            get_message_store(store_dir).append(messages, conversation_name="Jan")
+            snapshot_dir = os.path.join(tmp, 'snapshot')
+            os.makedirs(snapshot_dir)
+            with open(os.path.join(snapshot_dir, 'messages_20260105_120000.json'), 'w', encoding='utf-8') as f:
+                json.dump({'conversation_name': "Jan", 'messages': messages}, f)
+
+            from_store = compute_conversation_statistics(store_dir)
+            from_snapshot = compute_conversation_statistics(snapshot_dir)
+
+        self.assertEqual(from_store['dated_messages'], 3)
+        self.assertEqual(from_store, from_snapshot)
+
+
+if __name__ == '__main__':
+    unittest.main()
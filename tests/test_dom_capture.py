@@ -0,0 +1,46 @@
+"""
+Testy jednostkowe dla pobierania fragmentów DOM.
+"""
+import unittest
+
+from src.dom_capture import capture_dom, resolve_scopes
+from src.offline_extractor import extract_conversations
+
+
+class FakeDriver:
+    def __init__(self, parts):
+        self.parts = parts
+        self.calls = []
+
+    def execute_script(self, script, selectors, strip):
+        self.calls.append(selectors)
+        if selectors is None:
+            return [{'selector': 'page', 'html': '<html><body>login</body></html>'}]
+        return [part for part in self.parts if part['selector'] in selectors]
+
+
+class TestDomCapture(unittest.TestCase):
+    def test_resolve_scopes(self):
+        self.assertEqual(resolve_scopes(['main', "div.custom"]), ["div[role='main']", "div.custom"])
+        self.assertIsNone(resolve_scopes('page'))
+        self.assertIsNone(resolve_scopes(None))
+
+    def test_fragments_form_parseable_document(self):
+        sidebar = ('<div role="navigation"><div role="grid"><div role="gridcell">'
+                   '<a href="/messages/t/1/"><span dir="auto">Ala</span></a></div></div></div>')
+        driver = FakeDriver([{'selector': "div[role='navigation']", 'html': sidebar}])
+
+        html, used = capture_dom(driver, ['main', 'sidebar'])
+        self.assertEqual(used, ["div[role='navigation']"])
+        self.assertEqual(extract_conversations(html)[0]['name'], 'Ala')
+
+    def test_falls_back_to_full_page(self):
+        driver = FakeDriver([])
+        html, used = capture_dom(driver, ['main'])
+        self.assertEqual(used, ['page'])
+        self.assertIn('login', html)
+        self.assertEqual(driver.calls, [["div[role='main']"], None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Testy jednostkowe dla DriverLeaseManager.
+"""
+import threading
+import time
+import unittest
+
+from src.driver_lease import DriverLeaseManager, PRIORITY_MONITOR, PRIORITY_EXTRACTION
+
+
+class TestDriverLeaseManager(unittest.TestCase):
+    def setUp(self):
+        self.driver = object()
+        self.manager = DriverLeaseManager(self.driver)
+
+    def test_lease_is_reentrant(self):
+        with self.manager.lease("extraction") as outer:
+            with self.manager.lease("sidebar") as inner:
+                self.assertIs(inner, outer)
+                self.assertIs(inner.driver, self.driver)
+            self.assertEqual(self.manager.get_stats()['holder'], "extraction")
+        self.assertIsNone(self.manager.get_stats()['holder'])
+
+    def test_timeout_when_busy(self):
+        lease = self.manager.acquire("extraction")
+        errors = []
+
+        def other():
+            try:
+                self.manager.acquire("monitor", PRIORITY_MONITOR, timeout=0.05)
+            except TimeoutError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=other)
+        thread.start()
+        thread.join()
+        self.manager.release(lease)
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(self.manager.get_stats()['waiting'], 0)
+
+    def test_preemptible_lease_yields_to_monitor(self):
+        order = []
+        lease = self.manager.acquire("extraction", PRIORITY_EXTRACTION, preemptible=True)
+
+        def monitor_tick():
+            with self.manager.lease("monitor", PRIORITY_MONITOR) as tick:
+                order.append(("monitor", tick.previous_owner))
+
+        thread = threading.Thread(target=monitor_tick)
+        thread.start()
+
+        for _ in range(100):
+            if lease.should_yield():
+                break
+            time.sleep(0.01)
+
+        self.assertTrue(lease.yield_if_requested())
+        order.append(("extraction", lease.previous_owner))
+        self.manager.release(lease)
+        thread.join()
+
+        self.assertEqual(order, [("monitor", "extraction"), ("extraction", "monitor")])
+        stats = self.manager.get_stats()['owners']
+        self.assertEqual(stats['extraction']['yields'], 1)
+        self.assertEqual(stats['monitor']['leases'], 1)
+
+    def test_non_preemptible_lease_does_not_yield(self):
+        lease = self.manager.acquire("scheduled")
+        self.assertFalse(lease.yield_if_requested())
+        self.manager.release(lease)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Testy jednostkowe dla profilera komend WebDrivera.
+"""
+import os
+import json
+import tempfile
+import unittest
+
+from src import driver_profiler
+from src.driver_profiler import DriverProfiler, phase, current_phase, count_messages
+
+
+class FakeDriver:
+    def execute(self, driver_command, params=None):
+        return {'value': None}
+
+
+class TestDriverProfiler(unittest.TestCase):
+    def tearDown(self):
+        driver_profiler._active_profiler = None
+
+    def test_phases_nest_and_work_as_decorator(self):
+        @phase("inner")
+        def inner():
+            return current_phase()
+
+        with phase("outer"):
+            self.assertEqual(inner(), "inner")
+            self.assertEqual(current_phase(), "outer")
+        self.assertEqual(current_phase(), driver_profiler.NO_PHASE)
+
+    def test_report_groups_by_phase_and_call_site(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = DriverProfiler(report_dir=tmp)
+            driver = profiler.install(FakeDriver())
+
+            with phase("extract_messages"):
+                for _ in range(6):
+                    driver.execute("getElementText")
+                count_messages(3)
+            driver.execute("screenshot")
+
+            path = profiler.write_report()
+            with open(path, encoding='utf-8') as f:
+                report = json.load(f)
+
+        self.assertEqual(report['total_calls'], 7)
+        self.assertEqual(report['messages'], 3)
+        phases = {entry['phase']: entry for entry in report['phases']}
+        self.assertEqual(phases['extract_messages']['calls_per_message'], 2.0)
+        self.assertEqual(phases[driver_profiler.NO_PHASE]['commands'], {'screenshot': 1})
+        self.assertTrue(report['top_call_sites'][0]['site'].startswith(os.path.join('tests', 'test_driver_profiler.py')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Testy jednostkowe dla rozgłaszacza zdarzeń.
+"""
+import asyncio
+import unittest
+
+from src.event_stream import EventBroadcaster
+
+
+class TestEventBroadcaster(unittest.TestCase):
+    def test_resume_from_last_event_id(self):
+        broadcaster = EventBroadcaster(history_size=10)
+        for i in range(5):
+            broadcaster.publish('new_message', {'n': i})
+
+        subscriber = broadcaster.subscribe(last_event_id=3)
+        self.assertFalse(subscriber.history_gap)
+        self.assertEqual([subscriber.get_nowait().id, subscriber.get_nowait().id], [4, 5])
+        self.assertIsNone(subscriber.get_nowait())
+
+    def test_history_gap_is_reported(self):
+        broadcaster = EventBroadcaster(history_size=2)
+        for i in range(5):
+            broadcaster.publish('new_message', {'n': i})
+
+        subscriber = broadcaster.subscribe(last_event_id=1)
+        self.assertTrue(subscriber.history_gap)
+        self.assertEqual(subscriber.get_nowait().id, 4)
+
+    def test_slow_consumer_drops_oldest(self):
+        broadcaster = EventBroadcaster(subscriber_buffer=2)
+        subscriber = broadcaster.subscribe()
+        for i in range(5):
+            broadcaster.publish('new_message', {'n': i})
+
+        self.assertEqual(subscriber.take_dropped(), 3)
+        self.assertEqual(subscriber.take_dropped(), 0)
+        self.assertEqual(subscriber.get_nowait().data, {'n': 3})
+        self.assertEqual(broadcaster.get_stats()['dropped'], 3)
+
+    def test_async_subscriber_is_woken_from_other_thread(self):
+        broadcaster = EventBroadcaster()
+
+        async def consume():
+            loop = asyncio.get_running_loop()
+            subscriber = broadcaster.subscribe(loop=loop)
+            loop.run_in_executor(None, broadcaster.publish, 'new_message', {'n': 1})
+            event = await subscriber.get(timeout=2)
+            subscriber.close()
+            return event
+
+        event = asyncio.run(consume())
+        self.assertEqual(event.data, {'n': 1})
+        self.assertEqual(broadcaster.get_stats()['subscribers'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Testy jednostkowe dla strumieniowego eksportu wiadomości.
+"""
+import csv
+import json
+import os
+import tempfile
+import unittest
+import zipfile
+
+from src.exporter import Exporter, prepare_record
+from src.message_store import get_message_store
+
+
+def _write_snapshot(conv_dir, name, conversation, messages):
+    os.makedirs(conv_dir, exist_ok=True)
+    with open(os.path.join(conv_dir, name), 'w', encoding='utf-8') as f:
+        json.dump({'conversation_name': conversation, 'messages': messages}, f)
+
+
+def _message(i, sender="Jan"):
+    return {'index': i, 'text': f"wiadomość {i}", 'sender': sender, 'timestamp': f"10:{i:02d}",
+            'extracted_at': '2026-01-01T10:00:00'}
+
+
+class TestExporter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = os.path.join(self.tmp.name, 'data')
+        self.out = os.path.join(self.tmp.name, 'exports')
+        conv_dir = os.path.join(self.data, 'Jan_Kowalski')
+        # Dwa zachodzące na siebie snapshoty tej samej konwersacji
+        _write_snapshot(conv_dir, 'messages_20260101_100000.json', 'Jan Kowalski', [_message(i) for i in range(3)])
+        _write_snapshot(conv_dir, 'messages_20260102_100000.json', 'Jan Kowalski', [_message(i) for i in range(1, 5)])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _exporter(self, **options):
+        defaults = dict(source_dir=self.data, destination=self.out, formats=['json', 'csv', 'html', 'txt'],
+                        pattern="{conversation}_{format}")
+        defaults.update(options)
+        return Exporter(**defaults)
+
+    def test_single_pass_fans_out_to_all_formats(self):
+        stats = self._exporter().run(incremental=False)
+
+        self.assertEqual(stats['messages'], 5)
+        self.assertEqual(sorted(os.listdir(self.out)), [
+            'Jan_Kowalski_csv.csv', 'Jan_Kowalski_html.html', 'Jan_Kowalski_json.json', 'Jan_Kowalski_txt.txt'
+        ])
+        with open(os.path.join(self.out, 'Jan_Kowalski_json.json'), encoding='utf-8') as f:
+            exported = json.load(f)
+        self.assertEqual(exported['message_count'], 5)
+        self.assertEqual([m['text'] for m in exported['messages']], [f"wiadomość {i}" for i in range(5)])
+
+        with open(os.path.join(self.out, 'Jan_Kowalski_csv.csv'), encoding='utf-8', newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(len(rows), 6)
+
+    def test_zip_archives_are_streamed_per_format(self):
+        stats = self._exporter(compress=True, formats=['json', 'csv']).run(incremental=False)
+
+        self.assertEqual(len(stats['files']), 2)
+        self.assertFalse([name for name in os.listdir(self.out) if name.endswith('.tmp')])
+        with zipfile.ZipFile(os.path.join(self.out, 'all_json.json.zip')) as archive:
+            data = json.loads(archive.read('Jan_Kowalski_json.json'))
+        self.assertEqual(data['message_count'], 5)
+
+    def test_incremental_export_only_new_messages(self):
+        state_file = os.path.join(self.tmp.name, 'state.json')
+        exporter = self._exporter(formats=['json'], state_file=state_file)
+
+        self.assertEqual(exporter.run()['messages'], 5)
+        self.assertEqual(exporter.run()['messages'], 0)
+
+        _write_snapshot(os.path.join(self.data, 'Jan_Kowalski'), 'messages_20260103_100000.json',
+                        'Jan Kowalski', [_message(i) for i in range(3, 7)])
+        stats = exporter.run()
+        self.assertEqual(stats['messages'], 2)
+        # Poprzedni plik nie został nadpisany
+        self.assertEqual(len(os.listdir(self.out)), 2)
+
+    def test_incremental_export_of_message_store_uses_position_marker(self):
+        state_file = os.path.join(self.tmp.name, 'state.json')
+        exporter = self._exporter(formats=['json'], state_file=state_file, pattern="{timestamp}_{conversation}")
+        store = get_message_store(os.path.join(self.data, 'Anna'))
+        store.append([_message(i, "Anna") for i in range(1, 4)], conversation_name="Anna")
+
+        self.assertEqual(exporter.run()['messages'], 8)
+        with open(state_file, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['conversations']['Anna'], {'store': {'generation': 0, 'position': 3}})
+
+        store.append([_message(i, "Anna") for i in range(2, 6)])
+        self.assertEqual(exporter.run()['messages'], 2)
+
+        # Głębsze scrollowanie - starsza historia przed zapisaną (nowa generacja z przesunięciem)
+        store.append([_message(0, "Anna")] + list(store.iter_messages()))
+        self.assertEqual(store.generation, 1)
+        self.assertEqual(exporter.run()['messages'], 1)
+        self.assertEqual(exporter.run()['messages'], 0)
+
+    def test_prepare_record_anonymizes(self):
+        content = {'include_timestamps': False,
+                   'anonymize': {'enabled': True, 'anonymize_names': True, 'anonymize_phone_numbers': True}}
+        message = dict(_message(1), text="zadzwoń +48 600 100 200")
+        record = prepare_record("Jan Kowalski", "k", message, content)
+
+        self.assertTrue(record['sender'].startswith('Uczestnik_'))
+        self.assertTrue(record['conversation'].startswith('Uczestnik_'))
+        self.assertEqual(record['text'], "zadzwoń [telefon]")
+        self.assertNotIn('timestamp', record)
+
+
+if __name__ == '__main__':
+    unittest.main()
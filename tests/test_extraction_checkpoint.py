@@ -0,0 +1,94 @@
+"""
+Testy jednostkowe dla dziennika postępu ekstrakcji.
+"""
+import json
+import os
+import tempfile
+import unittest
+
+from src.extraction_checkpoint import CHECKPOINT_FILE, ExtractionCheckpoint, conversation_id
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestExtractionCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, CHECKPOINT_FILE)
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _checkpoint(self, mode='extract'):
+        return ExtractionCheckpoint(self.path, mode=mode, max_age_hours=24, clock=self.clock)
+
+    def test_resume_skips_done_and_continues_partial(self):
+        checkpoint = self._checkpoint()
+        self.assertFalse(checkpoint.resumed)
+        checkpoint.mark_done('/t/1', "Jan", messages=10, last_key='abc')
+        checkpoint.mark_partial('/t/2', "Anna", scrolls=20, last_key='def', messages=300)
+        checkpoint.mark_failed('/t/3', "Grupa", "Timeout")
+
+        # Przerwanie procesu - nowy przebieg czyta dziennik z dysku
+        resumed = self._checkpoint()
+        self.assertTrue(resumed.resumed)
+        self.assertTrue(resumed.is_done('/t/1'))
+        self.assertFalse(resumed.is_done('/t/3'))
+        self.assertEqual(resumed.resume_scrolls('/t/2'), 20)
+        self.assertEqual(resumed.resume_scrolls('/t/3'), 0)
+        self.assertEqual(resumed.get_stats(), {'done': 1, 'partial': 1, 'failed': 1})
+
+    def test_complete_removes_journal(self):
+        checkpoint = self._checkpoint()
+        checkpoint.mark_done('/t/1', "Jan")
+        checkpoint.mark_failed('/t/2', "Anna", "Timeout")
+        self.assertTrue(os.path.exists(self.path))
+
+        checkpoint.complete()
+
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(self._checkpoint().is_done('/t/1'))
+
+    def test_stale_or_foreign_journal_is_ignored(self):
+        self._checkpoint().mark_done('/t/1', "Jan")
+
+        self.assertFalse(self._checkpoint(mode='interactive').is_done('/t/1'))
+        self.clock.now += 25 * 3600
+        self.assertFalse(self._checkpoint().is_done('/t/1'))
+
+    def test_age_counts_from_start_of_run(self):
+        # Zapisy w kolejnych przebiegach nie przedłużają życia dziennika
+        checkpoint = self._checkpoint()
+        checkpoint.mark_done('/t/1', "Jan")
+        for _ in range(2):
+            self.clock.now += 20 * 3600
+            checkpoint = self._checkpoint()
+            checkpoint.mark_failed('/t/2', "Anna", "Timeout")
+
+        self.assertFalse(checkpoint.is_done('/t/1'))
+
+    def test_corrupted_journal_starts_fresh(self):
+        with open(self.path, 'w') as f:
+            f.write('{"conversations": {"/t/1"')
+
+        checkpoint = self._checkpoint()
+        checkpoint.mark_done('/t/2', "Anna")
+
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(list(json.load(f)['conversations']), ['/t/2'])
+
+    def test_conversation_id_prefers_url(self):
+        self.assertEqual(conversation_id({'name': "Jan", 'url': "https://www.messenger.com/t/1"}),
+                         "https://www.messenger.com/t/1")
+        self.assertEqual(conversation_id({'name': "Jan"}), "Jan")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Testy jednostkowe dla kolejki priorytetowej i budżetu ekstrakcji.
+"""
+import os
+import tempfile
+import unittest
+
+from config.config_snapshot import ConversationRule
+from config.conversation_matcher import ConversationMatcher
+from src.extraction_queue import ExtractionBudget, ExtractionQueue
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _rule(name, priority):
+    return ConversationRule(name=name, key=name.casefold(), priority=priority, actions=('monitor',))
+
+
+def _conversations(*names):
+    return [{'name': name, 'url': f"https://www.messenger.com/t/{i}"} for i, name in enumerate(names)]
+
+
+class TestExtractionQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.tmp.name, 'extraction_queue.json')
+        self.clock = FakeClock()
+        self.matcher = ConversationMatcher([_rule("Szef", 'high'), _rule("Rodzina", 'medium')])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _queue(self, aging_hours=24):
+        return ExtractionQueue(self.matcher, default_priority='low', aging_hours=aging_hours,
+                               state_file=self.state_file, clock=self.clock)
+
+    def test_priority_then_sidebar_order(self):
+        ordered = self._queue().order(_conversations("Sklep", "rodzina", "Kolega", "Szef"))
+        self.assertEqual([conv['name'] for conv in ordered], ["Szef", "rodzina", "Sklep", "Kolega"])
+        self.assertEqual([conv['priority'] for conv in ordered], ['high', 'medium', 'low', 'low'])
+
+    def test_aging_promotes_waiting_conversation(self):
+        conversations = _conversations("Sklep", "Rodzina")
+        queue = self._queue()
+        queue.order(conversations)
+        queue.mark_extracted(conversations[1])
+
+        # Po dwóch dobach "Sklep" (low) czeka od first_seen, "Rodzina" od ostatniej ekstrakcji
+        self.clock.now += 2 * 24 * 3600 + 1
+        ordered = self._queue().order(_conversations("Sklep", "Rodzina"))
+        self.assertEqual(ordered[0]['name'], "Sklep")
+        self.assertEqual(ordered[0]['queue_level'], 3)
+
+        # Bez starzenia obowiązuje skonfigurowany priorytet
+        ordered = self._queue(aging_hours=0).order(_conversations("Sklep", "Rodzina"))
+        self.assertEqual(ordered[0]['name'], "Rodzina")
+
+
+class TestExtractionBudget(unittest.TestCase):
+    def test_unlimited(self):
+        self.assertIsNone(ExtractionBudget(max_seconds=0, max_actions=0).exhausted())
+
+    def test_time_and_actions(self):
+        clock = FakeClock()
+        actions = [5]
+        budget = ExtractionBudget(max_seconds=60, max_actions=10, action_counter=lambda: actions[0], clock=clock)
+        self.assertIsNone(budget.exhausted())
+
+        actions[0] = 15
+        self.assertIn("akcje", budget.exhausted())
+        self.assertEqual(budget.used(), {'seconds': 0.0, 'actions': 10})
+
+        actions[0] = 5
+        clock.now += 61
+        self.assertIn("czas", budget.exhausted())
+
+
+if __name__ == '__main__':
+    unittest.main()
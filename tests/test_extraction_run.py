@@ -0,0 +1,126 @@
+"""
+Testy przebiegu ekstrakcji wszystkich konwersacji (dziennik, przerwanie po serii błędów).
+
+MessengerMonitor importuje Selenium - bez niego testy są pomijane.
+"""
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from config.config_parser import ConfigParser
+from src.extraction_checkpoint import CHECKPOINT_FILE, ExtractionCheckpoint
+from src.rate_limiter import TokenBucket
+
+HAS_SELENIUM = importlib.util.find_spec('selenium') is not None
+
+CONFIG = """
+mode: monitor
+extraction_queue:
+  state_file: "{tmp}/extraction_queue.json"
+extraction_checkpoint:
+  max_consecutive_failures: 3
+"""
+
+
+@unittest.skipUnless(HAS_SELENIUM, "wymaga selenium")
+class TestExtractionRun(unittest.TestCase):
+    def setUp(self):
+        from src.messenger_monitor import MessengerMonitor
+
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, 'bot_config.yaml')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(CONFIG.format(tmp=self.tmp.name))
+        self.config = ConfigParser(path)
+
+        with mock.patch('src.messenger_monitor.DebugLogger'):
+            self.monitor = MessengerMonitor(mock.MagicMock(), config=self.config)
+        self.monitor.rate_limiter = TokenBucket(100000)
+        self.monitor.extract_messages_from_conversation = lambda: [{'sender': "Anna", 'text': "ok"}]
+        self.monitor.save_messages_to_folder = lambda messages, name, output_dir: output_dir
+        self.conversations = [
+            {'name': f"Czat {i}", 'url': f"https://www.messenger.com/t/{i}/"} for i in range(6)
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self):
+        return self.monitor.extract_and_save_all_conversations(
+            conversations=[dict(conv) for conv in self.conversations], output_dir=self.tmp.name
+        )
+
+    def test_browser_failure_keeps_journal_and_resumes(self):
+        # Przeglądarka "pada" po dwóch konwersacjach - każde kolejne otwarcie się nie udaje
+        opened = []
+        self.monitor.open_conversation = lambda url: opened.append(url) or len(opened) <= 2
+
+        stats = self._run()
+
+        self.assertEqual(stats['success'], 2)
+        self.assertEqual(stats['failed'], 3)
+        self.assertIn('aborted', stats)
+        self.assertEqual(len(opened), 5)
+        journal = os.path.join(self.tmp.name, CHECKPOINT_FILE)
+        self.assertTrue(os.path.exists(journal))
+        self.assertEqual(ExtractionCheckpoint(journal, mode='monitor').get_stats()['done'], 2)
+
+        # Po ponownym zalogowaniu - ukończone konwersacje są pomijane, reszta dokończona
+        self.monitor.open_conversation = lambda url: True
+        stats = self._run()
+
+        self.assertEqual(stats['skipped'], 2)
+        self.assertEqual(stats['success'], 4)
+        self.assertFalse(os.path.exists(journal))
+
+    def test_failing_and_empty_chats_do_not_keep_journal(self):
+        # Czat bez URL zawsze się nie udaje, trzy puste czaty pod rząd to nie awaria przeglądarki
+        self.conversations[0].pop('url')
+        empty = {f"https://www.messenger.com/t/{i}/" for i in (1, 2, 3)}
+        opened = []
+        self.monitor.open_conversation = lambda url: opened.append(url) or True
+        self.monitor.extract_messages_from_conversation = lambda: (
+            [] if opened[-1] in empty else [{'sender': "Anna", 'text': "ok"}])
+
+        stats = self._run()
+
+        self.assertNotIn('aborted', stats)
+        self.assertEqual((stats['success'], stats['empty'], stats['failed']), (2, 3, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, CHECKPOINT_FILE)))
+
+        # Kolejny przebieg pobiera wszystkie konwersacje od nowa
+        opened.clear()
+        stats = self._run()
+        self.assertEqual(stats['skipped'], 0)
+        self.assertEqual(len(opened), 5)
+
+    def test_reports_opens_avoided_for_harvested_list(self):
+        self.monitor.open_conversation = lambda url: True
+        self.conversations[0]['archived'] = True
+        self.conversations = self.monitor._filter_conversations_by_config(self.conversations)
+
+        stats = self._run()
+
+        self.assertEqual(stats['success'], 5)
+        self.assertEqual(stats['opens_avoided'], 1)
+
+    def test_budget_exhaustion_keeps_journal(self):
+        def open_conversation(url):
+            self.monitor.rate_limiter.acquire(action="navigation")
+            return True
+        self.monitor.open_conversation = open_conversation
+        settings = dict(self.config.get_extraction_queue_settings(), max_actions=2)
+
+        with mock.patch.object(self.config, 'get_extraction_queue_settings', return_value=settings):
+            stats = self._run()
+
+        self.assertEqual(stats['success'], 2)
+        self.assertIn("akcje", stats['budget_exhausted'])
+        journal = os.path.join(self.tmp.name, CHECKPOINT_FILE)
+        self.assertEqual(ExtractionCheckpoint(journal, mode='monitor').get_stats()['done'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Testy jednostkowe dla atrapy Messengera używanej w benchmarkach.
+"""
+import json
+import unittest
+import urllib.request
+
+from benchmarks.fake_messenger import FakeMessengerApp, FakeMessengerServer, generate_conversations
+
+
+class TestSyntheticData(unittest.TestCase):
+    def test_generation_is_deterministic(self):
+        first = generate_conversations(5, 100, seed=7)
+        second = generate_conversations(5, 100, seed=7)
+        self.assertEqual([c.name for c in first], [c.name for c in second])
+        self.assertEqual(first[2].message(42), second[2].message(42))
+
+    def test_messages_are_clamped_to_range(self):
+        conv = generate_conversations(1, 10)[0]
+        self.assertEqual([m['index'] for m in conv.messages(-5, 3)], [0, 1, 2])
+        self.assertEqual(len(conv.messages(8, 50)), 2)
+
+
+class TestFakeMessengerServer(unittest.TestCase):
+    def setUp(self):
+        self.conversations = generate_conversations(3, 100, seed=1, unread_ratio=0)
+        self.app = FakeMessengerApp(self.conversations, batch_size=20)
+        self.server = FakeMessengerServer(self.app).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _get(self, path):
+        with urllib.request.urlopen(self.server.base_url + path, timeout=5) as response:
+            return response.read().decode('utf-8')
+
+    def test_sidebar_and_initial_rows(self):
+        cid = self.conversations[0].id
+        page = self._get(f"/messages/t/{cid}/")
+        self.assertIn(f'href="/messages/t/{cid}/"', page)
+        self.assertIn('<span dir="auto">', page)
+        self.assertEqual(page.count('role="row"'), 20)
+        self.assertIn('data-oldest="80"', page)
+
+    def test_history_pages_backwards(self):
+        cid = self.conversations[1].id
+        payload = json.loads(self._get(f"/api/t/{cid}/history?before=30&limit=20"))
+        self.assertEqual(payload['oldest'], 10)
+        self.assertEqual([m['index'] for m in payload['messages']], list(range(10, 30)))
+
+    def test_unread_control(self):
+        cid = self.conversations[2].id
+        request = urllib.request.Request(f"{self.server.base_url}/control/unread/{cid}", data=b'', method='POST')
+        urllib.request.urlopen(request, timeout=5).close()
+        self.assertEqual(json.loads(self._get("/api/unread"))['unread'], [cid])
+        self.assertIn('aria-label="Unread"', self._get("/messages/"))
+
+
+if __name__ == '__main__':
+    unittest.main()
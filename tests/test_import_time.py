@@ -0,0 +1,72 @@
+"""
+Budżet czasu importu modułów używanych bez przeglądarki.
+
+Sprawdzanie konfiguracji, parser offline i CLI nie powinny ładować
+Selenium, webdriver_manager ani .env. Pomiar przez `python -X importtime`
+w osobnym procesie (czysty sys.modules).
+"""
+import os
+import subprocess
+import sys
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Moduły, które muszą importować się bez Selenium
+LIGHT_MODULES = (
+    'config.settings',
+    'config.config_parser',
+    'config.config_watcher',
+    'src.utils',
+    'src.debug_logger',
+    'src.scheduler',
+    'src.offline_extractor',
+)
+
+FORBIDDEN_PACKAGES = ('selenium', 'webdriver_manager', 'dotenv')
+
+# Łączny czas importu (ms) - z zapasem na wolne maszyny CI; sam Selenium to zwykle 150+ ms
+IMPORT_BUDGET_MS = 400
+
+
+def _measure():
+    code = (
+        "import sys\n"
+        f"import {', '.join(LIGHT_MODULES)}\n"
+        "print(','.join(sorted({m.split('.')[0] for m in sys.modules})))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=60
+    )
+    if result.returncode != 0:
+        raise AssertionError(result.stderr[-2000:])
+
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Tylko moduły najwyższego poziomu - cumulative zawiera już zależności
+        if not name[1:].startswith(' '):
+            total_us += int(cumulative)
+
+    return total_us / 1000, set(result.stdout.strip().split(','))
+
+
+class TestImportTime(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.total_ms, cls.loaded = _measure()
+
+    def test_heavy_packages_are_not_imported(self):
+        for package in FORBIDDEN_PACKAGES:
+            self.assertNotIn(package, self.loaded)
+
+    def test_import_time_budget(self):
+        self.assertLess(self.total_ms, IMPORT_BUDGET_MS,
+                        f"Import trwał {self.total_ms:.1f} ms (budżet {IMPORT_BUDGET_MS} ms)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Testy jednostkowe dla systemu zadań w tle.
+"""
+import threading
+import unittest
+
+from src.jobs import Job, JobManager
+
+
+class TestJobManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = JobManager(max_workers=1)
+
+    def tearDown(self):
+        self.manager.shutdown()
+
+    def wait_for(self, job, states=Job.FINISHED_STATES):
+        for _ in range(200):
+            if job.status in states:
+                return
+            threading.Event().wait(0.01)
+        self.fail(f"Zadanie nie zakończyło się (status: {job.status})")
+
+    def test_result_and_progress(self):
+        def work(job, count):
+            job.update_progress(conversations_total=count)
+            for i in range(count):
+                job.update_progress(conversations_done=i + 1, messages=(i + 1) * 10)
+            return {'success': count}
+
+        job = self.manager.submit("test", work, parameters={"count": 3})
+        self.wait_for(job)
+
+        data = job.to_dict()
+        self.assertEqual(data['status'], Job.COMPLETED)
+        self.assertEqual(data['result'], {'success': 3})
+        self.assertEqual(data['progress']['messages'], 30)
+
+    def test_cooperative_cancel(self):
+        started = threading.Event()
+
+        def work(job):
+            started.set()
+            job.cancel_event.wait(5)
+            return None
+
+        job = self.manager.submit("test", work)
+        self.assertTrue(started.wait(2))
+        self.manager.cancel(job.id)
+        self.wait_for(job)
+        self.assertEqual(job.status, Job.CANCELLED)
+
+    def test_failure_is_reported(self):
+        def work(job):
+            raise RuntimeError("boom")
+
+        job = self.manager.submit("test", work)
+        self.wait_for(job)
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.error, "boom")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Testy jednostkowe dla zapytań API o historię konwersacji.
+"""
+import os
+import tempfile
+import unittest
+
+from src.message_query import (
+    PageCache, QueryError, decode_cursor, encode_cursor, list_conversations, query_messages
+)
+from src.message_store import get_message_store
+
+
+def _message(i):
+    return {'text': f"wiadomość {i}", 'sender': "Jan", 'timestamp': f"2026-01-01T{10 + i // 60:02d}:{i % 60:02d}:00"}
+
+
+class TestMessageQuery(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = os.path.join(self.tmp.name, 'data')
+        self.conv_dir = os.path.join(self.data, 'Jan_Kowalski')
+        self.store = get_message_store(self.conv_dir)
+        self.store.append([_message(i) for i in range(25)], conversation_name="Jan Kowalski")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_cursor_roundtrip(self):
+        self.assertEqual(decode_cursor(encode_cursor(3, 120)), (3, 120))
+        with self.assertRaises(QueryError):
+            decode_cursor("nie-kursor")
+
+    def test_pages_backwards_and_forwards(self):
+        page, _ = query_messages(self.conv_dir, limit=10)
+        self.assertEqual([m['text'] for m in page['messages']], [f"wiadomość {i}" for i in range(15, 25)])
+        self.assertIsNone(page['cursors']['after'])
+
+        older, _ = query_messages(self.conv_dir, before=page['cursors']['before'], limit=10)
+        oldest, _ = query_messages(self.conv_dir, before=older['cursors']['before'], limit=10)
+        self.assertEqual(older['messages'][0]['text'], "wiadomość 5")
+        self.assertEqual(len(oldest['messages']), 5)
+        self.assertIsNone(oldest['cursors']['before'])
+
+        newer, _ = query_messages(self.conv_dir, after=oldest['cursors']['after'], limit=10)
+        self.assertEqual(newer['messages'], older['messages'])
+
+    def test_etag_and_page_cache(self):
+        cache = PageCache(max_pages=2)
+        page, etag = query_messages(self.conv_dir, limit=10, cache=cache)
+
+        self.assertEqual(query_messages(self.conv_dir, limit=10, cache=cache, if_none_match=etag), (None, etag))
+        query_messages(self.conv_dir, before=page['cursors']['before'], limit=10, cache=cache)
+        query_messages(self.conv_dir, limit=10, cache=cache)
+        self.assertEqual(cache.get_stats()['hits'], 1)
+
+        # Nowa wiadomość zmienia najnowszą stronę, a więc i jej ETag
+        self.store.append([_message(30)])
+        _, new_etag = query_messages(self.conv_dir, limit=10, cache=cache, if_none_match=etag)
+        self.assertNotEqual(new_etag, etag)
+
+    def test_cursor_expires_after_rewrite(self):
+        page, _ = query_messages(self.conv_dir, limit=10)
+        self.store.rewrite(list(self.store.iter_messages()))
+
+        with self.assertRaises(QueryError):
+            query_messages(self.conv_dir, before=page['cursors']['before'])
+
+    def test_list_conversations(self):
+        os.makedirs(os.path.join(self.data, 'Stary_Format'))
+        with open(os.path.join(self.data, 'Stary_Format', 'messages_20260101_100000.json'), 'w') as f:
+            f.write('{"messages": []}')
+
+        conversations, etag = list_conversations(self.data)
+
+        self.assertEqual([c['id'] for c in conversations], ['Jan_Kowalski', 'Stary_Format'])
+        self.assertEqual(conversations[0]['message_count'], 25)
+        self.assertEqual(conversations[0]['last_message'], '2026-01-01T10:24:00')
+        self.assertEqual(conversations[1]['storage'], 'json')
+        self.assertEqual(list_conversations(self.data)[1], etag)
+        with self.assertRaises(QueryError):
+            query_messages(os.path.join(self.data, 'Stary_Format'))
+
+
+if __name__ == '__main__':
+    unittest.main()
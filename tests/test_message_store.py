@@ -0,0 +1,104 @@
+"""
+Testy jednostkowe dla magazynu segmentów historii konwersacji.
+"""
+import calendar
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from src.message_schema import message_key
+from src.message_store import INDEX_ENTRY, MessageStore
+
+
+def _message(minute, sender="Jan"):
+    return {'text': f"wiadomość {minute}", 'sender': sender, 'timestamp': f"2026-01-01T10:{minute:02d}:00"}
+
+
+def _epoch(minute):
+    return calendar.timegm(datetime(2026, 1, 1, 10, minute).timetuple())
+
+
+class TestMessageStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.conv_dir = os.path.join(self.tmp.name, 'Jan_Kowalski')
+        self.store = MessageStore(self.conv_dir, segment_max_bytes=256)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_append_skips_known_messages_and_rotates_segments(self):
+        self.assertEqual(self.store.append([_message(i) for i in range(5)], conversation_name="Jan Kowalski"), 5)
+        self.assertEqual(self.store.append([_message(i) for i in range(3, 8)]), 3)
+
+        self.assertEqual(len(self.store), 8)
+        self.assertGreater(self.store.get_stats()['segments'], 1)
+        self.assertEqual(self.store.get(message_key(_message(6)))['text'], "wiadomość 6")
+        self.assertIsNone(self.store.get(message_key(_message(30))))
+
+        reopened = MessageStore(self.conv_dir)
+        self.assertEqual(reopened.conversation_name, "Jan Kowalski")
+        self.assertEqual([m['text'] for m in reopened.tail(2)], ["wiadomość 6", "wiadomość 7"])
+        reopened.close()
+
+    def test_repeated_messages_without_timestamp_are_kept(self):
+        batch = [{'sender': "Anna", 'text': "ok"}, {'sender': "Ja", 'text': "jedziesz?"}, {'sender': "Anna", 'text': "ok"}]
+        self.assertEqual(self.store.append(batch), 3)
+
+        # Kolejny przebieg: to samo okno plus nowe "ok" - pokrywająca się część jest pomijana
+        self.assertEqual(self.store.append(batch[1:] + [{'sender': "Anna", 'text': "ok"}]), 1)
+        self.assertEqual([m['text'] for m in self.store.iter_messages()], ["ok", "jedziesz?", "ok", "ok"])
+
+        # Głębsze scrollowanie - starsza historia przed całym magazynem, nowa generacja w kolejności partii
+        older = [{'sender': "Ja", 'text': "ok"}]
+        self.assertEqual(self.store.append(older + list(self.store.iter_messages())), 1)
+        self.assertEqual(self.store.generation, 1)
+        self.assertEqual(len(self.store), 5)
+        self.assertEqual(self.store.read(0)['sender'], "Ja")
+
+    def test_time_range_queries(self):
+        self.store.append([_message(i) for i in range(10)])
+
+        self.assertEqual(self.store.bisect_time(_epoch(4)), 4)
+        self.assertEqual(list(self.store.positions_between(_epoch(2), _epoch(5))), [2, 3, 4])
+        self.assertEqual([m['text'] for m in self.store.since(_epoch(8))], ["wiadomość 8", "wiadomość 9"])
+
+        # Starsza wiadomość dopisana po nowszych - zapytania przechodzą na przegląd indeksu
+        self.store.append([{'text': "stara", 'sender': "Anna", 'timestamp': "2026-01-01T09:00:00"}])
+        self.assertFalse(self.store.ordered)
+        with self.assertRaises(ValueError):
+            self.store.bisect_time(_epoch(4))
+        self.assertEqual(list(self.store.positions_between(before=_epoch(1))), [0, 10])
+
+    def test_rewrite_creates_new_generation(self):
+        self.store.append([_message(i) for i in (3, 1, 2)])
+
+        self.assertEqual(self.store.rewrite(sorted(self.store.iter_messages(), key=lambda m: m['timestamp'])), 3)
+
+        self.assertEqual(self.store.generation, 1)
+        self.assertTrue(self.store.ordered)
+        # Kolejność niezachowana - pozycje poprzedniej generacji nie przenoszą się
+        self.assertIsNone(self.store.carried_offset(0))
+        self.assertEqual([m['text'] for m in self.store.read_range(0, 3)],
+                         ["wiadomość 1", "wiadomość 2", "wiadomość 3"])
+        self.assertFalse([name for name in os.listdir(self.conv_dir) if name.startswith(('index_0', 'segment_0'))])
+
+    def test_recovers_from_interrupted_append(self):
+        self.store.append([_message(1), _message(2)])
+        with open(os.path.join(self.conv_dir, 'index_0.idx'), 'ab') as f:
+            f.write(b'\x00' * (INDEX_ENTRY.size // 2))
+        with open(os.path.join(self.conv_dir, 'segment_0_000000.log'), 'ab') as f:
+            f.write(b'\x00\x00\x00\x10{"niedokonczony')
+
+        reopened = MessageStore(self.conv_dir)
+        self.assertEqual(len(reopened), 2)
+        self.assertEqual(reopened.append([_message(3)]), 1)
+        self.assertEqual([m['text'] for m in reopened.iter_messages()],
+                         ["wiadomość 1", "wiadomość 2", "wiadomość 3"])
+        reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Testy jednostkowe dla metryk Prometheusa.
+"""
+import unittest
+
+from src.metrics import WEBDRIVER_COMMAND_SECONDS, MetricsRegistry, instrument_driver
+
+
+class FakeDriver:
+    def execute(self, driver_command, params=None):
+        return {'value': driver_command}
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_counter_renders_with_labels(self):
+        registry = MetricsRegistry()
+        errors = registry.counter("test_errors_total", "Błędy", ("component",))
+        errors.labels("scroll").inc()
+        errors.labels("scroll").inc(2)
+
+        output = registry.render()
+        self.assertIn("# TYPE test_errors_total counter", output)
+        self.assertIn('test_errors_total{component="scroll"} 3.0', output)
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("test_seconds", "Czas", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        output = registry.render()
+        self.assertIn('test_seconds_bucket{le="0.1"} 1', output)
+        self.assertIn('test_seconds_bucket{le="1.0"} 2', output)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 3', output)
+        self.assertIn('test_seconds_count 3', output)
+
+    def test_gauge_errors_are_skipped(self):
+        registry = MetricsRegistry()
+        registry.gauge("test_ok", "OK", lambda: 7)
+        registry.gauge("test_broken", "Błąd", lambda: 1 / 0)
+
+        output = registry.render()
+        self.assertIn("test_ok 7", output)
+        samples = [line for line in output.splitlines() if not line.startswith('#')]
+        self.assertEqual(samples, ["test_ok 7"])
+
+
+class TestInstrumentDriver(unittest.TestCase):
+    def test_commands_are_passed_through(self):
+        histogram = WEBDRIVER_COMMAND_SECONDS.labels("findElements")
+        count, total = histogram.count, histogram.sum
+
+        driver = instrument_driver(FakeDriver())
+        self.assertEqual(driver.execute("findElements", {'using': 'css selector'}), {'value': 'findElements'})
+
+        self.assertEqual(histogram.count, count + 1)
+        self.assertGreaterEqual(histogram.sum, total)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Testy jednostkowe dla ekstrakcji offline ze snapshotów HTML.
+"""
+import gzip
+import os
+import tempfile
+import unittest
+
+from src.html_dom import parse_html
+from src.offline_extractor import extract_conversations, extract_messages, process_directory
+from benchmarks.fake_messenger import FakeMessengerApp, generate_conversations
+
+SNAPSHOT = """
+<html><head><script>var x = "<div role='row'>nie</div>";</script></head><body>
+<div role="navigation"><div role="grid">
+  <div role="gridcell"><a href="/messages/t/123/"><span dir="auto">Anna   Nowak</span></a></div>
+  <div role="gridcell"><div>separator</div></div>
+  <div role="gridcell" aria-label="Grupa"><a href="https://www.facebook.com/messages/e2ee/t/9/"></a></div>
+</div></div>
+<div role="main">
+  <div role="row" aria-label="Anna said 'Cześć'"><span aria-label="12:30"></span><div>Cześć</div>
+    <span aria-label="1 reaction: ❤">❤</span></div>
+  <div role="row" aria-label="You sent 'plik'"><a href="/files/raport.pdf">raport.pdf</a></div>
+  <div role="row"><img src="data:image/png;base64,AAA"></div>
+</div>
+</body></html>
+"""
+
+
+class TestSelectors(unittest.TestCase):
+    def test_descendant_child_and_attribute_operators(self):
+        doc = parse_html("<div role='main'><p class='a b'><span id='x' data-k='v-1'>t</span></p></div>")
+        self.assertEqual(len(doc.find_elements("div[role='main'] > p.b > span#x")), 1)
+        self.assertEqual(len(doc.find_elements("div > span")), 0)
+        self.assertEqual(len(doc.find_elements("[data-k^='v'], [data-k$='1'], [data-k*='-']")), 1)
+
+    def test_ancestors_may_be_outside_scope(self):
+        doc = parse_html("<div role='grid'><div id='cell'><span>x</span></div></div>")
+        cell = doc.find_element("#cell")
+        self.assertEqual(len(cell.find_elements("div[role='grid'] span")), 1)
+
+
+class TestOfflineExtractor(unittest.TestCase):
+    def test_conversations_schema(self):
+        conversations = extract_conversations(SNAPSHOT)
+        self.assertEqual(conversations, [
+            {'name': 'Anna Nowak', 'url': 'https://www.facebook.com/messages/t/123/'},
+            {'name': 'Grupa', 'url': 'https://www.facebook.com/messages/e2ee/t/9/'},
+        ])
+
+    def test_messages_schema(self):
+        messages = extract_messages(SNAPSHOT, extracted_at='2024-01-01T00:00:00')
+        self.assertEqual(len(messages), 2)
+        first, second = messages
+        self.assertEqual(first['text'], 'Cześć\n❤')
+        self.assertEqual(first['timestamp'], '12:30')
+        self.assertEqual(first['sender'], 'Anna')
+        self.assertEqual(first['reactions'], ['1 reaction: ❤'])
+        self.assertEqual(second['sender'], 'You')
+        self.assertEqual(second['media'][0]['type'], 'document')
+        self.assertEqual(second['media'][0]['url'], 'https://www.facebook.com/files/raport.pdf')
+
+    def test_respects_data_to_collect(self):
+        config = {'messages': {'include_sender_info': False, 'include_timestamps': False}}
+        messages = extract_messages(SNAPSHOT, data_config=config)
+        self.assertNotIn('sender', messages[0])
+        self.assertNotIn('timestamp', messages[0])
+
+    def test_fake_messenger_page(self):
+        conversations = generate_conversations(4, 50, seed=3)
+        app = FakeMessengerApp(conversations, batch_size=25)
+        html = app.render_page(conversations[0].id)
+
+        self.assertEqual(len(extract_conversations(html)), 4)
+        messages = extract_messages(html)
+        self.assertEqual(len(messages), 25)
+        expected = conversations[0].message(49)
+        self.assertEqual(messages[-1]['sender'], expected['sender'])
+
+    def test_process_directory_reads_gzip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, 'event'))
+            with gzip.open(os.path.join(tmp, 'event', 'page_source.html.gz'), 'wt', encoding='utf-8') as f:
+                f.write(SNAPSHOT)
+            with open(os.path.join(tmp, 'event', 'debug.log'), 'w') as f:
+                f.write('log')
+
+            results = list(process_directory(tmp, workers=1))
+
+        self.assertEqual(len(results), 1)
+        self.assertIsNone(results[0]['error'])
+        self.assertEqual(len(results[0]['messages']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
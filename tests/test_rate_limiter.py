@@ -0,0 +1,80 @@
+"""
+Testy jednostkowe dla TokenBucket.
+"""
+import threading
+import unittest
+
+from src.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bucket = TokenBucket(rate_per_hour=3600, capacity=2, clock=self.clock)
+
+    def test_burst_then_reject(self):
+        self.assertTrue(self.bucket.try_acquire(action="click"))
+        self.assertTrue(self.bucket.try_acquire(action="click"))
+        self.assertFalse(self.bucket.try_acquire(action="click"))
+
+        stats = self.bucket.get_stats()
+        self.assertEqual(stats['acquired'], 2)
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['by_action'], {'click': 2})
+
+    def test_refill_over_time(self):
+        self.bucket.try_acquire(2)
+        self.assertAlmostEqual(self.bucket.time_until_available(), 1.0)
+
+        self.clock.now += 1.0
+        self.assertAlmostEqual(self.bucket.available_tokens(), 1.0)
+        self.assertTrue(self.bucket.try_acquire())
+
+    def test_capacity_is_upper_bound(self):
+        self.clock.now += 1000
+        self.assertEqual(self.bucket.available_tokens(), 2)
+
+    def test_blocking_timeout(self):
+        self.bucket.try_acquire(2)
+        self.assertFalse(self.bucket.acquire(blocking=True, timeout=0))
+
+    def test_disabled_bucket_always_allows(self):
+        bucket = TokenBucket(rate_per_hour=0, enabled=False, clock=self.clock)
+        for _ in range(10):
+            self.assertTrue(bucket.acquire(action="scroll"))
+        self.assertEqual(bucket.get_stats()['acquired'], 10)
+
+    def test_non_positive_rate_is_rejected_when_enabled(self):
+        for rate in (0, None, -5):
+            with self.assertRaises(ValueError):
+                TokenBucket(rate_per_hour=rate, clock=self.clock)
+        with self.assertRaises(ValueError):
+            self.bucket.reconfigure(0)
+        self.assertTrue(self.bucket.try_acquire())
+
+    def test_thread_acquired_counts_only_current_thread(self):
+        bucket = TokenBucket(rate_per_hour=0, enabled=False, clock=self.clock)
+        bucket.acquire(action="scroll")
+
+        def other():
+            for _ in range(5):
+                bucket.acquire(action="navigation")
+
+        worker = threading.Thread(target=other)
+        worker.start()
+        worker.join()
+
+        self.assertEqual(bucket.thread_acquired(), 1)
+        self.assertEqual(bucket.get_stats()['acquired'], 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
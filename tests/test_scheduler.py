@@ -0,0 +1,77 @@
+"""
+Testy jednostkowe dla harmonogramu zadań okresowych.
+"""
+import json
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+
+from src.scheduler import ActiveWindow, PeriodicScheduler
+
+
+class TestActiveWindow(unittest.TestCase):
+    def test_disabled_window_is_always_active(self):
+        window = ActiveWindow(enabled=False)
+        self.assertTrue(window.is_active(datetime(2025, 11, 2, 3, 0)))
+
+    def test_day_window(self):
+        window = ActiveWindow(enabled=True, start='08:00', end='22:00', days=[1, 2, 3, 4, 5])
+        self.assertTrue(window.is_active(datetime(2025, 11, 3, 8, 0)))    # poniedziałek
+        self.assertFalse(window.is_active(datetime(2025, 11, 3, 22, 0)))
+        self.assertFalse(window.is_active(datetime(2025, 11, 2, 12, 0)))  # niedziela
+
+    def test_overnight_window(self):
+        window = ActiveWindow(enabled=True, start='22:00', end='06:00', days=[5])
+        self.assertTrue(window.is_active(datetime(2025, 11, 7, 23, 0)))   # piątek
+        self.assertTrue(window.is_active(datetime(2025, 11, 8, 5, 59)))   # sobota rano
+        self.assertFalse(window.is_active(datetime(2025, 11, 8, 23, 0)))
+
+    def test_seconds_until_active(self):
+        window = ActiveWindow(enabled=True, start='08:00', end='22:00', days=[1])
+        self.assertEqual(window.seconds_until_active(datetime(2025, 11, 3, 7, 30)), 1800)
+
+
+class TestPeriodicScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.tmp.name, 'state.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_job_runs_and_persists_next_run(self):
+        done = threading.Event()
+        scheduler = PeriodicScheduler(state_file=self.state_file)
+        scheduler.add_job('job', 3600, lambda: done.set())
+        scheduler.start()
+        try:
+            self.assertTrue(done.wait(2))
+        finally:
+            scheduler.stop()
+
+        with open(self.state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        self.assertIn('job', state['next_run'])
+        self.assertEqual(scheduler.get_status()[0]['run_count'], 1)
+
+    def test_restart_keeps_future_next_run(self):
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump({'next_run': {'job': 10_000.0}}, f)
+
+        scheduler = PeriodicScheduler(state_file=self.state_file, clock=lambda: 5_000.0)
+        job = scheduler.add_job('job', 60, lambda: None)
+        self.assertEqual(job.next_run, 10_000.0)
+
+    def test_overdue_job_runs_once(self):
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump({'next_run': {'job': 1.0}}, f)
+
+        scheduler = PeriodicScheduler(state_file=self.state_file, clock=lambda: 5_000.0)
+        job = scheduler.add_job('job', 60, lambda: None)
+        self.assertEqual(job.next_run, 5_000.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Testy jednostkowe dla klasyfikacji i filtrowania listy czatów.
+"""
+import os
+import tempfile
+import unittest
+
+from src.message_schema import classify_sidebar_row
+from src.message_store import get_message_store
+from src.sidebar_filter import SidebarFilter, stored_message_count
+
+
+class TestClassifySidebarRow(unittest.TestCase):
+    def test_private_read_row(self):
+        flags = classify_sidebar_row("Anna Nowak", {'label': "Anna Nowak", 'avatars': 1, 'path': '/t/1/'})
+        self.assertEqual(flags, {'is_group': None, 'muted': False, 'unread': False, 'archived': False})
+
+    def test_markers(self):
+        flags = classify_sidebar_row("Projekt", {
+            'label': "Projekt, Czat grupowy · Unread · Powiadomienia wyciszone", 'path': '/messages/archived/'
+        })
+        self.assertEqual(flags, {'is_group': True, 'muted': True, 'unread': True, 'archived': True})
+        self.assertTrue(classify_sidebar_row("Projekt", {'avatars': 2})['is_group'])
+        self.assertTrue(classify_sidebar_row("Jan", {'label': "Jan", 'unread_indicator': True})['unread'])
+
+    def test_preview_text_and_names_do_not_set_flags(self):
+        for name, label in [
+            ("Kowalski, Jan", "Kowalski, Jan, idziemy grupą? Unread messages are archived"),
+            ("Foo, Inc.", "Foo, Inc. · ok, muted the group chat, now unread"),
+        ]:
+            flags = classify_sidebar_row(name, {'label': label, 'avatars': 1, 'path': '/t/1/'})
+            self.assertEqual(flags, {'is_group': None, 'muted': False, 'unread': False, 'archived': False})
+
+    def test_undetermined_features_are_unknown(self):
+        flags = classify_sidebar_row("Anna", {})
+        self.assertEqual(flags, {'is_group': None, 'muted': None, 'unread': None, 'archived': None})
+        sidebar_filter = SidebarFilter(scope='groups', exclude_muted=True, only_unread=True)
+        kept, _ = sidebar_filter.apply([dict(name="Anna", **flags)])
+        self.assertEqual(len(kept), 1)
+
+
+class TestSidebarFilter(unittest.TestCase):
+    def _rows(self):
+        return [
+            {'name': "Anna", 'is_group': False, 'muted': False, 'unread': True, 'archived': False},
+            {'name': "Grupa", 'is_group': True, 'muted': True, 'unread': False, 'archived': False},
+            {'name': "Stary", 'is_group': False, 'muted': False, 'unread': False, 'archived': True},
+            {'name': "Nieznany"},
+        ]
+
+    def test_scope_and_filters(self):
+        kept, stats = SidebarFilter(scope='private', exclude_muted=True).apply(self._rows())
+        self.assertEqual([conv['name'] for conv in kept], ["Anna", "Nieznany"])
+        self.assertEqual(stats['opens_avoided'], 2)
+        self.assertEqual(stats['excluded']['scope'], 1)
+        self.assertEqual(stats['excluded']['archived'], 1)
+
+        kept, _ = SidebarFilter(scope='groups', exclude_archived=False).apply(self._rows())
+        self.assertEqual([conv['name'] for conv in kept], ["Grupa", "Nieznany"])
+
+        kept, stats = SidebarFilter(only_unread=True).apply(self._rows())
+        self.assertEqual([conv['name'] for conv in kept], ["Anna", "Nieznany"])
+        self.assertEqual(stats['excluded']['read'], 1)
+
+    def test_min_message_count_uses_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conv_dir = os.path.join(tmp, 'Anna')
+            store = get_message_store(conv_dir)
+            store.append([{'sender': 'Anna', 'text': f"m{i}", 'timestamp': f"2024-01-01T10:0{i}:00"} for i in range(3)],
+                         conversation_name="Anna")
+            store.close()
+
+            self.assertEqual(stored_message_count(conv_dir), 3)
+            self.assertIsNone(stored_message_count(os.path.join(tmp, 'Brak')))
+
+            count = lambda conv: stored_message_count(os.path.join(tmp, conv['name']))
+            kept, stats = SidebarFilter(min_message_count=5, message_count=count).apply([{'name': "Anna"}, {'name': "Brak"}])
+            self.assertEqual([conv['name'] for conv in kept], ["Brak"])
+            self.assertEqual(stats['excluded']['message_count'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Testy jednostkowe dla próbkowania snapshotów debugowych.
+"""
+import os
+import unittest
+
+from config.config_parser import ConfigParser
+from src.snapshot_sampler import SnapshotSampler, format_suppressed_summary
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSnapshotSampler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sampler = SnapshotSampler(
+            default_rule={'first': 2, 'per_minute': 1},
+            event_rules={'new_messages_detected': {'first': 1, 'per_minute': 2}},
+            clock=self.clock
+        )
+
+    def test_first_n_then_one_per_minute(self):
+        decisions = [self.sampler.should_capture("error")[0] for _ in range(4)]
+        self.assertEqual(decisions, [True, True, False, False])
+
+        self.clock.now = 30
+        self.assertFalse(self.sampler.should_capture("error")[0])
+        self.clock.now = 60
+        self.assertTrue(self.sampler.should_capture("error")[0])
+        self.assertFalse(self.sampler.should_capture("error")[0])
+        self.assertEqual(self.sampler.get_stats()['error'], {'seen': 7, 'suppressed': 4})
+
+    def test_event_rule_overrides_default(self):
+        self.assertTrue(self.sampler.should_capture("new_messages_detected")[0])
+        self.assertFalse(self.sampler.should_capture("new_messages_detected")[0])
+        self.clock.now = 30
+        self.assertTrue(self.sampler.should_capture("new_messages_detected")[0])
+
+    def test_suppressed_summary_goes_to_next_written_snapshot(self):
+        for _ in range(5):
+            self.sampler.should_capture("error")
+        self.sampler.should_capture("new_messages_detected")
+        self.sampler.should_capture("new_messages_detected")
+        self.sampler.should_capture("error")
+
+        capture, summary = self.sampler.should_capture("before_close")
+        self.assertTrue(capture)
+        self.assertEqual(summary, {'error': 1, 'new_messages_detected': 1})
+        self.assertIn("error: 1", format_suppressed_summary(summary))
+
+        # Podsumowanie trafia tylko do jednego snapshotu
+        self.assertEqual(self.sampler.should_capture("before_close")[1], {})
+
+    def test_disabled_sampler_captures_everything(self):
+        sampler = SnapshotSampler(default_rule={'first': 0, 'per_minute': 0}, enabled=False)
+        self.assertTrue(all(sampler.should_capture("error")[0] for _ in range(10)))
+
+    def test_from_config_defaults(self):
+        sampler = SnapshotSampler.from_config(ConfigParser(os.devnull))
+        self.assertTrue(sampler.enabled)
+        self.assertEqual(sampler.rule_for("error")['first'], 3)
+        self.assertEqual(sampler.rule_for("custom_event"), {'first': 5, 'per_minute': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
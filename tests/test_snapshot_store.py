@@ -0,0 +1,87 @@
+"""
+Testy jednostkowe dla magazynu snapshotów debugowych.
+"""
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from src.snapshot_store import SnapshotStore, read_blob, INDEX_FILE
+from src.snapshot_writer import DebugSnapshot
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_snapshot(store, name, html, created_at=None, png=b"\x89PNG"):
+    created_at = created_at or datetime.now()
+    snapshot = DebugSnapshot(name, store.event_dir_for(created_at.strftime("%Y%m%d_%H%M%S_%f"), name))
+    snapshot.created_at = created_at
+    snapshot.page_source = html
+    snapshot.screenshot_png = png
+    snapshot.browser_logs = []
+    return snapshot
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_identical_captures_are_stored_once(self):
+        store = SnapshotStore(self.root)
+        store.add(make_snapshot(store, "before_login", "<html>same</html>"))
+        store.add(make_snapshot(store, "before_login", "<html>same</html>", datetime.now() + timedelta(seconds=1)))
+
+        stats = store.get_stats()
+        self.assertEqual((stats['events'], stats['blobs'], stats['blobs_deduplicated']), (2, 2, 2))
+
+        blob_files = [name for _, _, files in os.walk(os.path.join(self.root, 'blobs')) for name in files]
+        self.assertEqual(len(blob_files), 2)
+        html_blob = next(name for name in blob_files if name.endswith('.html.gz'))
+        self.assertEqual(read_blob(self.root, os.path.join('blobs', html_blob[:2], html_blob)), b"<html>same</html>")
+
+    def test_retention_by_age_removes_orphaned_blobs(self):
+        now = datetime(2024, 6, 1, 12, 0)
+        store = SnapshotStore(self.root, max_age_days=7, clock=FakeClock(now.timestamp()))
+        old = store.add(make_snapshot(store, "error", "<html>old</html>", now - timedelta(days=10), png=b"old"))
+        store.add(make_snapshot(store, "error", "<html>new</html>", now, png=b"new"))
+
+        self.assertFalse(os.path.exists(old))
+        self.assertEqual(store.get_stats()['events'], 1)
+        self.assertEqual(store.get_stats()['blobs'], 2)
+
+    def test_retention_by_total_size(self):
+        store = SnapshotStore(self.root, max_total_mb=0.01)
+        base = datetime.now()
+        for i in range(5):
+            store.add(make_snapshot(store, "error", "x", base + timedelta(seconds=i), png=os.urandom(4000)))
+
+        self.assertLessEqual(store.get_stats()['total_bytes'], 0.01 * 1024 * 1024)
+        self.assertLess(store.get_stats()['events'], 5)
+
+    def test_index_survives_restart_and_rebuild(self):
+        store = SnapshotStore(self.root)
+        first = store.add(make_snapshot(store, "a", "<p>1</p>"))
+        store.add(make_snapshot(store, "b", "<p>2</p>", datetime.now() + timedelta(seconds=1)))
+        store._remove_event(os.path.relpath(first, self.root))
+
+        reloaded = SnapshotStore(self.root).get_stats()
+        self.assertEqual((reloaded['events'], reloaded['blobs']), (1, 2))
+
+        os.remove(os.path.join(self.root, INDEX_FILE))
+        rebuilt = SnapshotStore(self.root).get_stats()
+        self.assertEqual((rebuilt['events'], rebuilt['blobs'], rebuilt['total_bytes']),
+                         (reloaded['events'], reloaded['blobs'], reloaded['total_bytes']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Testy jednostkowe dla asynchronicznego zapisu snapshotów debugowych.
+"""
+import os
+import tempfile
+import threading
+import unittest
+
+from src.snapshot_writer import AsyncSnapshotWriter, DebugSnapshot, capture_snapshot, write_snapshot
+
+
+class FakeDriver:
+    current_url = "https://www.facebook.com/messages/"
+    title = "Messenger"
+    page_source = "<html><body>ok</body></html>"
+
+    def get_screenshot_as_png(self):
+        return b"\x89PNG"
+
+    def get_log(self, kind):
+        raise RuntimeError("brak logów")
+
+
+class TestSnapshotCapture(unittest.TestCase):
+    def test_capture_and_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            event_dir = os.path.join(tmp, "event")
+            snapshot = capture_snapshot(FakeDriver(), "error", event_dir, "info")
+            self.assertIn('browser_logs', snapshot.capture_errors)
+
+            write_snapshot(snapshot)
+            self.assertEqual(sorted(os.listdir(event_dir)), ['debug.log', 'page_source.html', 'screenshot.png'])
+            with open(os.path.join(event_dir, 'debug.log'), encoding='utf-8') as f:
+                self.assertIn("Browser logs not available: brak logów", f.read())
+
+
+class TestAsyncSnapshotWriter(unittest.TestCase):
+    def test_drop_oldest_when_queue_is_full(self):
+        release = threading.Event()
+        started = threading.Event()
+        written = []
+
+        def slow_write(snapshot):
+            started.set()
+            release.wait(5)
+            written.append(snapshot.event_name)
+
+        writer = AsyncSnapshotWriter(max_queue=2, write_func=slow_write)
+        writer.submit(DebugSnapshot("first", "unused"))
+        self.assertTrue(started.wait(5))
+
+        self.assertTrue(writer.submit(DebugSnapshot("a", "unused")))
+        self.assertTrue(writer.submit(DebugSnapshot("b", "unused")))
+        self.assertFalse(writer.submit(DebugSnapshot("c", "unused")))
+
+        release.set()
+        self.assertTrue(writer.flush(5))
+        writer.close()
+
+        self.assertEqual(written, ["first", "b", "c"])
+        stats = writer.get_stats()
+        self.assertEqual((stats['written'], stats['dropped'], stats['queued']), (3, 1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()